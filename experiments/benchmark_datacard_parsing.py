@@ -0,0 +1,110 @@
+"""
+Time the parse and validate cost of each dataset card in the collection.
+
+Cards are read from ``labretriever/tests/huggingface_collection_datacards.txt``
+(a ``# <name>`` line followed by the card's README text). For each card the
+script reports the best of ``--repeat`` runs of:
+
+- ``parse``: ``huggingface_hub.DatasetCard(text)``, which is what
+  ``huggingface_hub`` does on every uncached fetch
+- ``yaml (C)``: ``yaml.load`` of the same YAML header with libyaml's
+  ``CSafeLoader``, if available
+- ``validate``: ``DatasetCard(**data)``
+- ``cache hit``: ``json.loads`` of the cached card plus validation, which is
+  what :class:`~labretriever.datacard.DataCard` does when the card cache has
+  the current revision
+
+Usage::
+
+    python experiments/benchmark_datacard_parsing.py [--repeat N] [PATH]
+
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import huggingface_hub
+import yaml
+from huggingface_hub.repocard import REGEX_YAML_BLOCK
+from pydantic import ValidationError
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+# Run from a checkout without installing the package
+sys.path.insert(0, str(REPO_ROOT))
+
+from labretriever.models import DatasetCard  # noqa: E402
+
+DEFAULT_PATH = (
+    REPO_ROOT / "labretriever" / "tests" / "huggingface_collection_datacards.txt"
+)
+
+# A card starts with a "# <name>" line directly followed by its front matter
+_CARD_HEADER = re.compile(r"^# (\S+)[ \t]*\n(?=---)", flags=re.MULTILINE)
+
+
+def read_cards(path: Path) -> dict[str, str]:
+    """Split the collection file into ``name -> README text``."""
+    parts = _CARD_HEADER.split(path.read_text())
+    return {name: text for name, text in zip(parts[1::2], parts[2::2])}
+
+
+def best_of(fn: Callable[[], Any], repeat: int) -> tuple[float, Any]:
+    """Return the fastest of ``repeat`` runs in milliseconds and the result."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("path", nargs="?", type=Path, default=DEFAULT_PATH)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    c_loader = getattr(yaml, "CSafeLoader", None)
+
+    header = (
+        f"{'card':<26}{'features':>9}{'parse ms':>10}{'yaml (C) ms':>13}"
+        f"{'validate ms':>13}{'cache hit ms':>14}"
+    )
+    print(header)
+    print("-" * len(header))
+    for name, text in read_cards(args.path).items():
+        t_parse, hf_card = best_of(
+            lambda: huggingface_hub.DatasetCard(text), args.repeat
+        )
+        data = hf_card.data.to_dict()
+        match = REGEX_YAML_BLOCK.search(text)
+        if c_loader is not None and match is not None:
+            front_matter = match.group(2)
+            ms, _ = best_of(
+                lambda: yaml.load(front_matter, Loader=c_loader), args.repeat
+            )
+            t_cyaml = f"{ms:>13.3f}"
+        else:
+            t_cyaml = f"{'n/a':>13}"
+        try:
+            t_validate, card = best_of(lambda: DatasetCard(**data), args.repeat)
+        except ValidationError as exc:
+            print(f"{name:<26}invalid card ({exc.error_count()} errors), skipped")
+            continue
+        cached = json.dumps(data, default=str)
+        t_hit, _ = best_of(lambda: DatasetCard(**json.loads(cached)), args.repeat)
+        n_features = sum(len(c.dataset_info.features) for c in card.configs)
+        print(
+            f"{name:<26}{n_features:>9}{t_parse:>10.3f}{t_cyaml}"
+            f"{t_validate:>13.3f}{t_hit:>14.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
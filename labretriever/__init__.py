@@ -1,34 +1,66 @@
 from .datacard import DataCard
+from .download_plan import DownloadEstimate, DownloadPlan, plan_downloads
+from .fetch_cache import EndpointPolicy, FetchCache
 from .fetchers import HfDataCardFetcher, HfRepoStructureFetcher, HfSizeInfoFetcher
 from .hf_cache_manager import HfCacheManager
+from .interning import DefinitionInterner, InternReport
+from .matrix import CSRMatrix, DenseMatrix, load_matrix, save_matrix
 from .models import (
     DatasetCard,
     DatasetConfig,
     DatasetType,
     ExtractedMetadata,
     FeatureInfo,
+    LazyConfigList,
     MetadataConfig,
     MetadataRelationship,
     PropertyMapping,
     RepositoryConfig,
 )
-from .virtual_db import ColumnMeta, VirtualDB
+from .partition_plan import PartitionPlan, PartitionRange, plan_partitions
+from .rate_limit import Priority, RequestScheduler
+from .repo_listing import RepoListing
+from .row_group_index import RowGroupIndex, RowGroupRef
+from .structure_cache import RepoStructureCache
+from .virtual_db import ColumnMeta, ConditionCube, VirtualDB
 
 __all__ = [
     "ColumnMeta",
+    "ConditionCube",
+    "CSRMatrix",
     "DataCard",
+    "DefinitionInterner",
+    "EndpointPolicy",
+    "FetchCache",
+    "DenseMatrix",
+    "DownloadEstimate",
+    "DownloadPlan",
     "HfCacheManager",
     "HfDataCardFetcher",
     "HfRepoStructureFetcher",
     "HfSizeInfoFetcher",
+    "InternReport",
+    "load_matrix",
+    "PartitionPlan",
+    "PartitionRange",
+    "plan_downloads",
+    "plan_partitions",
+    "Priority",
     "MetadataConfig",
     "PropertyMapping",
+    "RepoListing",
     "RepositoryConfig",
+    "RequestScheduler",
+    "RepoStructureCache",
+    "RowGroupIndex",
+    "RowGroupRef",
+    "save_matrix",
     "VirtualDB",
     "DatasetCard",
     "DatasetConfig",
     "DatasetType",
     "ExtractedMetadata",
     "FeatureInfo",
+    "LazyConfigList",
     "MetadataRelationship",
 ]
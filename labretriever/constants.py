@@ -5,7 +5,139 @@ from huggingface_hub.constants import HF_HUB_CACHE
 
 CACHE_DIR = Path(os.getenv("HF_CACHE_DIR", HF_HUB_CACHE))
 
+# Location of files derived by labretriever itself (e.g. cached matrices).
+# Kept separate from the HuggingFace hub cache, which huggingface_hub manages.
+LABRETRIEVER_CACHE_DIR = Path(
+    os.getenv("LABRETRIEVER_CACHE_DIR", Path.home() / ".cache" / "labretriever")
+)
+
+_DISABLED_VALUES = {"", "0", "false", "off", "no", "none"}
+
 
 def get_hf_token() -> str | None:
     """Get HuggingFace token from environment variable."""
     return os.getenv("HF_TOKEN")
+
+
+def get_card_cache_dir() -> Path | None:
+    """
+    Get the persistent dataset card cache directory.
+
+    Set ``LABRETRIEVER_CARD_CACHE_DIR`` to a path to relocate the cache, or to ``off``
+    (also ``0``/``false``/``none``/empty) to disable it.
+
+    :return: Cache directory, or None if the cache is disabled
+
+    """
+    value = os.getenv("LABRETRIEVER_CARD_CACHE_DIR")
+    if value is None:
+        return LABRETRIEVER_CACHE_DIR / "cards"
+    if value.strip().lower() in _DISABLED_VALUES:
+        return None
+    return Path(value)
+
+
+def is_hf_offline() -> bool:
+    """Return True if HuggingFace Hub offline mode (``HF_HUB_OFFLINE``) is set."""
+    return os.getenv("HF_HUB_OFFLINE", "").strip().lower() not in _DISABLED_VALUES
+
+
+def resolve_offline(offline: bool | None) -> bool:
+    """
+    Resolve an ``offline`` argument.
+
+    :param offline: Explicit setting, or None to follow ``HF_HUB_OFFLINE``
+    :return: Whether to work from local state only
+
+    """
+    return is_hf_offline() if offline is None else offline
+
+
+def get_structure_cache_dir() -> Path | None:
+    """
+    Get the persistent repository structure cache directory.
+
+    Set ``LABRETRIEVER_STRUCTURE_CACHE_DIR`` to a path to relocate the cache, or to
+    ``off`` (also ``0``/``false``/``none``/empty) to keep structures in memory only.
+
+    :return: Cache directory, or None if the on-disk cache is disabled
+
+    """
+    value = os.getenv("LABRETRIEVER_STRUCTURE_CACHE_DIR")
+    if value is None:
+        return LABRETRIEVER_CACHE_DIR / "structure"
+    if value.strip().lower() in _DISABLED_VALUES:
+        return None
+    return Path(value)
+
+
+def get_structure_cache_ttl() -> float | None:
+    """
+    Get how long a cached repository structure is used without revalidation.
+
+    Set ``LABRETRIEVER_STRUCTURE_CACHE_TTL`` to a number of seconds (default 300), or to
+    ``never`` to never revalidate.
+
+    :return: TTL in seconds, or None to never revalidate
+    :raises ValueError: If the variable is not a number or ``never``
+
+    """
+    value = os.getenv("LABRETRIEVER_STRUCTURE_CACHE_TTL", "300").strip().lower()
+    if value == "never":
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(
+            f"LABRETRIEVER_STRUCTURE_CACHE_TTL must be a number of seconds or "
+            f"'never', got {value!r}"
+        ) from None
+
+
+def get_rate_limit() -> float | None:
+    """
+    Get the sustained rate of HuggingFace Hub requests.
+
+    Set ``LABRETRIEVER_RATE_LIMIT`` to requests per second (default 3), or to ``off``
+    (also ``0``/``false``/``none``/empty) to not limit the rate.
+
+    :return: Requests per second, or None for no limit
+    :raises ValueError: If the variable is not a positive number or ``off``
+
+    """
+    value = os.getenv("LABRETRIEVER_RATE_LIMIT", "3").strip().lower()
+    if value in _DISABLED_VALUES:
+        return None
+    try:
+        rate = float(value)
+    except ValueError:
+        rate = 0.0
+    if rate <= 0:
+        raise ValueError(
+            f"LABRETRIEVER_RATE_LIMIT must be a positive number of requests per "
+            f"second or 'off', got {value!r}"
+        )
+    return rate
+
+
+def get_rate_limit_burst() -> int:
+    """
+    Get how many HuggingFace Hub requests may start at once.
+
+    Set ``LABRETRIEVER_RATE_LIMIT_BURST`` to a positive integer (default 50).
+
+    :return: Burst size
+    :raises ValueError: If the variable is not a positive integer
+
+    """
+    value = os.getenv("LABRETRIEVER_RATE_LIMIT_BURST", "50").strip()
+    try:
+        burst = int(value)
+    except ValueError:
+        burst = 0
+    if burst < 1:
+        raise ValueError(
+            f"LABRETRIEVER_RATE_LIMIT_BURST must be a positive integer, "
+            f"got {value!r}"
+        )
+    return burst
@@ -17,6 +17,8 @@ data loading strategies.
 """
 
 import logging
+from collections.abc import Callable, Iterable, Sequence
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import Any
 
@@ -28,16 +30,24 @@ from labretriever.fetchers import (
     HfRepoStructureFetcher,
     HfSizeInfoFetcher,
 )
+from labretriever.interning import (
+    DEFAULT_INTERNER,
+    DefinitionInterner,
+    FrozenList,
+    InternReport,
+    freeze,
+)
 from labretriever.models import (
     DatasetCard,
     DatasetConfig,
+    DatasetType,
     ExtractedMetadata,
     FeatureInfo,
     MetadataRelationship,
 )
 
 
-@dataclass
+@dataclass(frozen=True)
 class DatasetSchema:
     """
     Complete schema summary for a data configuration.
@@ -53,17 +63,22 @@ class DatasetSchema:
     :ivar metadata_source: One of ``"embedded"``, ``"external"``, or ``"none"``.
     :ivar external_metadata_config: Config name of the external metadata config, or
         ``None`` if metadata is embedded or absent.
-    :ivar is_partitioned: Whether the data parquet is partitioned.
+    :ivar is_partitioned: Whether the data parquet is partitioned. Instances are
+        immutable; the column sets are stored as frozensets.
 
     """
 
-    data_columns: set[str]
-    metadata_columns: set[str]
-    join_columns: set[str]
+    data_columns: frozenset[str]
+    metadata_columns: frozenset[str]
+    join_columns: frozenset[str]
     metadata_source: str
     external_metadata_config: str | None
     is_partitioned: bool
 
+    def __post_init__(self) -> None:
+        for name in ("data_columns", "metadata_columns", "join_columns"):
+            object.__setattr__(self, name, frozenset(getattr(self, name)))
+
 
 class DataCard:
     """
@@ -100,27 +115,135 @@ class DataCard:
 
     """
 
-    def __init__(self, repo_id: str, token: str | None = None):
+    def __init__(
+        self,
+        repo_id: str,
+        token: str | None = None,
+        lazy: bool = False,
+        intern_definitions: bool = False,
+        offline: bool | None = None,
+        revision: str | None = None,
+    ):
         """
         Initialize DataCard for a repository.
 
         :param repo_id: HuggingFace repository identifier (e.g., "user/dataset")
         :param token: Optional HuggingFace token for authentication
+        :param lazy: If True, validate each configuration only when it is first used
+            (see :meth:`DatasetCard.validate_lazy`). Validation errors in a
+            configuration are then raised by the method that first touches it instead of
+            when the card is loaded.
+        :param intern_definitions: If True, share field definitions and experimental
+            conditions that are identical to those of other cards loaded this way (see
+            :mod:`labretriever.interning`). The shared values are read-only.
+        :param offline: If True, make no network calls and serve the card and repository
+            structure from local caches; anything not cached raises
+            :class:`~labretriever.errors.HfOfflineError` (wrapped in
+            :class:`~labretriever.errors.DataCardError` when loading the card). None
+            follows ``HF_HUB_OFFLINE``.
+        :param revision: Branch, tag or commit sha to read the card and repository
+            structure at. None follows the default branch; a commit sha pins them, and a
+            cached copy is reused without any request.
 
         """
         self.repo_id = repo_id
         self.token = token
+        self.lazy = lazy
+        self.intern_definitions = intern_definitions
+        self.offline = offline
+        self.revision = revision
         self.logger = logging.getLogger(self.__class__.__name__)
 
         # Initialize fetchers
-        self._card_fetcher = HfDataCardFetcher(token=token)
-        self._structure_fetcher = HfRepoStructureFetcher(token=token)
-        self._size_fetcher = HfSizeInfoFetcher(token=token)
+        self._card_fetcher = HfDataCardFetcher(token=token, offline=offline)
+        self._structure_fetcher = HfRepoStructureFetcher(token=token, offline=offline)
+        self._size_fetcher = HfSizeInfoFetcher(token=token, offline=offline)
 
         # Cache for parsed card
         self._dataset_card: DatasetCard | None = None
         self._metadata_cache: dict[str, list[ExtractedMetadata]] = {}
         self._metadata_fields_map: dict[str, list[str]] = {}
+        self._metadata_fields_resolved: set[str] = set()
+        # Derived results, keyed by (kind, config_name), for the loaded card
+        self._derived: dict[tuple[str, str | None], Any] = {}
+        self._intern_report: InternReport | None = None
+
+    @classmethod
+    def load_many(
+        cls,
+        repo_ids: Iterable[str],
+        max_workers: int = 8,
+        include_structure: bool = False,
+        factory: Callable[[str], "DataCard"] | None = None,
+        token: str | None = None,
+        **kwargs: Any,
+    ) -> tuple[dict[str, "DataCard"], dict[str, Exception]]:
+        """
+        Fetch and validate the cards of many repositories concurrently.
+
+        Card downloads are network-bound, so they run in a thread pool of at
+        most ``max_workers`` threads and a collection loads in roughly the
+        time of its slowest card rather than the sum of all of them.
+
+        Example:
+            >>> cards, errors = DataCard.load_many(
+            ...     ["BrentLab/harbison_2004", "BrentLab/hackett_2020"]
+            ... )
+            >>> for repo_id, exc in errors.items():
+            ...     print(f"{repo_id}: {exc}")
+
+        :param repo_ids: Repository identifiers. Duplicates are loaded once.
+        :param max_workers: Maximum number of concurrent fetches
+        :param include_structure: If True, also fetch each repository's file
+            structure (used by :meth:`info` and partition value lookups). A
+            failure here is logged and does not fail the card.
+        :param factory: Creates the DataCard for a repository identifier, e.g.
+            to share cards through a cache. Defaults to
+            ``DataCard(repo_id, token=token, **kwargs)``.
+        :param token: Optional HuggingFace token, used by the default factory
+        :param kwargs: Further DataCard arguments (``lazy``,
+            ``intern_definitions``, ``offline``, ``revision``), used by the
+            default factory
+        :return: Tuple of ``{repo_id: DataCard}`` for the cards that loaded and
+            ``{repo_id: exception}`` for those that did not, both in input
+            order
+        :raises ValueError: If ``max_workers`` is less than 1
+
+        """
+        if max_workers < 1:
+            raise ValueError(f"max_workers must be at least 1, got {max_workers}")
+        if factory is None:
+
+            def factory(repo_id: str) -> DataCard:
+                return cls(repo_id, token=token, **kwargs)
+
+        def load(repo_id: str) -> DataCard:
+            card = factory(repo_id)
+            _ = card.dataset_card
+            if include_structure:
+                try:
+                    card._structure_fetcher.fetch(repo_id, revision=card.revision)
+                except HfDataFetchError as e:
+                    card.logger.warning(
+                        f"Failed to fetch repo structure for {repo_id}: {e}"
+                    )
+            return card
+
+        unique = list(dict.fromkeys(repo_ids))
+        loaded: dict[str, DataCard] = {}
+        errors: dict[str, Exception] = {}
+        if not unique:
+            return loaded, errors
+        with ThreadPoolExecutor(
+            max_workers=min(max_workers, len(unique)), thread_name_prefix="datacard"
+        ) as pool:
+            futures = [(repo_id, pool.submit(load, repo_id)) for repo_id in unique]
+            for repo_id, future in futures:
+                try:
+                    loaded[repo_id] = future.result()
+                except Exception as e:
+                    errors[repo_id] = e
+        return loaded, errors
 
     @property
     def dataset_card(self) -> DatasetCard:
@@ -132,61 +255,197 @@ class DataCard:
         assert self._dataset_card is not None
         return self._dataset_card
 
-    def _load_and_validate_card(self) -> None:
-        """Load and validate the dataset card from HuggingFace."""
+    def _load_and_validate_card(self, force_refresh: bool = False) -> None:
+        """
+        Load and validate the dataset card from HuggingFace.
+
+        :param force_refresh: If True, download the card again instead of using a cached
+            copy
+
+        """
         try:
             self.logger.debug(f"Loading dataset card for {self.repo_id}")
-            card_data = self._card_fetcher.fetch(self.repo_id)
+            card_data = self._card_fetcher.fetch(
+                self.repo_id, force_refresh=force_refresh, revision=self.revision
+            )
 
             if not card_data:
                 raise DataCardValidationError(
                     f"No dataset card found for {self.repo_id}"
                 )
 
+            if self.intern_definitions:
+                card_data, self._intern_report = DEFAULT_INTERNER.intern_card_data(
+                    card_data
+                )
+            else:
+                self._intern_report = None
+
             # Validate using Pydantic model
-            self._dataset_card = DatasetCard(**card_data)
-            self._build_metadata_fields_map()
+            self._metadata_fields_map = {}
+            self._metadata_fields_resolved = set()
+            self._derived = {}
+            if self.lazy:
+                self._dataset_card = DatasetCard.validate_lazy(card_data)
+            else:
+                self._dataset_card = DatasetCard(**card_data)
+                self._build_metadata_fields_map()
             self.logger.debug(f"Successfully validated dataset card for {self.repo_id}")
 
         except ValidationError as e:
-            # Create a more user-friendly error message
-            error_details = []
-            for error in e.errors():
-                field_path = " -> ".join(str(x) for x in error["loc"])
-                error_type = error["type"]
-                error_msg = error["msg"]
-                input_value = error.get("input", "N/A")
-
-                if "dtype" in field_path and error_type == "string_type":
-                    error_details.append(
-                        f"Field '{field_path}': Expected a simple data type "
-                        "string (like 'string', 'int64', 'float64') "
-                        "but got a complex structure. This might be a categorical "
-                        "field with class labels. "
-                        f"Actual value: {input_value}"
-                    )
-                else:
-                    error_details.append(
-                        f"Field '{field_path}': {error_msg} (got: {input_value})"
-                    )
+            raise self._validation_error(e) from e
+        except HfDataFetchError as e:
+            raise DataCardError(f"Failed to fetch dataset card: {e}") from e
 
-            detailed_msg = (
-                f"Dataset card validation failed for {self.repo_id}:\n"
-                + "\n".join(f"  - {detail}" for detail in error_details)
-            )
-            self.logger.error(detailed_msg)
-            raise DataCardValidationError(detailed_msg) from e
+    def memory_report(self) -> InternReport:
+        """
+        Report how much of the card's definition data is shared.
+
+        For a card loaded with ``intern_definitions=True`` this is the report
+        from loading it: what was shared with cards loaded earlier, or
+        repeated within this card. Otherwise the card data is interned into a
+        throwaway table, which shows the savings from repetition within the
+        card alone.
+
+        :return: Node and byte counts for the card's definition blocks
+        :raises DataCardError: If the card cannot be fetched
+
+        """
+        _ = self.dataset_card  # ensure loaded
+        if self._intern_report is not None:
+            return self._intern_report
+        try:
+            card_data = self._card_fetcher.fetch(self.repo_id, revision=self.revision)
         except HfDataFetchError as e:
             raise DataCardError(f"Failed to fetch dataset card: {e}") from e
+        _, report = DefinitionInterner().intern_card_data(card_data)
+        return report
+
+    def _memoized(
+        self, kind: str, config_name: str | None, build: Callable[[], Any]
+    ) -> Any:
+        """
+        Return a result derived from the card, computing it once per load.
+
+        The cache is emptied whenever the card is loaded again, e.g. after
+        ``refresh_cache=True``, so results are never carried over from another revision
+        of the card. Exceptions raised by ``build`` are not cached.
+
+        :param kind: Name of the derived result
+        :param config_name: Configuration the result is for, or None
+        :param build: Computes the result
+        :return: The cached result
+
+        """
+        _ = self.dataset_card  # ensure loaded
+        key = (kind, config_name)
+        if key not in self._derived:
+            self._derived[key] = build()
+        return self._derived[key]
+
+    def _validation_error(
+        self, e: ValidationError, config_name: str | None = None
+    ) -> DataCardValidationError:
+        """
+        Build a user-friendly error from a pydantic ValidationError.
+
+        :param e: The validation error
+        :param config_name: Configuration that failed when it was validated on first use
+            in lazy mode, or None for the whole card
+        :return: DataCardValidationError describing each failing field
+
+        """
+        # Create a more user-friendly error message
+        error_details = []
+        for error in e.errors():
+            field_path = " -> ".join(str(x) for x in error["loc"])
+            error_type = error["type"]
+            error_msg = error["msg"]
+            input_value = error.get("input", "N/A")
+
+            if "dtype" in field_path and error_type == "string_type":
+                error_details.append(
+                    f"Field '{field_path}': Expected a simple data type "
+                    "string (like 'string', 'int64', 'float64') "
+                    "but got a complex structure. This might be a categorical "
+                    "field with class labels. "
+                    f"Actual value: {input_value}"
+                )
+            else:
+                error_details.append(
+                    f"Field '{field_path}': {error_msg} (got: {input_value})"
+                )
+
+        target = self.repo_id
+        if config_name is not None:
+            target += f" (config '{config_name}')"
+        detailed_msg = f"Dataset card validation failed for {target}:\n" + "\n".join(
+            f"  - {detail}" for detail in error_details
+        )
+        self.logger.error(detailed_msg)
+        return DataCardValidationError(detailed_msg)
 
     @property
-    def configs(self) -> list[DatasetConfig]:
+    def configs(self) -> Sequence[DatasetConfig]:
         """Get all dataset configurations."""
         return self.dataset_card.configs
 
     def get_config(self, config_name: str) -> DatasetConfig | None:
-        """Get a specific configuration by name."""
-        return self.dataset_card.get_config_by_name(config_name)
+        """
+        Get a specific configuration by name.
+
+        :param config_name: Configuration name
+        :return: The configuration, or None if the card has no such config
+        :raises DataCardValidationError: If the configuration is validated now (lazy
+            mode) and is invalid
+
+        """
+        try:
+            return self.dataset_card.get_config_by_name(config_name)
+        except ValidationError as e:
+            raise self._validation_error(e, config_name) from e
+
+    def _data_configs(self) -> list[DatasetConfig]:
+        """
+        Return all non-metadata configurations.
+
+        :raises DataCardValidationError: If one of them is validated now (lazy mode) and
+            is invalid
+
+        """
+        try:
+            return self.dataset_card.get_data_configs()
+        except ValidationError as e:
+            raise self._validation_error(e) from e
+
+    def _metadata_configs_for(self, config_name: str) -> list[DatasetConfig]:
+        """
+        Return the metadata configurations whose ``applies_to`` lists a config.
+
+        :param config_name: Name of the data configuration
+        :raises DataCardValidationError: If one of them is validated now (lazy mode) and
+            is invalid
+
+        """
+        try:
+            return self.dataset_card.get_metadata_configs_for(config_name)
+        except ValidationError as e:
+            raise self._validation_error(e) from e
+
+    def get_feature(self, config_name: str, field_name: str) -> FeatureInfo | None:
+        """
+        Get one feature definition of a configuration.
+
+        :param config_name: Configuration name
+        :param field_name: Feature (column) name
+        :return: The FeatureInfo, or None if the config has no such feature
+        :raises DataCardError: If config not found
+
+        """
+        config = self.get_config(config_name)
+        if not config:
+            raise DataCardError(f"Configuration '{config_name}' not found")
+        return config.dataset_info.get_feature(field_name)
 
     def get_features(self, config_name: str) -> list[FeatureInfo]:
         """
@@ -220,7 +479,7 @@ class DataCard:
         try:
             # Get partition values from repository structure
             partition_values = self._structure_fetcher.get_partition_values(
-                self.repo_id, field_name
+                self.repo_id, field_name, revision=self.revision
             )
             return set(partition_values)
         except HfDataFetchError:
@@ -234,30 +493,25 @@ class DataCard:
         Get relationships between data configs and their metadata.
 
         :param refresh_cache: If True, force refresh dataset card from remote
+        :raises DataCardValidationError: If a data config is validated now (lazy mode)
+            and is invalid
 
         """
-        # Clear cached dataset card if refresh requested
+        # Download the dataset card again if refresh requested
         if refresh_cache:
-            self._dataset_card = None
+            self._load_and_validate_card(force_refresh=True)
 
         relationships = []
-        data_configs = self.dataset_card.get_data_configs()
-        metadata_configs = self.dataset_card.get_metadata_configs()
-
-        for data_config in data_configs:
+        for data_config in self._data_configs():
             # Check for explicit applies_to relationships
-            for meta_config in metadata_configs:
-                if (
-                    meta_config.applies_to
-                    and data_config.config_name in meta_config.applies_to
-                ):
-                    relationships.append(
-                        MetadataRelationship(
-                            data_config=data_config.config_name,
-                            metadata_config=meta_config.config_name,
-                            relationship_type="explicit",
-                        )
+            for meta_config in self._metadata_configs_for(data_config.config_name):
+                relationships.append(
+                    MetadataRelationship(
+                        data_config=data_config.config_name,
+                        metadata_config=meta_config.config_name,
+                        relationship_type="explicit",
                     )
+                )
 
             # Check for embedded metadata (always runs regardless of
             # explicit relationships)
@@ -276,8 +530,22 @@ class DataCard:
         """
         Build a mapping from data config names to their metadata fields.
 
-        Called during card loading. For each data config, resolves metadata
-        fields from two sources:
+        Called during card loading unless the card is lazy, in which case
+        :meth:`get_metadata_fields` resolves each config on first use. See
+        :meth:`_resolve_metadata_fields` for how fields are found.
+
+        """
+        assert self._dataset_card is not None
+        self._metadata_fields_map = {}
+
+        for data_cfg in self._data_configs():
+            self._resolve_metadata_fields(data_cfg)
+
+    def _resolve_metadata_fields(self, data_cfg: DatasetConfig) -> None:
+        """
+        Record the metadata fields of one data config.
+
+        Metadata fields come from two sources:
 
         1. Embedded: the data config has ``metadata_fields`` listing which
            of its own columns are metadata.
@@ -288,48 +556,47 @@ class DataCard:
         Embedded takes priority. For external, the first matching metadata
         config wins.
 
+        :param data_cfg: The data configuration
+
         """
-        assert self._dataset_card is not None
-        self._metadata_fields_map = {}
-        meta_configs = self._dataset_card.get_metadata_configs()
-
-        for data_cfg in self._dataset_card.get_data_configs():
-            name = data_cfg.config_name
-            # Embedded case
-            if data_cfg.metadata_fields:
-                self._metadata_fields_map[name] = list(data_cfg.metadata_fields)
-                continue
-            # External case: find metadata config with applies_to
-            for meta_cfg in meta_configs:
-                if meta_cfg.applies_to and name in meta_cfg.applies_to:
-                    self._metadata_fields_map[name] = [
-                        f.name for f in meta_cfg.dataset_info.features
-                    ]
-                    break
-            else:
-                self.logger.info(
-                    "No metadata fields found for data config '%s' "
-                    "in repo '%s' -- no embedded metadata_fields and "
-                    "no metadata config with applies_to",
-                    name,
-                    self.repo_id,
-                )
+        name = data_cfg.config_name
+        self._metadata_fields_resolved.add(name)
+        # Embedded case
+        if data_cfg.metadata_fields:
+            self._metadata_fields_map[name] = FrozenList(data_cfg.metadata_fields)
+            return
+        # External case: find metadata config with applies_to
+        for meta_cfg in self._metadata_configs_for(name):
+            self._metadata_fields_map[name] = FrozenList(
+                f.name for f in meta_cfg.dataset_info.features
+            )
+            return
+        self.logger.info(
+            "No metadata fields found for data config '%s' "
+            "in repo '%s' -- no embedded metadata_fields and "
+            "no metadata config with applies_to",
+            name,
+            self.repo_id,
+        )
 
     def get_metadata_fields(self, config_name: str) -> list[str] | None:
         """
         Get metadata field names for a data configuration.
 
-        Returns pre-computed metadata fields resolved during card loading.
-        Handles both embedded metadata (``metadata_fields`` on the data
-        config) and external metadata (separate metadata config with
-        ``applies_to``).
+        Returns metadata fields resolved during card loading (or on first use for lazy
+        cards). Handles both embedded metadata (``metadata_fields`` on the data config)
+        and external metadata (separate metadata config with ``applies_to``).
 
         :param config_name: Name of the data configuration
-        :return: List of metadata field names, or None if no metadata
+        :return: Read-only list of metadata field names, or None if no metadata
 
         """
         # Ensure card is loaded (triggers _build_metadata_fields_map)
         _ = self.dataset_card
+        if self.lazy and config_name not in self._metadata_fields_resolved:
+            data_cfg = self.get_config(config_name)
+            if data_cfg is not None and data_cfg.dataset_type != DatasetType.METADATA:
+                self._resolve_metadata_fields(data_cfg)
         return self._metadata_fields_map.get(config_name)
 
     def get_data_col_names(self, config_name: str) -> set[str]:
@@ -353,9 +620,8 @@ class DataCard:
         """
         Return the config_name of the external metadata config, if any.
 
-        If the data config has embedded ``metadata_fields``, or if no
-        metadata config with ``applies_to`` references this config,
-        returns None.
+        If the data config has embedded ``metadata_fields``, or if no metadata config
+        with ``applies_to`` references this config, returns None.
 
         :param config_name: Name of the data configuration
         :return: The metadata config name, or None
@@ -369,9 +635,8 @@ class DataCard:
         if data_cfg.metadata_fields:
             return None
         # Find external metadata config with applies_to
-        for meta_cfg in self.dataset_card.get_metadata_configs():
-            if meta_cfg.applies_to and config_name in meta_cfg.applies_to:
-                return meta_cfg.config_name
+        for meta_cfg in self._metadata_configs_for(config_name):
+            return meta_cfg.config_name
         return None
 
     def get_dataset_schema(self, config_name: str) -> DatasetSchema | None:
@@ -384,6 +649,8 @@ class DataCard:
         All information is derived from the DataCard YAML -- no DuckDB
         introspection is needed.
 
+        The schema is computed once per loaded card.
+
         :param config_name: Name of the data configuration
         :return: DatasetSchema instance, or None if config not found
 
@@ -401,6 +668,14 @@ class DataCard:
             # schema.join_columns == {"id"}  (common to both parquets)
 
         """
+        return self._memoized(
+            "dataset_schema",
+            config_name,
+            lambda: self._build_dataset_schema(config_name),
+        )
+
+    def _build_dataset_schema(self, config_name: str) -> DatasetSchema | None:
+        """Build the result of :meth:`get_dataset_schema`."""
         _ = self.dataset_card  # ensure loaded
         config = self.get_config(config_name)
         if not config:
@@ -418,35 +693,34 @@ class DataCard:
             meta_cols = set(config.metadata_fields)
             data_cols = all_cols - meta_cols
             return DatasetSchema(
-                data_columns=data_cols,
-                metadata_columns=meta_cols,
-                join_columns=set(),
+                data_columns=frozenset(data_cols),
+                metadata_columns=frozenset(meta_cols),
+                join_columns=frozenset(),
                 metadata_source="embedded",
                 external_metadata_config=None,
                 is_partitioned=is_partitioned,
             )
 
         # External: find metadata config with applies_to
-        for meta_cfg in self.dataset_card.get_metadata_configs():
-            if meta_cfg.applies_to and config_name in meta_cfg.applies_to:
-                data_cols = {f.name for f in config.dataset_info.features}
-                meta_cols = {f.name for f in meta_cfg.dataset_info.features}
-                join_cols = data_cols & meta_cols
-                return DatasetSchema(
-                    data_columns=data_cols,
-                    metadata_columns=meta_cols,
-                    join_columns=join_cols,
-                    metadata_source="external",
-                    external_metadata_config=meta_cfg.config_name,
-                    is_partitioned=is_partitioned,
-                )
+        for meta_cfg in self._metadata_configs_for(config_name):
+            data_cols = {f.name for f in config.dataset_info.features}
+            meta_cols = {f.name for f in meta_cfg.dataset_info.features}
+            join_cols = data_cols & meta_cols
+            return DatasetSchema(
+                data_columns=frozenset(data_cols),
+                metadata_columns=frozenset(meta_cols),
+                join_columns=frozenset(join_cols),
+                metadata_source="external",
+                external_metadata_config=meta_cfg.config_name,
+                is_partitioned=is_partitioned,
+            )
 
         # No metadata relationship -- treat all columns as data
         all_cols = {f.name for f in config.dataset_info.features}
         return DatasetSchema(
-            data_columns=all_cols,
-            metadata_columns=set(),
-            join_columns=set(),
+            data_columns=frozenset(all_cols),
+            metadata_columns=frozenset(),
+            join_columns=frozenset(),
             metadata_source="none",
             external_metadata_config=None,
             is_partitioned=is_partitioned,
@@ -480,9 +754,15 @@ class DataCard:
     def _repo_info(self) -> dict[str, Any]:
         """Return repository-level metadata."""
         card = self.dataset_card
+        try:
+            configs = list(card.configs)
+        except ValidationError as e:
+            raise self._validation_error(e) from e
 
         try:
-            structure = self._structure_fetcher.fetch(self.repo_id)
+            structure = self._structure_fetcher.fetch(
+                self.repo_id, revision=self.revision
+            )
             total_files = structure.get("total_files", 0)
             last_modified = structure.get("last_modified")
         except HfDataFetchError:
@@ -498,7 +778,7 @@ class DataCard:
             "tags": card.tags,
             "language": card.language,
             "size_categories": card.size_categories,
-            "num_configs": len(card.configs),
+            "num_configs": len(configs),
             "total_files": total_files,
             "last_modified": last_modified,
             "has_default_config": card.default_config is not None,
@@ -509,7 +789,7 @@ class DataCard:
                     "default": c.default,
                     "description": c.description,
                 }
-                for c in card.configs
+                for c in configs
             ],
         }
 
@@ -559,6 +839,9 @@ class DataCard:
         3. Access condition definitions for creating flattened columns
         4. Plan metadata table structure
 
+        The schema is computed once per loaded card and returned read-only;
+        copy it (e.g. with ``copy.deepcopy``) to modify it.
+
         :param config_name: Configuration name to extract schema for
         :return: Dict with comprehensive schema including:
             - regulator_fields: List of regulator identifier field names
@@ -582,6 +865,14 @@ class DataCard:
             ...     print(f"{field} has {len(defs)} levels")
 
         """
+        return self._memoized(
+            "metadata_schema",
+            config_name,
+            lambda: freeze(self._build_metadata_schema(config_name)),
+        )
+
+    def _build_metadata_schema(self, config_name: str) -> dict[str, Any]:
+        """Build the result of :meth:`extract_metadata_schema`."""
         config = self.get_config(config_name)
         if not config:
             raise DataCardError(f"Configuration '{config_name}' not found")
@@ -596,34 +887,25 @@ class DataCard:
             "config_level_conditions": None,
         }
 
-        for feature in config.dataset_info.features:
-            if feature.role == "regulator_identifier":
-                schema["regulator_fields"].append(feature.name)
-            elif feature.role == "target_identifier":
-                schema["target_fields"].append(feature.name)
-            elif feature.role == "experimental_condition":
-                schema["condition_fields"].append(feature.name)
-                if feature.definitions:
-                    schema["condition_definitions"][feature.name] = feature.definitions
-
+        infos = [config.dataset_info]
         # Include features from external metadata config
         meta_fields = self.get_metadata_fields(config_name)
         schema["metadata_fields"] = meta_fields
         if meta_fields is not None and not config.metadata_fields:
-            for meta_cfg in self.dataset_card.get_metadata_configs():
-                if meta_cfg.applies_to and config_name in meta_cfg.applies_to:
-                    for feature in meta_cfg.dataset_info.features:
-                        if feature.role == "regulator_identifier":
-                            schema["regulator_fields"].append(feature.name)
-                        elif feature.role == "target_identifier":
-                            schema["target_fields"].append(feature.name)
-                        elif feature.role == "experimental_condition":
-                            schema["condition_fields"].append(feature.name)
-                            if feature.definitions:
-                                schema["condition_definitions"][
-                                    feature.name
-                                ] = feature.definitions
-                    break
+            meta_cfgs = self._metadata_configs_for(config_name)
+            if meta_cfgs:
+                infos.append(meta_cfgs[0].dataset_info)
+
+        for info in infos:
+            for role, key in (
+                ("regulator_identifier", "regulator_fields"),
+                ("target_identifier", "target_fields"),
+                ("experimental_condition", "condition_fields"),
+            ):
+                schema[key] += [f.name for f in info.get_features_by_role(role)]
+            for feature in info.get_features_by_role("experimental_condition"):
+                if feature.definitions:
+                    schema["condition_definitions"][feature.name] = feature.definitions
 
         # Add top-level conditions (applies to all configs/samples)
         if self.dataset_card.model_extra:
@@ -655,7 +937,9 @@ class DataCard:
         - If config_name is provided: returns merged (top + config) conditions
 
         All conditions are returned as flexible dicts that preserve the original
-        YAML structure. Navigate nested dicts to access specific values.
+        YAML structure. Navigate nested dicts to access specific values. Results
+        are computed once per loaded card and are read-only; copy them (e.g.
+        with ``copy.deepcopy``) to modify them.
 
         :param config_name: Optional config name. If provided, merges top
           and config levels
@@ -672,6 +956,16 @@ class DataCard:
             >>> media_name = media.get('name', 'unspecified')
 
         """
+        return self._memoized(
+            "experimental_conditions",
+            config_name,
+            lambda: freeze(self._build_experimental_conditions(config_name)),
+        )
+
+    def _build_experimental_conditions(
+        self, config_name: str | None = None
+    ) -> dict[str, Any]:
+        """Build the result of :meth:`get_experimental_conditions`."""
         # Get top-level conditions (stored in model_extra)
         top_level = (
             self.dataset_card.model_extra.get("experimental_conditions", {})
@@ -780,12 +1074,7 @@ class DataCard:
         if not config:
             raise DataCardError(f"Configuration '{config_name}' not found")
 
-        # Find the feature
-        feature = None
-        for f in config.dataset_info.features:
-            if f.name == field_name:
-                feature = f
-                break
+        feature = config.dataset_info.get_feature(field_name)
 
         if not feature:
             raise DataCardError(
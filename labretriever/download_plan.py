@@ -0,0 +1,423 @@
+"""
+Estimate what a VirtualDB configuration will download before building it.
+
+A cold :class:`~labretriever.virtual_db.VirtualDB` downloads the Parquet files
+of every configured dataset (and of each dataset's external metadata config).
+:func:`plan_downloads` reports, per ``db_name``, how many bytes that is, how
+much of it is already in the local HuggingFace cache, and how long the rest
+would take at a given bandwidth, without downloading anything.
+
+Total sizes come from the HuggingFace dataset viewer ``/size`` endpoint
+(fetched concurrently with :meth:`HfSizeInfoFetcher.fetch_many`). Cached sizes
+are the sizes of the files matching the config's ``data_files`` patterns in
+the locally cached snapshot of the dataset's pinned ``revision`` (the
+repository's ``main`` branch if none is configured).
+
+Example::
+
+    plan = plan_downloads("vdb_config.yaml", bandwidth=20 * 1024**2)
+    print(plan.summary())
+    plan.to_frame()  # one row per db_name
+
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+
+from labretriever.constants import CACHE_DIR
+from labretriever.datacard import DataCard
+from labretriever.errors import DataCardError
+from labretriever.fetchers import HfSizeInfoFetcher, is_commit_sha
+from labretriever.models import MetadataConfig
+
+logger = logging.getLogger(__name__)
+
+#: Default bandwidth for transfer time estimates, in bytes per second
+DEFAULT_BANDWIDTH = 50 * 1024**2
+
+
+@dataclass(frozen=True)
+class DownloadEstimate:
+    """
+    Download size of one VirtualDB dataset.
+
+    :ivar db_name: Dataset name in the VirtualDB configuration
+    :ivar repo_id: HuggingFace repository ID
+    :ivar config_names: The dataset's config and, if its metadata is external, the
+        metadata config
+    :ivar total_bytes: Size of the configs' files, or None if unknown
+    :ivar cached_bytes: Size of the matching files in the local cache
+    :ivar error: Why ``total_bytes`` is unknown, if it is
+
+    """
+
+    db_name: str
+    repo_id: str
+    config_names: tuple[str, ...]
+    total_bytes: int | None
+    cached_bytes: int
+    error: str | None = None
+
+    @property
+    def missing_bytes(self) -> int | None:
+        """Bytes still to download, or None if the total is unknown."""
+        if self.total_bytes is None:
+            return None
+        return max(0, self.total_bytes - self.cached_bytes)
+
+
+@dataclass(frozen=True)
+class DownloadPlan:
+    """
+    Download sizes for every dataset of a VirtualDB configuration.
+
+    Totals count each ``(repo_id, config_name)`` once, even if several datasets share a
+    metadata config, and leave out datasets whose size is unknown.
+
+    :ivar estimates: One estimate per db_name, in configuration order
+    :ivar bandwidth: Bandwidth used for the time estimate, in bytes per second
+    :ivar total_bytes: Total size of all known configs
+    :ivar cached_bytes: Of that, bytes already in the local cache
+    :ivar missing_bytes: Of that, bytes still to download
+
+    """
+
+    estimates: tuple[DownloadEstimate, ...]
+    bandwidth: float
+    total_bytes: int
+    cached_bytes: int
+    missing_bytes: int
+
+    @property
+    def estimated_seconds(self) -> float:
+        """Time to download ``missing_bytes`` at ``bandwidth``."""
+        return self.missing_bytes / self.bandwidth
+
+    @property
+    def unknown(self) -> list[str]:
+        """db_names whose download size could not be determined."""
+        return [e.db_name for e in self.estimates if e.total_bytes is None]
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Return the estimates as a DataFrame.
+
+        :return: One row per db_name with columns ``db_name``, ``repo_id``,
+            ``config_names``, ``total_bytes``, ``cached_bytes``, ``missing_bytes``,
+            ``estimated_seconds`` and ``error``
+
+        """
+        return pd.DataFrame(
+            [
+                {
+                    "db_name": e.db_name,
+                    "repo_id": e.repo_id,
+                    "config_names": ", ".join(e.config_names),
+                    "total_bytes": e.total_bytes,
+                    "cached_bytes": e.cached_bytes,
+                    "missing_bytes": e.missing_bytes,
+                    "estimated_seconds": (
+                        None
+                        if e.missing_bytes is None
+                        else e.missing_bytes / self.bandwidth
+                    ),
+                    "error": e.error,
+                }
+                for e in self.estimates
+            ],
+            columns=[
+                "db_name",
+                "repo_id",
+                "config_names",
+                "total_bytes",
+                "cached_bytes",
+                "missing_bytes",
+                "estimated_seconds",
+                "error",
+            ],
+        )
+
+    def summary(self) -> str:
+        """
+        Return a human readable report.
+
+        :return: One line per db_name followed by the totals
+
+        """
+        lines = []
+        for e in self.estimates:
+            if e.total_bytes is None:
+                lines.append(f"{e.db_name}: size unknown ({e.error})")
+            else:
+                lines.append(
+                    f"{e.db_name}: {_format_bytes(e.total_bytes)} total, "
+                    f"{_format_bytes(e.cached_bytes)} cached, "
+                    f"{_format_bytes(e.missing_bytes or 0)} to download"
+                )
+        lines.append(
+            f"Total: {_format_bytes(self.total_bytes)}, "
+            f"{_format_bytes(self.cached_bytes)} cached, "
+            f"{_format_bytes(self.missing_bytes)} to download "
+            f"(~{self.estimated_seconds:.0f}s at "
+            f"{_format_bytes(int(self.bandwidth))}/s)"
+        )
+        return "\n".join(lines)
+
+
+def plan_downloads(
+    config_path: Path | str,
+    token: str | None = None,
+    bandwidth: float = DEFAULT_BANDWIDTH,
+    max_workers: int = 8,
+    cache_dir: Path | str | None = None,
+) -> DownloadPlan:
+    """
+    Estimate the downloads a cold VirtualDB would make for a configuration.
+
+    Only dataset cards and size information are fetched; no data files are
+    downloaded. Cards are read at each dataset's configured revision, so the
+    cached files are matched with the patterns of that revision. Datasets
+    whose card or size cannot be fetched are reported with
+    ``total_bytes=None`` and an error message.
+
+    :param config_path: Path to the VirtualDB YAML configuration
+    :param token: Optional HuggingFace token for private datasets
+    :param bandwidth: Expected download bandwidth in bytes per second
+    :param max_workers: Maximum number of concurrent requests
+    :param cache_dir: HuggingFace hub cache to check. Defaults to
+        :data:`~labretriever.constants.CACHE_DIR`.
+    :return: The download plan
+    :raises ValueError: If ``bandwidth`` is not positive, or the
+        configuration is invalid
+    :raises FileNotFoundError: If the configuration file does not exist
+
+    """
+    if bandwidth <= 0:
+        raise ValueError(f"bandwidth must be positive, got {bandwidth}")
+    config = MetadataConfig.from_yaml(config_path)
+    cache_root = Path(cache_dir) if cache_dir is not None else CACHE_DIR
+    db_name_map = config.get_db_name_map()
+    repo_ids = [repo_id for repo_id, _ in db_name_map.values()]
+
+    # Cards are read at each config's revision, as VirtualDB reads them
+    cards, card_errors = _load_cards(
+        [(r, config.get_revision(r, c)) for r, c in db_name_map.values()],
+        token,
+        max_workers,
+    )
+    # External metadata configs can be pinned to yet another revision
+    missing = []
+    for repo_id, config_name in db_name_map.values():
+        card = cards.get((repo_id, config.get_revision(repo_id, config_name)))
+        if card is None:
+            continue
+        for name in _external_metadata_configs(card, config_name):
+            key = (repo_id, config.get_revision(repo_id, name))
+            if key not in cards:
+                missing.append(key)
+    if missing:
+        more_cards, more_errors = _load_cards(missing, token, max_workers)
+        cards.update(more_cards)
+        card_errors.update(more_errors)
+
+    sizes, size_errors = HfSizeInfoFetcher(token=token).fetch_many(
+        repo_ids, max_workers=max_workers
+    )
+
+    # (repo_id, config_name) -> (total bytes or None, cached bytes)
+    config_sizes: dict[tuple[str, str], tuple[int | None, int]] = {}
+    estimates = []
+    for db_name, (repo_id, config_name) in db_name_map.items():
+        card_key = (repo_id, config.get_revision(repo_id, config_name))
+        card = cards.get(card_key)
+        if card is None:
+            estimates.append(
+                DownloadEstimate(
+                    db_name,
+                    repo_id,
+                    (config_name,),
+                    None,
+                    0,
+                    str(card_errors[card_key]),
+                )
+            )
+            continue
+        config_names = (config_name, *_external_metadata_configs(card, config_name))
+        error = str(size_errors[repo_id]) if repo_id in size_errors else None
+        total: int | None = 0
+        cached = 0
+        for name in config_names:
+            key = (repo_id, name)
+            if key not in config_sizes:
+                revision = config.get_revision(repo_id, name)
+                name_card = cards.get((repo_id, revision))
+                config_sizes[key] = (
+                    _config_bytes(sizes.get(repo_id), name),
+                    (
+                        _cached_bytes(name_card, name, cache_root, revision)
+                        if name_card is not None
+                        else 0
+                    ),
+                )
+            config_total, config_cached = config_sizes[key]
+            cached += config_cached
+            if config_total is None:
+                total = None
+                error = error or f"No size information for config '{name}'"
+            elif total is not None:
+                total += config_total
+        estimates.append(
+            DownloadEstimate(db_name, repo_id, config_names, total, cached, error)
+        )
+
+    known = [
+        (total, cached) for total, cached in config_sizes.values() if total is not None
+    ]
+    return DownloadPlan(
+        estimates=tuple(estimates),
+        bandwidth=bandwidth,
+        total_bytes=sum(total for total, _ in known),
+        cached_bytes=sum(min(cached, total) for total, cached in known),
+        missing_bytes=sum(max(0, total - cached) for total, cached in known),
+    )
+
+
+def _load_cards(
+    keys: list[tuple[str, str | None]], token: str | None, max_workers: int
+) -> tuple[
+    dict[tuple[str, str | None], DataCard], dict[tuple[str, str | None], Exception]
+]:
+    """
+    Load dataset cards at the given revisions.
+
+    :param keys: (repo_id, revision) pairs. Duplicates are loaded once.
+    :param token: Optional HuggingFace token
+    :param max_workers: Maximum number of concurrent requests
+    :return: Loaded cards and load errors, keyed by (repo_id, revision)
+
+    """
+    by_revision: dict[str | None, list[str]] = {}
+    for repo_id, revision in dict.fromkeys(keys):
+        by_revision.setdefault(revision, []).append(repo_id)
+    cards: dict[tuple[str, str | None], DataCard] = {}
+    errors: dict[tuple[str, str | None], Exception] = {}
+    for revision, repo_ids in by_revision.items():
+        loaded, failed = DataCard.load_many(
+            repo_ids,
+            max_workers=max_workers,
+            token=token,
+            lazy=True,
+            revision=revision,
+        )
+        cards.update(((r, revision), card) for r, card in loaded.items())
+        errors.update(((r, revision), exc) for r, exc in failed.items())
+    return cards, errors
+
+
+def _external_metadata_configs(card: DataCard, config_name: str) -> list[str]:
+    """Return the external metadata config VirtualDB would also download."""
+    try:
+        schema = card.get_dataset_schema(config_name)
+    except DataCardError as e:
+        logger.warning(
+            "Could not resolve metadata for %s/%s: %s", card.repo_id, config_name, e
+        )
+        return []
+    if schema is not None and schema.external_metadata_config:
+        return [schema.external_metadata_config]
+    return []
+
+
+def _config_bytes(size_info: dict[str, Any] | None, config_name: str) -> int | None:
+    """Return the size of a config's files from a ``/size`` response."""
+    if not size_info:
+        return None
+    for entry in size_info.get("size", {}).get("configs", []):
+        if entry.get("config") == config_name:
+            value = entry.get("num_bytes_original_files")
+            if value is None:
+                value = entry.get("num_bytes_parquet_files")
+            return int(value) if value is not None else None
+    return None
+
+
+def _cached_bytes(
+    card: DataCard, config_name: str, cache_root: Path, revision: str | None = None
+) -> int:
+    """
+    Return the size of a config's files in the cached snapshot of a revision.
+
+    Files are matched like
+    :meth:`~labretriever.virtual_db.VirtualDB._resolve_parquet_files` matches
+    them after download.
+
+    :param revision: Configured branch, tag or commit sha, or None for ``main``
+
+    """
+    repo_dir = cache_root / f"datasets--{card.repo_id.replace('/', '--')}"
+    snapshot = _snapshot_dir(repo_dir, revision)
+    if snapshot is None:
+        return 0
+    try:
+        config = card.get_config(config_name)
+    except DataCardError:
+        return 0
+    if config is None or not snapshot.is_dir():
+        return 0
+
+    files: set[Path] = set()
+    for data_file in config.data_files:
+        pattern = data_file.path
+        path = snapshot / pattern
+        if path.is_file():
+            files.add(path)
+        elif "*" in pattern:
+            files.update(f for f in snapshot.glob(pattern) if f.is_file())
+        elif path.parent.is_dir():
+            files.update(path.parent.glob("*.parquet"))
+
+    total = 0
+    for f in files:
+        try:
+            total += f.stat().st_size
+        except OSError:
+            # Dangling symlink to a removed blob
+            continue
+    return total
+
+
+def _snapshot_dir(repo_dir: Path, revision: str | None) -> Path | None:
+    """
+    Return the cached snapshot directory of a revision.
+
+    A commit sha names its snapshot directly; a branch or tag is looked up in the
+    cache's ``refs``.
+
+    :param repo_dir: Repository directory in the HuggingFace hub cache
+    :param revision: Branch, tag or commit sha, or None for ``main``
+    :return: The snapshot directory, or None if the revision is not cached
+
+    """
+    if revision is not None and is_commit_sha(revision):
+        return repo_dir / "snapshots" / revision
+    try:
+        commit = (repo_dir / "refs" / (revision or "main")).read_text().strip()
+    except OSError:
+        return None
+    return repo_dir / "snapshots" / commit
+
+
+def _format_bytes(num_bytes: int) -> str:
+    """Format a byte count for display (e.g., ``1.5GB``)."""
+    size = float(num_bytes)
+    for unit in ["B", "KB", "MB", "GB"]:
+        if size < 1024.0:
+            return f"{size:.1f}{unit}"
+        size /= 1024.0
+    return f"{size:.1f}TB"
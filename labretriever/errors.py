@@ -17,6 +17,18 @@ class HfDataFetchError(Exception):
         self.endpoint = endpoint
 
 
+class HfOfflineError(HfDataFetchError):
+    """Raised in offline mode when a resource is not available locally."""
+
+    pass
+
+
+class HfRateLimitError(HfDataFetchError):
+    """Raised when a request cannot start within the scheduler's ``max_wait``."""
+
+    pass
+
+
 class DataCardError(Exception):
     """Base exception for DataCard operations."""
 
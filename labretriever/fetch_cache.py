@@ -0,0 +1,371 @@
+"""
+Process-wide in-memory cache for HuggingFace fetcher responses.
+
+Every :class:`~labretriever.datacard.DataCard` creates its own fetchers, so
+without a shared cache two cards for the same repository fetch everything
+twice. :class:`FetchCache` is one thread-safe cache that all fetchers use,
+keyed by ``(endpoint, repo_id, revision, token fingerprint, params)``:
+
+- ``endpoint`` names what was fetched (``"card"``, ``"structure"``,
+  ``"listing"``, ``"size"``). Each endpoint has its own
+  :class:`EndpointPolicy`: entries expire ``ttl`` seconds after they were
+  stored, and the least recently used entries are evicted beyond
+  ``max_entries``.
+- The token fingerprint is a hash of the token, so responses for private
+  repositories are only reused by callers presenting the same token. The
+  token itself is not kept.
+- Concurrent misses for the same key are coalesced: one thread fetches while
+  the others wait for its result.
+
+Hits, misses and evictions are counted per endpoint (see :meth:`FetchCache.stats`).
+Cached values are shared between callers and must be treated as read-only.
+
+The fetchers use :func:`get_fetch_cache` unless given a cache. Install a
+differently configured (or subclassed) cache with :func:`set_fetch_cache`::
+
+    set_fetch_cache(FetchCache({"card": EndpointPolicy(ttl=3600, max_entries=64)}))
+    ...
+    get_fetch_cache().stats()["card"].hit_rate
+
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Mapping
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+#: Cache key: (endpoint, repo_id, revision, token fingerprint, params)
+CacheKey = tuple[str, str, str | None, str, tuple[Hashable, ...]]
+
+
+@dataclass(frozen=True)
+class EndpointPolicy:
+    """
+    Expiry and size limit for the entries of one endpoint.
+
+    :ivar ttl: Seconds an entry is served after it was stored, or None to
+        keep it until evicted
+    :ivar max_entries: Most entries kept; the least recently used are evicted
+        first. 0 disables caching for the endpoint.
+
+    """
+
+    ttl: float | None = 300.0
+    max_entries: int = 256
+
+
+#: Policies of the endpoints used by the fetchers
+DEFAULT_POLICIES: dict[str, EndpointPolicy] = {
+    "card": EndpointPolicy(ttl=300.0, max_entries=512),
+    "structure": EndpointPolicy(ttl=60.0, max_entries=128),
+    "listing": EndpointPolicy(ttl=300.0, max_entries=32),
+    "size": EndpointPolicy(ttl=600.0, max_entries=512),
+}
+
+
+@dataclass
+class CacheStats:
+    """
+    Counters of one endpoint.
+
+    :ivar hits: Lookups served from the cache
+    :ivar misses: Lookups that found no live entry
+    :ivar evictions: Entries dropped to respect ``max_entries``
+    :ivar expirations: Entries dropped because their ``ttl`` passed
+    :ivar size: Entries currently cached
+
+    """
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    size: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups that were hits (0.0 without lookups)."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+def token_fingerprint(token: str | None) -> str:
+    """
+    Return a short, non-reversible identifier for a token.
+
+    :param token: HuggingFace token, or None
+    :return: The string ``"anonymous"`` without a token, else a SHA-256 prefix
+
+    """
+    if not token:
+        return "anonymous"
+    return hashlib.sha256(token.encode()).hexdigest()[:16]
+
+
+_MISSING = object()
+
+
+class FetchCache:
+    """Thread-safe TTL + LRU cache of fetcher responses."""
+
+    def __init__(
+        self,
+        policies: Mapping[str, EndpointPolicy] | None = None,
+        default_policy: EndpointPolicy = EndpointPolicy(),
+    ):
+        """
+        Initialize the cache.
+
+        :param policies: Policy per endpoint, merged over :data:`DEFAULT_POLICIES`
+        :param default_policy: Policy of endpoints without one
+
+        """
+        self.policies = {**DEFAULT_POLICIES, **(policies or {})}
+        self.default_policy = default_policy
+        # endpoint -> key -> (stored at, value), least recently used first
+        self._entries: dict[str, OrderedDict[CacheKey, tuple[float, Any]]] = {}
+        self._stats: dict[str, CacheStats] = {}
+        self._inflight: dict[CacheKey, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def disabled(cls) -> FetchCache:
+        """
+        Return a cache that stores nothing.
+
+        Lookups still count misses, and concurrent fetches of the same key are still
+        coalesced.
+
+        :return: A cache with ``max_entries=0`` for every endpoint
+
+        """
+        off = EndpointPolicy(ttl=0, max_entries=0)
+        return cls({name: off for name in DEFAULT_POLICIES}, default_policy=off)
+
+    def policy(self, endpoint: str) -> EndpointPolicy:
+        """
+        Return the policy of an endpoint.
+
+        :param endpoint: Endpoint name
+        :return: Its policy, or the default policy
+
+        """
+        return self.policies.get(endpoint, self.default_policy)
+
+    def get(
+        self,
+        endpoint: str,
+        repo_id: str,
+        revision: str | None = None,
+        token: str | None = None,
+        params: tuple[Hashable, ...] = (),
+    ) -> Any | None:
+        """
+        Return a cached response.
+
+        :param endpoint: Endpoint name
+        :param repo_id: Repository identifier
+        :param revision: Requested revision, or None for the default branch
+        :param token: Token the response was fetched with
+        :param params: Further request parameters that identify the response
+        :return: The cached value, or None on a miss
+
+        """
+        value = self._lookup(self._key(endpoint, repo_id, revision, token, params))
+        return None if value is _MISSING else value
+
+    def put(
+        self,
+        endpoint: str,
+        repo_id: str,
+        value: Any,
+        revision: str | None = None,
+        token: str | None = None,
+        params: tuple[Hashable, ...] = (),
+    ) -> None:
+        """
+        Store a response.
+
+        :param endpoint: Endpoint name
+        :param repo_id: Repository identifier
+        :param value: Response to cache
+        :param revision: Requested revision, or None for the default branch
+        :param token: Token the response was fetched with
+        :param params: Further request parameters that identify the response
+
+        """
+        self._store(self._key(endpoint, repo_id, revision, token, params), value)
+
+    def get_or_fetch(
+        self,
+        endpoint: str,
+        repo_id: str,
+        fetch: Callable[[], T],
+        revision: str | None = None,
+        token: str | None = None,
+        params: tuple[Hashable, ...] = (),
+    ) -> T:
+        """
+        Return a cached response, fetching and storing it on a miss.
+
+        If several threads miss the same key at once, only one calls ``fetch``; the
+        others wait and reuse its result. Exceptions from ``fetch`` are not cached.
+
+        :param endpoint: Endpoint name
+        :param repo_id: Repository identifier
+        :param fetch: Fetches the response
+        :param revision: Requested revision, or None for the default branch
+        :param token: Token used by ``fetch``
+        :param params: Further request parameters that identify the response
+        :return: The cached or fetched value
+
+        """
+        key = self._key(endpoint, repo_id, revision, token, params)
+        value = self._lookup(key)
+        if value is not _MISSING:
+            return value
+        with self._lock:
+            flight = self._inflight.setdefault(key, threading.Lock())
+        with flight:
+            value = self._lookup(key, count=False)
+            if value is not _MISSING:
+                return value
+            try:
+                value = fetch()
+                self._store(key, value)
+            finally:
+                with self._lock:
+                    self._inflight.pop(key, None)
+        return value
+
+    def invalidate(
+        self, endpoint: str | None = None, repo_id: str | None = None
+    ) -> int:
+        """
+        Drop cached responses.
+
+        :param endpoint: Only drop entries of this endpoint
+        :param repo_id: Only drop entries of this repository
+        :return: Number of entries dropped
+
+        """
+        dropped = 0
+        with self._lock:
+            for name, entries in self._entries.items():
+                if endpoint is not None and name != endpoint:
+                    continue
+                for key in [k for k in entries if repo_id in (None, k[1])]:
+                    del entries[key]
+                    dropped += 1
+                self._stats_for(name).size = len(entries)
+        return dropped
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._stats.clear()
+
+    def stats(self) -> dict[str, CacheStats]:
+        """
+        Return a snapshot of the counters.
+
+        :return: Counters per endpoint that has been used
+
+        """
+        with self._lock:
+            return {name: CacheStats(**vars(s)) for name, s in self._stats.items()}
+
+    @staticmethod
+    def _key(
+        endpoint: str,
+        repo_id: str,
+        revision: str | None,
+        token: str | None,
+        params: tuple[Hashable, ...],
+    ) -> CacheKey:
+        return (endpoint, repo_id, revision, token_fingerprint(token), tuple(params))
+
+    def _stats_for(self, endpoint: str) -> CacheStats:
+        """Return the counters of an endpoint; call with the lock held."""
+        stats = self._stats.get(endpoint)
+        if stats is None:
+            stats = self._stats[endpoint] = CacheStats()
+        return stats
+
+    def _lookup(self, key: CacheKey, count: bool = True) -> Any:
+        """Return the live value for a key, or ``_MISSING``."""
+        endpoint = key[0]
+        ttl = self.policy(endpoint).ttl
+        with self._lock:
+            stats = self._stats_for(endpoint)
+            entries = self._entries.get(endpoint)
+            entry = entries.get(key) if entries is not None else None
+            if entry is not None and ttl is not None:
+                if time.monotonic() - entry[0] >= ttl:
+                    del entries[key]  # type: ignore[union-attr]
+                    stats.expirations += 1
+                    stats.size = len(entries)  # type: ignore[arg-type]
+                    entry = None
+            if entry is None:
+                if count:
+                    stats.misses += 1
+                return _MISSING
+            entries.move_to_end(key)  # type: ignore[union-attr]
+            if count:
+                stats.hits += 1
+            return entry[1]
+
+    def _store(self, key: CacheKey, value: Any) -> None:
+        """Store a value, evicting the least recently used entries."""
+        endpoint = key[0]
+        max_entries = self.policy(endpoint).max_entries
+        with self._lock:
+            stats = self._stats_for(endpoint)
+            if max_entries <= 0:
+                return
+            entries = self._entries.setdefault(endpoint, OrderedDict())
+            entries[key] = (time.monotonic(), value)
+            entries.move_to_end(key)
+            while len(entries) > max_entries:
+                entries.popitem(last=False)
+                stats.evictions += 1
+            stats.size = len(entries)
+
+
+_fetch_cache = FetchCache()
+_fetch_cache_lock = threading.Lock()
+
+
+def get_fetch_cache() -> FetchCache:
+    """
+    Return the process-wide fetch cache.
+
+    :return: The cache used by fetchers created without one
+
+    """
+    with _fetch_cache_lock:
+        return _fetch_cache
+
+
+def set_fetch_cache(cache: FetchCache) -> FetchCache:
+    """
+    Replace the process-wide fetch cache.
+
+    Fetchers created afterwards use the new cache; existing ones keep theirs.
+
+    :param cache: The new cache
+    :return: The previous cache
+
+    """
+    global _fetch_cache
+    with _fetch_cache_lock:
+        previous, _fetch_cache = _fetch_cache, cache
+        return previous
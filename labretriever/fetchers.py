@@ -1,69 +1,540 @@
 """Data fetchers for HuggingFace Hub integration."""
 
+import json
 import logging
+import os
+import random
 import re
+import tempfile
+import threading
+import time
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
 from typing import Any
+from urllib.parse import quote
 
 import requests
-from huggingface_hub import DatasetCard, repo_info
+from huggingface_hub import (
+    DatasetCard,
+)
+from huggingface_hub import constants as hf_constants
+from huggingface_hub import (
+    get_hf_file_metadata,
+    hf_hub_download,
+    hf_hub_url,
+    repo_info,
+    try_to_load_from_cache,
+)
+from huggingface_hub.hf_api import ExpandDatasetProperty_T
+from huggingface_hub.utils import build_hf_headers
 from requests import HTTPError
+from requests.adapters import HTTPAdapter
 
-from labretriever.constants import get_hf_token
-from labretriever.errors import HfDataFetchError
+from labretriever.constants import (
+    CACHE_DIR,
+    get_card_cache_dir,
+    get_hf_token,
+    resolve_offline,
+)
+from labretriever.errors import HfDataFetchError, HfOfflineError
+from labretriever.fetch_cache import FetchCache, get_fetch_cache
+from labretriever.partition_plan import PartitionPlan, plan_partitions
+from labretriever.rate_limit import (
+    Priority,
+    RequestScheduler,
+    get_request_scheduler,
+    parse_retry_after,
+)
+from labretriever.repo_listing import RepoListing, parse_partitions
+from labretriever.structure_cache import (
+    CachedStructure,
+    RepoStructureCache,
+    get_structure_cache,
+)
+
+#: HTTP status codes that are retried with backoff
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+_COMMIT_SHA_RE = re.compile(r"^[0-9a-f]{40}$")
+
+# Repository properties requested to revalidate a cached structure
+_REVALIDATE_EXPAND: list[ExpandDatasetProperty_T] = ["sha", "lastModified"]
+
+# Connect and read timeouts, in seconds, of a tree listing page
+_TREE_PAGE_TIMEOUT = (10.0, 30.0)
+
+_http_session: requests.Session | None = None
+_http_session_lock = threading.Lock()
+
+
+def is_commit_sha(revision: str | None) -> bool:
+    """
+    Return True if a revision is a full commit sha.
+
+    Branches and tags can move; a commit sha always names the same files.
+
+    :param revision: Branch, tag or commit sha
+    :return: Whether ``revision`` is a 40-character hexadecimal sha
+
+    """
+    return revision is not None and bool(_COMMIT_SHA_RE.match(revision))
+
+
+def get_http_session() -> requests.Session:
+    """
+    Return the process-wide HTTP session shared by the fetchers.
+
+    The session keeps connections alive, so repeated calls to the same host reuse one
+    TCP/TLS connection instead of opening a new one per request.
+
+    :return: The shared ``requests.Session``
+
+    """
+    global _http_session
+    with _http_session_lock:
+        if _http_session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=8, pool_maxsize=32)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _http_session = session
+        return _http_session
+
+
+class _StaleCard(Exception):
+    """Carries a previously cached card served because a fetch failed."""
+
+    def __init__(self, sha: str | None, data: dict[str, Any]):
+        super().__init__("stale dataset card")
+        self.sha = sha
+        self.data = data
 
 
 class HfDataCardFetcher:
-    """Handles fetching dataset cards from HuggingFace Hub."""
+    """
+    Handles fetching dataset cards from HuggingFace Hub.
+
+    Parsed card data is cached on disk as JSON, keyed by repo_id and the
+    commit sha of the repository's README. A fetch makes one ``HEAD`` request
+    for the current sha and serves the card from disk if that sha is cached;
+    otherwise the card is downloaded at that sha. When the sha cannot be
+    determined, the most recently cached card is served. Authentication and
+    not-found errors of the ``HEAD`` request are raised. See
+    :func:`~labretriever.constants.get_card_cache_dir` to relocate or disable the
+    cache. In front of the disk cache, responses are kept in
+    the shared in-memory :class:`~labretriever.fetch_cache.FetchCache`
+    (endpoint ``"card"``), so repeated fetches skip the ``HEAD`` request. Cards
+    served as a fallback because the Hub could not be reached are not kept there.
+    Requests to the Hub are paced by the shared
+    :class:`~labretriever.rate_limit.RequestScheduler` with
+    :attr:`~labretriever.rate_limit.Priority.CARD` priority, and retried
+    after 429 responses.
 
-    def __init__(self, token: str | None = None):
+    In offline mode no network call is made. The most recently cached card
+    is served, falling back to a ``README.md`` in the HuggingFace hub cache
+    (e.g. from an earlier ``snapshot_download``); if neither exists,
+    :class:`~labretriever.errors.HfOfflineError` is raised.
+
+    A ``revision`` passed to :meth:`fetch` reads the card at that branch,
+    tag or commit. A card pinned to a commit sha never changes, so once it
+    is cached on disk it is served without any request.
+
+    """
+
+    def __init__(
+        self,
+        token: str | None = None,
+        cache_dir: Path | str | None = None,
+        offline: bool | None = None,
+        fetch_cache: FetchCache | None = None,
+        scheduler: RequestScheduler | None = None,
+    ):
         """
         Initialize the fetcher.
 
         :param token: HuggingFace token for authentication
+        :param cache_dir: Directory for the persistent card cache. Defaults to
+            :func:`~labretriever.constants.get_card_cache_dir`; the cache is
+            disabled if that returns None.
+        :param offline: If True, only serve cards available locally. None
+            follows ``HF_HUB_OFFLINE``.
+        :param fetch_cache: In-memory response cache. Defaults to
+            :func:`~labretriever.fetch_cache.get_fetch_cache`.
+        :param scheduler: Paces requests to the Hub. Defaults to
+            :func:`~labretriever.rate_limit.get_request_scheduler`.
 
         """
         self.logger = logging.getLogger(self.__class__.__name__)
         self.token = token or get_hf_token()
+        self.offline = offline
+        self.fetch_cache = fetch_cache if fetch_cache is not None else get_fetch_cache()
+        self.scheduler = scheduler if scheduler is not None else get_request_scheduler()
+        self.cache_dir = (
+            Path(cache_dir) if cache_dir is not None else get_card_cache_dir()
+        )
+        # (repo_id, requested revision) -> commit sha of the most recently
+        # fetched card, if known
+        self.revisions: dict[tuple[str, str | None], str] = {}
 
-    def fetch(self, repo_id: str, repo_type: str = "dataset") -> dict[str, Any]:
+    def fetch(
+        self,
+        repo_id: str,
+        repo_type: str = "dataset",
+        force_refresh: bool = False,
+        revision: str | None = None,
+    ) -> dict[str, Any]:
         """
         Fetch and return dataset card data.
 
         :param repo_id: Repository identifier (e.g., "user/dataset")
         :param repo_type: Type of repository ("dataset", "model", "space")
+        :param force_refresh: If True, download the card even if the current
+            revision is cached on disk. Ignored in offline mode.
+        :param revision: Branch, tag or commit sha to read the card at, or
+            None for the default branch
         :return: Dataset card data as dictionary
-        :raises HfDataFetchError: If fetching fails
+        :raises HfOfflineError: If offline and the card is not cached
+        :raises HfDataFetchError: If fetching fails and no cached card is
+            available
 
         """
+        # Offline and online fetches of the same card differ, as do cards read
+        # from different disk caches
+        params = (repo_type, resolve_offline(self.offline), self.cache_dir)
+        try:
+            if force_refresh:
+                sha, data = self._fetch(repo_id, repo_type, True, revision)
+                self.fetch_cache.put(
+                    "card",
+                    repo_id,
+                    (sha, data),
+                    revision=revision,
+                    token=self.token,
+                    params=params,
+                )
+            else:
+                sha, data = self.fetch_cache.get_or_fetch(
+                    "card",
+                    repo_id,
+                    lambda: self._fetch(repo_id, repo_type, pinned=revision),
+                    revision=revision,
+                    token=self.token,
+                    params=params,
+                )
+        except _StaleCard as stale:
+            # Not cached, so the next fetch retries the Hub
+            sha, data = stale.sha, stale.data
+        if sha is not None:
+            self.revisions[(repo_id, revision)] = sha
+        return data
+
+    def _fetch(
+        self,
+        repo_id: str,
+        repo_type: str,
+        force_refresh: bool = False,
+        pinned: str | None = None,
+    ) -> tuple[str | None, dict[str, Any]]:
+        """
+        Fetch card data, bypassing the in-memory cache.
+
+        :param pinned: Requested branch, tag or commit sha, or None for the
+            default branch
+        :return: Commit sha of the card (None if unknown) and the card data
+
+        """
+        if resolve_offline(self.offline):
+            data = self._fetch_offline(repo_id, repo_type, pinned)
+            return (pinned if is_commit_sha(pinned) else None), data
+
+        revision: str | None = None
+        if self.cache_dir is not None and not force_refresh:
+            if is_commit_sha(pinned):
+                revision = pinned
+            else:
+                revision = self._remote_revision(repo_id, repo_type, pinned)
+            checked = revision is not None
+            if revision is None and pinned is None:
+                revision = self._latest_cached_revision(repo_id, repo_type)
+            if revision is not None:
+                cached = self._read_cached_card(repo_id, repo_type, revision)
+                if cached is not None:
+                    self.logger.debug(
+                        f"Using cached dataset card for {repo_id}@{revision}"
+                    )
+                    if not checked:
+                        raise _StaleCard(revision, cached)
+                    return revision, cached
+        elif self.cache_dir is not None:
+            revision = self._remote_revision(repo_id, repo_type, pinned)
+
+        # Download at the resolved sha, so the card matches the sha it is
+        # cached under even if the branch moves in between
+        download_revision = revision if revision is not None else pinned
         try:
             self.logger.debug(f"Fetching dataset card for {repo_id}")
-            card = DatasetCard.load(repo_id, repo_type=repo_type, token=self.token)
+            card = self.scheduler.call(
+                lambda: self._load_card(repo_id, repo_type, download_revision),
+                priority=Priority.CARD,
+            )
 
             if not card.data:
                 self.logger.warning(f"Dataset card for {repo_id} has no data section")
-                return {}
+                return revision, {}
 
-            return card.data.to_dict()
+            data = card.data.to_dict()
 
         except Exception as e:
+            # A pinned card must not be replaced by a card of another revision
+            stale = (
+                self._read_latest_cached_card(repo_id, repo_type)
+                if pinned is None
+                else None
+            )
+            if stale is not None:
+                self.logger.warning(
+                    f"Failed to fetch dataset card for {repo_id} ({e}); "
+                    "using the most recently cached card"
+                )
+                raise _StaleCard(None, stale) from e
             error_msg = f"Failed to fetch dataset card for {repo_id}: {e}"
             self.logger.error(error_msg)
             raise HfDataFetchError(error_msg) from e
 
+        if revision is not None:
+            self._write_cached_card(
+                repo_id, repo_type, revision, data, latest=pinned is None
+            )
+        return revision, data
+
+    def _load_card(
+        self, repo_id: str, repo_type: str, revision: str | None
+    ) -> DatasetCard:
+        """Download and parse the card at a revision (None: default branch)."""
+        if revision is None:
+            return DatasetCard.load(repo_id, repo_type=repo_type, token=self.token)
+        readme = hf_hub_download(
+            repo_id,
+            "README.md",
+            repo_type=repo_type,
+            revision=revision,
+            token=self.token,
+        )
+        return DatasetCard.load(readme)
+
+    def _fetch_offline(
+        self, repo_id: str, repo_type: str, revision: str | None = None
+    ) -> dict[str, Any]:
+        """
+        Return card data from local state only.
+
+        :param revision: Requested branch, tag or commit sha. Only a card cached for
+            that commit sha, or a ``README.md`` cached by huggingface_hub for that
+            revision, is served.
+        :raises HfOfflineError: If the card is not available locally
+
+        """
+        if revision is None:
+            cached = self._read_latest_cached_card(repo_id, repo_type)
+        elif is_commit_sha(revision) and self.cache_dir is not None:
+            cached = self._read_cached_card(repo_id, repo_type, revision)
+        else:
+            cached = None
+        if cached is not None:
+            self.logger.debug(f"Using cached dataset card for {repo_id} (offline)")
+            return cached
+
+        readme = try_to_load_from_cache(
+            repo_id,
+            "README.md",
+            cache_dir=CACHE_DIR,
+            revision=revision,
+            repo_type=repo_type,
+        )
+        if isinstance(readme, str):
+            try:
+                card = DatasetCard.load(readme)
+            except Exception as e:
+                raise HfOfflineError(
+                    f"Cached README.md for {repo_id} could not be read: {e}",
+                    repo_id=repo_id,
+                ) from e
+            self.logger.debug(f"Using hub-cached README.md for {repo_id} (offline)")
+            return card.data.to_dict() if card.data else {}
+
+        at = f"@{revision}" if revision is not None else ""
+        raise HfOfflineError(
+            f"Dataset card for {repo_id}{at} is not cached locally and offline "
+            "mode is enabled. Load it once while online, or unset offline mode.",
+            repo_id=repo_id,
+        )
+
+    def _repo_cache_dir(self, repo_id: str, repo_type: str) -> Path:
+        """Return the cache directory for one repository."""
+        assert self.cache_dir is not None
+        return self.cache_dir / f"{repo_type}s" / repo_id.replace("/", "--")
+
+    def _remote_revision(
+        self, repo_id: str, repo_type: str, revision: str | None = None
+    ) -> str | None:
+        """
+        Return the commit sha of the repository's README on the Hub.
+
+        :param repo_id: Repository identifier
+        :param repo_type: Type of repository
+        :param revision: Branch, tag or commit to resolve, or None for the
+            default branch
+        :return: Commit sha, or None if it could not be determined
+        :raises HfDataFetchError: If the Hub denies access to the repository or
+            the card does not exist (HTTP 401, 403 or 404)
+
+        """
+        try:
+            url = hf_hub_url(
+                repo_id, "README.md", repo_type=repo_type, revision=revision
+            )
+            metadata = self.scheduler.call(
+                lambda: get_hf_file_metadata(url, token=self.token),
+                priority=Priority.CARD,
+            )
+            return metadata.commit_hash
+        except Exception as e:
+            status = getattr(getattr(e, "response", None), "status_code", None)
+            if status in (401, 403, 404):
+                error_msg = f"Failed to fetch dataset card for {repo_id}: {e}"
+                self.logger.error(error_msg)
+                raise HfDataFetchError(
+                    error_msg, repo_id=repo_id, status_code=status
+                ) from e
+            self.logger.debug(f"Could not check card revision for {repo_id}: {e}")
+            return None
+
+    def _latest_cached_revision(self, repo_id: str, repo_type: str) -> str | None:
+        """Return the sha of the most recently cached card for a repository."""
+        ref = self._repo_cache_dir(repo_id, repo_type) / "latest"
+        try:
+            return ref.read_text().strip() or None
+        except OSError:
+            return None
+
+    def _read_latest_cached_card(
+        self, repo_id: str, repo_type: str
+    ) -> dict[str, Any] | None:
+        """Return the most recently cached card, or None if caching is off."""
+        if self.cache_dir is None:
+            return None
+        revision = self._latest_cached_revision(repo_id, repo_type)
+        if revision is None:
+            return None
+        return self._read_cached_card(repo_id, repo_type, revision)
+
+    def _read_cached_card(
+        self, repo_id: str, repo_type: str, revision: str
+    ) -> dict[str, Any] | None:
+        """Return cached card data for a revision, or None if not cached."""
+        path = self._repo_cache_dir(repo_id, repo_type) / f"{revision}.json"
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_cached_card(
+        self,
+        repo_id: str,
+        repo_type: str,
+        revision: str,
+        data: dict[str, Any],
+        latest: bool = True,
+    ) -> None:
+        """
+        Store card data for a revision and, optionally, mark it as the latest.
+
+        Files are written to a temporary name and renamed into place so concurrent
+        readers never see a partial file. Failures are logged and otherwise ignored.
+
+        """
+        repo_dir = self._repo_cache_dir(repo_id, repo_type)
+        files = [(f"{revision}.json", json.dumps(data, default=str))]
+        if latest:
+            files.append(("latest", revision))
+        try:
+            repo_dir.mkdir(parents=True, exist_ok=True)
+            for name, content in files:
+                fd, tmp = tempfile.mkstemp(dir=repo_dir, prefix=f".{name}.")
+                with os.fdopen(fd, "w") as f:
+                    f.write(content)
+                os.replace(tmp, repo_dir / name)
+        except OSError as e:
+            self.logger.warning(f"Could not cache dataset card for {repo_id}: {e}")
+
 
 class HfSizeInfoFetcher:
-    """Handles fetching size information from HuggingFace Dataset Server API."""
+    """
+    Handles fetching size information from HuggingFace Dataset Server API.
+
+    Requests go through the shared keep-alive session from
+    :func:`get_http_session`. Connection errors, timeouts and the status codes
+    in :data:`RETRY_STATUS_CODES` are retried up to ``max_retries`` times,
+    waiting a random time up to ``backoff_factor * 2**attempt`` seconds
+    (capped at ``max_backoff``) or as long as the ``Retry-After`` header asks.
+    Every attempt waits for a slot from the shared
+    :class:`~labretriever.rate_limit.RequestScheduler`, and a 429 pauses the
+    scheduler for all other requests too.
 
-    def __init__(self, token: str | None = None):
+    Responses are kept in the shared in-memory
+    :class:`~labretriever.fetch_cache.FetchCache` (endpoint ``"size"``). They
+    are not persisted, so in offline mode :meth:`fetch` raises
+    :class:`~labretriever.errors.HfOfflineError` for anything not in memory.
+
+    """
+
+    def __init__(
+        self,
+        token: str | None = None,
+        connect_timeout: float = 10.0,
+        read_timeout: float = 30.0,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        max_backoff: float = 30.0,
+        session: requests.Session | None = None,
+        offline: bool | None = None,
+        fetch_cache: FetchCache | None = None,
+        scheduler: RequestScheduler | None = None,
+    ):
         """
         Initialize the fetcher.
 
         :param token: HuggingFace token for authentication
+        :param connect_timeout: Seconds to wait for a connection
+        :param read_timeout: Seconds to wait for the server to send data
+        :param max_retries: Retries after the first attempt; 0 disables them
+        :param backoff_factor: Base of the exponential backoff, in seconds
+        :param max_backoff: Longest wait between attempts, in seconds. A
+            ``Retry-After`` longer than this is not waited for; the response
+            is returned as an error instead.
+        :param session: Session to use instead of the shared one
+        :param offline: If True, never make requests. None follows
+            ``HF_HUB_OFFLINE``.
+        :param fetch_cache: In-memory response cache. Defaults to
+            :func:`~labretriever.fetch_cache.get_fetch_cache`.
+        :param scheduler: Paces requests to the Hub. Defaults to
+            :func:`~labretriever.rate_limit.get_request_scheduler`.
 
         """
         self.logger = logging.getLogger(self.__class__.__name__)
         self.token = token or get_hf_token()
         self.base_url = "https://datasets-server.huggingface.co"
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.session = session if session is not None else get_http_session()
+        self.offline = offline
+        self.fetch_cache = fetch_cache if fetch_cache is not None else get_fetch_cache()
+        self.scheduler = scheduler if scheduler is not None else get_request_scheduler()
 
     def _build_headers(self) -> dict[str, str]:
         """Build request headers with authentication if available."""
@@ -78,16 +549,28 @@ class HfSizeInfoFetcher:
 
         :param repo_id: Repository identifier (e.g., "user/dataset")
         :return: Size information as dictionary
+        :raises HfOfflineError: If offline and the response is not cached
         :raises HfDataFetchError: If fetching fails
 
         """
+        return self.fetch_cache.get_or_fetch(
+            "size", repo_id, lambda: self._fetch(repo_id), token=self.token
+        )
+
+    def _fetch(self, repo_id: str) -> dict[str, Any]:
+        """Fetch size information, bypassing the in-memory cache."""
+        if resolve_offline(self.offline):
+            raise HfOfflineError(
+                f"Size information for {repo_id} is not available offline",
+                repo_id=repo_id,
+            )
         url = f"{self.base_url}/size"
         params = {"dataset": repo_id}
         headers = self._build_headers()
 
         try:
             self.logger.debug(f"Fetching size info for {repo_id}")
-            response = requests.get(url, params=params, headers=headers, timeout=30)
+            response = self._get(url, params=params, headers=headers)
             response.raise_for_status()
 
             data = response.json()
@@ -117,39 +600,226 @@ class HfSizeInfoFetcher:
             self.logger.error(error_msg)
             raise HfDataFetchError(error_msg) from e
 
+    def fetch_many(
+        self, repo_ids: Iterable[str], max_workers: int = 8
+    ) -> tuple[dict[str, dict[str, Any]], dict[str, HfDataFetchError]]:
+        """
+        Fetch size information for many datasets concurrently.
+
+        :param repo_ids: Repository identifiers. Duplicates are fetched once.
+        :param max_workers: Maximum number of concurrent requests
+        :return: Tuple of ``{repo_id: size info}`` and ``{repo_id: error}``,
+            both in input order
+        :raises ValueError: If ``max_workers`` is less than 1
+
+        """
+        if max_workers < 1:
+            raise ValueError(f"max_workers must be at least 1, got {max_workers}")
+        unique = list(dict.fromkeys(repo_ids))
+        results: dict[str, dict[str, Any]] = {}
+        errors: dict[str, HfDataFetchError] = {}
+        if not unique:
+            return results, errors
+        with ThreadPoolExecutor(
+            max_workers=min(max_workers, len(unique)), thread_name_prefix="size-info"
+        ) as pool:
+            futures = [
+                (repo_id, pool.submit(self.fetch, repo_id)) for repo_id in unique
+            ]
+            for repo_id, future in futures:
+                try:
+                    results[repo_id] = future.result()
+                except HfDataFetchError as e:
+                    errors[repo_id] = e
+        return results, errors
+
+    def _get(
+        self, url: str, params: dict[str, str], headers: dict[str, str]
+    ) -> requests.Response:
+        """
+        GET ``url``, retrying transient failures.
+
+        :return: The first response that is not retried, or the last one
+        :raises requests.RequestException: If the last attempt fails without a response
+
+        """
+        attempt = 0
+        while True:
+            self.scheduler.acquire(Priority.METADATA)
+            try:
+                response = self.session.get(
+                    url, params=params, headers=headers, timeout=self.timeout
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                reason = str(e)
+            else:
+                if (
+                    response.status_code not in RETRY_STATUS_CODES
+                    or attempt >= self.max_retries
+                ):
+                    return response
+                retry_after = self._retry_after(response)
+                if retry_after is not None and retry_after > self.max_backoff:
+                    self.logger.warning(
+                        f"Not retrying {url}: Retry-After {retry_after:.0f}s "
+                        f"exceeds max_backoff {self.max_backoff:.0f}s"
+                    )
+                    return response
+                delay = (
+                    retry_after if retry_after is not None else self._backoff(attempt)
+                )
+                reason = f"HTTP {response.status_code}"
+                if response.status_code == 429:
+                    self.scheduler.report_rate_limited(delay)
+                response.close()
+            attempt += 1
+            self.logger.debug(
+                f"Retrying {url} in {delay:.2f}s "
+                f"(attempt {attempt}/{self.max_retries}): {reason}"
+            )
+            time.sleep(delay)
+
+    def _backoff(self, attempt: int) -> float:
+        """Return a jittered exponential delay for retry ``attempt`` (0-based)."""
+        return random.uniform(
+            0, min(self.max_backoff, self.backoff_factor * 2**attempt)
+        )
+
+    @staticmethod
+    def _retry_after(response: requests.Response) -> float | None:
+        """Return the ``Retry-After`` delay in seconds, if the header is valid."""
+        return parse_retry_after(response.headers.get("Retry-After"))
+
 
 class HfRepoStructureFetcher:
-    """Handles fetching repository structure from HuggingFace Hub."""
+    """
+    Handles fetching repository structure from HuggingFace Hub.
+
+    :meth:`fetch` returns the whole repository as one dict per file. For
+    repositories with very many files, :meth:`list_files` streams the
+    listing (optionally under a path prefix) into a compact, columnar
+    :class:`~labretriever.repo_listing.RepoListing` instead.
 
-    def __init__(self, token: str | None = None):
+    Requests to the Hub are paced by the shared
+    :class:`~labretriever.rate_limit.RequestScheduler`.
+
+    """
+
+    def __init__(
+        self,
+        token: str | None = None,
+        cache: RepoStructureCache | None = None,
+        offline: bool | None = None,
+        fetch_cache: FetchCache | None = None,
+        scheduler: RequestScheduler | None = None,
+    ):
         """
         Initialize the fetcher.
 
         :param token: HuggingFace token for authentication
+        :param cache: Structure cache to use. Defaults to the process-wide
+            cache from :func:`~labretriever.structure_cache.get_structure_cache`,
+            shared by all fetchers.
+        :param offline: If True, only serve cached structures. None follows
+            ``HF_HUB_OFFLINE``.
+        :param fetch_cache: In-memory response cache for structures and
+            listings. Defaults to
+            :func:`~labretriever.fetch_cache.get_fetch_cache`.
+        :param scheduler: Paces requests to the Hub. Defaults to
+            :func:`~labretriever.rate_limit.get_request_scheduler`.
 
         """
         self.logger = logging.getLogger(self.__class__.__name__)
         self.token = token or get_hf_token()
-        self._cached_structure: dict[str, dict[str, Any]] = {}
+        self.offline = offline
+        self.cache = cache if cache is not None else get_structure_cache()
+        self.fetch_cache = fetch_cache if fetch_cache is not None else get_fetch_cache()
+        self.scheduler = scheduler if scheduler is not None else get_request_scheduler()
 
-    def fetch(self, repo_id: str, force_refresh: bool = False) -> dict[str, Any]:
+    def fetch(
+        self, repo_id: str, force_refresh: bool = False, revision: str | None = None
+    ) -> dict[str, Any]:
         """
         Fetch repository structure information.
 
+        Recently fetched structures are served from the in-memory
+        :class:`~labretriever.fetch_cache.FetchCache` (endpoint
+        ``"structure"``, per token). Behind it, structures are cached per
+        repo_id and commit sha (see :mod:`labretriever.structure_cache`),
+        shared by all tokens. A cached structure younger than
+        the cache's TTL is returned directly. An older one is revalidated
+        with a request for the repository's current sha and
+        ``last_modified``, and the file listing is only fetched again if the
+        repository has changed. In offline mode, or if revalidation fails,
+        the cached structure is returned as is.
+
+        A structure pinned to a commit sha never changes and is served from
+        the cache without revalidation. Structures at other revisions are
+        cached on disk under their commit sha, without replacing the
+        repository's newest structure.
+
         :param repo_id: Repository identifier (e.g., "user/dataset")
-        :param force_refresh: If True, bypass cache and fetch fresh data
+        :param force_refresh: If True, bypass cache and fetch fresh data.
+            Ignored in offline mode.
+        :param revision: Branch, tag or commit sha to list, or None for the
+            default branch
         :return: Repository structure information
+        :raises HfOfflineError: If offline and the structure is not cached
         :raises HfDataFetchError: If fetching fails
 
         """
-        # Check cache first unless force refresh is requested
-        if not force_refresh and repo_id in self._cached_structure:
-            self.logger.debug(f"Using cached repo structure for {repo_id}")
-            return self._cached_structure[repo_id]
+        if force_refresh:
+            structure = self._fetch(repo_id, True, revision)
+            self.fetch_cache.put(
+                "structure", repo_id, structure, revision=revision, token=self.token
+            )
+            return structure
+        return self.fetch_cache.get_or_fetch(
+            "structure",
+            repo_id,
+            lambda: self._fetch(repo_id, revision=revision),
+            revision=revision,
+            token=self.token,
+        )
+
+    def _fetch(
+        self, repo_id: str, force_refresh: bool = False, revision: str | None = None
+    ) -> dict[str, Any]:
+        """Fetch a structure, bypassing the in-memory cache."""
+        if resolve_offline(self.offline):
+            entry = self._cached_entry(repo_id, revision)
+            if entry is None:
+                at = f"{repo_id}@{revision}" if revision is not None else repo_id
+                raise HfOfflineError(
+                    f"Repo structure for {at} is not cached locally and "
+                    "offline mode is enabled",
+                    repo_id=repo_id,
+                )
+            self.logger.debug(f"Using cached repo structure for {repo_id} (offline)")
+            return entry.structure
+
+        if not force_refresh:
+            if revision is None:
+                cached = self._cached(repo_id)
+            else:
+                entry = self._cached_entry(repo_id, revision)
+                cached = entry.structure if entry is not None else None
+            if cached is not None:
+                return cached
 
         try:
             self.logger.debug(f"Fetching repo structure for {repo_id}")
-            info = repo_info(repo_id=repo_id, repo_type="dataset", token=self.token)
+            info = self.scheduler.call(
+                lambda: repo_info(
+                    repo_id=repo_id,
+                    revision=revision,
+                    repo_type="dataset",
+                    token=self.token,
+                )
+            )
 
             # Extract file structure
             files = []
@@ -168,6 +838,7 @@ class HfRepoStructureFetcher:
 
             result = {
                 "repo_id": repo_id,
+                "sha": info.sha,
                 "files": files,
                 "partitions": partitions,
                 "total_files": len(files),
@@ -176,15 +847,81 @@ class HfRepoStructureFetcher:
                 ),
             }
 
-            # Cache the result
-            self._cached_structure[repo_id] = result
-            return result
+            # Cache the result; only the default branch moves ``latest``
+            entry = self.cache.put(repo_id, info.sha, result, latest=revision is None)
+            return entry.structure
 
         except Exception as e:
             error_msg = f"Failed to fetch repo structure for {repo_id}: {e}"
             self.logger.error(error_msg)
             raise HfDataFetchError(error_msg) from e
 
+    def _cached_entry(
+        self, repo_id: str, revision: str | None
+    ) -> CachedStructure | None:
+        """
+        Return the cached entry for a revision without any request.
+
+        :param repo_id: Repository identifier
+        :param revision: None for the newest cached structure, or a commit sha. Branches
+            and tags are never served from the cache.
+        :return: The entry, or None
+
+        """
+        if revision is None:
+            return self.cache.get(repo_id)
+        if is_commit_sha(revision):
+            return self.cache.get_revision(repo_id, revision, promote=False)
+        return None
+
+    def _cached(self, repo_id: str) -> dict[str, Any] | None:
+        """
+        Return the cached structure of a repository if it is still current.
+
+        :param repo_id: Repository identifier
+        :return: The structure, or None if it has to be fetched
+
+        """
+        entry = self.cache.get(repo_id)
+        if entry is None:
+            return None
+        if self.cache.is_fresh(entry):
+            self.logger.debug(f"Using cached repo structure for {repo_id}")
+            return entry.structure
+
+        try:
+            info = self.scheduler.call(
+                lambda: repo_info(
+                    repo_id=repo_id,
+                    repo_type="dataset",
+                    token=self.token,
+                    # repo_info annotates expand as one property, but takes a list
+                    expand=_REVALIDATE_EXPAND,  # type: ignore[arg-type]
+                )
+            )
+        except Exception as e:
+            self.logger.warning(
+                f"Could not revalidate repo structure for {repo_id} ({e}); "
+                "using the cached structure"
+            )
+            return entry.structure
+
+        last_modified = info.last_modified.isoformat() if info.last_modified else None
+        if info.sha is not None:
+            current = self.cache.get_revision(repo_id, info.sha)
+            if current is not None:
+                self.logger.debug(
+                    f"Using cached repo structure for {repo_id}@{info.sha}"
+                )
+                return current.structure
+            return None
+        if last_modified is not None and (
+            last_modified == entry.structure.get("last_modified")
+        ):
+            self.cache.touch(repo_id)
+            return entry.structure
+        return None
+
     def _extract_partition_info(
         self, file_path: str, partitions: dict[str, set[str]]
     ) -> None:
@@ -196,16 +933,149 @@ class HfRepoStructureFetcher:
 
         """
         # Look for partition patterns like "column=value" in path
-        partition_pattern = r"([^/=]+)=([^/]+)"
-        matches = re.findall(partition_pattern, file_path)
-
-        for column, value in matches:
+        for column, value in parse_partitions(file_path):
             if column not in partitions:
                 partitions[column] = set()
             partitions[column].add(value)
 
+    def iter_files(
+        self,
+        repo_id: str,
+        path_prefix: str | None = None,
+        revision: str | None = None,
+    ) -> Iterator[tuple[str, int | None, bool]]:
+        """
+        Stream the files of a repository page by page.
+
+        Only the directory containing ``path_prefix`` is listed on the Hub;
+        paths in it that do not start with ``path_prefix`` are skipped. In
+        offline mode the files come from the cached structure (see
+        :meth:`fetch`).
+
+        :param repo_id: Repository identifier
+        :param path_prefix: Only yield paths starting with this prefix (e.g.
+            ``"data/"`` or ``"data/regulator=GAL"``)
+        :param revision: Branch, tag or commit sha to list, or None for the
+            default branch
+        :return: Iterator of ``(path, size, is_lfs)``
+        :raises HfOfflineError: If offline and the structure is not cached
+        :raises HfDataFetchError: If listing fails
+
+        """
+        if resolve_offline(self.offline):
+            for f in self.fetch(repo_id, revision=revision)["files"]:
+                if not path_prefix or f["path"].startswith(path_prefix):
+                    yield f["path"], f["size"], f["is_lfs"]
+            return
+
+        directory = path_prefix.rpartition("/")[0] if path_prefix else ""
+        url: str | None = (
+            f"{hf_constants.ENDPOINT}/api/datasets/{repo_id}/tree/"
+            f"{quote(revision or 'main', safe='')}"
+        )
+        if directory:
+            url = f"{url}/{quote(directory, safe='')}"
+        params: dict[str, str] | None = {"recursive": "true"}
+        try:
+            while url is not None:
+                # Each page is a request of its own: pace it, and retry it on 429
+                entries, url = self.scheduler.call(
+                    partial(self._get_tree_page, url, params),
+                    priority=Priority.METADATA,
+                )
+                # The next page's URL already carries the query
+                params = None
+                for entry in entries:
+                    if entry.get("type") != "file":
+                        continue
+                    path = entry["path"]
+                    if path_prefix and not path.startswith(path_prefix):
+                        continue
+                    yield path, entry.get("size"), entry.get("lfs") is not None
+        except Exception as e:
+            error_msg = f"Failed to list files for {repo_id}: {e}"
+            self.logger.error(error_msg)
+            raise HfDataFetchError(error_msg) from e
+
+    def _get_tree_page(
+        self, url: str, params: dict[str, str] | None
+    ) -> tuple[list[dict[str, Any]], str | None]:
+        """
+        GET one page of a repository tree listing.
+
+        :param url: Page URL
+        :param params: Query parameters, or None if ``url`` already has them
+        :return: Tuple of the page's entries and the next page's URL, or None
+            on the last page
+        :raises requests.HTTPError: If the Hub responds with an error
+
+        """
+        response = get_http_session().get(
+            url,
+            params=params,
+            headers=build_hf_headers(token=self.token),
+            timeout=_TREE_PAGE_TIMEOUT,
+        )
+        response.raise_for_status()
+        return response.json(), response.links.get("next", {}).get("url")
+
+    def list_files(
+        self,
+        repo_id: str,
+        path_prefix: str | None = None,
+        force_refresh: bool = False,
+        revision: str | None = None,
+    ) -> RepoListing:
+        """
+        Return a columnar listing of the files of a repository.
+
+        Listings are cached per ``(repo_id, revision, path_prefix)`` in the
+        in-memory :class:`~labretriever.fetch_cache.FetchCache` (endpoint
+        ``"listing"``).
+
+        :param repo_id: Repository identifier
+        :param path_prefix: Only list paths starting with this prefix
+        :param force_refresh: If True, bypass cache and list again
+        :param revision: Branch, tag or commit sha to list, or None for the
+            default branch
+        :return: The listing
+        :raises HfDataFetchError: If listing fails
+
+        """
+
+        def build() -> RepoListing:
+            self.logger.debug(f"Listing files for {repo_id} (prefix {path_prefix!r})")
+            return RepoListing.from_entries(
+                repo_id, self.iter_files(repo_id, path_prefix, revision), path_prefix
+            )
+
+        if force_refresh:
+            listing = build()
+            self.fetch_cache.put(
+                "listing",
+                repo_id,
+                listing,
+                revision=revision,
+                token=self.token,
+                params=(path_prefix,),
+            )
+            return listing
+        return self.fetch_cache.get_or_fetch(
+            "listing",
+            repo_id,
+            build,
+            revision=revision,
+            token=self.token,
+            params=(path_prefix,),
+        )
+
     def get_partition_values(
-        self, repo_id: str, partition_column: str, force_refresh: bool = False
+        self,
+        repo_id: str,
+        partition_column: str,
+        force_refresh: bool = False,
+        path_prefix: str | None = None,
+        revision: str | None = None,
     ) -> list[str]:
         """
         Get all values for a specific partition column.
@@ -213,14 +1083,62 @@ class HfRepoStructureFetcher:
         :param repo_id: Repository identifier
         :param partition_column: Name of the partition column
         :param force_refresh: If True, bypass cache and fetch fresh data
+        :param path_prefix: If given, only consider files under this prefix,
+            using the streamed listing from :meth:`list_files`
+        :param revision: Branch, tag or commit sha, or None for the default
+            branch
         :return: List of unique partition values
         :raises HfDataFetchError: If fetching fails
 
         """
-        structure = self.fetch(repo_id, force_refresh=force_refresh)
+        if path_prefix is not None:
+            listing = self.list_files(
+                repo_id,
+                path_prefix=path_prefix,
+                force_refresh=force_refresh,
+                revision=revision,
+            )
+            return listing.partition_values(partition_column)
+        structure = self.fetch(repo_id, force_refresh=force_refresh, revision=revision)
         partition_values = structure.get("partitions", {}).get(partition_column, set())
         return sorted(list(partition_values))
 
+    def plan_partitions(
+        self,
+        repo_id: str,
+        filters: Mapping[str, Any] | None = None,
+        path_prefix: str | None = None,
+        patterns: Sequence[str] | None = None,
+        force_refresh: bool = False,
+        revision: str | None = None,
+    ) -> PartitionPlan:
+        """
+        Select the files of a repository that satisfy partition predicates.
+
+        See :func:`~labretriever.partition_plan.plan_partitions` for the
+        filter syntax.
+
+        :param repo_id: Repository identifier
+        :param filters: Partition column -> value, collection of values or
+            :class:`~labretriever.partition_plan.PartitionRange`
+        :param path_prefix: Only consider files under this prefix
+        :param patterns: Optional ``fnmatch`` patterns files must match
+        :param force_refresh: If True, list the repository again
+        :param revision: Branch, tag or commit sha to list, or None for the
+            default branch
+        :return: The matching files and their total size
+        :raises HfDataFetchError: If listing fails
+        :raises ValueError: If a filtered column is not a partition column
+
+        """
+        listing = self.list_files(
+            repo_id,
+            path_prefix=path_prefix,
+            force_refresh=force_refresh,
+            revision=revision,
+        )
+        return plan_partitions(listing, filters, patterns)
+
     def get_dataset_files(
         self, repo_id: str, path_pattern: str | None = None, force_refresh: bool = False
     ) -> list[dict[str, Any]]:
@@ -7,7 +7,9 @@ import duckdb
 from huggingface_hub import scan_cache_dir, try_to_load_from_cache
 from huggingface_hub.utils import DeleteCacheStrategy
 
+from labretriever.constants import resolve_offline
 from labretriever.datacard import DataCard
+from labretriever.rate_limit import Priority, get_request_scheduler
 
 
 class HfCacheManager(DataCard):
@@ -20,8 +22,10 @@ class HfCacheManager(DataCard):
         duckdb_conn: duckdb.DuckDBPyConnection,
         token: str | None = None,
         logger: logging.Logger | None = None,
+        offline: bool | None = None,
+        revision: str | None = None,
     ):
-        super().__init__(repo_id, token)
+        super().__init__(repo_id, token, offline=offline, revision=revision)
         self.duckdb_conn = duckdb_conn
         self.logger = logger or logging.getLogger(__name__)
 
@@ -124,6 +128,7 @@ class HfCacheManager(DataCard):
                 cached_path = try_to_load_from_cache(
                     repo_id=self.repo_id,
                     filename=data_file.path,
+                    revision=self.revision,
                     repo_type="dataset",
                 )
 
@@ -155,11 +160,16 @@ class HfCacheManager(DataCard):
             # Download specific files for this metadata config
             file_patterns = [data_file.path for data_file in config.data_files]
 
-            downloaded_path = snapshot_download(
-                repo_id=self.repo_id,
-                repo_type="dataset",
-                allow_patterns=file_patterns,
-                token=self.token,
+            downloaded_path = get_request_scheduler().call(
+                lambda: snapshot_download(
+                    repo_id=self.repo_id,
+                    repo_type="dataset",
+                    revision=self.revision,
+                    allow_patterns=file_patterns,
+                    token=self.token,
+                    local_files_only=resolve_offline(self.offline),
+                ),
+                priority=Priority.BULK,
             )
 
             # Find downloaded parquet files
@@ -0,0 +1,277 @@
+"""
+Structural interning of dataset card definition blocks.
+
+Cards in a collection repeat the same experimental-condition structures
+(media, carbon sources, temperatures) in many ``definitions`` and
+``experimental_conditions`` blocks, and each parsed copy is a separate tree of
+dicts. :class:`DefinitionInterner` replaces structurally equal subtrees with a
+single shared, read-only instance, so a process that loads many cards holds
+each distinct block once.
+
+Interning works bottom-up: children are interned first, so a container can be
+looked up by its keys and the identities of its (already shared) children
+without hashing whole subtrees.
+
+Shared values are :class:`FrozenDict`/:class:`FrozenList` instances. They
+compare equal to, and are instances of, ``dict``/``list``, but raise
+``TypeError`` when modified. Copies (``dict(x)``, ``copy.deepcopy(x)``) are
+ordinary mutable containers.
+
+Example::
+
+    card = DataCard("BrentLab/harbison_2004", intern_definitions=True)
+    card.memory_report()
+    # InternReport(nodes=412, shared_nodes=198, bytes=..., shared_bytes=...)
+
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+import weakref
+from dataclasses import dataclass
+from typing import Any, NoReturn
+
+_SCALARS = (int, float, bool, type(None))
+
+
+class FrozenDict(dict):
+    """
+    A dict that raises TypeError on modification.
+
+    Copies are plain dicts.
+
+    """
+
+    def _readonly(self, *args: Any, **kwargs: Any) -> NoReturn:
+        raise TypeError("This dict is shared and read-only; copy with dict() to modify")
+
+    # Some of these are overloaded in dict; the replacement takes any arguments
+    __setitem__ = __delitem__ = __ior__ = _readonly  # type: ignore[assignment]
+    pop = setdefault = update = _readonly  # type: ignore[assignment]
+    clear = popitem = _readonly
+
+    def __reduce__(self) -> tuple[type, tuple[dict]]:
+        return (dict, (dict(self),))
+
+
+class FrozenList(list):
+    """
+    A list that raises TypeError on modification.
+
+    Copies are plain lists.
+
+    """
+
+    def _readonly(self, *args: Any, **kwargs: Any) -> NoReturn:
+        raise TypeError("This list is shared and read-only; copy with list() to modify")
+
+    # Overloaded in list; the replacement takes any arguments
+    __setitem__ = __delitem__ = sort = _readonly  # type: ignore[assignment]
+    __iadd__ = __imul__ = _readonly
+    append = extend = insert = pop = remove = clear = reverse = _readonly
+
+    def __reduce__(self) -> tuple[type, tuple[list]]:
+        return (list, (list(self),))
+
+
+def freeze(value: Any) -> Any:
+    """
+    Return a read-only copy of nested dicts and lists.
+
+    Values that are already frozen are returned as-is.
+
+    :param value: Value to freeze
+    :return: A copy of ``value`` with every dict and list replaced by a frozen copy
+
+    """
+    if isinstance(value, (FrozenDict, FrozenList)):
+        return value
+    if isinstance(value, dict):
+        return FrozenDict((k, freeze(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return FrozenList(freeze(v) for v in value)
+    return value
+
+
+@dataclass
+class InternReport:
+    """
+    Memory accounting for interning one dataset card.
+
+    Sizes are shallow ``sys.getsizeof`` sums over the dicts and lists of the
+    interned blocks, so a shared subtree contributes all of its nodes. Strings
+    are interned with ``sys.intern`` but not counted.
+
+    :param nodes: Dicts and lists in the card's definition blocks
+    :param shared_nodes: Of those, how many were replaced by an existing
+        shared instance
+    :param bytes: Size of the blocks as parsed, without sharing
+    :param shared_bytes: Size of the parts replaced by shared instances,
+        i.e. memory not held a second time
+
+    """
+
+    nodes: int = 0
+    shared_nodes: int = 0
+    bytes: int = 0
+    shared_bytes: int = 0
+
+    @property
+    def unique_bytes(self) -> int:
+        """Size of the parts of the card that are not shared."""
+        return self.bytes - self.shared_bytes
+
+
+class DefinitionInterner:
+    """
+    Table of shared, read-only definition subtrees.
+
+    Instances are thread-safe. The table holds its values weakly: a shared value is
+    dropped once no card references it, so a long-running process does not keep the
+    definitions of cards it has released.
+
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty table."""
+        # Keys hold the ids of interned children. A child stays alive while its
+        # parent entry does, so an id in a live key cannot be reused.
+        self._table: weakref.WeakValueDictionary[tuple, Any] = (
+            weakref.WeakValueDictionary()
+        )
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Number of distinct shared dicts and lists."""
+        return len(self._table)
+
+    def clear(self) -> None:
+        """
+        Drop all shared values.
+
+        Values already handed out stay valid.
+
+        """
+        with self._lock:
+            self._table.clear()
+
+    def intern(self, value: Any, report: InternReport | None = None) -> Any:
+        """
+        Return the shared instance structurally equal to ``value``.
+
+        :param value: Parsed YAML/JSON value (dicts, lists, scalars)
+        :param report: If given, node and byte counts are added to it
+        :return: A frozen value equal to ``value``; the same object for equal inputs
+
+        """
+        with self._lock:
+            return self._intern(value, report if report is not None else InternReport())
+
+    def intern_card_data(
+        self, data: dict[str, Any]
+    ) -> tuple[dict[str, Any], InternReport]:
+        """
+        Intern the definition blocks of raw (unvalidated) card data.
+
+        The top-level and per-config ``experimental_conditions`` and every
+        value of each feature's ``definitions`` are interned. The rest of the
+        card is shallow-copied where needed and otherwise left unchanged; the
+        input is not modified.
+
+        :param data: Card data as returned by
+            :meth:`~labretriever.fetchers.HfDataCardFetcher.fetch`
+        :return: The card data with shared definition blocks, and the report
+
+        """
+        report = InternReport()
+        with self._lock:
+            data = dict(data)
+            if "experimental_conditions" in data:
+                data["experimental_conditions"] = self._intern(
+                    data["experimental_conditions"], report
+                )
+            configs = data.get("configs")
+            if isinstance(configs, list):
+                data["configs"] = [self._intern_config(c, report) for c in configs]
+        return data, report
+
+    def _intern_config(self, config: Any, report: InternReport) -> Any:
+        """Intern the definition blocks of one raw config."""
+        if not isinstance(config, dict):
+            return config
+        config = dict(config)
+        if "experimental_conditions" in config:
+            config["experimental_conditions"] = self._intern(
+                config["experimental_conditions"], report
+            )
+        info = config.get("dataset_info")
+        features = info.get("features") if isinstance(info, dict) else None
+        if isinstance(info, dict) and isinstance(features, list):
+            new_features = []
+            for feature in features:
+                definitions = (
+                    feature.get("definitions") if isinstance(feature, dict) else None
+                )
+                if isinstance(definitions, dict):
+                    feature = dict(feature)
+                    feature["definitions"] = {
+                        self._intern_str(k): self._intern(v, report)
+                        for k, v in definitions.items()
+                    }
+                new_features.append(feature)
+            config["dataset_info"] = {**info, "features": new_features}
+        return config
+
+    @staticmethod
+    def _intern_str(value: Any) -> Any:
+        """Intern a string with ``sys.intern``; other values pass through."""
+        return sys.intern(value) if type(value) is str else value
+
+    def _intern(self, value: Any, report: InternReport) -> Any:
+        """Intern ``value`` bottom-up; the caller holds the lock."""
+        if isinstance(value, dict):
+            items = [
+                (self._intern_str(k), self._intern(v, report)) for k, v in value.items()
+            ]
+            key: tuple = (dict, *((k, self._identity(v)) for k, v in items))
+            make: Any = FrozenDict
+        elif isinstance(value, list):
+            items = [self._intern(v, report) for v in value]
+            key = (list, *(self._identity(v) for v in items))
+            make = FrozenList
+        elif type(value) is str:
+            return self._intern_str(value)
+        else:
+            return value
+
+        size = sys.getsizeof(value)
+        report.nodes += 1
+        report.bytes += size
+        try:
+            shared = self._table.get(key)
+        except TypeError:
+            # An unhashable leaf (not produced by YAML/JSON) -- do not share
+            return make(items)
+        if shared is not None:
+            report.shared_nodes += 1
+            report.shared_bytes += size
+            return shared
+        shared = make(items)
+        self._table[key] = shared
+        return shared
+
+    @staticmethod
+    def _identity(value: Any) -> Any:
+        """Return a hashable stand-in for an already interned value."""
+        if isinstance(value, (FrozenDict, FrozenList)):
+            return (id(value),)
+        if isinstance(value, _SCALARS) or type(value) is str:
+            # Include the type so that 1, 1.0 and True stay distinct
+            return (type(value), value)
+        return (id(value), value)
+
+
+#: Interner shared by all DataCards created with ``intern_definitions=True``
+DEFAULT_INTERNER = DefinitionInterner()
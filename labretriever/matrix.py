@@ -0,0 +1,313 @@
+"""
+Labeled dense and CSR matrices built from VirtualDB views.
+
+:meth:`VirtualDB.to_matrix` pivots a measurement column of a dataset into a row axis
+(e.g. regulators) by column axis (e.g. targets) matrix. The axes are integer coded in
+DuckDB and the result is returned as one of the containers below, which keep the axis
+labels alongside the NumPy buffers.
+
+Both containers can be written to a directory of ``.npy`` files with :func:`save_matrix`
+and loaded back memory-mapped with :func:`load_matrix`, so repeat analyses do not
+rebuild or even fully read the matrix.
+
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Literal
+
+import numpy as np
+import pandas as pd
+
+_META_FILE = "matrix.json"
+
+
+@dataclass
+class DenseMatrix:
+    """
+    A dense 2D matrix with row and column labels.
+
+    Missing cells are ``NaN``.
+
+    :param values: 2D float array of shape ``(len(row_labels), len(col_labels))``
+    :param row_labels: Label of each row, in row order
+    :param col_labels: Label of each column, in column order
+    :param row_axis: Name of the column the rows were taken from
+    :param col_axis: Name of the column the columns were taken from
+    :param value_col: Name of the measurement column
+
+    """
+
+    values: np.ndarray
+    row_labels: np.ndarray
+    col_labels: np.ndarray
+    row_axis: str | None = None
+    col_axis: str | None = None
+    value_col: str | None = None
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        """Matrix shape as ``(n_rows, n_cols)``."""
+        return (len(self.row_labels), len(self.col_labels))
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Return the matrix as a DataFrame indexed by the axis labels.
+
+        :return: DataFrame with ``row_labels`` as index and ``col_labels`` as columns
+
+        """
+        return pd.DataFrame(
+            np.asarray(self.values),
+            index=pd.Index(self.row_labels, name=self.row_axis),
+            columns=pd.Index(self.col_labels, name=self.col_axis),
+        )
+
+
+@dataclass
+class CSRMatrix:
+    """
+    A compressed sparse row matrix with row and column labels.
+
+    The layout matches ``scipy.sparse.csr_matrix``: the column indices of row ``i`` are
+    ``indices[indptr[i]:indptr[i + 1]]`` (sorted) and their values are the same slice of
+    ``data``.
+
+    :param data: Stored values
+    :param indices: Column index of each stored value
+    :param indptr: Row pointer array of length ``n_rows + 1``
+    :param row_labels: Label of each row, in row order
+    :param col_labels: Label of each column, in column order
+    :param row_axis: Name of the column the rows were taken from
+    :param col_axis: Name of the column the columns were taken from
+    :param value_col: Name of the measurement column
+
+    """
+
+    data: np.ndarray
+    indices: np.ndarray
+    indptr: np.ndarray
+    row_labels: np.ndarray
+    col_labels: np.ndarray
+    row_axis: str | None = None
+    col_axis: str | None = None
+    value_col: str | None = None
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        """Matrix shape as ``(n_rows, n_cols)``."""
+        return (len(self.row_labels), len(self.col_labels))
+
+    @property
+    def nnz(self) -> int:
+        """Number of stored values."""
+        return len(self.data)
+
+    def to_dense(self, fill_value: float = np.nan) -> DenseMatrix:
+        """
+        Expand to a :class:`DenseMatrix`.
+
+        :param fill_value: Value for cells that are not stored
+        :return: DenseMatrix with the same labels
+
+        """
+        values = np.full(self.shape, fill_value, dtype=np.float64)
+        rows = np.repeat(np.arange(self.shape[0]), np.diff(self.indptr))
+        values[rows, self.indices] = self.data
+        return DenseMatrix(
+            values=values,
+            row_labels=self.row_labels,
+            col_labels=self.col_labels,
+            row_axis=self.row_axis,
+            col_axis=self.col_axis,
+            value_col=self.value_col,
+        )
+
+    def to_scipy(self) -> Any:
+        """
+        Return a ``scipy.sparse.csr_matrix`` sharing this matrix's buffers.
+
+        :return: A ``scipy.sparse.csr_matrix``
+        :raises ImportError: If scipy is not installed
+
+        """
+        try:
+            from scipy.sparse import csr_matrix
+        except ImportError as exc:
+            raise ImportError(
+                "scipy is required for CSRMatrix.to_scipy(). "
+                "Install it with `pip install scipy`."
+            ) from exc
+        return csr_matrix((self.data, self.indices, self.indptr), shape=self.shape)
+
+
+def _label_array(labels: Any) -> np.ndarray:
+    """
+    Convert axis labels to an array that can be saved without pickling.
+
+    DuckDB returns VARCHAR columns as object arrays. Those are converted to fixed-width
+    unicode so the saved ``.npy`` can be memory-mapped.
+
+    :param labels: Sequence or array of labels
+    :return: Array with a non-object dtype
+
+    """
+    arr = np.asarray(labels)
+    if arr.dtype == object:
+        arr = np.asarray([str(v) for v in arr.tolist()], dtype=str)
+    return arr
+
+
+def build_matrix(
+    row_codes: np.ndarray,
+    col_codes: np.ndarray,
+    values: np.ndarray,
+    row_labels: Any,
+    col_labels: Any,
+    sparse: bool = False,
+    row_axis: str | None = None,
+    col_axis: str | None = None,
+    value_col: str | None = None,
+) -> DenseMatrix | CSRMatrix:
+    """
+    Assemble a matrix from integer-coded coordinates.
+
+    :param row_codes: Zero-based row index of each value
+    :param col_codes: Zero-based column index of each value
+    :param values: Cell values
+    :param row_labels: Labels for row codes ``0..n_rows-1``
+    :param col_labels: Labels for column codes ``0..n_cols-1``
+    :param sparse: If True return a :class:`CSRMatrix`, else a :class:`DenseMatrix`
+    :param row_axis: Name of the row axis column
+    :param col_axis: Name of the column axis column
+    :param value_col: Name of the measurement column
+    :return: The assembled matrix
+
+    """
+    row_labels = _label_array(row_labels)
+    col_labels = _label_array(col_labels)
+    row_codes = np.asarray(row_codes, dtype=np.int64)
+    col_codes = np.asarray(col_codes, dtype=np.int64)
+    values = np.asarray(np.ma.filled(values, np.nan), dtype=np.float64)
+    shape = (len(row_labels), len(col_labels))
+
+    if not sparse:
+        dense = np.full(shape, np.nan, dtype=np.float64)
+        dense[row_codes, col_codes] = values
+        return DenseMatrix(dense, row_labels, col_labels, row_axis, col_axis, value_col)
+
+    order = np.lexsort((col_codes, row_codes))
+    indptr = np.zeros(shape[0] + 1, dtype=np.int64)
+    np.cumsum(np.bincount(row_codes, minlength=shape[0]), out=indptr[1:])
+    return CSRMatrix(
+        data=values[order],
+        indices=col_codes[order].astype(np.int32),
+        indptr=indptr,
+        row_labels=row_labels,
+        col_labels=col_labels,
+        row_axis=row_axis,
+        col_axis=col_axis,
+        value_col=value_col,
+    )
+
+
+def save_matrix(matrix: DenseMatrix | CSRMatrix, path: Path | str) -> Path:
+    """
+    Write a matrix to a directory of ``.npy`` files.
+
+    The directory is written to a temporary sibling and renamed into place, so a
+    concurrent :func:`load_matrix` never sees a partial matrix. An existing directory at
+    ``path`` is first renamed aside and only deleted once the new matrix is in place, so
+    a failed save leaves it untouched.
+
+    :param matrix: Matrix to save
+    :param path: Target directory
+    :return: The ``path`` argument as a Path
+
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = Path(tempfile.mkdtemp(prefix=f".{path.name}.", dir=path.parent))
+    try:
+        if isinstance(matrix, CSRMatrix):
+            kind = "csr"
+            arrays = {
+                "data": matrix.data,
+                "indices": matrix.indices,
+                "indptr": matrix.indptr,
+            }
+        else:
+            kind = "dense"
+            arrays = {"values": matrix.values}
+        arrays["row_labels"] = _label_array(matrix.row_labels)
+        arrays["col_labels"] = _label_array(matrix.col_labels)
+        for name, arr in arrays.items():
+            np.save(tmp / f"{name}.npy", np.asarray(arr), allow_pickle=False)
+        (tmp / _META_FILE).write_text(
+            json.dumps(
+                {
+                    "kind": kind,
+                    "row_axis": matrix.row_axis,
+                    "col_axis": matrix.col_axis,
+                    "value_col": matrix.value_col,
+                }
+            )
+        )
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+    old = tmp.with_name(tmp.name + ".old") if path.exists() else None
+    if old is not None:
+        os.replace(path, old)
+    try:
+        os.replace(tmp, path)
+    except BaseException:
+        if old is not None:
+            os.replace(old, path)
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    if old is not None:
+        shutil.rmtree(old, ignore_errors=True)
+    return path
+
+
+def load_matrix(path: Path | str, mmap: bool = True) -> DenseMatrix | CSRMatrix:
+    """
+    Load a matrix written by :func:`save_matrix`.
+
+    :param path: Directory written by :func:`save_matrix`
+    :param mmap: If True (default) the arrays are memory-mapped read-only
+        instead of read into memory
+    :return: The saved matrix
+    :raises FileNotFoundError: If ``path`` does not contain a saved matrix
+
+    """
+    path = Path(path)
+    meta_path = path / _META_FILE
+    if not meta_path.exists():
+        raise FileNotFoundError(f"No saved matrix at {path}")
+    meta = json.loads(meta_path.read_text())
+    mmap_mode: Literal["r+", "r", "w+", "c"] | None = "r" if mmap else None
+
+    def load(name: str) -> np.ndarray:
+        return np.load(path / f"{name}.npy", mmap_mode=mmap_mode, allow_pickle=False)
+
+    labels = {
+        "row_labels": load("row_labels"),
+        "col_labels": load("col_labels"),
+        "row_axis": meta.get("row_axis"),
+        "col_axis": meta.get("col_axis"),
+        "value_col": meta.get("value_col"),
+    }
+    if meta["kind"] == "csr":
+        return CSRMatrix(
+            data=load("data"), indices=load("indices"), indptr=load("indptr"), **labels
+        )
+    return DenseMatrix(values=load("values"), **labels)
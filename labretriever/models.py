@@ -10,6 +10,7 @@ Also includes models for VirtualDB metadata normalization configuration.
 """
 
 import logging
+from collections.abc import Iterator, Sequence
 from enum import Enum
 from functools import cached_property
 from pathlib import Path
@@ -20,6 +21,11 @@ from pydantic import (
     BaseModel,
     ConfigDict,
     Field,
+    PrivateAttr,
+    SerializerFunctionWrapHandler,
+    TypeAdapter,
+    ValidationInfo,
+    ValidatorFunctionWrapHandler,
     computed_field,
     field_serializer,
     field_validator,
@@ -81,13 +87,49 @@ class PartitioningInfo(BaseModel):
 
 
 class DatasetInfo(BaseModel):
-    """Dataset structure information."""
+    """
+    Dataset structure information.
+
+    Features are indexed by name and by role once, after validation.
+
+    """
 
     features: list[FeatureInfo] = Field(..., description="Feature definitions")
     partitioning: PartitioningInfo | None = Field(
         default=None, description="Partitioning configuration"
     )
 
+    _features_by_name: dict[str, FeatureInfo] = PrivateAttr(default_factory=dict)
+    _features_by_role: dict[str | None, list[FeatureInfo]] = PrivateAttr(
+        default_factory=dict
+    )
+
+    def model_post_init(self, __context: Any) -> None:
+        """Build the feature name and role indexes."""
+        for feature in self.features:
+            self._features_by_name.setdefault(feature.name, feature)
+            self._features_by_role.setdefault(feature.role, []).append(feature)
+
+    def get_feature(self, name: str) -> FeatureInfo | None:
+        """
+        Get a feature by name.
+
+        :param name: Feature (column) name
+        :return: The first feature with that name, or None
+
+        """
+        return self._features_by_name.get(name)
+
+    def get_features_by_role(self, role: str | None) -> list[FeatureInfo]:
+        """
+        Get the features with a given role, in declaration order.
+
+        :param role: Role to look up, or None for features without a role
+        :return: Matching features
+
+        """
+        return list(self._features_by_role.get(role, ()))
+
 
 class DataFileInfo(BaseModel):
     """Information about data files."""
@@ -170,6 +212,83 @@ class DatasetConfig(BaseModel):
         return v
 
 
+class _ConfigIndexEntry(BaseModel):
+    """The fields of a config needed to find it without validating the rest."""
+
+    config_name: str
+    dataset_type: DatasetType
+    default: bool = False
+    applies_to: list[str] | None = None
+
+    model_config = ConfigDict(extra="ignore")
+
+
+_CONFIG_INDEX_ADAPTER: TypeAdapter[list[_ConfigIndexEntry]] = TypeAdapter(
+    list[_ConfigIndexEntry]
+)
+
+
+class LazyConfigList(Sequence[DatasetConfig]):
+    """
+    Read-only sequence of configs that are validated on first access.
+
+    Built by :meth:`DatasetCard.validate_lazy`. Only ``config_name``, ``dataset_type``
+    and ``default`` of each config are validated up front; indexing or iterating
+    validates the corresponding :class:`DatasetConfig` (features, definitions,
+    partitioning) once and keeps the result.
+
+    A config that fails validation raises ``pydantic.ValidationError`` when it is first
+    accessed rather than when the card is loaded.
+
+    """
+
+    def __init__(self, raw: list[Any], index: list[_ConfigIndexEntry]):
+        """
+        Initialize from raw config mappings and their validated index entries.
+
+        :param raw: Unvalidated config mappings, in card order
+        :param index: Validated index entry for each item of ``raw``
+
+        """
+        self._raw = list(raw)
+        self._index = list(index)
+        self._validated: list[DatasetConfig | None] = [None] * len(self._raw)
+
+    @property
+    def num_validated(self) -> int:
+        """Number of configs validated so far."""
+        return sum(1 for c in self._validated if c is not None)
+
+    def __len__(self) -> int:
+        return len(self._raw)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        config = self._validated[i]
+        if config is None:
+            config = DatasetConfig.model_validate(self._raw[i])
+            self._validated[i] = config
+        return config
+
+    def __iter__(self) -> Iterator[DatasetConfig]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (list, LazyConfigList)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return (
+            f"LazyConfigList({[e.config_name for e in self._index]!r}, "
+            f"validated={self.num_validated})"
+        )
+
+
 class DatasetCard(BaseModel):
     """
     Complete dataset card model.
@@ -191,35 +310,96 @@ class DatasetCard(BaseModel):
 
     model_config = ConfigDict(extra="allow")
 
-    @field_validator("configs", mode="after")
+    _config_positions: dict[str, int] = PrivateAttr(default_factory=dict)
+    _metadata_config_positions: dict[str, list[int]] = PrivateAttr(default_factory=dict)
+
+    def model_post_init(self, __context: Any) -> None:
+        """Index configs by name and data configs by their metadata configs."""
+        for i, entry in enumerate(self._config_entries()):
+            self._config_positions.setdefault(entry.config_name, i)
+            if entry.dataset_type == DatasetType.METADATA and entry.applies_to:
+                for name in entry.applies_to:
+                    self._metadata_config_positions.setdefault(name, []).append(i)
+
+    @field_validator("configs", mode="wrap")
     @classmethod
-    def validate_configs(cls, v: list[DatasetConfig]) -> list[DatasetConfig]:
+    def validate_configs(
+        cls,
+        v: Any,
+        handler: ValidatorFunctionWrapHandler,
+        info: ValidationInfo,
+    ) -> list[DatasetConfig] | LazyConfigList:
         """
         Validate configs list.
 
         Ensures at least one config exists, all config names are unique, and at most one
-        config is marked as default.
+        config is marked as default. When validating with the context ``{"lazy_configs":
+        True}`` (see :meth:`validate_lazy`) only the fields needed for these checks are
+        validated and a :class:`LazyConfigList` is returned.
 
-        :param v: The list of DatasetConfig objects
+        :param v: The raw configs value
+        :param handler: Pydantic's validator for ``list[DatasetConfig]``
+        :param info: Validation info carrying the validation context
         :return: The validated list of configs
         :raises ValueError: If validation fails
 
         """
+        configs: list[DatasetConfig] | LazyConfigList
+        if info.context and info.context.get("lazy_configs") and isinstance(v, list):
+            index = _CONFIG_INDEX_ADAPTER.validate_python(v)
+            configs = LazyConfigList(v, index)
+            entries: list[Any] = index
+        else:
+            configs = handler(v)
+            entries = list(configs)
+
         # Check non-empty
-        if not v:
+        if not entries:
             raise ValueError("At least one dataset configuration is required")
 
         # Check unique names
-        names = [config.config_name for config in v]
+        names = [entry.config_name for entry in entries]
         if len(names) != len(set(names)):
             raise ValueError("Configuration names must be unique")
 
         # Check at most one default
-        defaults = sum(1 for config in v if config.default)
+        defaults = sum(1 for entry in entries if entry.default)
         if defaults > 1:
             raise ValueError("At most one configuration can be marked as default")
 
-        return v
+        return configs
+
+    @field_serializer("configs", mode="wrap")
+    def serialize_configs(
+        self,
+        v: list[DatasetConfig] | LazyConfigList,
+        handler: SerializerFunctionWrapHandler,
+    ) -> Any:
+        """Serialize lazily validated configs as a plain list."""
+        return handler(list(v))
+
+    @classmethod
+    def validate_lazy(cls, data: dict[str, Any]) -> "DatasetCard":
+        """
+        Validate a card, deferring validation of each config until it is used.
+
+        The top level and each config's ``config_name``, ``dataset_type`` and
+        ``default`` are validated immediately. ``configs`` is a :class:`LazyConfigList`
+        that validates a :class:`DatasetConfig` the first time it is accessed, so the
+        cost of loading a large card scales with the configs actually used.
+
+        :param data: Parsed card data
+        :return: DatasetCard with lazily validated configs
+        :raises ValidationError: If the top level or the config index is invalid
+
+        """
+        return cls.model_validate(data, context={"lazy_configs": True})
+
+    def _config_entries(self) -> list[Any]:
+        """Return objects with ``config_name``/``dataset_type``/``default``."""
+        if isinstance(self.configs, LazyConfigList):
+            return self.configs._index
+        return list(self.configs)
 
     # Computed properties for better discoverability
     @computed_field  # type: ignore[prop-decorator]
@@ -231,9 +411,9 @@ class DatasetCard(BaseModel):
         :return: The default DatasetConfig or None if no default is set
 
         """
-        for config in self.configs:
-            if config.default:
-                return config
+        for i, entry in enumerate(self._config_entries()):
+            if entry.default:
+                return self.configs[i]
         return None
 
     @computed_field  # type: ignore[prop-decorator]
@@ -245,7 +425,7 @@ class DatasetCard(BaseModel):
         :return: List of all config_name values
 
         """
-        return [config.config_name for config in self.configs]
+        return [entry.config_name for entry in self._config_entries()]
 
     # Utility methods (not serialized)
     def get_config_by_name(self, name: str) -> DatasetConfig | None:
@@ -256,10 +436,8 @@ class DatasetCard(BaseModel):
         :return: The matching DatasetConfig or None if not found
 
         """
-        for config in self.configs:
-            if config.config_name == name:
-                return config
-        return None
+        i = self._config_positions.get(name)
+        return None if i is None else self.configs[i]
 
     def get_configs_by_type(self, dataset_type: DatasetType) -> list[DatasetConfig]:
         """
@@ -270,7 +448,22 @@ class DatasetCard(BaseModel):
 
         """
         return [
-            config for config in self.configs if config.dataset_type == dataset_type
+            self.configs[i]
+            for i, entry in enumerate(self._config_entries())
+            if entry.dataset_type == dataset_type
+        ]
+
+    def get_metadata_configs_for(self, config_name: str) -> list[DatasetConfig]:
+        """
+        Get the metadata configurations whose ``applies_to`` lists a config.
+
+        :param config_name: Name of the data configuration
+        :return: Matching metadata DatasetConfig objects, in card order
+
+        """
+        return [
+            self.configs[i]
+            for i in self._metadata_config_positions.get(config_name, ())
         ]
 
     def get_data_configs(self) -> list[DatasetConfig]:
@@ -281,9 +474,9 @@ class DatasetCard(BaseModel):
 
         """
         return [
-            config
-            for config in self.configs
-            if config.dataset_type != DatasetType.METADATA
+            self.configs[i]
+            for i, entry in enumerate(self._config_entries())
+            if entry.dataset_type != DatasetType.METADATA
         ]
 
     def get_metadata_configs(self) -> list[DatasetConfig]:
@@ -293,11 +486,7 @@ class DatasetCard(BaseModel):
         :return: List of DatasetConfig objects with metadata type
 
         """
-        return [
-            config
-            for config in self.configs
-            if config.dataset_type == DatasetType.METADATA
-        ]
+        return self.get_configs_by_type(DatasetType.METADATA)
 
 
 class ExtractedMetadata(BaseModel):
@@ -451,6 +640,8 @@ class DatasetVirtualDBConfig(BaseModel):
     :ivar links: For comparative datasets, map link_field -> list of
         [repo_id, config_name] pairs specifying which primary datasets
         are linked through each link field.
+    :ivar revision: Branch, tag or commit sha to read this dataset's files
+        at. Overrides the repository's ``revision``.
 
     Example - Primary dataset::
 
@@ -505,6 +696,13 @@ class DatasetVirtualDBConfig(BaseModel):
         default_factory=dict,
         description="Arbitrary key/value annotations for this dataset",
     )
+    revision: str | None = Field(
+        default=None,
+        description=(
+            "Branch, tag or commit sha of this dataset's files. Overrides the "
+            "repository revision."
+        ),
+    )
 
     model_config = ConfigDict(extra="allow")
 
@@ -551,7 +749,7 @@ class DatasetVirtualDBConfig(BaseModel):
                 "Use only letters, digits, and underscores, "
                 "starting with a letter or underscore."
             )
-        reserved = {"samples"}
+        reserved = {"samples", "all", "all_meta"}
         if v.lower() in reserved:
             raise ValueError(f"db_name '{v}' is reserved for internal use.")
         return v
@@ -573,7 +771,7 @@ class DatasetVirtualDBConfig(BaseModel):
         result = {}
         for key, value in data.items():
             # Known typed fields - let Pydantic handle them
-            if key in ("sample_id", "links", "db_name", "tags"):
+            if key in ("sample_id", "links", "db_name", "tags", "revision"):
                 result[key] = value
             # Dict values should be PropertyMappings
             elif isinstance(value, dict):
@@ -616,10 +814,14 @@ class RepositoryConfig(BaseModel):
     :ivar properties: Repo-wide property mappings that apply to all datasets
     :ivar dataset: Dataset-specific configurations including sample_id,
         comparative_analyses, and property mappings
+    :ivar revision: Branch, tag or commit sha to read the repository at.
+        None follows the default branch. A commit sha pins the DataCard and
+        data files, so everything cached from them stays valid.
 
     Example::
 
         BrentLab/harbison_2004:
+          revision: 5d3c0a4e9b1f2c6d7e8f9a0b1c2d3e4f5a6b7c8d
           temperature_celsius:
             path: temperature_celsius
           dataset:
@@ -642,6 +844,10 @@ class RepositoryConfig(BaseModel):
         default_factory=dict,
         description="Arbitrary key/value annotations for all datasets in this repo",
     )
+    revision: str | None = Field(
+        default=None,
+        description="Branch, tag or commit sha to read the repository at",
+    )
 
     @model_validator(mode="before")
     @classmethod
@@ -679,10 +885,18 @@ class RepositoryConfig(BaseModel):
                         f"Invalid configuration for dataset '{dataset_name}': {e}"
                     ) from e
 
-        # Parse repo-wide properties (all keys except 'dataset' and 'tags')
+        revision = data.get("revision")
+        if revision is not None and not isinstance(revision, str):
+            raise ValueError(
+                f"'revision' must be a string, got {revision!r} "
+                "(quote numeric commit shas in YAML)"
+            )
+
+        # Parse repo-wide properties (all keys except 'dataset', 'tags' and
+        # 'revision')
         parsed_properties = {}
         for key, value in data.items():
-            if key in ("dataset", "tags"):
+            if key in ("dataset", "tags", "revision"):
                 continue
 
             try:
@@ -694,6 +908,7 @@ class RepositoryConfig(BaseModel):
             "properties": parsed_properties,
             "dataset": parsed_datasets,
             "tags": data.get("tags") or {},
+            "revision": revision,
         }
 
 
@@ -934,6 +1149,24 @@ class MetadataConfig(BaseModel):
         """
         return self.repositories.get(repo_id)
 
+    def get_db_name_map(self) -> dict[str, tuple[str, str]]:
+        """
+        Map each dataset's resolved db_name to its repository and config.
+
+        The db_name is the dataset's ``db_name`` if set, else its config name.
+
+        :return: Dict mapping db_name -> (repo_id, config_name)
+
+        """
+        mapping: dict[str, tuple[str, str]] = {}
+        for repo_id, repo_cfg in self.repositories.items():
+            if not repo_cfg.dataset:
+                continue
+            for config_name, ds_cfg in repo_cfg.dataset.items():
+                resolved = ds_cfg.db_name or config_name
+                mapping[resolved] = (repo_id, config_name)
+        return mapping
+
     def get_property_mappings(
         self, repo_id: str, config_name: str
     ) -> dict[str, PropertyMapping]:
@@ -985,12 +1218,33 @@ class MetadataConfig(BaseModel):
 
         return merged
 
+    def get_revision(self, repo_id: str, config_name: str | None = None) -> str | None:
+        """
+        Resolve the pinned revision of a repository or dataset.
+
+        Checks the dataset-level ``revision`` first (if ``config_name`` is given), then
+        the repo-level one.
+
+        :param repo_id: Repository ID
+        :param config_name: Dataset/config name, or None for the repository
+        :return: Branch, tag or commit sha, or None to follow the default branch
+
+        """
+        repo_cfg = self.get_repository_config(repo_id)
+        if not repo_cfg:
+            return None
+        if config_name is not None and repo_cfg.dataset:
+            ds_cfg = repo_cfg.dataset.get(config_name)
+            if ds_cfg is not None and ds_cfg.revision is not None:
+                return ds_cfg.revision
+        return repo_cfg.revision
+
     def get_sample_id_field(self, repo_id: str, config_name: str) -> str:
         """
         Resolve the actual column name for the sample identifier.
 
-        Checks dataset-level ``sample_id`` first, then repo-level,
-        falling back to ``"sample_id"`` if neither is configured.
+        Checks dataset-level ``sample_id`` first, then repo-level, falling back to
+        ``"sample_id"`` if neither is configured.
 
         :param repo_id: Repository ID
         :param config_name: Dataset/config name
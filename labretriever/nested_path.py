@@ -0,0 +1,135 @@
+"""
+Compiled dot-notation accessors for nested dicts and lists.
+
+Property mappings address values inside dataset card definitions with dotted
+paths such as ``media.carbon_source.compound``. :func:`compile_path` parses a
+path once into a :class:`NestedPath`, which is cached per path string and can
+be applied to many definitions without re-parsing. When an intermediate value
+is a list of dicts, the rest of the path is applied to each item and the
+non-missing results are returned as a list.
+
+Example::
+
+    compound = compile_path("media.carbon_source.compound")
+    compound.get({"media": {"carbon_source": [{"compound": "glucose"}]}})
+    # ['glucose']
+    compound.get_many(definitions)  # {definition key: value}
+
+"""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class NestedPath:
+    """
+    A parsed dot-notation path.
+
+    Use :func:`compile_path` rather than constructing instances directly, so that parsed
+    paths are shared.
+
+    :ivar path: The original path string
+    :ivar keys: The path split on ``"."``
+
+    """
+
+    __slots__ = ("path", "keys")
+
+    def __init__(self, path: str):
+        """
+        Parse a path.
+
+        :param path: Dot-separated path (e.g., "media.carbon_source.compound")
+
+        """
+        self.path = path
+        self.keys = tuple(path.split("."))
+
+    def __repr__(self) -> str:
+        return f"NestedPath({self.path!r})"
+
+    def get(self, data: Any) -> Any:
+        """
+        Return the value at this path.
+
+        Missing keys return None. When the top-level value or an intermediate value is a
+        list, the remaining path is applied to each dict item and the non-None results
+        are returned as a list (or None if there are none).
+
+        :param data: Dictionary or list of dicts to navigate
+        :return: Value at path, list of values, or None if not found
+        :raises TypeError: If the path descends into a value that is neither a dict nor
+            a list
+
+        """
+        if not isinstance(data, (dict, list)):
+            return None
+        return self._get(data, 0)
+
+    def get_many(self, items: Mapping[Any, Any]) -> dict[Any, Any]:
+        """
+        Apply the path to every value of a mapping in one pass.
+
+        :param items: Mapping of key -> data, e.g. a field's definitions
+        :return: Mapping of key -> value at path (None where not found)
+        :raises TypeError: As for :meth:`get`
+
+        """
+        get = self.get
+        return {key: get(data) for key, data in items.items()}
+
+    def _get(self, current: Any, start: int) -> Any:
+        """Navigate ``keys[start:]`` from ``current`` (a dict or list)."""
+        keys = self.keys
+        for i in range(start, len(keys)):
+            if isinstance(current, dict):
+                try:
+                    current = current[keys[i]]
+                except KeyError:
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug(
+                            "Key '%s' not found at path '%s' (current keys: %s)",
+                            keys[i],
+                            ".".join(keys[: i + 1]),
+                            list(current),
+                        )
+                    return None
+            elif isinstance(current, list):
+                return self._fan_out(current, i)
+            else:
+                error_msg = (
+                    f"Unexpected type '{type(current).__name__}' at "
+                    f"path '{'.'.join(keys[:i])}'; expected dict or "
+                    f"list of dicts"
+                )
+                logger.error(error_msg)
+                raise TypeError(error_msg)
+        return current
+
+    def _fan_out(self, items: list, start: int) -> list | None:
+        """Apply ``keys[start:]`` to each dict in ``items``."""
+        results = []
+        for item in items:
+            if isinstance(item, dict):
+                val = self._get(item, start)
+                if val is not None:
+                    results.append(val)
+        return results if results else None
+
+
+@lru_cache(maxsize=1024)
+def compile_path(path: str) -> NestedPath:
+    """
+    Return the (cached) compiled accessor for a dot-notation path.
+
+    :param path: Dot-separated path (e.g., "media.carbon_source.compound")
+    :return: NestedPath for ``path``
+
+    """
+    return NestedPath(path)
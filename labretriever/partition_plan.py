@@ -0,0 +1,181 @@
+"""
+Select the files of a partitioned dataset that a query needs.
+
+Hive-partitioned datasets encode column values in their paths
+(``data/regulator=GAL4/condition=YPD/part-0.parquet``). :func:`plan_partitions`
+takes predicates over those columns and returns the exact set of matching
+files, with their total size, from a
+:class:`~labretriever.repo_listing.RepoListing`, without downloading anything.
+
+Filters map a partition column to:
+
+- a single value, for equality (``{"regulator": "GAL4"}``)
+- a list, tuple or set of values, for membership (``{"regulator": ["GAL4",
+  "CBF1"]}``)
+- a :class:`PartitionRange`, for an inclusive range
+  (``{"time": PartitionRange(15, 45)}``)
+
+Partition values are strings in the paths. They are compared with the type of
+the filter value: numeric filters parse the partition values as numbers, and
+date filters parse them as ISO dates. Values that cannot be parsed never match.
+Each predicate is evaluated once per distinct partition value. Files are then
+selected by comparing the listing's per-file codes.
+
+Example::
+
+    listing = fetcher.list_files("BrentLab/callingcards", path_prefix="data/")
+    plan = plan_partitions(listing, {"regulator": ["GAL4", "CBF1"]})
+    plan.files        # paths to download, e.g. as allow_patterns
+    plan.total_bytes  # their combined size
+
+"""
+
+from __future__ import annotations
+
+import fnmatch
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+from datetime import date, datetime
+from numbers import Number
+from typing import Any
+
+import numpy as np
+
+from labretriever.repo_listing import RepoListing
+
+
+@dataclass(frozen=True)
+class PartitionRange:
+    """
+    Inclusive range predicate on a partition column.
+
+    :ivar lo: Lower bound, or None for unbounded
+    :ivar hi: Upper bound, or None for unbounded
+
+    """
+
+    lo: Any = None
+    hi: Any = None
+
+
+@dataclass(frozen=True)
+class PartitionPlan:
+    """
+    Files of a repository selected by partition predicates.
+
+    :ivar repo_id: Repository the files belong to
+    :ivar files: Matching paths, in listing order
+    :ivar total_bytes: Combined size of the files with a known size
+    :ivar unknown_sizes: Number of matching files without a known size
+    :ivar values: Matching partition values per filtered column
+
+    """
+
+    repo_id: str
+    files: tuple[str, ...]
+    total_bytes: int
+    unknown_sizes: int
+    values: dict[str, tuple[str, ...]]
+
+    def __len__(self) -> int:
+        """Number of matching files."""
+        return len(self.files)
+
+
+def plan_partitions(
+    listing: RepoListing,
+    filters: Mapping[str, Any] | None = None,
+    patterns: Sequence[str] | None = None,
+) -> PartitionPlan:
+    """
+    Select the files of a listing that satisfy partition predicates.
+
+    A file matches when, for every filtered column, its path has a ``column=value``
+    segment whose value satisfies the predicate. Files without the column do not match.
+
+    :param listing: Repository listing to select from
+    :param filters: Partition column -> value, collection of values or
+        :class:`PartitionRange`. No filters select every file.
+    :param patterns: Optional ``fnmatch`` patterns (e.g. a config's ``data_files``
+        paths); files must match at least one
+    :return: The selected files
+    :raises ValueError: If a filtered column is not a partition column of a non-empty
+        listing
+
+    """
+    filters = dict(filters or {})
+    mask = np.ones(len(listing), dtype=bool)
+    values: dict[str, tuple[str, ...]] = {}
+    if len(listing):
+        for column, predicate in filters.items():
+            if column not in listing.partition_columns:
+                raise ValueError(
+                    f"'{column}' is not a partition column of {listing.repo_id}; "
+                    f"available: {listing.partition_columns}"
+                )
+            candidates = listing.partition_values(column)
+            matched = [
+                code for code, raw in enumerate(candidates) if _matches(raw, predicate)
+            ]
+            values[column] = tuple(candidates[code] for code in matched)
+            mask &= np.isin(listing.partition_codes(column), matched)
+    else:
+        values = {column: () for column in filters}
+
+    indexes = np.flatnonzero(mask)
+    if patterns is not None:
+        indexes = np.array(
+            [
+                i
+                for i in indexes.tolist()
+                if any(fnmatch.fnmatchcase(listing.path(i), p) for p in patterns)
+            ],
+            dtype=np.int64,
+        )
+    sizes = listing.sizes[indexes]
+    return PartitionPlan(
+        repo_id=listing.repo_id,
+        files=tuple(listing.path(i) for i in indexes.tolist()),
+        total_bytes=int(sizes[sizes >= 0].sum()),
+        unknown_sizes=int((sizes < 0).sum()),
+        values=values,
+    )
+
+
+def _matches(raw: str, predicate: Any) -> bool:
+    """Return True if a partition value satisfies a predicate."""
+    if isinstance(predicate, PartitionRange):
+        like = predicate.lo if predicate.lo is not None else predicate.hi
+        value = _coerce(raw, like)
+        if value is None:
+            return False
+        try:
+            return (predicate.lo is None or value >= predicate.lo) and (
+                predicate.hi is None or value <= predicate.hi
+            )
+        except TypeError:
+            return False
+    if isinstance(predicate, (list, tuple, set, frozenset)):
+        return any(_matches(raw, p) for p in predicate)
+    return _coerce(raw, predicate) == predicate
+
+
+def _coerce(raw: str, like: Any) -> Any:
+    """
+    Parse a partition value to the type of a filter value.
+
+    :return: The parsed value, or None if it cannot be parsed
+
+    """
+    try:
+        if isinstance(like, bool):
+            return {"true": True, "false": False}.get(raw.lower())
+        if isinstance(like, Number):
+            return float(raw)
+        if isinstance(like, datetime):
+            return datetime.fromisoformat(raw)
+        if isinstance(like, date):
+            return date.fromisoformat(raw)
+    except ValueError:
+        return None
+    return raw
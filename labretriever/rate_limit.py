@@ -0,0 +1,326 @@
+"""
+Process-wide scheduler for HuggingFace Hub requests.
+
+The Hub rate-limits API calls per token and per IP address, and a rate-limited
+call fails with HTTP 429. Loading many DataCards at once, or running several
+VirtualDB workers, can send a burst large enough to hit that limit.
+:class:`RequestScheduler` paces all fetcher calls and downloads through one
+token bucket, so bursts become short delays instead of failures:
+
+- Up to ``burst`` requests start at once. After that, requests start at
+  ``rate`` per second.
+- Callers that cannot start yet wait in a queue. The queue is ordered by
+  :class:`Priority`, so dataset cards and metadata go before bulk data
+  downloads, and requests of the same priority keep their arrival order.
+- A 429 response pauses the whole queue for the ``Retry-After`` the Hub asks
+  for, then :meth:`RequestScheduler.call` retries the request.
+
+The fetchers use :func:`get_request_scheduler` unless given a scheduler. Its
+rate and burst come from :func:`~labretriever.constants.get_rate_limit` and
+:func:`~labretriever.constants.get_rate_limit_burst`. Install a differently
+configured scheduler with :func:`set_request_scheduler`::
+
+    set_request_scheduler(RequestScheduler(rate=1.0, burst=10, max_wait=120))
+
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import logging
+import random
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from enum import IntEnum
+from typing import TypeVar
+
+from labretriever.constants import get_rate_limit, get_rate_limit_burst
+from labretriever.errors import HfRateLimitError
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    """Request classes, served lowest value first."""
+
+    #: Dataset cards and their revision checks
+    CARD = 0
+    #: Repository info, file listings and size information
+    METADATA = 1
+    #: Data file downloads
+    BULK = 2
+
+
+@dataclass
+class SchedulerStats:
+    """
+    Counters of a scheduler.
+
+    :ivar requests: Requests started
+    :ivar delayed: Requests that had to wait for a slot
+    :ivar waited: Total seconds spent waiting for slots
+    :ivar rate_limited: 429 responses reported
+    :ivar queued: Requests waiting right now
+
+    """
+
+    requests: int = 0
+    delayed: int = 0
+    waited: float = 0.0
+    rate_limited: int = 0
+    queued: int = 0
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """
+    Parse a ``Retry-After`` header.
+
+    :param value: Header value: seconds, or an HTTP date
+    :return: Delay in seconds (never negative), or None if missing or invalid
+
+    """
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class RequestScheduler:
+    """Thread-safe token bucket with a priority queue of waiting requests."""
+
+    def __init__(
+        self,
+        rate: float | None = 3.0,
+        burst: int = 50,
+        max_wait: float | None = None,
+        max_retries: int = 5,
+        max_backoff: float = 60.0,
+    ):
+        """
+        Initialize the scheduler.
+
+        :param rate: Requests per second once the burst is used up, or None
+            to not limit the rate
+        :param burst: Requests that may start at once
+        :param max_wait: Longest a request waits for a slot before
+            :class:`~labretriever.errors.HfRateLimitError` is raised, or None
+            to wait as long as needed
+        :param max_retries: Retries of a request answered with HTTP 429
+        :param max_backoff: Longest pause after a 429, in seconds. A
+            ``Retry-After`` longer than this is not waited for.
+        :raises ValueError: If ``rate`` is not positive or ``burst`` is less
+            than 1
+
+        """
+        if rate is not None and rate <= 0:
+            raise ValueError(f"rate must be positive, got {rate}")
+        if burst < 1:
+            raise ValueError(f"burst must be at least 1, got {burst}")
+        self.rate = rate
+        self.burst = burst
+        self.max_wait = max_wait
+        self.max_retries = max_retries
+        self.max_backoff = max_backoff
+        self._tokens = float(burst)
+        self._refilled_at = time.monotonic()
+        self._paused_until = 0.0
+        # (priority, arrival) of the waiting requests
+        self._queue: list[tuple[int, int]] = []
+        self._arrivals = itertools.count()
+        self._stats = SchedulerStats()
+        self._cond = threading.Condition()
+
+    @classmethod
+    def unlimited(cls) -> RequestScheduler:
+        """
+        Return a scheduler that never delays requests.
+
+        429 responses still pause it and are still retried.
+
+        :return: A scheduler without a rate limit
+
+        """
+        return cls(rate=None)
+
+    def acquire(self, priority: Priority = Priority.METADATA) -> float:
+        """
+        Wait for a request slot.
+
+        :param priority: Class of the request
+        :return: Seconds waited
+        :raises HfRateLimitError: If no slot is free within ``max_wait``
+
+        """
+        start = time.monotonic()
+        deadline = None if self.max_wait is None else start + self.max_wait
+        with self._cond:
+            ticket = (int(priority), next(self._arrivals))
+            heapq.heappush(self._queue, ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    wait = self._wait_time(now) if self._queue[0] == ticket else None
+                    if wait == 0.0:
+                        break
+                    if deadline is not None:
+                        remaining = deadline - now
+                        if remaining <= 0 or (wait is not None and wait > remaining):
+                            raise HfRateLimitError(
+                                f"No request slot free within {self.max_wait:g}s "
+                                f"({len(self._queue)} requests queued)",
+                                status_code=429,
+                            )
+                        wait = remaining if wait is None else wait
+                    self._cond.wait(wait)
+            except BaseException:
+                self._queue.remove(ticket)
+                heapq.heapify(self._queue)
+                self._cond.notify_all()
+                raise
+            heapq.heappop(self._queue)
+            if self.rate is not None:
+                self._tokens -= 1
+            waited = time.monotonic() - start
+            self._stats.requests += 1
+            if waited > 0.001:
+                self._stats.delayed += 1
+                self._stats.waited += waited
+            # The next request in line may be able to start too
+            self._cond.notify_all()
+        return waited
+
+    def call(self, fetch: Callable[[], T], priority: Priority = Priority.METADATA) -> T:
+        """
+        Run a request in a slot, retrying it after 429 responses.
+
+        An exception counts as a 429 if its ``response`` attribute (as on ``requests``
+        and ``huggingface_hub`` HTTP errors) has that status.
+
+        :param fetch: Makes the request
+        :param priority: Class of the request
+        :return: What ``fetch`` returns
+        :raises HfRateLimitError: If no slot is free within ``max_wait``
+
+        """
+        attempt = 0
+        while True:
+            self.acquire(priority)
+            try:
+                return fetch()
+            except Exception as e:
+                response = getattr(e, "response", None)
+                if (
+                    response is None
+                    or getattr(response, "status_code", None) != 429
+                    or attempt >= self.max_retries
+                ):
+                    raise
+                delay = parse_retry_after(response.headers.get("Retry-After"))
+                if delay is None:
+                    delay = random.uniform(0, min(self.max_backoff, 2.0**attempt))
+                elif delay > self.max_backoff:
+                    raise
+                attempt += 1
+                logger.debug(
+                    f"Rate limited; retrying in {delay:.2f}s "
+                    f"(attempt {attempt}/{self.max_retries})"
+                )
+                self.report_rate_limited(delay)
+
+    def report_rate_limited(self, delay: float) -> None:
+        """
+        Pause all requests after a 429 response.
+
+        :param delay: Seconds to pause, e.g. from ``Retry-After``
+
+        """
+        with self._cond:
+            self._stats.rate_limited += 1
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+            self._tokens = min(self._tokens, 0.0)
+            self._cond.notify_all()
+
+    def stats(self) -> SchedulerStats:
+        """
+        Return a snapshot of the counters.
+
+        :return: The counters
+
+        """
+        with self._cond:
+            return SchedulerStats(**{**vars(self._stats), "queued": len(self._queue)})
+
+    def _refill(self, now: float) -> None:
+        """Add the tokens earned since the last refill; call with the lock held."""
+        if self.rate is not None:
+            earned = (now - self._refilled_at) * self.rate
+            self._tokens = min(float(self.burst), self._tokens + earned)
+        self._refilled_at = now
+
+    def _wait_time(self, now: float) -> float:
+        """Return seconds until the next request may start (0.0 if now)."""
+        wait = max(0.0, self._paused_until - now)
+        if self.rate is not None and self._tokens < 1:
+            wait = max(wait, (1 - self._tokens) / self.rate)
+        return wait
+
+
+_scheduler: RequestScheduler | None = None
+_scheduler_lock = threading.Lock()
+
+
+def get_request_scheduler() -> RequestScheduler:
+    """
+    Return the process-wide request scheduler.
+
+    It is created on first use from
+    :func:`~labretriever.constants.get_rate_limit` and
+    :func:`~labretriever.constants.get_rate_limit_burst`.
+
+    :return: The scheduler used by fetchers created without one
+
+    """
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = RequestScheduler(
+                rate=get_rate_limit(), burst=get_rate_limit_burst()
+            )
+        return _scheduler
+
+
+def set_request_scheduler(
+    scheduler: RequestScheduler | None,
+) -> RequestScheduler | None:
+    """
+    Replace the process-wide request scheduler.
+
+    Fetchers created afterwards use the new scheduler; existing ones keep
+    theirs.
+
+    :param scheduler: The new scheduler, or None to create one from the
+        environment on next use
+    :return: The previous scheduler, or None if none was created yet
+
+    """
+    global _scheduler
+    with _scheduler_lock:
+        previous, _scheduler = _scheduler, scheduler
+        return previous
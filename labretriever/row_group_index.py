@@ -0,0 +1,301 @@
+"""
+Row-group level indexes over Parquet files.
+
+Parquet footers record the min/max value of every column in every row group.
+:class:`RowGroupIndex` reads those footers (via DuckDB's ``parquet_metadata``,
+no data pages are read) for a chosen set of columns and keeps, per column, the
+row-group ranges sorted by their minimum. Point and range lookups then return
+only the ``(file, row_group)`` pairs whose range can contain the requested
+values, so callers can restrict scans to the files that matter. When the files
+carry Parquet bloom filters, :meth:`RowGroupIndex.probe` additionally drops row
+groups whose bloom filter excludes the value.
+
+Example::
+
+    conn = duckdb.connect()
+    index = RowGroupIndex.from_parquet(
+        conn, files, ["regulator_locus_tag", "target_locus_tag"]
+    )
+    refs = index.candidates("regulator_locus_tag", "YBR049C")
+    files_to_scan = index.candidate_files("regulator_locus_tag", "YBR049C")
+
+"""
+
+from __future__ import annotations
+
+import bisect
+import logging
+from dataclasses import dataclass
+from typing import Any
+
+import duckdb
+
+from labretriever.parquet_compaction import sql_file_list
+
+logger = logging.getLogger(__name__)
+
+_INTEGER_TYPES = {"INT32", "INT64", "INT96", "BOOLEAN"}
+_FLOAT_TYPES = {"FLOAT", "DOUBLE"}
+
+
+@dataclass(frozen=True)
+class RowGroupRef:
+    """
+    A single row group within a Parquet file.
+
+    :param file: Path of the Parquet file
+    :param row_group: Zero-based row group id within the file
+    :param num_rows: Number of rows in the row group
+
+    """
+
+    file: str
+    row_group: int
+    num_rows: int
+
+
+@dataclass(frozen=True)
+class _ColumnRange:
+    """Min/max statistics for one column in one row group."""
+
+    min: Any
+    max: Any
+    ref: RowGroupRef
+
+
+def _coerce(value: Any, physical_type: str | None) -> Any:
+    """
+    Convert a value to the Python type matching a Parquet physical type.
+
+    Parquet statistics are reported as strings by ``parquet_metadata``; lookup values
+    may be ints or strings. Both are converted so comparisons are numeric for numeric
+    columns and lexicographic otherwise.
+
+    :param value: Value to convert
+    :param physical_type: Parquet physical type (e.g. ``"INT64"``)
+    :return: Converted value, or the original value if conversion fails
+
+    """
+    if value is None:
+        return None
+    try:
+        if physical_type in _INTEGER_TYPES:
+            return int(float(value))
+        if physical_type in _FLOAT_TYPES:
+            return float(value)
+    except (TypeError, ValueError):
+        return value
+    return str(value)
+
+
+class RowGroupIndex:
+    """
+    Sorted per-column row-group ranges for a set of Parquet files.
+
+    :ivar files: Files covered by the index
+    :ivar columns: Indexed column names that were found in the files
+
+    """
+
+    def __init__(
+        self,
+        files: list[str],
+        ranges: dict[str, list[_ColumnRange]],
+        physical_types: dict[str, str],
+        row_groups: list[RowGroupRef] | None = None,
+    ):
+        """
+        Initialize the index from pre-collected ranges.
+
+        Use :meth:`from_parquet` to build an index from files.
+
+        :param files: Files covered by the index
+        :param ranges: Column name -> row-group ranges
+        :param physical_types: Column name -> Parquet physical type
+        :param row_groups: All row groups of ``files``, including those without
+            statistics for the indexed columns
+
+        """
+        self.files = list(files)
+        self._row_groups = sorted(
+            {r.ref for col_ranges in ranges.values() for r in col_ranges}
+            | set(row_groups or ()),
+            key=lambda ref: (ref.file, ref.row_group),
+        )
+        self._physical_types = dict(physical_types)
+        self._ranges: dict[str, list[_ColumnRange]] = {}
+        # Ranges without statistics can contain anything and are always
+        # candidates; the rest are sorted by min for bisection.
+        self._unbounded: dict[str, list[_ColumnRange]] = {}
+        self._mins: dict[str, list[Any]] = {}
+        for column, col_ranges in ranges.items():
+            bounded = [r for r in col_ranges if r.min is not None and r.max is not None]
+            try:
+                bounded.sort(key=lambda r: r.min)
+            except TypeError:
+                # Mixed types in the statistics -- treat everything as unbounded
+                self._unbounded[column] = list(col_ranges)
+                self._ranges[column] = []
+                self._mins[column] = []
+                continue
+            self._ranges[column] = bounded
+            self._mins[column] = [r.min for r in bounded]
+            self._unbounded[column] = [
+                r for r in col_ranges if r.min is None or r.max is None
+            ]
+
+    @property
+    def columns(self) -> list[str]:
+        """Indexed column names."""
+        return sorted(self._ranges)
+
+    @property
+    def row_groups(self) -> list[RowGroupRef]:
+        """Every row group of the indexed files, ordered by file and id."""
+        return list(self._row_groups)
+
+    @classmethod
+    def from_parquet(
+        cls,
+        conn: duckdb.DuckDBPyConnection,
+        files: list[str],
+        columns: list[str],
+    ) -> RowGroupIndex:
+        """
+        Build an index from the footers of Parquet files.
+
+        Columns that are not physically present in the files (for example hive partition
+        columns encoded in the path) are skipped.
+
+        :param conn: DuckDB connection used to read the footers
+        :param files: Parquet file paths
+        :param columns: Column names to index
+        :return: RowGroupIndex over ``files``
+
+        """
+        ranges: dict[str, list[_ColumnRange]] = {}
+        physical_types: dict[str, str] = {}
+        if not files:
+            return cls(files, ranges, physical_types)
+
+        file_list = sql_file_list(files)
+        wanted = set(columns)
+        rows = conn.execute(
+            "SELECT file_name, row_group_id, row_group_num_rows, path_in_schema, "
+            "type, stats_min_value, stats_max_value "
+            f"FROM parquet_metadata({file_list})"
+        ).fetchall()
+
+        row_groups: set[RowGroupRef] = set()
+        for file_name, rg_id, num_rows, column, ptype, vmin, vmax in rows:
+            ref = RowGroupRef(file=file_name, row_group=int(rg_id), num_rows=num_rows)
+            row_groups.add(ref)
+            if column not in wanted:
+                continue
+            physical_types[column] = ptype
+            ranges.setdefault(column, []).append(
+                _ColumnRange(
+                    min=_coerce(vmin, ptype),
+                    max=_coerce(vmax, ptype),
+                    ref=ref,
+                )
+            )
+
+        missing = set(columns) - set(ranges)
+        if missing:
+            logger.debug(
+                "Columns %s not found in parquet footers -- not indexed",
+                sorted(missing),
+            )
+        return cls(files, ranges, physical_types, list(row_groups))
+
+    def candidates_in_range(self, column: str, lo: Any, hi: Any) -> list[RowGroupRef]:
+        """
+        Return row groups whose ``column`` range overlaps ``[lo, hi]``.
+
+        :param column: Indexed column name
+        :param lo: Inclusive lower bound, or None for unbounded
+        :param hi: Inclusive upper bound, or None for unbounded
+        :return: Matching row groups, ordered by file and row group id
+        :raises KeyError: If ``column`` is not indexed
+
+        """
+        if column not in self._ranges:
+            raise KeyError(f"Column '{column}' is not indexed")
+        ptype = self._physical_types.get(column)
+        lo = _coerce(lo, ptype)
+        hi = _coerce(hi, ptype)
+
+        bounded = self._ranges[column]
+        try:
+            end = (
+                len(bounded)
+                if hi is None
+                else bisect.bisect_right(self._mins[column], hi)
+            )
+            matched = [r.ref for r in bounded[:end] if lo is None or r.max >= lo]
+        except TypeError:
+            # Bounds not comparable with the statistics -- cannot prune
+            matched = [r.ref for r in bounded]
+        matched += [r.ref for r in self._unbounded[column]]
+        return sorted(set(matched), key=lambda ref: (ref.file, ref.row_group))
+
+    def candidates(self, column: str, value: Any) -> list[RowGroupRef]:
+        """
+        Return row groups whose ``column`` range can contain ``value``.
+
+        :param column: Indexed column name
+        :param value: Value to look up
+        :return: Matching row groups, ordered by file and row group id
+        :raises KeyError: If ``column`` is not indexed
+
+        """
+        return self.candidates_in_range(column, value, value)
+
+    def candidate_files(self, column: str, value: Any) -> list[str]:
+        """
+        Return the files containing at least one candidate row group.
+
+        :param column: Indexed column name
+        :param value: Value to look up
+        :return: Sorted file paths
+        :raises KeyError: If ``column`` is not indexed
+
+        """
+        return sorted({ref.file for ref in self.candidates(column, value)})
+
+    def probe(
+        self, conn: duckdb.DuckDBPyConnection, column: str, value: Any
+    ) -> list[RowGroupRef]:
+        """
+        Return candidate row groups, refined by Parquet bloom filters.
+
+        Starts from the min/max candidates of :meth:`candidates` and drops row groups
+        whose bloom filter (when the file has one) proves ``value`` is absent.
+
+        :param conn: DuckDB connection used to read the bloom filters
+        :param column: Indexed column name
+        :param value: Value to look up
+        :return: Matching row groups, ordered by file and row group id
+        :raises KeyError: If ``column`` is not indexed
+
+        """
+        refs = self.candidates(column, value)
+        if not refs:
+            return refs
+        files = sorted({ref.file for ref in refs})
+        file_list = sql_file_list(files)
+        try:
+            excluded = {
+                (file_name, int(rg_id))
+                for file_name, rg_id, excludes in conn.execute(
+                    f"SELECT file_name, row_group_id, bloom_filter_excludes "
+                    f"FROM parquet_bloom_probe({file_list}, ?, ?)",
+                    [column, value],
+                ).fetchall()
+                if excludes
+            }
+        except duckdb.Error as exc:
+            logger.debug("Bloom filter probe failed for '%s': %s", column, exc)
+            return refs
+        return [ref for ref in refs if (ref.file, ref.row_group) not in excluded]
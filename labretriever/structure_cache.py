@@ -0,0 +1,308 @@
+"""
+Process-wide, on-disk cache of repository structures.
+
+:meth:`~labretriever.fetchers.HfRepoStructureFetcher.fetch` lists every file
+of a repository. Listings are keyed by repo_id and commit sha, shared by all
+fetchers (and therefore all DataCards) in a process, and persisted as JSON so
+a new process can reuse them.
+
+Cached structures are shared by every caller, so they are frozen: the dicts
+and lists are read-only :class:`~labretriever.interning.FrozenDict` and
+:class:`~labretriever.interning.FrozenList` instances and partition values are
+frozensets. Copy a structure (``copy.deepcopy``) to modify it.
+
+A cached structure is served without a network call for ``ttl`` seconds after
+it was fetched or last validated. After that, the fetcher asks the Hub for the
+repository's current sha and ``last_modified`` (a small request that does not
+list files) and only refetches the listing if the repository has changed.
+
+On disk the layout mirrors the dataset card cache::
+
+    <cache_dir>/datasets/<owner>--<name>/<sha>.json
+    <cache_dir>/datasets/<owner>--<name>/latest     # sha of the newest listing
+
+See :func:`~labretriever.constants.get_structure_cache_dir` and
+:func:`~labretriever.constants.get_structure_cache_ttl` to configure it.
+
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from labretriever.constants import get_structure_cache_dir, get_structure_cache_ttl
+from labretriever.interning import freeze
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CachedStructure:
+    """
+    A cached repository structure.
+
+    :ivar sha: Commit sha the structure was listed at, or None if unknown
+    :ivar structure: The read-only structure, as returned by
+        :meth:`~labretriever.fetchers.HfRepoStructureFetcher.fetch`
+    :ivar checked_at: When the structure was fetched or last validated
+        against the Hub (seconds since the epoch)
+
+    """
+
+    sha: str | None
+    structure: dict[str, Any]
+    checked_at: float
+
+
+def freeze_structure(structure: dict[str, Any]) -> dict[str, Any]:
+    """
+    Return a read-only copy of a repository structure.
+
+    :param structure: Structure as built by
+        :meth:`~labretriever.fetchers.HfRepoStructureFetcher.fetch`. Partition values
+        may be any iterable (sets, or the sorted lists stored on disk).
+    :return: The structure with frozen dicts and lists and frozenset partition values
+
+    """
+    partitions = {
+        column: frozenset(values)
+        for column, values in structure.get("partitions", {}).items()
+    }
+    return freeze({**structure, "partitions": partitions})
+
+
+class RepoStructureCache:
+    """
+    Repository structures cached in memory and, optionally, on disk.
+
+    Instances are thread-safe. Use :func:`get_structure_cache` for the process-wide
+    instance shared by the fetchers.
+
+    """
+
+    def __init__(self, cache_dir: Path | str | None = None, ttl: float | None = 300.0):
+        """
+        Initialize the cache.
+
+        :param cache_dir: Directory for persisted structures, or None to keep
+            them in memory only
+        :param ttl: Seconds a structure is served without revalidation, or
+            None to never revalidate
+
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.ttl = ttl
+        self._entries: dict[str, CachedStructure] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Number of repositories cached in memory."""
+        return len(self._entries)
+
+    def clear(self) -> None:
+        """Drop the in-memory entries; files on disk are kept."""
+        with self._lock:
+            self._entries.clear()
+
+    def is_fresh(self, entry: CachedStructure) -> bool:
+        """
+        Return True if an entry can be served without revalidation.
+
+        :param entry: Cached entry
+        :return: Whether the entry is younger than ``ttl``
+
+        """
+        return self.ttl is None or time.time() - entry.checked_at < self.ttl
+
+    def get(self, repo_id: str) -> CachedStructure | None:
+        """
+        Return the newest cached structure of a repository.
+
+        Falls back to the newest structure on disk, whose age is taken from the time it
+        was written.
+
+        :param repo_id: Repository identifier
+        :return: The entry, or None if the repository is not cached
+
+        """
+        with self._lock:
+            entry = self._entries.get(repo_id)
+        if entry is not None or self.cache_dir is None:
+            return entry
+
+        latest = self._repo_dir(repo_id) / "latest"
+        try:
+            sha = latest.read_text().strip() or None
+            checked_at = latest.stat().st_mtime
+        except OSError:
+            return None
+        if sha is None:
+            return None
+        structure = self._read(repo_id, sha)
+        if structure is None:
+            return None
+        entry = CachedStructure(sha, structure, checked_at)
+        with self._lock:
+            return self._entries.setdefault(repo_id, entry)
+
+    def get_revision(
+        self, repo_id: str, sha: str, promote: bool = True
+    ) -> CachedStructure | None:
+        """
+        Return the structure of a repository at a given sha.
+
+        :param repo_id: Repository identifier
+        :param sha: Commit sha
+        :param promote: If True, a hit becomes the repository's newest entry and counts
+            as validated. Use False to read a pinned revision.
+        :return: The entry, or None if that sha is not cached
+
+        """
+        with self._lock:
+            entry = self._entries.get(repo_id)
+        if entry is not None and entry.sha == sha:
+            if promote:
+                self.touch(repo_id)
+            return entry
+        if self.cache_dir is None:
+            return None
+        structure = self._read(repo_id, sha)
+        if structure is None:
+            return None
+        if not promote:
+            return CachedStructure(sha, structure, time.time())
+        return self.put(repo_id, sha, structure, persist=False)
+
+    def put(
+        self,
+        repo_id: str,
+        sha: str | None,
+        structure: dict[str, Any],
+        persist: bool = True,
+        latest: bool = True,
+    ) -> CachedStructure:
+        """
+        Store a freshly fetched structure as the repository's newest entry.
+
+        :param repo_id: Repository identifier
+        :param sha: Commit sha the structure was listed at, if known. Structures without
+            a sha are kept in memory only.
+        :param structure: The structure
+        :param persist: Whether to write the structure to disk
+        :param latest: If False, only persist the structure under its sha (e.g. one
+            listed at a pinned revision) and keep the newest entry
+        :return: The new entry, holding a frozen copy of ``structure``
+
+        """
+        entry = CachedStructure(sha, freeze_structure(structure), time.time())
+        if not latest:
+            if persist and sha is not None and self.cache_dir is not None:
+                self._write(repo_id, sha, structure, latest=False)
+            return entry
+        with self._lock:
+            self._entries[repo_id] = entry
+        if persist and sha is not None and self.cache_dir is not None:
+            self._write(repo_id, sha, structure)
+        elif sha is not None and self.cache_dir is not None:
+            self._mark_latest(repo_id, sha)
+        return entry
+
+    def touch(self, repo_id: str) -> None:
+        """
+        Mark a repository's newest entry as validated now.
+
+        :param repo_id: Repository identifier
+
+        """
+        with self._lock:
+            entry = self._entries.get(repo_id)
+            if entry is not None:
+                entry.checked_at = time.time()
+        if entry is not None and entry.sha is not None and self.cache_dir is not None:
+            self._mark_latest(repo_id, entry.sha)
+
+    def _repo_dir(self, repo_id: str) -> Path:
+        """Return the cache directory for one repository."""
+        assert self.cache_dir is not None
+        return self.cache_dir / "datasets" / repo_id.replace("/", "--")
+
+    def _read(self, repo_id: str, sha: str) -> dict[str, Any] | None:
+        """Return the structure stored for a sha, or None if not stored."""
+        path = self._repo_dir(repo_id) / f"{sha}.json"
+        try:
+            with open(path) as f:
+                structure = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return freeze_structure(structure)
+
+    def _write(
+        self, repo_id: str, sha: str, structure: dict[str, Any], latest: bool = True
+    ) -> None:
+        """Store a structure for a sha and, optionally, mark it as the latest."""
+        data = dict(structure)
+        data["partitions"] = {
+            column: sorted(values)
+            for column, values in structure.get("partitions", {}).items()
+        }
+        files: tuple[tuple[str, str], ...] = (
+            (f"{sha}.json", json.dumps(data, default=str)),
+        )
+        if latest:
+            files += (("latest", sha),)
+        self._write_files(repo_id, files)
+
+    def _mark_latest(self, repo_id: str, sha: str) -> None:
+        """Point ``latest`` at a sha, which also records the validation time."""
+        self._write_files(repo_id, (("latest", sha),))
+
+    def _write_files(self, repo_id: str, files: tuple[tuple[str, str], ...]) -> None:
+        """
+        Write files into a repository's cache directory.
+
+        Files are written to a temporary name and renamed into place so concurrent
+        readers never see a partial file. Failures are logged and otherwise ignored.
+
+        """
+        repo_dir = self._repo_dir(repo_id)
+        try:
+            repo_dir.mkdir(parents=True, exist_ok=True)
+            for name, content in files:
+                fd, tmp = tempfile.mkstemp(dir=repo_dir, prefix=f".{name}.")
+                with os.fdopen(fd, "w") as f:
+                    f.write(content)
+                os.replace(tmp, repo_dir / name)
+        except OSError as e:
+            logger.warning(f"Could not cache repo structure for {repo_id}: {e}")
+
+
+_caches: dict[Path | None, RepoStructureCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_structure_cache() -> RepoStructureCache:
+    """
+    Return the process-wide structure cache.
+
+    One instance is kept per configured cache directory, so changing
+    ``LABRETRIEVER_STRUCTURE_CACHE_DIR`` at runtime switches to a separate cache.
+
+    :return: The shared cache
+
+    """
+    cache_dir = get_structure_cache_dir()
+    with _caches_lock:
+        cache = _caches.get(cache_dir)
+        if cache is None:
+            cache = _caches[cache_dir] = RepoStructureCache(
+                cache_dir, ttl=get_structure_cache_ttl()
+            )
+        return cache
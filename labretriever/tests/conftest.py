@@ -4,6 +4,38 @@ from unittest.mock import patch
 
 import pytest
 
+from labretriever.fetch_cache import FetchCache, set_fetch_cache
+from labretriever.rate_limit import RequestScheduler, set_request_scheduler
+from labretriever.structure_cache import get_structure_cache
+
+
+@pytest.fixture(autouse=True)
+def _disable_card_cache(monkeypatch):
+    """
+    Keep tests off persistent caches and the rate limit.
+
+    Each test gets an empty fetch cache and an unlimited request scheduler.
+
+    """
+    monkeypatch.setenv("LABRETRIEVER_CARD_CACHE_DIR", "off")
+    monkeypatch.setenv("LABRETRIEVER_STRUCTURE_CACHE_DIR", "off")
+    cache = get_structure_cache()
+    cache.clear()
+    previous = set_fetch_cache(FetchCache())
+    previous_scheduler = set_request_scheduler(RequestScheduler.unlimited())
+    yield
+    set_fetch_cache(previous)
+    set_request_scheduler(previous_scheduler)
+    cache.clear()
+
+
+@pytest.fixture
+def no_fetch_cache():
+    """Install a fetch cache that stores nothing, to exercise the layers below."""
+    previous = set_fetch_cache(FetchCache.disabled())
+    yield
+    set_fetch_cache(previous)
+
 
 @pytest.fixture
 def mock_cache_info():
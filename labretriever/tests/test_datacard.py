@@ -1,5 +1,9 @@
 """Tests for the DataCard class."""
 
+import copy
+import threading
+import time
+from dataclasses import FrozenInstanceError
 from unittest.mock import Mock, patch
 
 import pytest
@@ -7,7 +11,8 @@ import pytest
 from labretriever import DataCard
 from labretriever.datacard import DatasetSchema
 from labretriever.errors import DataCardError, DataCardValidationError, HfDataFetchError
-from labretriever.models import DatasetType
+from labretriever.interning import DefinitionInterner
+from labretriever.models import DatasetType, LazyConfigList
 
 
 def _external_metadata_card_data():
@@ -103,9 +108,9 @@ class TestDataCard:
         assert datacard._metadata_fields_map == {}
 
         # Check that fetchers were initialized
-        mock_card_fetcher.assert_called_once_with(token=test_token)
-        mock_structure_fetcher.assert_called_once_with(token=test_token)
-        mock_size_fetcher.assert_called_once_with(token=test_token)
+        mock_card_fetcher.assert_called_once_with(token=test_token, offline=None)
+        mock_structure_fetcher.assert_called_once_with(token=test_token, offline=None)
+        mock_size_fetcher.assert_called_once_with(token=test_token, offline=None)
 
     @patch("labretriever.datacard.HfDataCardFetcher")
     @patch("labretriever.datacard.HfRepoStructureFetcher")
@@ -120,9 +125,9 @@ class TestDataCard:
         assert datacard.token is None
 
         # Check that fetchers were initialized without token
-        mock_card_fetcher.assert_called_once_with(token=None)
-        mock_structure_fetcher.assert_called_once_with(token=None)
-        mock_size_fetcher.assert_called_once_with(token=None)
+        mock_card_fetcher.assert_called_once_with(token=None, offline=None)
+        mock_structure_fetcher.assert_called_once_with(token=None, offline=None)
+        mock_size_fetcher.assert_called_once_with(token=None, offline=None)
 
     @patch("labretriever.datacard.HfDataCardFetcher")
     @patch("labretriever.datacard.HfRepoStructureFetcher")
@@ -149,7 +154,9 @@ class TestDataCard:
         assert card is not None
         assert len(card.configs) == 4
         assert card.pretty_name == "Test Genomics Dataset"
-        mock_fetcher_instance.fetch.assert_called_once_with(test_repo_id)
+        mock_fetcher_instance.fetch.assert_called_once_with(
+            test_repo_id, force_refresh=False, revision=None
+        )
 
     @patch("labretriever.datacard.HfDataCardFetcher")
     @patch("labretriever.datacard.HfRepoStructureFetcher")
@@ -206,6 +213,121 @@ class TestDataCard:
         with pytest.raises(DataCardError, match="Failed to fetch dataset card"):
             _ = datacard.dataset_card
 
+    @patch("labretriever.datacard.HfDataCardFetcher")
+    @patch("labretriever.datacard.HfRepoStructureFetcher")
+    @patch("labretriever.datacard.HfSizeInfoFetcher")
+    def test_get_feature(
+        self,
+        mock_size_fetcher,
+        mock_structure_fetcher,
+        mock_card_fetcher,
+        test_repo_id,
+        sample_dataset_card_data,
+    ):
+        """Features are looked up by config and name."""
+        mock_card_fetcher.return_value.fetch.return_value = sample_dataset_card_data
+        datacard = DataCard(test_repo_id)
+
+        feature = datacard.get_feature("binding_data", "regulator_symbol")
+        assert feature is not None
+        assert feature.name == "regulator_symbol"
+        assert datacard.get_feature("binding_data", "missing") is None
+        with pytest.raises(DataCardError, match="not found"):
+            datacard.get_feature("missing", "regulator_symbol")
+
+    @patch("labretriever.datacard.HfDataCardFetcher")
+    @patch("labretriever.datacard.HfRepoStructureFetcher")
+    @patch("labretriever.datacard.HfSizeInfoFetcher")
+    def test_lazy_card(
+        self,
+        mock_size_fetcher,
+        mock_structure_fetcher,
+        mock_card_fetcher,
+        test_repo_id,
+        sample_dataset_card_data,
+    ):
+        """Lazy mode validates configs as they are used."""
+        mock_card_fetcher.return_value.fetch.return_value = sample_dataset_card_data
+
+        datacard = DataCard(test_repo_id, lazy=True)
+
+        configs = datacard.dataset_card.configs
+        assert isinstance(configs, LazyConfigList)
+        assert configs.num_validated == 0
+        assert datacard.get_metadata_fields("binding_data") == [
+            "regulator_symbol",
+            "experimental_condition",
+        ]
+        assert datacard.get_metadata_fields("genome_map_data") is None
+        assert datacard.get_metadata_fields("experiment_metadata") is None
+        # binding_data, genome_map_data and the metadata config
+        assert configs.num_validated == 3
+
+    @patch("labretriever.datacard.HfDataCardFetcher")
+    @patch("labretriever.datacard.HfRepoStructureFetcher")
+    @patch("labretriever.datacard.HfSizeInfoFetcher")
+    def test_lazy_card_invalid_config(
+        self,
+        mock_size_fetcher,
+        mock_structure_fetcher,
+        mock_card_fetcher,
+        test_repo_id,
+        sample_dataset_card_data,
+    ):
+        """An invalid config only fails when it is used."""
+        sample_dataset_card_data["configs"][2]["dataset_info"] = {"features": "x"}
+        mock_card_fetcher.return_value.fetch.return_value = sample_dataset_card_data
+
+        datacard = DataCard(test_repo_id, lazy=True)
+
+        assert datacard.get_features("binding_data")
+        with pytest.raises(DataCardValidationError, match="genome_map_data"):
+            datacard.get_features("genome_map_data")
+        with pytest.raises(DataCardValidationError):
+            datacard.get_metadata_relationships()
+        with pytest.raises(DataCardValidationError):
+            datacard.info()
+
+    @patch("labretriever.datacard.HfDataCardFetcher")
+    @patch("labretriever.datacard.HfRepoStructureFetcher")
+    @patch("labretriever.datacard.HfSizeInfoFetcher")
+    def test_intern_definitions(
+        self,
+        mock_size_fetcher,
+        mock_structure_fetcher,
+        mock_card_fetcher,
+        harbison_2004_datacard,
+        monkeypatch,
+    ):
+        """Interned cards share equal definitions and report the savings."""
+        monkeypatch.setattr(
+            "labretriever.datacard.DEFAULT_INTERNER", DefinitionInterner()
+        )
+        mock_card_fetcher.return_value.fetch.side_effect = lambda repo_id, **kwargs: (
+            copy.deepcopy(harbison_2004_datacard)
+        )
+        plain = DataCard("test/plain")
+        first = DataCard("test/first", intern_definitions=True)
+        second = DataCard("test/second", intern_definitions=True, lazy=True)
+
+        defs = first.get_field_definitions("harbison_2004", "condition")
+        assert defs == plain.get_field_definitions("harbison_2004", "condition")
+        assert all(
+            value is defs[key]
+            for key, value in second.get_field_definitions(
+                "harbison_2004", "condition"
+            ).items()
+        )
+        with pytest.raises(TypeError, match="read-only"):
+            defs["YPD"]["temperature_celsius"] = 37
+
+        report = second.memory_report()
+        assert report.nodes > 0
+        assert report.shared_nodes == report.nodes
+        assert first.memory_report().unique_bytes > 0
+        # Without interning the report covers repetition within the card
+        assert plain.memory_report().nodes == report.nodes
+
     @patch("labretriever.datacard.HfDataCardFetcher")
     @patch("labretriever.datacard.HfRepoStructureFetcher")
     @patch("labretriever.datacard.HfSizeInfoFetcher")
@@ -457,7 +579,7 @@ class TestDataCard:
         values = datacard._extract_partition_values(config, "regulator")
         assert values == {"TF1", "TF2", "TF3"}
         mock_structure_fetcher_instance.get_partition_values.assert_called_once_with(
-            test_repo_id, "regulator"
+            test_repo_id, "regulator", revision=None
         )
 
     @patch("labretriever.datacard.HfDataCardFetcher")
@@ -1109,3 +1231,214 @@ class TestGetCitation:
             DataCardError, match="Configuration 'nonexistent' not found"
         ):
             datacard.get_citation("nonexistent")
+
+
+class TestMemoizedResults:
+    """Tests for memoized, read-only schema results."""
+
+    @patch("labretriever.datacard.HfDataCardFetcher")
+    @patch("labretriever.datacard.HfRepoStructureFetcher")
+    @patch("labretriever.datacard.HfSizeInfoFetcher")
+    def test_results_computed_once(
+        self,
+        mock_size_fetcher,
+        mock_structure_fetcher,
+        mock_card_fetcher,
+        test_repo_id,
+        sample_dataset_card_data,
+    ):
+        """Repeated calls return the same read-only object."""
+        mock_card_fetcher.return_value.fetch.return_value = sample_dataset_card_data
+        datacard = DataCard(test_repo_id)
+
+        schema = datacard.extract_metadata_schema("binding_data")
+        assert datacard.extract_metadata_schema("binding_data") is schema
+        assert datacard.get_dataset_schema("binding_data") is (
+            datacard.get_dataset_schema("binding_data")
+        )
+        conditions = datacard.get_experimental_conditions("binding_data")
+        assert datacard.get_experimental_conditions("binding_data") is conditions
+
+        with pytest.raises(TypeError, match="read-only"):
+            schema["regulator_fields"].append("x")
+        with pytest.raises(TypeError, match="read-only"):
+            conditions["temperature_celsius"] = 37
+        fields = datacard.get_metadata_fields("binding_data")
+        assert fields is not None
+        with pytest.raises(TypeError, match="read-only"):
+            fields.append("x")
+        dataset_schema = datacard.get_dataset_schema("binding_data")
+        assert dataset_schema is not None
+        with pytest.raises(FrozenInstanceError):
+            dataset_schema.metadata_source = "none"  # type: ignore[misc]
+
+        # Copies are ordinary, mutable containers
+        copied = copy.deepcopy(schema)
+        copied["regulator_fields"].append("x")
+        assert "x" not in schema["regulator_fields"]
+
+    @patch("labretriever.datacard.HfDataCardFetcher")
+    @patch("labretriever.datacard.HfRepoStructureFetcher")
+    @patch("labretriever.datacard.HfSizeInfoFetcher")
+    def test_refresh_invalidates(
+        self,
+        mock_size_fetcher,
+        mock_structure_fetcher,
+        mock_card_fetcher,
+        test_repo_id,
+        sample_dataset_card_data,
+    ):
+        """refresh_cache=True reloads the card and recomputes results."""
+        mock_fetcher = mock_card_fetcher.return_value
+        mock_fetcher.fetch.return_value = sample_dataset_card_data
+        datacard = DataCard(test_repo_id)
+        before = datacard.get_dataset_schema("binding_data")
+
+        updated = copy.deepcopy(sample_dataset_card_data)
+        updated["configs"][1]["metadata_fields"] = ["regulator_symbol"]
+        mock_fetcher.fetch.return_value = updated
+        datacard.get_metadata_relationships(refresh_cache=True)
+
+        after = datacard.get_dataset_schema("binding_data")
+        assert after is not None and after is not before
+        assert after.metadata_columns == {"regulator_symbol"}
+        assert datacard.get_metadata_fields("binding_data") == ["regulator_symbol"]
+
+    @patch("labretriever.fetchers.DatasetCard")
+    def test_refresh_bypasses_fetch_cache(
+        self, mock_dataset_card, test_repo_id, sample_dataset_card_data
+    ):
+        """refresh_cache=True downloads the card even if another card cached it."""
+        mock_dataset_card.load.return_value.data.to_dict.return_value = (
+            sample_dataset_card_data
+        )
+        DataCard(test_repo_id).get_metadata_relationships()
+        datacard = DataCard(test_repo_id)
+        datacard.get_metadata_relationships()
+        assert mock_dataset_card.load.call_count == 1
+
+        updated = copy.deepcopy(sample_dataset_card_data)
+        updated["configs"][1]["metadata_fields"] = ["regulator_symbol"]
+        mock_dataset_card.load.return_value.data.to_dict.return_value = updated
+        datacard.get_metadata_relationships(refresh_cache=True)
+
+        assert mock_dataset_card.load.call_count == 2
+        assert datacard.get_metadata_fields("binding_data") == ["regulator_symbol"]
+
+
+@patch("labretriever.datacard.HfDataCardFetcher")
+@patch("labretriever.datacard.HfRepoStructureFetcher")
+@patch("labretriever.datacard.HfSizeInfoFetcher")
+class TestLoadMany:
+    """Tests for concurrent loading with DataCard.load_many."""
+
+    def test_results_and_errors(
+        self,
+        mock_size_fetcher,
+        mock_structure_fetcher,
+        mock_card_fetcher,
+        sample_dataset_card_data,
+        invalid_dataset_card_data,
+    ):
+        """Loaded cards and per-repo errors are returned in input order."""
+        cards_by_repo = {
+            "test/b": sample_dataset_card_data,
+            "test/invalid": invalid_dataset_card_data,
+            "test/a": sample_dataset_card_data,
+        }
+
+        def fetch(repo_id, **kwargs):
+            if repo_id == "test/missing":
+                raise HfDataFetchError("404")
+            return cards_by_repo[repo_id]
+
+        mock_card_fetcher.return_value.fetch.side_effect = fetch
+
+        cards, errors = DataCard.load_many(
+            ["test/b", "test/missing", "test/invalid", "test/a", "test/b"],
+            max_workers=2,
+            lazy=True,
+        )
+
+        assert list(cards) == ["test/b", "test/a"]
+        assert all(card._dataset_card is not None for card in cards.values())
+        assert cards["test/a"].lazy
+        assert list(errors) == ["test/missing", "test/invalid"]
+        assert isinstance(errors["test/missing"], DataCardError)
+        assert isinstance(errors["test/invalid"], DataCardValidationError)
+
+    def test_fetches_concurrently(
+        self,
+        mock_size_fetcher,
+        mock_structure_fetcher,
+        mock_card_fetcher,
+        sample_dataset_card_data,
+    ):
+        """At most max_workers fetches are in flight at once."""
+        lock = threading.Lock()
+        in_flight = 0
+        peak = 0
+
+        def fetch(repo_id, **kwargs):
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            time.sleep(0.05)
+            with lock:
+                in_flight -= 1
+            return sample_dataset_card_data
+
+        mock_card_fetcher.return_value.fetch.side_effect = fetch
+
+        cards, errors = DataCard.load_many(
+            [f"test/repo_{i}" for i in range(8)], max_workers=4
+        )
+
+        assert len(cards) == 8
+        assert errors == {}
+        assert peak == 4
+
+    def test_include_structure(
+        self,
+        mock_size_fetcher,
+        mock_structure_fetcher,
+        mock_card_fetcher,
+        sample_dataset_card_data,
+    ):
+        """Repo structure is prefetched; its failures do not fail the card."""
+        mock_card_fetcher.return_value.fetch.return_value = sample_dataset_card_data
+        mock_structure_fetcher.return_value.fetch.side_effect = HfDataFetchError("boom")
+
+        cards, errors = DataCard.load_many(["test/a"], include_structure=True)
+
+        assert list(cards) == ["test/a"]
+        assert errors == {}
+        mock_structure_fetcher.return_value.fetch.assert_called_once_with(
+            "test/a", revision=None
+        )
+
+    def test_factory(
+        self, mock_size_fetcher, mock_structure_fetcher, mock_card_fetcher
+    ):
+        """A factory supplies the cards; its errors are reported per repo."""
+        card = Mock()
+
+        def factory(repo_id):
+            if repo_id == "test/bad":
+                raise RuntimeError("no card")
+            return card
+
+        cards, errors = DataCard.load_many(["test/a", "test/bad"], factory=factory)
+
+        assert cards == {"test/a": card}
+        assert isinstance(errors["test/bad"], RuntimeError)
+        mock_card_fetcher.assert_not_called()
+
+    def test_invalid_max_workers(
+        self, mock_size_fetcher, mock_structure_fetcher, mock_card_fetcher
+    ):
+        """max_workers must be positive."""
+        with pytest.raises(ValueError, match="max_workers"):
+            DataCard.load_many(["test/a"], max_workers=0)
+        assert DataCard.load_many([]) == ({}, {})
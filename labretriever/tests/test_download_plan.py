@@ -0,0 +1,300 @@
+"""Tests for the VirtualDB download planner."""
+
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+from labretriever.download_plan import plan_downloads
+from labretriever.errors import HfDataFetchError
+
+
+def _card_data():
+    """Two data configs sharing one external metadata config."""
+
+    def features(*names):
+        return {
+            "features": [
+                {"name": n, "dtype": "string", "description": n} for n in names
+            ]
+        }
+
+    return {
+        "configs": [
+            {
+                "config_name": "cov_a",
+                "description": "cov_a",
+                "dataset_type": "genome_map",
+                "data_files": [{"split": "train", "path": "a.parquet"}],
+                "dataset_info": features("sample_id", "chr"),
+            },
+            {
+                "config_name": "cov_b",
+                "description": "cov_b",
+                "dataset_type": "genome_map",
+                "data_files": [{"split": "train", "path": "b/*.parquet"}],
+                "dataset_info": features("sample_id", "chr"),
+            },
+            {
+                "config_name": "sample_metadata",
+                "description": "sample_metadata",
+                "dataset_type": "metadata",
+                "applies_to": ["cov_a", "cov_b"],
+                "data_files": [{"split": "train", "path": "metadata.parquet"}],
+                "dataset_info": features("sample_id", "batch"),
+            },
+        ]
+    }
+
+
+def _size_info(**configs):
+    return {
+        "size": {
+            "configs": [
+                {"config": name, "num_bytes_original_files": size}
+                for name, size in configs.items()
+            ]
+        }
+    }
+
+
+@pytest.fixture
+def hub_cache(tmp_path):
+    """HF hub cache holding part of test/cov's files."""
+    repo_dir = tmp_path / "hub" / "datasets--test--cov"
+    (repo_dir / "refs").mkdir(parents=True)
+    (repo_dir / "refs" / "main").write_text("abc123")
+    snapshot = repo_dir / "snapshots" / "abc123"
+    (snapshot / "b").mkdir(parents=True)
+    (snapshot / "a.parquet").write_bytes(b"x" * 1000)
+    (snapshot / "b" / "1.parquet").write_bytes(b"x" * 500)
+    (snapshot / "b" / "2.parquet").write_bytes(b"x" * 500)
+    (snapshot / "metadata.parquet").write_bytes(b"x" * 300)
+    return tmp_path / "hub"
+
+
+@pytest.fixture
+def vdb_config(write_config):
+    return write_config(
+        {
+            "repositories": {
+                "test/cov": {
+                    "dataset": {
+                        "cov_a": {"db_name": "coverage_a"},
+                        "cov_b": {},
+                    }
+                },
+                "test/missing": {"dataset": {"data": {}}},
+            }
+        }
+    )
+
+
+@patch("labretriever.download_plan.HfSizeInfoFetcher")
+@patch("labretriever.datacard.HfDataCardFetcher")
+@patch("labretriever.datacard.HfRepoStructureFetcher")
+@patch("labretriever.datacard.HfSizeInfoFetcher")
+class TestPlanDownloads:
+    """Tests for plan_downloads."""
+
+    @pytest.fixture(autouse=True)
+    def _cards(self):
+        # repo_id, or (repo_id, revision) for cards that differ at a revision
+        self.cards: dict[Any, dict[str, Any]] = {"test/cov": _card_data()}
+
+    def _setup(self, card_fetcher, plan_size_fetcher, sizes, size_errors=None):
+        def fetch(repo_id, revision=None, **kwargs):
+            if (repo_id, revision) in self.cards:
+                return self.cards[(repo_id, revision)]
+            if repo_id not in self.cards:
+                raise HfDataFetchError(f"{repo_id} not found")
+            return self.cards[repo_id]
+
+        card_fetcher.return_value.fetch.side_effect = fetch
+        plan_size_fetcher.return_value.fetch_many.return_value = (
+            sizes,
+            size_errors or {},
+        )
+
+    def test_plan(
+        self,
+        mock_size_fetcher,
+        mock_structure_fetcher,
+        mock_card_fetcher,
+        mock_plan_size_fetcher,
+        vdb_config,
+        hub_cache,
+    ):
+        """Sizes are reported per db_name and totals count configs once."""
+        self._setup(
+            mock_card_fetcher,
+            mock_plan_size_fetcher,
+            {"test/cov": _size_info(cov_a=5000, cov_b=2000, sample_metadata=300)},
+        )
+
+        plan = plan_downloads(vdb_config, bandwidth=1000, cache_dir=hub_cache)
+
+        by_name = {e.db_name: e for e in plan.estimates}
+        assert list(by_name) == ["coverage_a", "cov_b", "data"]
+        cov_a = by_name["coverage_a"]
+        assert cov_a.config_names == ("cov_a", "sample_metadata")
+        assert (cov_a.total_bytes, cov_a.cached_bytes) == (5300, 1300)
+        assert cov_a.missing_bytes == 4000
+        cov_b = by_name["cov_b"]
+        assert (cov_b.total_bytes, cov_b.cached_bytes) == (2300, 1300)
+        assert by_name["data"].total_bytes is None
+        assert "not found" in str(by_name["data"].error)
+        assert plan.unknown == ["data"]
+
+        # sample_metadata is counted once
+        assert plan.total_bytes == 7300
+        assert plan.cached_bytes == 2300
+        assert plan.missing_bytes == 5000
+        assert plan.estimated_seconds == 5.0
+
+        frame = plan.to_frame()
+        assert list(frame["db_name"]) == ["coverage_a", "cov_b", "data"]
+        assert frame.loc[0, "estimated_seconds"] == 4.0
+        assert "Total: 7.1KB, 2.2KB cached, 4.9KB to download" in plan.summary()
+
+    def test_nothing_cached(
+        self,
+        mock_size_fetcher,
+        mock_structure_fetcher,
+        mock_card_fetcher,
+        mock_plan_size_fetcher,
+        vdb_config,
+        tmp_path,
+    ):
+        """Without a cached snapshot everything is missing."""
+        self._setup(
+            mock_card_fetcher,
+            mock_plan_size_fetcher,
+            {"test/cov": _size_info(cov_a=5000, cov_b=2000, sample_metadata=300)},
+        )
+
+        plan = plan_downloads(vdb_config, cache_dir=tmp_path / "empty")
+
+        assert plan.cached_bytes == 0
+        assert plan.missing_bytes == plan.total_bytes == 7300
+
+    def test_size_unknown(
+        self,
+        mock_size_fetcher,
+        mock_structure_fetcher,
+        mock_card_fetcher,
+        mock_plan_size_fetcher,
+        vdb_config,
+        hub_cache,
+    ):
+        """Missing size information leaves the total unknown."""
+        self._setup(
+            mock_card_fetcher,
+            mock_plan_size_fetcher,
+            {"test/cov": _size_info(cov_a=5000)},
+        )
+
+        plan = plan_downloads(vdb_config, cache_dir=hub_cache)
+
+        by_name = {e.db_name: e for e in plan.estimates}
+        assert by_name["coverage_a"].total_bytes is None
+        assert by_name["coverage_a"].cached_bytes == 1300
+        assert "sample_metadata" in str(by_name["coverage_a"].error)
+        assert by_name["cov_b"].missing_bytes is None
+        assert plan.total_bytes == 5000
+        assert plan.missing_bytes == 4000
+
+    def test_pinned_revisions(
+        self,
+        mock_size_fetcher,
+        mock_structure_fetcher,
+        mock_card_fetcher,
+        mock_plan_size_fetcher,
+        write_config,
+        hub_cache,
+    ):
+        """Cached sizes are read from the snapshot of the configured revision."""
+        repo_dir = hub_cache / "datasets--test--cov"
+        (repo_dir / "refs" / "v1").write_text("def456")
+        (repo_dir / "snapshots" / "def456").mkdir()
+        (repo_dir / "snapshots" / "def456" / "a.parquet").write_bytes(b"x" * 10)
+        (repo_dir / "snapshots" / "def456" / "metadata.parquet").write_bytes(b"x" * 5)
+        config = write_config(
+            {
+                "repositories": {
+                    "test/cov": {
+                        "revision": "v1",
+                        "dataset": {
+                            "cov_a": {},
+                            "cov_b": {"revision": "abc123" + "0" * 34},
+                        },
+                    }
+                }
+            }
+        )
+        self._setup(
+            mock_card_fetcher,
+            mock_plan_size_fetcher,
+            {"test/cov": _size_info(cov_a=5000, cov_b=2000, sample_metadata=300)},
+        )
+
+        plan = plan_downloads(config, cache_dir=hub_cache)
+
+        by_name = {e.db_name: e for e in plan.estimates}
+        # cov_a and sample_metadata are read at the repository's tag
+        assert by_name["cov_a"].cached_bytes == 15
+        # cov_b is pinned to a commit that is not cached; only its metadata is
+        assert by_name["cov_b"].cached_bytes == 5
+
+    def test_card_read_at_revision(
+        self,
+        mock_size_fetcher,
+        mock_structure_fetcher,
+        mock_card_fetcher,
+        mock_plan_size_fetcher,
+        write_config,
+        hub_cache,
+    ):
+        """File patterns come from the card at the configured revision."""
+        repo_dir = hub_cache / "datasets--test--cov"
+        (repo_dir / "refs" / "v1").write_text("def456")
+        snapshot = repo_dir / "snapshots" / "def456"
+        (snapshot / "v1").mkdir(parents=True)
+        (snapshot / "a.parquet").write_bytes(b"x" * 10)
+        (snapshot / "v1" / "a.parquet").write_bytes(b"x" * 40)
+        (snapshot / "metadata.parquet").write_bytes(b"x" * 5)
+        pinned = "v1"
+        card = _card_data()
+        card["configs"][0]["data_files"] = [{"split": "train", "path": "v1/a.parquet"}]
+        self.cards[("test/cov", pinned)] = card
+        config = write_config(
+            {
+                "repositories": {
+                    "test/cov": {"revision": pinned, "dataset": {"cov_a": {}}}
+                }
+            }
+        )
+        self._setup(
+            mock_card_fetcher,
+            mock_plan_size_fetcher,
+            {"test/cov": _size_info(cov_a=5000, sample_metadata=300)},
+        )
+
+        plan = plan_downloads(config, cache_dir=hub_cache)
+
+        assert mock_card_fetcher.return_value.fetch.call_args.kwargs["revision"] == (
+            pinned
+        )
+        assert plan.estimates[0].cached_bytes == 45
+
+    def test_invalid_bandwidth(
+        self,
+        mock_size_fetcher,
+        mock_structure_fetcher,
+        mock_card_fetcher,
+        mock_plan_size_fetcher,
+        vdb_config,
+    ):
+        """Bandwidth must be positive."""
+        with pytest.raises(ValueError, match="bandwidth"):
+            plan_downloads(vdb_config, bandwidth=0)
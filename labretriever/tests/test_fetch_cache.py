@@ -0,0 +1,147 @@
+"""Tests for the shared fetch cache."""
+
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from labretriever.fetch_cache import (
+    EndpointPolicy,
+    FetchCache,
+    get_fetch_cache,
+    set_fetch_cache,
+    token_fingerprint,
+)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable replacement for time.monotonic in the cache."""
+    now = [1000.0]
+    monkeypatch.setattr(
+        "labretriever.fetch_cache.time", SimpleNamespace(monotonic=lambda: now[0])
+    )
+    return now
+
+
+class TestFetchCache:
+    """Tests for FetchCache."""
+
+    def test_key_parts(self):
+        """Entries are separated by endpoint, revision, token and params."""
+        cache = FetchCache()
+        cache.put("card", "a/b", 1, token="t1")
+
+        assert cache.get("card", "a/b", token="t1") == 1
+        assert cache.get("card", "a/b", token="t2") is None
+        assert cache.get("card", "a/b") is None
+        assert cache.get("card", "a/b", revision="v1", token="t1") is None
+        assert cache.get("size", "a/b", token="t1") is None
+        assert cache.get("card", "a/b", token="t1", params=("x",)) is None
+
+        stats = cache.stats()
+        assert (stats["card"].hits, stats["card"].misses) == (1, 4)
+        assert stats["card"].hit_rate == 0.2
+
+    def test_ttl(self, clock):
+        """Entries expire ttl seconds after they were stored."""
+        cache = FetchCache({"card": EndpointPolicy(ttl=10, max_entries=4)})
+        cache.put("card", "a/b", 1)
+
+        clock[0] += 9
+        assert cache.get("card", "a/b") == 1
+        clock[0] += 1
+        assert cache.get("card", "a/b") is None
+        assert cache.stats()["card"].expirations == 1
+        assert cache.stats()["card"].size == 0
+
+    def test_lru_eviction(self):
+        """The least recently used entry is evicted beyond max_entries."""
+        cache = FetchCache({"card": EndpointPolicy(ttl=None, max_entries=2)})
+        cache.put("card", "a", 1)
+        cache.put("card", "b", 2)
+        cache.get("card", "a")
+        cache.put("card", "c", 3)
+
+        assert cache.get("card", "b") is None
+        assert cache.get("card", "a") == 1
+        assert cache.get("card", "c") == 3
+        assert cache.stats()["card"].evictions == 1
+
+    def test_get_or_fetch_coalesces(self):
+        """Concurrent misses for one key call fetch once."""
+        cache = FetchCache()
+        calls = []
+        started = threading.Event()
+
+        def fetch():
+            calls.append(1)
+            started.set()
+            time.sleep(0.05)
+            return "value"
+
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(cache.get_or_fetch("card", "a/b", fetch))
+            )
+            for _ in range(8)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert calls == [1]
+        assert results == ["value"] * 8
+
+    def test_errors_not_cached(self):
+        """A failing fetch is retried on the next call."""
+        cache = FetchCache()
+
+        def fail():
+            raise RuntimeError("down")
+
+        with pytest.raises(RuntimeError):
+            cache.get_or_fetch("card", "a/b", fail)
+        assert cache.get_or_fetch("card", "a/b", lambda: 2) == 2
+
+    def test_invalidate_and_clear(self):
+        """Entries can be dropped by endpoint and repository."""
+        cache = FetchCache()
+        for endpoint in ("card", "size"):
+            for repo in ("a/b", "c/d"):
+                cache.put(endpoint, repo, 1)
+
+        assert cache.invalidate(repo_id="a/b") == 2
+        assert cache.invalidate(endpoint="size") == 1
+        assert cache.get("card", "c/d") == 1
+        assert cache.stats()["card"].size == 1
+        cache.clear()
+        assert cache.stats() == {}
+
+    def test_disabled(self):
+        """A disabled cache stores nothing."""
+        cache = FetchCache.disabled()
+        cache.put("card", "a/b", 1)
+        assert cache.get("card", "a/b") is None
+        assert cache.get_or_fetch("listing", "a/b", lambda: 2) == 2
+        assert cache.stats()["listing"].size == 0
+
+
+def test_token_fingerprint():
+    """Tokens are fingerprinted, not stored."""
+    assert token_fingerprint(None) == "anonymous"
+    assert "hf_secret" not in token_fingerprint("hf_secret")
+    assert token_fingerprint("a") != token_fingerprint("b")
+
+
+def test_set_fetch_cache():
+    """The process-wide cache can be replaced."""
+    cache = FetchCache()
+    previous = set_fetch_cache(cache)
+    try:
+        assert get_fetch_cache() is cache
+    finally:
+        set_fetch_cache(previous)
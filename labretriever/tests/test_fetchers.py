@@ -1,17 +1,86 @@
 """Tests for datainfo fetcher classes."""
 
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from typing import Any, cast
 from unittest.mock import Mock, patch
 
 import pytest
 import requests
 from requests import HTTPError
 
-from labretriever.errors import HfDataFetchError
+from labretriever.errors import HfDataFetchError, HfOfflineError
+from labretriever.fetch_cache import get_fetch_cache
 from labretriever.fetchers import (
     HfDataCardFetcher,
     HfRepoStructureFetcher,
     HfSizeInfoFetcher,
+    get_http_session,
 )
+from labretriever.rate_limit import RequestScheduler, get_request_scheduler
+from labretriever.structure_cache import RepoStructureCache, get_structure_cache
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """
+    Serve scripted responses.
+
+    Each request pops ``(status, headers, delay)`` from ``server.script``; once the
+    script is empty, requests get ``200`` with ``server.body``.
+
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = cast(_StubServer, self.server)
+        server.requests.append((self.path, self.client_address[1]))
+        status, headers, delay = server.script.pop(0) if server.script else (200, {}, 0)
+        if delay:
+            time.sleep(delay)
+        body = json.dumps(server.body if status == 200 else {}).encode()
+        try:
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except OSError:
+            # The client gave up (read timeout)
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+class _StubServer(ThreadingHTTPServer):
+    """Local server of :class:`_StubHandler` holding its script and requests."""
+
+    daemon_threads = True
+
+    def __init__(self, body: Any):
+        super().__init__(("127.0.0.1", 0), _StubHandler)
+        self.script: list[tuple[int, dict[str, str], float]] = []
+        self.requests: list[tuple[str, int]] = []
+        self.body = body
+
+
+@pytest.fixture
+def stub_server(sample_size_info):
+    """Local HTTP server that injects latency and errors."""
+    server = _StubServer(sample_size_info)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
 
 
 class TestHfDataCardFetcher:
@@ -97,6 +166,341 @@ class TestHfDataCardFetcher:
             )
 
 
+class TestRequestScheduling:
+    """Fetchers pace their Hub requests through the shared scheduler."""
+
+    def test_default_scheduler(self):
+        """Fetchers use the process-wide scheduler unless given one."""
+        scheduler = RequestScheduler()
+        assert HfDataCardFetcher().scheduler is get_request_scheduler()
+        assert HfRepoStructureFetcher(scheduler=scheduler).scheduler is scheduler
+        assert HfSizeInfoFetcher().scheduler is get_request_scheduler()
+
+    @patch("labretriever.fetchers.DatasetCard")
+    def test_card_retried_after_429(
+        self, mock_dataset_card, test_repo_id, sample_dataset_card_data
+    ):
+        """A rate-limited card request is retried instead of failing."""
+        limited = HTTPError(
+            response=Mock(status_code=429, headers={"Retry-After": "0"})
+        )
+        card = Mock()
+        card.data.to_dict.return_value = sample_dataset_card_data
+        mock_dataset_card.load.side_effect = [limited, card]
+
+        fetcher = HfDataCardFetcher()
+        assert fetcher.fetch(test_repo_id) == sample_dataset_card_data
+        assert mock_dataset_card.load.call_count == 2
+        assert fetcher.scheduler.stats().rate_limited == 1
+
+    @patch("labretriever.fetchers.repo_info")
+    def test_structure_errors_not_retried(self, mock_repo_info, test_repo_id):
+        """Errors other than 429 are not retried."""
+        mock_repo_info.side_effect = HTTPError(response=Mock(status_code=500))
+
+        with pytest.raises(HfDataFetchError):
+            HfRepoStructureFetcher().fetch(test_repo_id)
+        assert mock_repo_info.call_count == 1
+
+
+class TestSharedFetchCache:
+    """Fetchers share responses through the process-wide FetchCache."""
+
+    @patch("labretriever.fetchers.DatasetCard")
+    def test_card_shared_per_token(
+        self, mock_dataset_card, test_repo_id, sample_dataset_card_data
+    ):
+        """Cards are reused by other fetchers with the same token only."""
+        mock_dataset_card.load.return_value.data.to_dict.return_value = (
+            sample_dataset_card_data
+        )
+
+        HfDataCardFetcher(token="t1").fetch(test_repo_id)
+        assert HfDataCardFetcher(token="t1").fetch(test_repo_id) == (
+            sample_dataset_card_data
+        )
+        assert mock_dataset_card.load.call_count == 1
+
+        HfDataCardFetcher(token="t2").fetch(test_repo_id)
+        HfDataCardFetcher(token="t1").fetch(test_repo_id, force_refresh=True)
+        assert mock_dataset_card.load.call_count == 3
+        assert get_fetch_cache().stats()["card"].hits == 1
+
+    def test_card_keyed_by_offline_and_cache_dir(
+        self, tmp_path, test_repo_id, sample_dataset_card_data
+    ):
+        """Cards are not shared between offline and online or disk caches."""
+        with (
+            patch("labretriever.fetchers.DatasetCard") as mock_dataset_card,
+            patch("labretriever.fetchers.get_hf_file_metadata") as mock_metadata,
+            patch("labretriever.fetchers.hf_hub_download", return_value="README.md"),
+            patch("labretriever.fetchers.try_to_load_from_cache", return_value=None),
+        ):
+            mock_dataset_card.load.return_value.data.to_dict.return_value = (
+                sample_dataset_card_data
+            )
+            mock_metadata.return_value = Mock(commit_hash="a" * 40)
+
+            HfDataCardFetcher(cache_dir=tmp_path / "a").fetch(test_repo_id)
+            HfDataCardFetcher(cache_dir=tmp_path / "b").fetch(test_repo_id)
+            assert mock_dataset_card.load.call_count == 2
+
+            offline = HfDataCardFetcher(cache_dir=tmp_path / "c", offline=True)
+            with pytest.raises(HfOfflineError, match="not cached locally"):
+                offline.fetch(test_repo_id)
+
+    def test_stale_card_not_cached(
+        self, tmp_path, test_repo_id, sample_dataset_card_data
+    ):
+        """A cached card served after a failed download is not kept in memory."""
+        with (
+            patch("labretriever.fetchers.DatasetCard") as mock_dataset_card,
+            patch("labretriever.fetchers.get_hf_file_metadata") as mock_metadata,
+            patch("labretriever.fetchers.hf_hub_download", return_value="README.md"),
+        ):
+            mock_dataset_card.load.return_value.data.to_dict.return_value = (
+                sample_dataset_card_data
+            )
+            mock_metadata.return_value = Mock(commit_hash="a" * 40)
+            HfDataCardFetcher(cache_dir=tmp_path).fetch(test_repo_id)
+            get_fetch_cache().invalidate()
+
+            # The revision check fails, then the download
+            fetcher = HfDataCardFetcher(cache_dir=tmp_path)
+            mock_metadata.side_effect = Exception("unreachable")
+            assert fetcher.fetch(test_repo_id) == sample_dataset_card_data
+            mock_metadata.side_effect = None
+            mock_metadata.return_value = Mock(commit_hash="b" * 40)
+            mock_dataset_card.load.side_effect = Exception("unreachable")
+            assert fetcher.fetch(test_repo_id) == sample_dataset_card_data
+
+            mock_dataset_card.load.side_effect = None
+            mock_dataset_card.load.return_value.data.to_dict.return_value = {"new": 1}
+            assert fetcher.fetch(test_repo_id) == {"new": 1}
+            assert get_fetch_cache().stats()["card"].hits == 0
+
+    @patch.object(requests.Session, "get")
+    def test_size_shared(self, mock_get, test_repo_id, sample_size_info):
+        """Size information is requested once for all fetchers."""
+        mock_get.return_value = Mock(status_code=200)
+        mock_get.return_value.json.return_value = sample_size_info
+
+        HfSizeInfoFetcher().fetch(test_repo_id)
+        HfSizeInfoFetcher().fetch_many([test_repo_id])
+        assert mock_get.call_count == 1
+
+    @patch.object(requests.Session, "get")
+    def test_listing_shared(self, mock_tree, test_repo_id):
+        """Listings are reused across fetchers, per path prefix."""
+        mock_tree.side_effect = lambda *args, **kwargs: _tree_page([])
+
+        listing = HfRepoStructureFetcher().list_files(test_repo_id, "data/")
+        assert HfRepoStructureFetcher().list_files(test_repo_id, "data/") is listing
+        HfRepoStructureFetcher().list_files(test_repo_id, "other/")
+        assert mock_tree.call_count == 2
+
+        HfRepoStructureFetcher().list_files(test_repo_id, "data/", revision="v1")
+        assert mock_tree.call_count == 3
+        assert mock_tree.call_args.args[0].endswith("/tree/v1/data")
+
+
+@pytest.mark.usefixtures("no_fetch_cache")
+class TestHfDataCardFetcherCache:
+    """Test the persistent dataset card cache of HfDataCardFetcher."""
+
+    SHA = "a" * 40
+
+    @pytest.fixture
+    def hub(self, sample_dataset_card_data):
+        """Patch the Hub calls; yields (DatasetCard mock, metadata mock)."""
+        with (
+            patch("labretriever.fetchers.DatasetCard") as mock_dataset_card,
+            patch("labretriever.fetchers.get_hf_file_metadata") as mock_metadata,
+            patch("labretriever.fetchers.hf_hub_download", return_value="README.md"),
+        ):
+            mock_card = Mock()
+            mock_card.data.to_dict.return_value = sample_dataset_card_data
+            mock_dataset_card.load.return_value = mock_card
+            mock_metadata.return_value = Mock(commit_hash=self.SHA)
+            yield mock_dataset_card, mock_metadata
+
+    def test_disabled_by_env(self, monkeypatch):
+        """The cache can be disabled through the environment."""
+        monkeypatch.setenv("LABRETRIEVER_CARD_CACHE_DIR", "off")
+        assert HfDataCardFetcher().cache_dir is None
+        monkeypatch.setenv("LABRETRIEVER_CARD_CACHE_DIR", "/tmp/cards")
+        assert str(HfDataCardFetcher().cache_dir) == "/tmp/cards"
+
+    def test_second_fetch_served_from_disk(
+        self, hub, tmp_path, test_repo_id, sample_dataset_card_data
+    ):
+        """A new fetcher serves a cached revision after one revision check."""
+        mock_dataset_card, mock_metadata = hub
+        first = HfDataCardFetcher(cache_dir=tmp_path).fetch(test_repo_id)
+        second_fetcher = HfDataCardFetcher(cache_dir=tmp_path)
+        second = second_fetcher.fetch(test_repo_id)
+
+        assert first == second == sample_dataset_card_data
+        assert mock_dataset_card.load.call_count == 1
+        assert mock_metadata.call_count == 2
+        assert second_fetcher.revisions[(test_repo_id, None)] == self.SHA
+        repo_dir = tmp_path / "datasets" / test_repo_id.replace("/", "--")
+        assert (repo_dir / f"{self.SHA}.json").exists()
+        assert (repo_dir / "latest").read_text() == self.SHA
+
+    def test_new_revision_refetches(self, hub, tmp_path, test_repo_id):
+        """A changed revision downloads the card again."""
+        mock_dataset_card, mock_metadata = hub
+        HfDataCardFetcher(cache_dir=tmp_path).fetch(test_repo_id)
+        mock_metadata.return_value = Mock(commit_hash="b" * 40)
+        HfDataCardFetcher(cache_dir=tmp_path).fetch(test_repo_id)
+        assert mock_dataset_card.load.call_count == 2
+
+    def test_force_refresh(self, hub, tmp_path, test_repo_id):
+        """force_refresh bypasses the cached card."""
+        mock_dataset_card, _ = hub
+        fetcher = HfDataCardFetcher(cache_dir=tmp_path)
+        fetcher.fetch(test_repo_id)
+        fetcher.fetch(test_repo_id, force_refresh=True)
+        assert mock_dataset_card.load.call_count == 2
+
+    def test_offline_skips_revision_check(
+        self, hub, tmp_path, test_repo_id, monkeypatch, sample_dataset_card_data
+    ):
+        """Offline mode serves the latest cached card without network calls."""
+        mock_dataset_card, mock_metadata = hub
+        HfDataCardFetcher(cache_dir=tmp_path).fetch(test_repo_id)
+        monkeypatch.setenv("HF_HUB_OFFLINE", "1")
+        result = HfDataCardFetcher(cache_dir=tmp_path).fetch(test_repo_id)
+        assert result == sample_dataset_card_data
+        assert mock_metadata.call_count == 1
+        assert mock_dataset_card.load.call_count == 1
+
+    def test_offline_uncached_raises(self, hub, tmp_path, test_repo_id):
+        """Offline, a card that is not cached fails fast without requests."""
+        mock_dataset_card, mock_metadata = hub
+        fetcher = HfDataCardFetcher(cache_dir=tmp_path, offline=True)
+        with (
+            patch("labretriever.fetchers.try_to_load_from_cache", return_value=None),
+            pytest.raises(HfOfflineError, match="not cached locally"),
+        ):
+            fetcher.fetch(test_repo_id)
+        mock_metadata.assert_not_called()
+        mock_dataset_card.load.assert_not_called()
+
+    def test_offline_reads_hub_cached_readme(
+        self, hub, tmp_path, test_repo_id, sample_dataset_card_data
+    ):
+        """Offline, a README.md in the hub cache is used if no card is cached."""
+        mock_dataset_card, mock_metadata = hub
+        readme = tmp_path / "README.md"
+        with patch(
+            "labretriever.fetchers.try_to_load_from_cache", return_value=str(readme)
+        ):
+            result = HfDataCardFetcher(offline=True).fetch(test_repo_id)
+        assert result == sample_dataset_card_data
+        mock_dataset_card.load.assert_called_once_with(str(readme))
+        mock_metadata.assert_not_called()
+
+    def test_failed_download_falls_back_to_cache(
+        self, hub, tmp_path, test_repo_id, sample_dataset_card_data
+    ):
+        """If the Hub is unreachable, the latest cached card is served."""
+        mock_dataset_card, mock_metadata = hub
+        HfDataCardFetcher(cache_dir=tmp_path).fetch(test_repo_id)
+        mock_metadata.side_effect = Exception("unreachable")
+        mock_dataset_card.load.side_effect = Exception("unreachable")
+        result = HfDataCardFetcher(cache_dir=tmp_path).fetch(test_repo_id)
+        assert result == sample_dataset_card_data
+
+    def test_download_pinned_to_checked_sha(self, hub, tmp_path, test_repo_id):
+        """The card is downloaded at the sha it will be cached under."""
+        with patch(
+            "labretriever.fetchers.hf_hub_download", return_value="README.md"
+        ) as mock_download:
+            fetcher = HfDataCardFetcher(cache_dir=tmp_path)
+            fetcher.fetch(test_repo_id)
+            fetcher.fetch(test_repo_id, force_refresh=True)
+        assert [c.kwargs["revision"] for c in mock_download.call_args_list] == [
+            self.SHA,
+            self.SHA,
+        ]
+        assert fetcher.revisions[(test_repo_id, None)] == self.SHA
+
+    @pytest.mark.parametrize("status", [401, 403, 404])
+    def test_auth_and_not_found_raised(self, hub, tmp_path, test_repo_id, status):
+        """Access and not-found errors of the revision check are not swallowed."""
+        mock_dataset_card, mock_metadata = hub
+        HfDataCardFetcher(cache_dir=tmp_path).fetch(test_repo_id)
+        mock_metadata.side_effect = HTTPError(response=Mock(status_code=status))
+        with pytest.raises(HfDataFetchError) as exc_info:
+            HfDataCardFetcher(cache_dir=tmp_path).fetch(test_repo_id)
+        assert exc_info.value.status_code == status
+        assert mock_dataset_card.load.call_count == 1
+
+    def test_no_cache_still_raises(self, hub, tmp_path, test_repo_id):
+        """Without a cached card, fetch failures still raise."""
+        mock_dataset_card, _ = hub
+        mock_dataset_card.load.side_effect = Exception("API Error")
+        with pytest.raises(HfDataFetchError):
+            HfDataCardFetcher(cache_dir=tmp_path).fetch(test_repo_id)
+
+    def test_pinned_sha_served_without_requests(
+        self, hub, tmp_path, test_repo_id, sample_dataset_card_data
+    ):
+        """A card pinned to a commit sha is downloaded once, then read from disk."""
+        mock_dataset_card, mock_metadata = hub
+        pinned = "c" * 40
+        with patch(
+            "labretriever.fetchers.hf_hub_download", return_value="README.md"
+        ) as mock_download:
+            first = HfDataCardFetcher(cache_dir=tmp_path).fetch(
+                test_repo_id, revision=pinned
+            )
+            fetcher = HfDataCardFetcher(cache_dir=tmp_path)
+            second = fetcher.fetch(test_repo_id, revision=pinned)
+
+        assert first == second == sample_dataset_card_data
+        assert mock_download.call_count == 1
+        assert mock_download.call_args.kwargs["revision"] == pinned
+        mock_dataset_card.load.assert_called_once_with("README.md")
+        mock_metadata.assert_not_called()
+        assert fetcher.revisions[(test_repo_id, pinned)] == pinned
+        # A pinned card does not become the latest card of the repository
+        repo_dir = tmp_path / "datasets" / test_repo_id.replace("/", "--")
+        assert (repo_dir / f"{pinned}.json").exists()
+        assert not (repo_dir / "latest").exists()
+
+    def test_pinned_branch_resolved(self, hub, tmp_path, test_repo_id):
+        """A branch or tag is resolved to its commit sha for the disk cache."""
+        _, mock_metadata = hub
+        with patch(
+            "labretriever.fetchers.hf_hub_download", return_value="README.md"
+        ) as mock_download:
+            fetcher = HfDataCardFetcher(cache_dir=tmp_path)
+            fetcher.fetch(test_repo_id, revision="v1.0")
+            fetcher.fetch(test_repo_id, revision="v1.0")
+            assert mock_download.call_count == 1
+
+        # A branch can move, so its sha is checked on every fetch
+        assert "/resolve/v1.0/" in mock_metadata.call_args.args[0]
+        assert mock_metadata.call_count == 2
+        assert fetcher.revisions[(test_repo_id, "v1.0")] == self.SHA
+
+    def test_offline_pinned_not_replaced_by_latest(self, hub, tmp_path, test_repo_id):
+        """Offline, a pinned card is never substituted with another revision."""
+        HfDataCardFetcher(cache_dir=tmp_path).fetch(test_repo_id)
+        fetcher = HfDataCardFetcher(cache_dir=tmp_path, offline=True)
+        with (
+            patch(
+                "labretriever.fetchers.try_to_load_from_cache", return_value=None
+            ) as mock_hub_cache,
+            pytest.raises(HfOfflineError, match=f"{test_repo_id}@v1.0"),
+        ):
+            fetcher.fetch(test_repo_id, revision="v1.0")
+        assert mock_hub_cache.call_args.kwargs["revision"] == "v1.0"
+
+
 class TestHfSizeInfoFetcher:
     """Test HfSizeInfoFetcher class."""
 
@@ -106,6 +510,13 @@ class TestHfSizeInfoFetcher:
         assert fetcher.token == test_token
         assert fetcher.base_url == "https://datasets-server.huggingface.co"
 
+    @patch.object(requests.Session, "get")
+    def test_offline_raises(self, mock_get, test_repo_id):
+        """Offline, size information fails fast without a request."""
+        with pytest.raises(HfOfflineError):
+            HfSizeInfoFetcher(offline=True).fetch(test_repo_id)
+        mock_get.assert_not_called()
+
     def test_build_headers_with_token(self, test_token):
         """Test building headers with token."""
         fetcher = HfSizeInfoFetcher(token=test_token)
@@ -122,7 +533,7 @@ class TestHfSizeInfoFetcher:
         assert headers["User-Agent"] == "TFBP-API/1.0"
         assert "Authorization" not in headers
 
-    @patch("labretriever.fetchers.requests.get")
+    @patch.object(requests.Session, "get")
     def test_fetch_success(self, mock_get, test_repo_id, sample_size_info):
         """Test successful size info fetch."""
         # Setup mock response
@@ -140,9 +551,9 @@ class TestHfSizeInfoFetcher:
         call_args = mock_get.call_args
         assert call_args[1]["params"]["dataset"] == test_repo_id
         assert call_args[1]["headers"]["Authorization"] == "Bearer test_token"
-        assert call_args[1]["timeout"] == 30
+        assert call_args[1]["timeout"] == (10.0, 30.0)
 
-    @patch("labretriever.fetchers.requests.get")
+    @patch.object(requests.Session, "get")
     def test_fetch_404_error(self, mock_get, test_repo_id):
         """Test fetch with 404 error."""
         # Setup mock 404 response
@@ -156,7 +567,7 @@ class TestHfSizeInfoFetcher:
         with pytest.raises(HfDataFetchError, match="Dataset .* not found"):
             fetcher.fetch(test_repo_id)
 
-    @patch("labretriever.fetchers.requests.get")
+    @patch.object(requests.Session, "get")
     def test_fetch_403_error(self, mock_get, test_repo_id):
         """Test fetch with 403 error."""
         # Setup mock 403 response
@@ -172,7 +583,7 @@ class TestHfSizeInfoFetcher:
         ):
             fetcher.fetch(test_repo_id)
 
-    @patch("labretriever.fetchers.requests.get")
+    @patch.object(requests.Session, "get")
     def test_fetch_other_http_error(self, mock_get, test_repo_id):
         """Test fetch with other HTTP error."""
         # Setup mock 500 response
@@ -186,7 +597,7 @@ class TestHfSizeInfoFetcher:
         with pytest.raises(HfDataFetchError, match="HTTP error fetching size"):
             fetcher.fetch(test_repo_id)
 
-    @patch("labretriever.fetchers.requests.get")
+    @patch.object(requests.Session, "get")
     def test_fetch_request_exception(self, mock_get, test_repo_id):
         """Test fetch with request exception."""
         mock_get.side_effect = requests.RequestException("Network error")
@@ -196,7 +607,7 @@ class TestHfSizeInfoFetcher:
         with pytest.raises(HfDataFetchError, match="Request failed fetching size"):
             fetcher.fetch(test_repo_id)
 
-    @patch("labretriever.fetchers.requests.get")
+    @patch.object(requests.Session, "get")
     def test_fetch_json_decode_error(self, mock_get, test_repo_id):
         """Test fetch with JSON decode error."""
         # Setup mock response with invalid JSON
@@ -210,6 +621,146 @@ class TestHfSizeInfoFetcher:
             fetcher.fetch(test_repo_id)
 
 
+class TestHfSizeInfoFetcherFetchMany:
+    """Test HfSizeInfoFetcher.fetch_many."""
+
+    def test_fetch_many(self, sample_size_info):
+        """Results and errors are returned per repo, in input order."""
+
+        def fetch(repo_id):
+            if repo_id == "user/missing":
+                raise HfDataFetchError("Dataset user/missing not found")
+            return {**sample_size_info, "dataset": repo_id}
+
+        fetcher = HfSizeInfoFetcher()
+        with patch.object(fetcher, "fetch", side_effect=fetch) as mock_fetch:
+            results, errors = fetcher.fetch_many(
+                ["user/b", "user/missing", "user/a", "user/b"], max_workers=2
+            )
+
+        assert list(results) == ["user/b", "user/a"]
+        assert results["user/a"]["dataset"] == "user/a"
+        assert list(errors) == ["user/missing"]
+        assert mock_fetch.call_count == 3
+
+    def test_fetch_many_invalid_workers(self):
+        """max_workers must be positive."""
+        with pytest.raises(ValueError, match="max_workers"):
+            HfSizeInfoFetcher().fetch_many(["user/a"], max_workers=0)
+        assert HfSizeInfoFetcher().fetch_many([]) == ({}, {})
+
+
+@pytest.mark.usefixtures("no_fetch_cache")
+class TestHfSizeInfoFetcherRetries:
+    """Test HfSizeInfoFetcher retries and connection reuse against a stub server."""
+
+    @pytest.fixture
+    def sleeps(self, monkeypatch):
+        """Record backoff delays instead of sleeping."""
+        delays: list[float] = []
+        monkeypatch.setattr(
+            "labretriever.fetchers.time", SimpleNamespace(sleep=delays.append)
+        )
+        return delays
+
+    @staticmethod
+    def make_fetcher(server, **kwargs):
+        kwargs.setdefault("backoff_factor", 0.01)
+        kwargs.setdefault("scheduler", Mock(spec=RequestScheduler))
+        fetcher = HfSizeInfoFetcher(session=requests.Session(), **kwargs)
+        fetcher.base_url = f"http://127.0.0.1:{server.server_port}"
+        return fetcher
+
+    def test_shared_session(self):
+        """Fetchers share one keep-alive session by default."""
+        assert HfSizeInfoFetcher().session is get_http_session()
+        assert HfSizeInfoFetcher().session is HfSizeInfoFetcher().session
+
+    def test_retries_server_errors(self, stub_server, sleeps, sample_size_info):
+        """5xx responses are retried with bounded, jittered backoff."""
+        stub_server.script = [(503, {}, 0), (500, {}, 0)]
+        fetcher = self.make_fetcher(stub_server)
+
+        assert fetcher.fetch("user/dataset") == sample_size_info
+        assert len(stub_server.requests) == 3
+        assert stub_server.requests[0][0] == "/size?dataset=user%2Fdataset"
+        assert len(sleeps) == 2
+        assert 0 <= sleeps[0] <= 0.01
+        assert 0 <= sleeps[1] <= 0.02
+
+    def test_honors_retry_after(self, stub_server, sleeps, sample_size_info):
+        """Retry-After in seconds or as an HTTP date sets the delay."""
+        when = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=20))
+        stub_server.script = [
+            (429, {"Retry-After": "2"}, 0),
+            (503, {"Retry-After": when}, 0),
+        ]
+        fetcher = self.make_fetcher(stub_server)
+
+        assert fetcher.fetch("user/dataset") == sample_size_info
+        assert sleeps[0] == 2.0
+        assert 15 < sleeps[1] <= 20
+        # Only the 429 pauses other requests; every attempt takes a slot
+        fetcher.scheduler.report_rate_limited.assert_called_once_with(2.0)
+        assert fetcher.scheduler.acquire.call_count == 3
+
+    def test_retry_after_too_long(self, stub_server, sleeps):
+        """A Retry-After beyond max_backoff is not waited for."""
+        stub_server.script = [(429, {"Retry-After": "3600"}, 0)]
+        fetcher = self.make_fetcher(stub_server)
+
+        with pytest.raises(HfDataFetchError, match="HTTP error fetching size"):
+            fetcher.fetch("user/dataset")
+        assert len(stub_server.requests) == 1
+        assert sleeps == []
+
+    def test_gives_up_after_max_retries(self, stub_server, sleeps):
+        """The last error response is reported once retries run out."""
+        stub_server.script = [(502, {}, 0)] * 5
+        fetcher = self.make_fetcher(stub_server, max_retries=2)
+
+        with pytest.raises(HfDataFetchError, match="HTTP error fetching size"):
+            fetcher.fetch("user/dataset")
+        assert len(stub_server.requests) == 3
+        assert len(sleeps) == 2
+
+    def test_client_errors_not_retried(self, stub_server, sleeps):
+        """4xx responses other than 429 fail immediately."""
+        stub_server.script = [(404, {}, 0)]
+        fetcher = self.make_fetcher(stub_server)
+
+        with pytest.raises(HfDataFetchError, match="not found"):
+            fetcher.fetch("user/dataset")
+        assert len(stub_server.requests) == 1
+
+    def test_read_timeout_retried(self, stub_server, sleeps, sample_size_info):
+        """A slow response hits the read timeout and is retried."""
+        stub_server.script = [(200, {}, 1.0)]
+        fetcher = self.make_fetcher(stub_server, read_timeout=0.2)
+
+        assert fetcher.fetch("user/dataset") == sample_size_info
+        assert len(stub_server.requests) == 2
+        assert len(sleeps) == 1
+
+    def test_read_timeout_exhausted(self, stub_server, sleeps):
+        """Timeouts on every attempt surface as a request failure."""
+        stub_server.script = [(200, {}, 1.0)] * 2
+        fetcher = self.make_fetcher(stub_server, read_timeout=0.2, max_retries=1)
+
+        with pytest.raises(HfDataFetchError, match="Request failed fetching size"):
+            fetcher.fetch("user/dataset")
+
+    def test_connection_reused(self, stub_server, sleeps):
+        """Consecutive requests, including retries, share one connection."""
+        stub_server.script = [(503, {}, 0)]
+        fetcher = self.make_fetcher(stub_server)
+
+        for _ in range(3):
+            fetcher.fetch("user/dataset")
+        assert len(stub_server.requests) == 4
+        assert len({port for _, port in stub_server.requests}) == 1
+
+
 class TestHfRepoStructureFetcher:
     """Test HfRepoStructureFetcher class."""
 
@@ -217,7 +768,7 @@ class TestHfRepoStructureFetcher:
         """Test initialization."""
         fetcher = HfRepoStructureFetcher(token=test_token)
         assert fetcher.token == test_token
-        assert fetcher._cached_structure == {}
+        assert fetcher.cache is get_structure_cache()
 
     @patch("labretriever.fetchers.repo_info")
     def test_fetch_success(self, mock_repo_info, test_repo_id, sample_repo_structure):
@@ -246,7 +797,7 @@ class TestHfRepoStructureFetcher:
 
         # Check that repo_info was called correctly
         mock_repo_info.assert_called_once_with(
-            repo_id=test_repo_id, repo_type="dataset", token="test_token"
+            repo_id=test_repo_id, revision=None, repo_type="dataset", token="test_token"
         )
 
     @patch("labretriever.fetchers.repo_info")
@@ -427,9 +978,345 @@ class TestHfRepoStructureFetcher:
 
             # First call
             result = fetcher.get_partition_values("test/repo", "regulator")
-            mock_fetch.assert_called_with("test/repo", force_refresh=False)
+            mock_fetch.assert_called_with(
+                "test/repo", force_refresh=False, revision=None
+            )
             assert result == ["TF1", "TF2"]
 
             # Second call with force_refresh
             fetcher.get_partition_values("test/repo", "regulator", force_refresh=True)
-            mock_fetch.assert_called_with("test/repo", force_refresh=True)
+            mock_fetch.assert_called_with(
+                "test/repo", force_refresh=True, revision=None
+            )
+
+
+def _tree_page(entries, next_url=None, status=200, headers=None):
+    """Mock a response with one page of a repository tree listing."""
+    response = Mock(status_code=status, headers=headers or {})
+    response.links = {"next": {"url": next_url}} if next_url else {}
+    response.json.return_value = entries
+    if status >= 400:
+        response.raise_for_status.side_effect = HTTPError(response=response)
+    return response
+
+
+def _structure_info(sha, last_modified="2024-01-01T00:00:00+00:00", paths=()):
+    """Mock ``repo_info`` result listing ``paths``."""
+    info = Mock(sha=sha)
+    info.last_modified = datetime.fromisoformat(last_modified)
+    info.siblings = [Mock(rfilename=p, size=10, lfs=None) for p in paths]
+    return info
+
+
+@pytest.mark.usefixtures("no_fetch_cache")
+class TestHfRepoStructureFetcherCache:
+    """Tests for the shared, revision-aware structure cache."""
+
+    @pytest.fixture
+    def mock_repo_info(self):
+        with patch("labretriever.fetchers.repo_info") as mock_repo_info:
+            yield mock_repo_info
+
+    @staticmethod
+    def _listing_calls(mock_repo_info):
+        return [c for c in mock_repo_info.call_args_list if "expand" not in c.kwargs]
+
+    def test_shared_between_fetchers(self, mock_repo_info, test_repo_id):
+        """A structure fetched by one fetcher is reused by another."""
+        mock_repo_info.return_value = _structure_info("sha1", paths=["a=1/f"])
+
+        first = HfRepoStructureFetcher().fetch(test_repo_id)
+        second = HfRepoStructureFetcher().fetch(test_repo_id)
+
+        assert first is second
+        assert first["sha"] == "sha1"
+        assert mock_repo_info.call_count == 1
+
+    def test_structure_read_only(self, mock_repo_info, test_repo_id, tmp_path):
+        """Shared structures cannot be modified by one of their callers."""
+        cache = RepoStructureCache(cache_dir=tmp_path, ttl=None)
+        mock_repo_info.return_value = _structure_info("sha1", paths=["a=1/f"])
+        structure = HfRepoStructureFetcher(cache=cache).fetch(test_repo_id)
+        from_disk = RepoStructureCache(cache_dir=tmp_path).get(test_repo_id)
+        assert from_disk is not None
+
+        for shared in (structure, from_disk.structure):
+            assert shared["partitions"] == {"a": {"1"}}
+            assert isinstance(shared["partitions"]["a"], frozenset)
+            with pytest.raises(TypeError, match="read-only"):
+                shared["files"].append({"path": "b=2/f"})
+            with pytest.raises(TypeError, match="read-only"):
+                shared["partitions"]["b"] = {"2"}
+
+    def test_revalidates_after_ttl(self, mock_repo_info, test_repo_id):
+        """After the TTL only the sha is checked while it is unchanged."""
+        cache = RepoStructureCache(ttl=0)
+        fetcher = HfRepoStructureFetcher(cache=cache)
+        mock_repo_info.return_value = _structure_info("sha1", paths=["a=1/f"])
+        fetcher.fetch(test_repo_id)
+
+        assert fetcher.fetch(test_repo_id)["partitions"] == {"a": {"1"}}
+        assert mock_repo_info.call_args.kwargs["expand"] == ["sha", "lastModified"]
+        assert len(self._listing_calls(mock_repo_info)) == 1
+
+        mock_repo_info.return_value = _structure_info("sha2", paths=["a=2/f"])
+        assert fetcher.fetch(test_repo_id)["partitions"] == {"a": {"2"}}
+        assert len(self._listing_calls(mock_repo_info)) == 2
+
+    def test_pinned_revision(self, mock_repo_info, test_repo_id, tmp_path):
+        """Pinned structures are cached by sha without moving ``latest``."""
+        pinned = "c" * 40
+        cache = RepoStructureCache(cache_dir=tmp_path, ttl=None)
+        mock_repo_info.return_value = _structure_info("sha1", paths=["a=1/f"])
+        HfRepoStructureFetcher(cache=cache).fetch(test_repo_id)
+        mock_repo_info.return_value = _structure_info(pinned, paths=["a=0/f"])
+        structure = HfRepoStructureFetcher(cache=cache).fetch(
+            test_repo_id, revision=pinned
+        )
+
+        assert structure["partitions"] == {"a": {"0"}}
+        assert mock_repo_info.call_args.kwargs["revision"] == pinned
+        latest = cache.get(test_repo_id)
+        assert latest is not None and latest.sha == "sha1"
+
+        # A new process reads the pinned structure from disk
+        fresh = RepoStructureCache(cache_dir=tmp_path, ttl=None)
+        again = HfRepoStructureFetcher(cache=fresh).fetch(test_repo_id, revision=pinned)
+        assert again["partitions"] == {"a": {"0"}}
+        assert mock_repo_info.call_count == 2
+        latest = fresh.get(test_repo_id)
+        assert latest is not None and latest.sha == "sha1"
+
+    def test_revalidates_by_last_modified_without_sha(
+        self, mock_repo_info, test_repo_id
+    ):
+        """Without a sha, an unchanged last_modified keeps the cached structure."""
+        fetcher = HfRepoStructureFetcher(cache=RepoStructureCache(ttl=0))
+        mock_repo_info.return_value = _structure_info(None, paths=["f"])
+        fetcher.fetch(test_repo_id)
+        fetcher.fetch(test_repo_id)
+        assert len(self._listing_calls(mock_repo_info)) == 1
+
+        mock_repo_info.return_value = _structure_info(
+            None, last_modified="2024-02-01T00:00:00+00:00"
+        )
+        fetcher.fetch(test_repo_id)
+        assert len(self._listing_calls(mock_repo_info)) == 2
+
+    def test_stale_served_offline_or_on_error(
+        self, mock_repo_info, test_repo_id, monkeypatch
+    ):
+        """Expired structures are served if the Hub cannot be asked."""
+        fetcher = HfRepoStructureFetcher(cache=RepoStructureCache(ttl=0))
+        mock_repo_info.return_value = _structure_info("sha1", paths=["f"])
+        expected = fetcher.fetch(test_repo_id)
+
+        mock_repo_info.side_effect = Exception("Hub down")
+        assert fetcher.fetch(test_repo_id) is expected
+
+        monkeypatch.setenv("HF_HUB_OFFLINE", "1")
+        mock_repo_info.reset_mock()
+        assert fetcher.fetch(test_repo_id) is expected
+        mock_repo_info.assert_not_called()
+
+    @patch.object(requests.Session, "get")
+    def test_offline(self, mock_tree, mock_repo_info, test_repo_id):
+        """Offline, structures and listings come from the cache only."""
+        mock_repo_info.return_value = _structure_info(
+            "sha1", paths=["data/a=1/f", "README.md"]
+        )
+        HfRepoStructureFetcher().fetch(test_repo_id)
+        mock_repo_info.reset_mock()
+
+        fetcher = HfRepoStructureFetcher(offline=True)
+        assert fetcher.fetch(test_repo_id, force_refresh=True)["total_files"] == 2
+        listing = fetcher.list_files(test_repo_id, path_prefix="data/")
+        assert list(listing.paths()) == ["data/a=1/f"]
+        with pytest.raises(HfOfflineError, match="not cached locally"):
+            fetcher.fetch("other/repo")
+        mock_repo_info.assert_not_called()
+        mock_tree.assert_not_called()
+
+    def test_persisted_on_disk(self, mock_repo_info, test_repo_id, tmp_path):
+        """A new process reuses the structure stored on disk."""
+        mock_repo_info.return_value = _structure_info(
+            "sha1", paths=["data/a=1/f", "data/a=2/f"]
+        )
+        HfRepoStructureFetcher(cache=RepoStructureCache(tmp_path)).fetch(test_repo_id)
+        repo_dir = tmp_path / "datasets" / test_repo_id.replace("/", "--")
+        assert (repo_dir / "latest").read_text() == "sha1"
+
+        mock_repo_info.reset_mock()
+        structure = HfRepoStructureFetcher(cache=RepoStructureCache(tmp_path)).fetch(
+            test_repo_id
+        )
+        mock_repo_info.assert_not_called()
+        assert structure["partitions"] == {"a": {"1", "2"}}
+        assert structure["total_files"] == 2
+
+    def test_disk_revision_reused_after_ttl(
+        self, mock_repo_info, test_repo_id, tmp_path
+    ):
+        """An expired structure whose sha is unchanged is not listed again."""
+        mock_repo_info.return_value = _structure_info("sha1", paths=["f"])
+        HfRepoStructureFetcher(cache=RepoStructureCache(tmp_path)).fetch(test_repo_id)
+
+        mock_repo_info.reset_mock()
+        fetcher = HfRepoStructureFetcher(cache=RepoStructureCache(tmp_path, ttl=0))
+        assert fetcher.fetch(test_repo_id)["files"][0]["path"] == "f"
+        assert self._listing_calls(mock_repo_info) == []
+
+    def test_cache_settings_from_env(self, monkeypatch, tmp_path):
+        """The shared cache's directory and TTL come from the environment."""
+        monkeypatch.setenv("LABRETRIEVER_STRUCTURE_CACHE_DIR", str(tmp_path))
+        monkeypatch.setenv("LABRETRIEVER_STRUCTURE_CACHE_TTL", "never")
+        cache = get_structure_cache()
+        assert cache.cache_dir == tmp_path
+        assert cache.ttl is None
+        assert get_structure_cache() is cache
+
+        monkeypatch.setenv("LABRETRIEVER_STRUCTURE_CACHE_TTL", "soon")
+        monkeypatch.setenv("LABRETRIEVER_STRUCTURE_CACHE_DIR", str(tmp_path / "x"))
+        with pytest.raises(ValueError, match="LABRETRIEVER_STRUCTURE_CACHE_TTL"):
+            get_structure_cache()
+
+
+class TestHfRepoStructureFetcherListing:
+    """Test the streamed, columnar listing of HfRepoStructureFetcher."""
+
+    TREE = [
+        {"type": "directory", "path": "data", "oid": "t1", "size": 0},
+        {"type": "file", "path": "data/README.md", "size": 10, "oid": "b0"},
+        {
+            "type": "file",
+            "path": "data/regulator=TF1/part-0.parquet",
+            "size": 1000,
+            "oid": "b1",
+            "lfs": {"size": 1000, "oid": "s1", "pointerSize": 130},
+        },
+        {
+            "type": "file",
+            "path": "data/regulator=TF2/part-0.parquet",
+            "size": 2000,
+            "oid": "b2",
+        },
+        {
+            "type": "file",
+            "path": "data/regulator=TF10/part-0.parquet",
+            "size": 3000,
+            "oid": "b3",
+        },
+    ]
+
+    @patch.object(requests.Session, "get")
+    def test_iter_files(self, mock_tree, test_repo_id):
+        """Folders are skipped and paths are filtered by prefix."""
+        mock_tree.return_value = _tree_page(self.TREE)
+        fetcher = HfRepoStructureFetcher(token="test_token")
+
+        files = list(fetcher.iter_files(test_repo_id, "data/regulator=TF1"))
+
+        assert files == [
+            ("data/regulator=TF1/part-0.parquet", 1000, True),
+            ("data/regulator=TF10/part-0.parquet", 3000, False),
+        ]
+        mock_tree.assert_called_once()
+        args, kwargs = mock_tree.call_args
+        assert args == (
+            f"https://huggingface.co/api/datasets/{test_repo_id}/tree/main/data",
+        )
+        assert kwargs["params"] == {"recursive": "true"}
+        assert kwargs["headers"]["authorization"] == "Bearer test_token"
+
+    @patch.object(requests.Session, "get")
+    def test_iter_files_no_prefix(self, mock_tree, test_repo_id):
+        """Without a prefix the whole repository is listed."""
+        mock_tree.return_value = _tree_page(self.TREE)
+        fetcher = HfRepoStructureFetcher()
+
+        assert len(list(fetcher.iter_files(test_repo_id))) == 4
+        assert mock_tree.call_args.args[0].endswith(f"{test_repo_id}/tree/main")
+
+    @patch.object(requests.Session, "get")
+    def test_iter_files_pages(self, mock_tree, test_repo_id):
+        """Each page is paced by the scheduler and retried after a 429."""
+        limited = _tree_page([], status=429, headers={"Retry-After": "0"})
+        mock_tree.side_effect = [
+            _tree_page(self.TREE[:3], next_url="https://huggingface.co/page2"),
+            limited,
+            _tree_page(self.TREE[3:]),
+        ]
+        scheduler = RequestScheduler()
+        fetcher = HfRepoStructureFetcher(scheduler=scheduler)
+
+        files = list(fetcher.iter_files(test_repo_id, "data/"))
+
+        assert [path for path, _, _ in files] == [
+            "data/README.md",
+            "data/regulator=TF1/part-0.parquet",
+            "data/regulator=TF2/part-0.parquet",
+            "data/regulator=TF10/part-0.parquet",
+        ]
+        assert [c.args[0] for c in mock_tree.call_args_list[1:]] == [
+            "https://huggingface.co/page2"
+        ] * 2
+        assert mock_tree.call_args.kwargs["params"] is None
+        stats = scheduler.stats()
+        assert stats.requests == 3
+        assert stats.rate_limited == 1
+
+    @patch.object(requests.Session, "get")
+    def test_iter_files_error(self, mock_tree, test_repo_id):
+        """Listing failures raise HfDataFetchError."""
+        mock_tree.side_effect = requests.ConnectionError("API Error")
+        fetcher = HfRepoStructureFetcher()
+
+        with pytest.raises(HfDataFetchError, match="Failed to list files"):
+            list(fetcher.iter_files(test_repo_id))
+
+    @patch.object(requests.Session, "get")
+    def test_list_files_cached(self, mock_tree, test_repo_id):
+        """Listings are cached per repo and prefix."""
+        mock_tree.side_effect = lambda *args, **kwargs: _tree_page(self.TREE)
+        fetcher = HfRepoStructureFetcher()
+
+        listing = fetcher.list_files(test_repo_id, path_prefix="data/")
+        assert len(listing) == 4
+        assert fetcher.list_files(test_repo_id, path_prefix="data/") is listing
+        assert mock_tree.call_count == 1
+
+        fetcher.list_files(test_repo_id, path_prefix="data/", force_refresh=True)
+        fetcher.list_files(test_repo_id)
+        assert mock_tree.call_count == 3
+
+    @patch("labretriever.fetchers.repo_info")
+    @patch.object(requests.Session, "get")
+    def test_get_partition_values_with_prefix(
+        self, mock_tree, mock_repo_info, test_repo_id
+    ):
+        """A path prefix answers partition queries from the listing."""
+        mock_tree.return_value = _tree_page(self.TREE)
+        fetcher = HfRepoStructureFetcher()
+
+        values = fetcher.get_partition_values(
+            test_repo_id, "regulator", path_prefix="data/"
+        )
+
+        assert values == ["TF1", "TF10", "TF2"]
+        mock_repo_info.assert_not_called()
+
+    @patch.object(requests.Session, "get")
+    def test_plan_partitions(self, mock_tree, test_repo_id):
+        """Partition predicates select files from the listing."""
+        mock_tree.return_value = _tree_page(self.TREE)
+        fetcher = HfRepoStructureFetcher()
+
+        plan = fetcher.plan_partitions(
+            test_repo_id, {"regulator": ["TF1", "TF10"]}, path_prefix="data/"
+        )
+
+        assert plan.files == (
+            "data/regulator=TF1/part-0.parquet",
+            "data/regulator=TF10/part-0.parquet",
+        )
+        assert plan.total_bytes == 4000
@@ -33,7 +33,9 @@ class TestHfCacheManagerInit:
             assert cache_manager.token is None
             assert cache_manager.logger is not None
             # DataCard should be initialized as parent
-            mock_datacard_init.assert_called_once_with(repo_id, None)
+            mock_datacard_init.assert_called_once_with(
+                repo_id, None, offline=None, revision=None
+            )
 
     def test_init_with_token_and_logger(self):
         """Test initialization with token and custom logger."""
@@ -56,7 +58,9 @@ class TestHfCacheManagerInit:
             assert cache_manager.token == token
             assert cache_manager.logger == logger
             # DataCard should be initialized as parent with token
-            mock_datacard_init.assert_called_once_with(repo_id, token)
+            mock_datacard_init.assert_called_once_with(
+                repo_id, token, offline=None, revision=None
+            )
 
 
 class TestHfCacheManagerDatacard:
@@ -74,7 +78,9 @@ class TestHfCacheManagerDatacard:
             cache_manager = HfCacheManager(repo_id, conn, token=token)
 
             # DataCard should be initialized during construction
-            mock_datacard_init.assert_called_once_with(repo_id, token)
+            mock_datacard_init.assert_called_once_with(
+                repo_id, token, offline=None, revision=None
+            )
 
             # Should have DataCard methods available (they exist on the class)
             assert hasattr(cache_manager, "get_config")
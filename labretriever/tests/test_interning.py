@@ -0,0 +1,166 @@
+"""Tests for structural interning of definition blocks."""
+
+import copy
+import gc
+import pickle
+
+import pytest
+
+from labretriever.interning import (
+    DefinitionInterner,
+    FrozenDict,
+    FrozenList,
+    InternReport,
+    freeze,
+)
+
+YPD = {
+    "media": {
+        "name": "YPD",
+        "carbon_source": [{"compound": "D-glucose", "concentration_percent": 2}],
+    },
+    "temperature_celsius": 30,
+}
+
+
+def card_data(definitions, conditions=None):
+    """Minimal raw card data with one feature carrying ``definitions``."""
+    data = {
+        "configs": [
+            {
+                "config_name": "data",
+                "dataset_info": {
+                    "features": [
+                        {"name": "id", "dtype": "string"},
+                        {"name": "condition", "definitions": definitions},
+                    ]
+                },
+            }
+        ]
+    }
+    if conditions is not None:
+        data["experimental_conditions"] = conditions
+    return data
+
+
+class TestFrozenContainers:
+    """Tests for FrozenDict, FrozenList and freeze."""
+
+    def test_mutation_raises(self):
+        """Frozen containers refuse modification."""
+        frozen = freeze({"a": [1, {"b": 2}]})
+        assert isinstance(frozen, FrozenDict)
+        assert isinstance(frozen["a"], FrozenList)
+        with pytest.raises(TypeError, match="read-only"):
+            frozen["c"] = 1
+        with pytest.raises(TypeError, match="read-only"):
+            frozen["a"].append(3)
+        with pytest.raises(TypeError, match="read-only"):
+            frozen["a"][1].update(b=3)
+
+    def test_copies_are_mutable(self):
+        """Copies and pickles are plain containers."""
+        frozen = freeze({"a": [1, {"b": 2}]})
+        for clone in (copy.deepcopy(frozen), pickle.loads(pickle.dumps(frozen))):
+            assert type(clone) is dict
+            assert type(clone["a"]) is list
+            assert clone == {"a": [1, {"b": 2}]}
+            clone["a"][1]["b"] = 3
+
+    def test_freeze_keeps_frozen_values(self):
+        """Already frozen values are returned as-is."""
+        frozen = freeze({"a": 1})
+        assert freeze(frozen) is frozen
+
+
+class TestDefinitionInterner:
+    """Tests for DefinitionInterner."""
+
+    def test_equal_values_are_shared(self):
+        """Structurally equal values intern to the same object."""
+        interner = DefinitionInterner()
+        first = interner.intern(copy.deepcopy(YPD))
+        second = interner.intern(copy.deepcopy(YPD))
+        assert first == YPD
+        assert first is second
+        assert isinstance(first, FrozenDict)
+        assert len(interner) == 4
+
+    def test_shared_subtrees(self):
+        """Different values share their equal subtrees."""
+        interner = DefinitionInterner()
+        ypd = interner.intern(copy.deepcopy(YPD))
+        warm = interner.intern({**copy.deepcopy(YPD), "temperature_celsius": 37})
+        assert warm is not ypd
+        assert warm["media"] is ypd["media"]
+
+    @pytest.mark.parametrize("a, b", [(1, 1.0), (1, True), (0, None), ("1", 1)])
+    def test_scalar_types_distinct(self, a, b):
+        """Equal-comparing scalars of different types are not merged."""
+        interner = DefinitionInterner()
+        first = interner.intern({"value": a})
+        second = interner.intern({"value": b})
+        assert type(first["value"]) is type(a)
+        assert type(second["value"]) is type(b)
+
+    def test_report(self):
+        """The report counts dicts and lists and the shared part."""
+        interner = DefinitionInterner()
+        first = InternReport()
+        kept = interner.intern(copy.deepcopy(YPD), first)
+        assert first.nodes == 4
+        assert first.shared_nodes == 0
+        second = InternReport()
+        interner.intern(copy.deepcopy(YPD), second)
+        assert second.nodes == 4
+        assert second.shared_nodes == 4
+        assert second.shared_bytes == second.bytes
+        assert second.unique_bytes == 0
+        assert kept == YPD
+
+    def test_clear(self):
+        """Clearing the table stops sharing with earlier values."""
+        interner = DefinitionInterner()
+        first = interner.intern(copy.deepcopy(YPD))
+        interner.clear()
+        assert len(interner) == 0
+        assert interner.intern(copy.deepcopy(YPD)) is not first
+
+    def test_unreferenced_values_dropped(self):
+        """The table does not keep values alive that nothing else references."""
+        interner = DefinitionInterner()
+        first = interner.intern(copy.deepcopy(YPD))
+        assert len(interner) == 4
+        del first
+        gc.collect()
+        assert len(interner) == 0
+
+    def test_intern_card_data(self):
+        """Definitions and conditions are shared across cards."""
+        interner = DefinitionInterner()
+        raw_a = card_data({"YPD": copy.deepcopy(YPD)}, {"strain": "BY4741"})
+        raw_b = card_data({"ctrl": copy.deepcopy(YPD)}, {"strain": "BY4741"})
+        a, report_a = interner.intern_card_data(raw_a)
+        b, report_b = interner.intern_card_data(raw_b)
+
+        assert a == raw_a
+        assert b == raw_b
+        # the input is left unchanged
+        assert type(raw_a["configs"][0]["dataset_info"]["features"][1]) is dict
+        assert type(raw_a["experimental_conditions"]) is dict
+
+        def defs(data):
+            return data["configs"][0]["dataset_info"]["features"][1]["definitions"]
+
+        assert defs(a)["YPD"] is defs(b)["ctrl"]
+        assert a["experimental_conditions"] is b["experimental_conditions"]
+        assert report_a.shared_nodes == 0
+        assert report_b.shared_nodes == report_b.nodes == 5
+
+    def test_intern_card_data_malformed(self):
+        """Unexpected card structure is passed through for validation."""
+        interner = DefinitionInterner()
+        raw = {"configs": ["not a dict", {"dataset_info": {"features": "x"}}]}
+        data, report = interner.intern_card_data(raw)
+        assert data == raw
+        assert report.nodes == 0
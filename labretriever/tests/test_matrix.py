@@ -0,0 +1,118 @@
+"""Tests for labeled matrices and their .npy persistence."""
+
+import os
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from labretriever.matrix import (
+    CSRMatrix,
+    DenseMatrix,
+    build_matrix,
+    load_matrix,
+    save_matrix,
+)
+
+
+@pytest.fixture()
+def coords():
+    """Unordered coordinates for a 2 x 3 matrix with one missing cell."""
+    return {
+        "row_codes": np.array([1, 0, 0, 1, 1]),
+        "col_codes": np.array([2, 1, 0, 0, 1]),
+        "values": np.array([6.0, 2.0, 1.0, 4.0, 5.0]),
+        "row_labels": np.array(["r0", "r1"], dtype=object),
+        "col_labels": np.array(["c0", "c1", "c2"], dtype=object),
+    }
+
+
+def test_build_dense(coords):
+    """Dense matrices place values by code and fill gaps with NaN."""
+    m = build_matrix(**coords, row_axis="reg", col_axis="tgt", value_col="x")
+    assert isinstance(m, DenseMatrix)
+    assert m.shape == (2, 3)
+    np.testing.assert_array_equal(m.values, [[1.0, 2.0, np.nan], [4.0, 5.0, 6.0]])
+    df = m.to_frame()
+    assert df.index.name == "reg"
+    assert df.loc["r1", "c2"] == 6.0
+
+
+def test_build_csr(coords):
+    """CSR matrices have sorted column indices and a valid indptr."""
+    m = build_matrix(**coords, sparse=True)
+    assert isinstance(m, CSRMatrix)
+    assert m.nnz == 5
+    np.testing.assert_array_equal(m.indptr, [0, 2, 5])
+    np.testing.assert_array_equal(m.indices, [0, 1, 0, 1, 2])
+    np.testing.assert_array_equal(m.data, [1.0, 2.0, 4.0, 5.0, 6.0])
+    dense = build_matrix(**coords)
+    assert isinstance(dense, DenseMatrix)
+    np.testing.assert_array_equal(m.to_dense().values, dense.values)
+
+
+def test_labels_are_not_object_dtype(coords):
+    """Object labels are converted so they can be saved without pickling."""
+    m = build_matrix(**coords)
+    assert m.row_labels.dtype.kind == "U"
+    assert list(m.col_labels) == ["c0", "c1", "c2"]
+
+
+@pytest.mark.parametrize("sparse", [False, True])
+def test_save_load_roundtrip_mmap(coords, tmp_path, sparse):
+    """Saved matrices load back memory-mapped with identical contents."""
+    m = build_matrix(**coords, sparse=sparse, value_col="x")
+    path = save_matrix(m, tmp_path / "m")
+    loaded = load_matrix(path)
+    assert type(loaded) is type(m)
+    assert loaded.value_col == "x"
+    assert list(loaded.row_labels) == ["r0", "r1"]
+    if isinstance(loaded, CSRMatrix):
+        assert isinstance(m, CSRMatrix)
+        assert isinstance(loaded.data, np.memmap)
+        np.testing.assert_array_equal(loaded.indptr, m.indptr)
+    else:
+        assert isinstance(m, DenseMatrix)
+        assert isinstance(loaded.values, np.memmap)
+        np.testing.assert_array_equal(loaded.values, m.values)
+
+
+def test_save_replaces_existing(coords, tmp_path):
+    """Saving over an existing matrix replaces it."""
+    save_matrix(build_matrix(**coords, sparse=True), tmp_path / "m")
+    save_matrix(build_matrix(**coords), tmp_path / "m")
+    assert isinstance(load_matrix(tmp_path / "m"), DenseMatrix)
+    assert [p.name for p in tmp_path.iterdir()] == ["m"]
+
+
+def test_failed_replace_keeps_existing(coords, tmp_path, monkeypatch):
+    """If the new matrix cannot be moved into place the old one is restored."""
+    save_matrix(build_matrix(**coords, sparse=True), tmp_path / "m")
+    real_replace = os.replace
+
+    def failing_replace(src, dst):
+        if Path(dst) == tmp_path / "m" and ".old" not in Path(src).name:
+            raise OSError("replace failed")
+        real_replace(src, dst)
+
+    monkeypatch.setattr(os, "replace", failing_replace)
+    with pytest.raises(OSError, match="replace failed"):
+        save_matrix(build_matrix(**coords), tmp_path / "m")
+    assert isinstance(load_matrix(tmp_path / "m"), CSRMatrix)
+    assert [p.name for p in tmp_path.iterdir()] == ["m"]
+
+
+def test_load_missing_raises(tmp_path):
+    """Loading from a directory without a saved matrix raises."""
+    with pytest.raises(FileNotFoundError):
+        load_matrix(tmp_path / "nope")
+
+
+def test_to_scipy(coords):
+    """to_scipy returns an equivalent scipy matrix when scipy is installed."""
+    pytest.importorskip("scipy")
+    m = build_matrix(**coords, sparse=True)
+    assert isinstance(m, CSRMatrix)
+    np.testing.assert_array_equal(
+        m.to_scipy().toarray(), np.nan_to_num(m.to_dense().values)
+    )
@@ -202,6 +202,17 @@ class TestDatasetVirtualDBConfig:
             )
         assert "reserved" in str(exc_info.value)
 
+    @pytest.mark.parametrize("name", ["all", "all_meta"])
+    def test_db_name_reserved_all_meta(self, name):
+        """Test that names colliding with the all_meta view are reserved."""
+        from labretriever.models import DatasetVirtualDBConfig
+
+        with pytest.raises(ValidationError) as exc_info:
+            DatasetVirtualDBConfig.model_validate(
+                {"db_name": name, "sample_id": {"field": "sample_id"}}
+            )
+        assert "reserved" in str(exc_info.value)
+
     def test_db_name_underscores_allowed(self):
         """Test that underscores are allowed in db_name."""
         from labretriever.models import DatasetVirtualDBConfig
@@ -267,6 +278,25 @@ class TestRepositoryConfig:
         assert config.properties["environmental_condition"].field == "condition"
         assert config.properties["environmental_condition"].path is None
 
+    def test_revision(self):
+        """Revision is parsed as a field, not as a property mapping."""
+        config = RepositoryConfig.model_validate(
+            {
+                "revision": "v1.0",
+                "dataset": {"dataset1": {"revision": "abc123", "tags": {}}},
+            }
+        )
+        assert config.revision == "v1.0"
+        assert "revision" not in config.properties
+        assert config.dataset is not None
+        assert config.dataset["dataset1"].revision == "abc123"
+        assert config.dataset["dataset1"].property_mappings == {}
+
+    def test_revision_must_be_string(self):
+        """Unquoted numeric shas are rejected with a hint."""
+        with pytest.raises(ValidationError, match="quote numeric commit shas"):
+            RepositoryConfig.model_validate({"revision": 1234567})
+
 
 class TestMetadataConfig:
     """Tests for MetadataConfig model."""
@@ -714,3 +744,25 @@ class TestMetadataConfig:
         with pytest.raises(ValidationError) as exc_info:
             MetadataConfig.model_validate(config_data)
         assert "Duplicate db_name" in str(exc_info.value)
+
+    def test_get_revision(self):
+        """Dataset revisions override repository revisions."""
+        config = MetadataConfig.model_validate(
+            {
+                "repositories": {
+                    "BrentLab/repo1": {
+                        "revision": "main",
+                        "dataset": {
+                            "ds1": {"revision": "v2"},
+                            "ds2": {"sample_id": {"field": "sample_id"}},
+                        },
+                    },
+                    "BrentLab/repo2": {"dataset": {"ds3": {"db_name": "ds3"}}},
+                }
+            }
+        )
+        assert config.get_revision("BrentLab/repo1") == "main"
+        assert config.get_revision("BrentLab/repo1", "ds1") == "v2"
+        assert config.get_revision("BrentLab/repo1", "ds2") == "main"
+        assert config.get_revision("BrentLab/repo2", "ds3") is None
+        assert config.get_revision("BrentLab/unknown") is None
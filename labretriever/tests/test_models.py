@@ -16,6 +16,7 @@ from labretriever.models import (
     DatasetType,
     ExtractedMetadata,
     FeatureInfo,
+    LazyConfigList,
     MetadataConfig,
     MetadataRelationship,
     PartitioningInfo,
@@ -160,6 +161,33 @@ class TestDatasetInfo:
         assert len(dataset_info.features) == 2
         assert dataset_info.partitioning.enabled is True  # type: ignore
 
+    def test_feature_indexes(self):
+        """Features can be looked up by name and by role."""
+        dataset_info = DatasetInfo(
+            features=[
+                FeatureInfo(
+                    name="regulator_locus_tag",
+                    dtype="string",
+                    description="Regulator",
+                    role="regulator_identifier",
+                ),
+                FeatureInfo(name="score", dtype="float64", description="Score"),
+                FeatureInfo(
+                    name="regulator_symbol",
+                    dtype="string",
+                    description="Regulator symbol",
+                    role="regulator_identifier",
+                ),
+            ]
+        )
+        assert dataset_info.get_feature("score") is dataset_info.features[1]
+        assert dataset_info.get_feature("missing") is None
+        assert [
+            f.name for f in dataset_info.get_features_by_role("regulator_identifier")
+        ] == ["regulator_locus_tag", "regulator_symbol"]
+        assert dataset_info.get_features_by_role("target_identifier") == []
+        assert [f.name for f in dataset_info.get_features_by_role(None)] == ["score"]
+
 
 class TestDatasetConfig:
     """Tests for DatasetConfig model."""
@@ -605,6 +633,89 @@ class TestDatasetCard:
         assert card.configs[0].citation is None
 
 
+class TestDatasetCardIndexes:
+    """Test the config lookup indexes of DatasetCard."""
+
+    @pytest.mark.parametrize("lazy", [False, True])
+    def test_metadata_configs_for(self, sample_dataset_card_data, lazy):
+        """Data configs map to the metadata configs that apply to them."""
+        card = (
+            DatasetCard.validate_lazy(sample_dataset_card_data)
+            if lazy
+            else DatasetCard(**sample_dataset_card_data)
+        )
+        assert [
+            c.config_name for c in card.get_metadata_configs_for("binding_data")
+        ] == ["experiment_metadata"]
+        assert card.get_metadata_configs_for("genome_map_data") == []
+        config = card.get_config_by_name("genome_map_data")
+        assert config is not None
+        assert config.config_name == "genome_map_data"
+        assert card.get_config_by_name("missing") is None
+
+
+class TestLazyDatasetCard:
+    """Test DatasetCard.validate_lazy and LazyConfigList."""
+
+    def test_configs_validated_on_access(self, sample_dataset_card_data):
+        """Only the configs that are looked up are validated."""
+        card = DatasetCard.validate_lazy(sample_dataset_card_data)
+
+        assert isinstance(card.configs, LazyConfigList)
+        assert card.configs.num_validated == 0
+        assert card.config_names == [
+            "genomic_features",
+            "binding_data",
+            "genome_map_data",
+            "experiment_metadata",
+        ]
+        assert card.default_config.config_name == "genomic_features"
+        assert card.configs.num_validated == 1
+
+        config = card.get_config_by_name("binding_data")
+        assert isinstance(config, DatasetConfig)
+        assert card.get_config_by_name("binding_data") is config
+        assert card.configs.num_validated == 2
+
+        assert [c.config_name for c in card.get_metadata_configs()] == [
+            "experiment_metadata"
+        ]
+        assert card.configs.num_validated == 3
+
+    def test_matches_eager_validation(self, sample_dataset_card_data):
+        """A fully accessed lazy card equals and serializes like an eager one."""
+        eager = DatasetCard(**sample_dataset_card_data)
+        lazy = DatasetCard.validate_lazy(sample_dataset_card_data)
+
+        assert lazy.model_dump() == eager.model_dump()
+        assert lazy == eager
+        assert isinstance(lazy.configs, LazyConfigList)
+        assert lazy.configs.num_validated == len(eager.configs)
+
+    def test_invalid_config_raises_on_access(self, sample_dataset_card_data):
+        """Errors outside the config index surface when the config is used."""
+        sample_dataset_card_data["configs"][2]["dataset_info"] = {"features": "x"}
+
+        with pytest.raises(ValidationError):
+            DatasetCard(**sample_dataset_card_data)
+
+        card = DatasetCard.validate_lazy(sample_dataset_card_data)
+        assert card.get_config_by_name("binding_data") is not None
+        with pytest.raises(ValidationError):
+            card.get_config_by_name("genome_map_data")
+
+    def test_index_checked_up_front(self, sample_dataset_card_data):
+        """Config index errors and duplicate names fail immediately."""
+        sample_dataset_card_data["configs"][1]["dataset_type"] = "bogus"
+        with pytest.raises(ValidationError, match="dataset_type"):
+            DatasetCard.validate_lazy(sample_dataset_card_data)
+
+        sample_dataset_card_data["configs"][1]["dataset_type"] = "genome_map"
+        sample_dataset_card_data["configs"][1]["config_name"] = "genomic_features"
+        with pytest.raises(ValidationError, match="must be unique"):
+            DatasetCard.validate_lazy(sample_dataset_card_data)
+
+
 class TestExtractedMetadata:
     """Tests for ExtractedMetadata model."""
 
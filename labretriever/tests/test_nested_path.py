@@ -0,0 +1,71 @@
+"""Tests for compiled dot-notation accessors."""
+
+import pytest
+
+from labretriever.nested_path import NestedPath, compile_path
+
+DEFINITION = {
+    "temperature_celsius": 30,
+    "media": {
+        "name": "YPD",
+        "carbon_source": [
+            {"compound": "D-glucose", "concentration_percent": 2},
+            {"compound": "D-galactose"},
+            "not a dict",
+        ],
+    },
+}
+
+
+class TestNestedPath:
+    """Tests for NestedPath and compile_path."""
+
+    def test_compile_path_is_cached(self):
+        """The same path string returns the same accessor."""
+        accessor = compile_path("media.name")
+        assert isinstance(accessor, NestedPath)
+        assert compile_path("media.name") is accessor
+        assert accessor.keys == ("media", "name")
+
+    @pytest.mark.parametrize(
+        "path, expected",
+        [
+            ("temperature_celsius", 30),
+            ("media.name", "YPD"),
+            ("media.carbon_source.compound", ["D-glucose", "D-galactose"]),
+            ("media.carbon_source.concentration_percent", [2]),
+            ("media.carbon_source.missing", None),
+            ("media.missing.deeper", None),
+            ("missing", None),
+        ],
+    )
+    def test_get(self, path, expected):
+        """Values are found through dicts and fanned out over lists."""
+        assert compile_path(path).get(DEFINITION) == expected
+
+    def test_get_top_level_list(self):
+        """A top-level list applies the whole path to each dict item."""
+        data = [{"a": {"b": 1}}, {"a": {}}, {"a": {"b": 2}}, 3]
+        assert compile_path("a.b").get(data) == [1, 2]
+
+    def test_get_non_container(self):
+        """Non-container input returns None."""
+        assert compile_path("a.b").get("not a dict") is None
+
+    def test_get_through_scalar_raises(self):
+        """Descending into a scalar raises TypeError."""
+        with pytest.raises(TypeError, match="expected dict or list of dicts"):
+            compile_path("temperature_celsius.value").get(DEFINITION)
+
+    def test_get_many(self):
+        """get_many evaluates the path for every definition."""
+        definitions = {
+            "YPD": DEFINITION,
+            "HEAT": {"temperature_celsius": 37},
+            "EMPTY": {},
+        }
+        assert compile_path("temperature_celsius").get_many(definitions) == {
+            "YPD": 30,
+            "HEAT": 37,
+            "EMPTY": None,
+        }
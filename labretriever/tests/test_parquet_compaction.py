@@ -0,0 +1,102 @@
+"""Tests for local parquet compaction."""
+
+from pathlib import Path
+
+import duckdb
+import pytest
+
+from labretriever.parquet_compaction import compact_parquet, sql_file_list
+
+
+@pytest.fixture()
+def conn():
+    """In-memory DuckDB connection."""
+    c = duckdb.connect(":memory:")
+    yield c
+    c.close()
+
+
+@pytest.fixture()
+def small_files(conn, tmp_path):
+    """Twenty small, unsorted files hive-partitioned by batch."""
+    files = []
+    for i in range(20):
+        path = tmp_path / "src" / f"batch={i % 2}" / f"part-{i}.parquet"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        conn.execute(
+            f"""
+            COPY (
+                SELECT (j * 7 + {i}) % 50 AS sample_id, j AS value
+                FROM range(500) t(j)
+            ) TO '{path}' (FORMAT PARQUET)
+            """
+        )
+        files.append(str(path))
+    return files
+
+
+def test_compacts_and_sorts(conn, small_files, tmp_path):
+    """Rows are preserved, sorted, zstd compressed, and partitions kept."""
+    out = compact_parquet(
+        conn, small_files, tmp_path / "out", sort_by=["sample_id", "missing"]
+    )
+    assert len(out) == 1
+    files_sql = ", ".join(f"'{f}'" for f in out)
+    df = conn.execute(f"SELECT * FROM read_parquet([{files_sql}])").fetchdf()
+    assert len(df) == 10_000
+    assert "batch" in df.columns
+    assert df["sample_id"].is_monotonic_increasing
+
+    compression = conn.execute(
+        f"SELECT DISTINCT compression FROM parquet_metadata([{files_sql}])"
+    ).fetchall()
+    assert compression == [("ZSTD",)]
+
+
+def test_row_group_size(conn, small_files, tmp_path):
+    """Row groups follow the requested size."""
+    out = compact_parquet(conn, small_files, tmp_path / "out", row_group_size=2048)
+    files_sql = ", ".join(f"'{f}'" for f in out)
+    n_groups = conn.execute(
+        "SELECT COUNT(DISTINCT (file_name, row_group_id)) "
+        f"FROM parquet_metadata([{files_sql}])"
+    ).fetchone()[0]
+    assert n_groups >= 4
+
+
+def test_existing_output_reused(conn, small_files, tmp_path):
+    """An existing output directory is returned without rewriting."""
+    first = compact_parquet(conn, small_files, tmp_path / "out")
+    mtime = Path(first[0]).stat().st_mtime_ns
+    second = compact_parquet(conn, small_files, tmp_path / "out")
+    assert second == first
+    assert Path(first[0]).stat().st_mtime_ns == mtime
+    # no temporary directories are left behind
+    assert [p.name for p in (tmp_path).iterdir() if p.name.startswith(".")] == []
+
+
+def test_failure_leaves_no_output(conn, tmp_path):
+    """A failed copy does not leave a partial output directory."""
+    bad = tmp_path / "bad.parquet"
+    bad.write_text("not parquet")
+    with pytest.raises(duckdb.Error):
+        compact_parquet(conn, [str(bad)], tmp_path / "out")
+    assert not (tmp_path / "out").exists()
+    with pytest.raises(ValueError):
+        compact_parquet(conn, [], tmp_path / "out")
+
+
+def test_quoted_paths(conn, small_files, tmp_path):
+    """Source and output paths containing single quotes are escaped."""
+    quoted = tmp_path / "o'brien"
+    sources = []
+    for f in small_files[:2]:
+        dest = quoted / Path(f).name
+        dest.parent.mkdir(exist_ok=True)
+        dest.write_bytes(Path(f).read_bytes())
+        sources.append(str(dest))
+    out = compact_parquet(conn, sources, quoted / "out'put")
+    n_rows = conn.execute(
+        f"SELECT COUNT(*) FROM read_parquet({sql_file_list(out)})"
+    ).fetchone()[0]
+    assert n_rows == 1000
@@ -0,0 +1,98 @@
+"""Tests for the partition predicate planner."""
+
+from datetime import date
+
+import pytest
+
+from labretriever.partition_plan import PartitionRange, plan_partitions
+from labretriever.repo_listing import RepoListing
+
+ENTRIES = [
+    ("README.md", 100, False),
+    ("data/regulator=GAL4/time=0/part-0.parquet", 1000, True),
+    ("data/regulator=GAL4/time=15/part-0.parquet", 1500, True),
+    ("data/regulator=GAL4/time=45/part-0.parquet", None, True),
+    ("data/regulator=CBF1/time=15/part-0.parquet", 2000, True),
+    ("data/regulator=CBF1/time=unknown/part-0.parquet", 10, True),
+    ("data/regulator=CBF1/time=15/summary.json", 5, False),
+]
+
+
+@pytest.fixture
+def listing():
+    return RepoListing.from_entries("user/repo", ENTRIES)
+
+
+class TestPlanPartitions:
+    """Tests for plan_partitions."""
+
+    def test_equality(self, listing):
+        """Equality selects the files of one partition value."""
+        plan = plan_partitions(listing, {"regulator": "CBF1"})
+
+        assert plan.files == (
+            "data/regulator=CBF1/time=15/part-0.parquet",
+            "data/regulator=CBF1/time=unknown/part-0.parquet",
+            "data/regulator=CBF1/time=15/summary.json",
+        )
+        assert plan.total_bytes == 2015
+        assert plan.values == {"regulator": ("CBF1",)}
+
+    def test_in_and_patterns(self, listing):
+        """Collections match any value and patterns restrict the file names."""
+        plan = plan_partitions(
+            listing, {"regulator": ["CBF1", "GAL4"], "time": {15}}, ["*.parquet"]
+        )
+
+        assert plan.files == (
+            "data/regulator=GAL4/time=15/part-0.parquet",
+            "data/regulator=CBF1/time=15/part-0.parquet",
+        )
+        assert plan.values["time"] == ("15",)
+        assert len(plan) == 2
+
+    def test_numeric_range(self, listing):
+        """Ranges compare numerically and skip unparsable values."""
+        plan = plan_partitions(
+            listing, {"regulator": "GAL4", "time": PartitionRange(10, 45)}
+        )
+
+        assert [f.split("/")[2] for f in plan.files] == ["time=15", "time=45"]
+        assert plan.total_bytes == 1500
+        assert plan.unknown_sizes == 1
+        # Numeric, not lexicographic: "45" > "100" as strings
+        assert len(plan_partitions(listing, {"time": PartitionRange(hi=100)})) == 5
+        assert plan_partitions(listing, {"time": PartitionRange(lo=1)}).values == {
+            "time": ("15", "45")
+        }
+
+    def test_no_filters(self, listing):
+        """Without filters every file is selected."""
+        plan = plan_partitions(listing)
+
+        assert len(plan) == len(ENTRIES)
+        assert plan.total_bytes == 4615
+
+    def test_dates(self):
+        """Date filters parse partition values as ISO dates."""
+        listing = RepoListing.from_entries(
+            "user/repo",
+            [(f"day={d}/f.parquet", 1, True) for d in ["2024-01-05", "2024-02-01"]],
+        )
+        plan = plan_partitions(
+            listing, {"day": PartitionRange(date(2024, 1, 1), date(2024, 1, 31))}
+        )
+        assert plan.files == ("day=2024-01-05/f.parquet",)
+
+    def test_unknown_column(self, listing):
+        """Filtering on a column that is not a partition raises."""
+        with pytest.raises(ValueError, match="not a partition column"):
+            plan_partitions(listing, {"condition": "YPD"})
+
+    def test_empty_listing(self):
+        """An empty listing gives an empty plan for any filter."""
+        plan = plan_partitions(
+            RepoListing.from_entries("user/repo", []), {"regulator": "GAL4"}
+        )
+        assert plan.files == ()
+        assert plan.values == {"regulator": ()}
@@ -0,0 +1,167 @@
+"""Tests for the request scheduler."""
+
+import threading
+import time
+from unittest.mock import Mock
+
+import pytest
+from requests import HTTPError
+
+from labretriever.constants import get_rate_limit, get_rate_limit_burst
+from labretriever.errors import HfDataFetchError, HfRateLimitError
+from labretriever.rate_limit import (
+    Priority,
+    RequestScheduler,
+    get_request_scheduler,
+    parse_retry_after,
+    set_request_scheduler,
+)
+
+
+def rate_limited(retry_after: str | None = "0") -> HTTPError:
+    """Return an HTTP 429 error as raised by requests."""
+    headers = {} if retry_after is None else {"Retry-After": retry_after}
+    return HTTPError(response=Mock(status_code=429, headers=headers))
+
+
+class TestRequestScheduler:
+    """Tests for RequestScheduler."""
+
+    def test_burst_then_rate(self):
+        """Requests beyond the burst wait for the bucket to refill."""
+        scheduler = RequestScheduler(rate=20, burst=2)
+
+        assert scheduler.acquire() == pytest.approx(0, abs=0.01)
+        assert scheduler.acquire() == pytest.approx(0, abs=0.01)
+        assert scheduler.acquire() >= 0.04
+
+        stats = scheduler.stats()
+        assert (stats.requests, stats.delayed, stats.queued) == (3, 1, 0)
+        assert stats.waited >= 0.04
+
+    def test_priority_order(self):
+        """Waiting cards start before bulk downloads queued earlier."""
+        scheduler = RequestScheduler(rate=10, burst=1)
+        scheduler.acquire()
+        order = []
+
+        def wait_for(priority):
+            scheduler.acquire(priority)
+            order.append(priority)
+
+        threads = []
+        for priority in (Priority.BULK, Priority.METADATA, Priority.CARD):
+            thread = threading.Thread(target=wait_for, args=(priority,))
+            thread.start()
+            threads.append(thread)
+            while scheduler.stats().queued < len(threads):
+                time.sleep(0.001)
+        for thread in threads:
+            thread.join()
+
+        assert order == [Priority.CARD, Priority.METADATA, Priority.BULK]
+
+    def test_max_wait(self):
+        """A request that cannot start within max_wait fails and leaves the queue."""
+        scheduler = RequestScheduler(rate=0.1, burst=1, max_wait=0.05)
+        scheduler.acquire()
+
+        with pytest.raises(HfRateLimitError, match="No request slot") as exc_info:
+            scheduler.acquire()
+        assert isinstance(exc_info.value, HfDataFetchError)
+        assert exc_info.value.status_code == 429
+        assert scheduler.stats().queued == 0
+
+    def test_unlimited(self):
+        """An unlimited scheduler never waits for tokens."""
+        scheduler = RequestScheduler.unlimited()
+        assert sum(scheduler.acquire() for _ in range(100)) < 0.1
+
+    def test_report_rate_limited_pauses(self):
+        """A reported 429 pauses every request."""
+        scheduler = RequestScheduler.unlimited()
+        scheduler.report_rate_limited(0.05)
+
+        assert scheduler.acquire(Priority.CARD) >= 0.04
+        assert scheduler.stats().rate_limited == 1
+
+    def test_call_retries_429(self):
+        """Call() retries a rate-limited request after the pause."""
+        scheduler = RequestScheduler(rate=None, max_backoff=0.05)
+        fetch = Mock(side_effect=[rate_limited("0.01"), rate_limited(None), "ok"])
+
+        assert scheduler.call(fetch, priority=Priority.CARD) == "ok"
+        assert fetch.call_count == 3
+        assert scheduler.stats().rate_limited == 2
+
+    def test_call_gives_up(self):
+        """Call() re-raises other errors, long Retry-After and exhausted retries."""
+        scheduler = RequestScheduler.unlimited()
+        scheduler.max_retries = 1
+
+        other = HTTPError(response=Mock(status_code=500))
+        with pytest.raises(HTTPError):
+            scheduler.call(Mock(side_effect=other))
+        with pytest.raises(HTTPError):
+            scheduler.call(Mock(side_effect=rate_limited("3600")))
+
+        fetch = Mock(side_effect=rate_limited())
+        with pytest.raises(HTTPError):
+            scheduler.call(fetch)
+        assert fetch.call_count == 2
+
+    @pytest.mark.parametrize("kwargs", [{"rate": 0}, {"burst": 0}])
+    def test_invalid(self, kwargs):
+        """Non-positive rates and bursts are rejected."""
+        with pytest.raises(ValueError):
+            RequestScheduler(**kwargs)
+
+
+def test_parse_retry_after():
+    """Retry-After is parsed from seconds or an HTTP date."""
+    assert parse_retry_after("2") == 2.0
+    assert parse_retry_after("-1") == 0.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_process_wide_scheduler(monkeypatch):
+    """The shared scheduler is created from the environment."""
+    monkeypatch.setenv("LABRETRIEVER_RATE_LIMIT", "7.5")
+    monkeypatch.setenv("LABRETRIEVER_RATE_LIMIT_BURST", "4")
+    previous = set_request_scheduler(None)
+    try:
+        scheduler = get_request_scheduler()
+        assert (scheduler.rate, scheduler.burst) == (7.5, 4)
+        assert get_request_scheduler() is scheduler
+    finally:
+        set_request_scheduler(previous)
+
+
+@pytest.mark.parametrize(
+    "rate, expected", [(None, 3.0), ("0.5", 0.5), ("off", None), ("none", None)]
+)
+def test_get_rate_limit(monkeypatch, rate, expected):
+    """LABRETRIEVER_RATE_LIMIT sets or disables the rate."""
+    if rate is None:
+        monkeypatch.delenv("LABRETRIEVER_RATE_LIMIT", raising=False)
+    else:
+        monkeypatch.setenv("LABRETRIEVER_RATE_LIMIT", rate)
+    assert get_rate_limit() == expected
+
+
+@pytest.mark.parametrize(
+    "name, value, getter",
+    [
+        ("LABRETRIEVER_RATE_LIMIT", "fast", get_rate_limit),
+        ("LABRETRIEVER_RATE_LIMIT", "-1", get_rate_limit),
+        ("LABRETRIEVER_RATE_LIMIT_BURST", "0", get_rate_limit_burst),
+        ("LABRETRIEVER_RATE_LIMIT_BURST", "1.5", get_rate_limit_burst),
+    ],
+)
+def test_invalid_rate_limit_settings(monkeypatch, name, value, getter):
+    """Invalid rate limit settings raise ValueError."""
+    monkeypatch.setenv(name, value)
+    with pytest.raises(ValueError, match=name):
+        getter()
@@ -0,0 +1,91 @@
+"""Tests for the columnar repository listing."""
+
+import re
+
+import numpy as np
+import pytest
+
+from labretriever.repo_listing import RepoListing, parse_partitions
+
+ENTRIES = [
+    ("README.md", 1200, False),
+    ("data/regulator=GAL4/condition=YPD/part-0.parquet", 5000, True),
+    ("data/regulator=CBF1/condition=YPD/part-0.parquet", 4000, True),
+    ("data/regulator=GAL4/condition=HEAT/part-0.parquet", None, True),
+    ("data/regulator=ÄBC1/part-0.parquet", 10, True),
+]
+
+
+class TestRepoListing:
+    """Tests for RepoListing."""
+
+    def test_columns(self):
+        """Paths, sizes and LFS flags round-trip through the arrays."""
+        listing = RepoListing.from_entries("user/repo", iter(ENTRIES))
+
+        assert len(listing) == 5
+        assert list(listing.paths()) == [path for path, _, _ in ENTRIES]
+        assert listing.path(4) == "data/regulator=ÄBC1/part-0.parquet"
+        assert listing.sizes.dtype == np.int64
+        assert listing.sizes.tolist() == [1200, 5000, 4000, -1, 10]
+        assert listing.is_lfs.tolist() == [False, True, True, True, True]
+        assert listing.total_size == 10210
+        assert next(listing.files()) == {
+            "path": "README.md",
+            "size": 1200,
+            "is_lfs": False,
+        }
+        assert list(listing.files())[3]["size"] is None
+
+    def test_partitions(self):
+        """Partition values are sorted and files are coded per column."""
+        listing = RepoListing.from_entries("user/repo", ENTRIES)
+
+        assert listing.partition_columns == ["regulator", "condition"]
+        assert listing.partition_values("regulator") == ["CBF1", "GAL4", "ÄBC1"]
+        assert listing.partition_values("condition") == ["HEAT", "YPD"]
+        assert listing.partition_values("missing") == []
+        assert listing.partition_codes("regulator").tolist() == [-1, 1, 0, 1, 2]
+        assert listing.partition_codes("condition").tolist() == [-1, 1, 1, 0, -1]
+
+    def test_files_with(self):
+        """Files of one partition value are selected from the codes."""
+        listing = RepoListing.from_entries("user/repo", ENTRIES)
+
+        assert listing.files_with("regulator", "GAL4") == [
+            "data/regulator=GAL4/condition=YPD/part-0.parquet",
+            "data/regulator=GAL4/condition=HEAT/part-0.parquet",
+        ]
+        assert listing.files_with("condition", "HEAT") == [
+            "data/regulator=GAL4/condition=HEAT/part-0.parquet"
+        ]
+        assert listing.files_with("regulator", "nope") == []
+        assert listing.files_with("missing", "GAL4") == []
+
+    def test_empty(self):
+        """An empty stream gives an empty listing."""
+        listing = RepoListing.from_entries("user/repo", [], path_prefix="data/")
+
+        assert len(listing) == 0
+        assert listing.path_prefix == "data/"
+        assert list(listing.paths()) == []
+        assert listing.total_size == 0
+        assert listing.partition_columns == []
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        "data/regulator=GAL4/condition=YPD/part-0.parquet",
+        "a=b=c/x",
+        "=x/a=",
+        "a==b",
+        "/a=b/",
+        "a=/b=c",
+        "file=1.parquet",
+        "no/partitions.parquet",
+    ],
+)
+def test_parse_partitions_matches_regex(path):
+    """parse_partitions agrees with the regex it replaces."""
+    assert parse_partitions(path) == re.findall(r"([^/=]+)=([^/]+)", path)
@@ -0,0 +1,105 @@
+"""Tests for the Parquet row-group index."""
+
+import duckdb
+import pytest
+
+from labretriever.row_group_index import RowGroupIndex, RowGroupRef
+
+
+@pytest.fixture()
+def conn():
+    """In-memory DuckDB connection."""
+    c = duckdb.connect(":memory:")
+    yield c
+    c.close()
+
+
+@pytest.fixture()
+def parquet_files(conn, tmp_path):
+    """
+    Write two Parquet files with several row groups each.
+
+    File ``a.parquet`` holds regulators R00-R04, ``b.parquet`` R05-R09. Rows are
+    sorted by regulator so each row group covers a narrow regulator range.
+
+    """
+    files = []
+    for name, offset in (("a", 0), ("b", 5)):
+        path = tmp_path / f"{name}.parquet"
+        conn.execute(
+            f"""
+            COPY (
+                SELECT
+                    'R0' || CAST((i // 4000) + {offset} AS VARCHAR)
+                        AS regulator_locus_tag,
+                    'T' || CAST(i % 50 AS VARCHAR) AS target_locus_tag,
+                    i AS pos
+                FROM range(20000) t(i)
+                ORDER BY regulator_locus_tag, pos
+            ) TO '{path}' (FORMAT PARQUET, ROW_GROUP_SIZE 4096)
+            """
+        )
+        files.append(str(path))
+    return files
+
+
+def test_from_parquet_indexes_present_columns(conn, parquet_files):
+    """Only columns physically present in the files are indexed."""
+    index = RowGroupIndex.from_parquet(
+        conn, parquet_files, ["regulator_locus_tag", "pos", "not_a_column"]
+    )
+    assert index.columns == ["pos", "regulator_locus_tag"]
+    assert index.files == parquet_files
+
+
+def test_candidates_prune_files(conn, parquet_files):
+    """A point lookup only returns row groups from the file holding the value."""
+    index = RowGroupIndex.from_parquet(conn, parquet_files, ["regulator_locus_tag"])
+    refs = index.candidates("regulator_locus_tag", "R07")
+    assert refs
+    assert all(isinstance(r, RowGroupRef) for r in refs)
+    assert {r.file for r in refs} == {parquet_files[1]}
+    assert index.candidate_files("regulator_locus_tag", "R02") == [parquet_files[0]]
+
+
+def test_candidates_absent_value(conn, parquet_files):
+    """Values outside every range have no candidates."""
+    index = RowGroupIndex.from_parquet(conn, parquet_files, ["regulator_locus_tag"])
+    assert index.candidates("regulator_locus_tag", "Z99") == []
+
+
+def test_numeric_range_lookup(conn, parquet_files):
+    """Numeric statistics are compared numerically."""
+    index = RowGroupIndex.from_parquet(conn, parquet_files, ["pos"])
+    refs = index.candidates_in_range("pos", 100, 200)
+    # positions 100-200 live in the first row group of each file
+    assert {(r.file, r.row_group) for r in refs} == {
+        (parquet_files[0], 0),
+        (parquet_files[1], 0),
+    }
+    # numeric, not lexicographic: 9000 sorts before 10000
+    assert index.candidates("pos", "9000")
+
+
+def test_unindexed_column_raises(conn, parquet_files):
+    """Lookups on unindexed columns raise KeyError."""
+    index = RowGroupIndex.from_parquet(conn, parquet_files, ["pos"])
+    with pytest.raises(KeyError):
+        index.candidates("regulator_locus_tag", "R01")
+
+
+def test_probe_is_subset_of_candidates(conn, parquet_files):
+    """Bloom filter probing never adds row groups."""
+    index = RowGroupIndex.from_parquet(conn, parquet_files, ["target_locus_tag"])
+    candidates = index.candidates("target_locus_tag", "T7")
+    probed = index.probe(conn, "target_locus_tag", "T7")
+    assert set(probed) <= set(candidates)
+    assert probed
+
+
+def test_row_groups_include_unindexed_files(conn, parquet_files):
+    """row_groups lists every row group, even with no indexed columns."""
+    index = RowGroupIndex.from_parquet(conn, parquet_files, [])
+    assert index.columns == []
+    assert {r.file for r in index.row_groups} == set(parquet_files)
+    assert sum(r.num_rows for r in index.row_groups) == 40000
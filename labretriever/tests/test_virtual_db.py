@@ -6,18 +6,28 @@ and ``_cached_datacard`` so no network access is needed.
 
 """
 
+import threading
 from pathlib import Path
-from unittest.mock import MagicMock
+from typing import Any
+from unittest.mock import MagicMock, patch
 
 import duckdb
+import numpy as np
 import pandas as pd
 import pytest
 import yaml  # type: ignore
 
 from labretriever.datacard import DatasetSchema
+from labretriever.errors import HfOfflineError
+from labretriever.fetchers import HfRepoStructureFetcher
+from labretriever.matrix import CSRMatrix, DenseMatrix
 from labretriever.models import DatasetType, FeatureInfo, MetadataConfig
+from labretriever.repo_listing import RepoListing
 from labretriever.virtual_db import VirtualDB
 
+# Unpatched, for tests of the download step itself
+_RESOLVE_PARQUET_FILES = VirtualDB._resolve_parquet_files
+
 # ------------------------------------------------------------------
 # Fixtures
 # ------------------------------------------------------------------
@@ -360,7 +370,7 @@ def _make_mock_datacard(repo_id):
             "pvalue",
         }
         card.get_dataset_schema.return_value = DatasetSchema(
-            data_columns=harbison_data_cols
+            data_columns=frozenset(harbison_data_cols)
             | {
                 "sample_id",
                 "condition",
@@ -368,8 +378,8 @@ def _make_mock_datacard(repo_id):
                 "effect",
                 "pvalue",
             },
-            metadata_columns=harbison_meta_cols,
-            join_columns=set(),
+            metadata_columns=frozenset(harbison_meta_cols),
+            join_columns=frozenset(),
             metadata_source="embedded",
             external_metadata_config=None,
             is_partitioned=False,
@@ -411,14 +421,16 @@ def _make_mock_datacard(repo_id):
             "pvalue",
         }
         card.get_dataset_schema.return_value = DatasetSchema(
-            data_columns={
-                "sample_id",
-                "target_locus_tag",
-                "effect",
-                "pvalue",
-            },
-            metadata_columns=kemmeren_meta_cols,
-            join_columns=set(),
+            data_columns=frozenset(
+                {
+                    "sample_id",
+                    "target_locus_tag",
+                    "effect",
+                    "pvalue",
+                }
+            ),
+            metadata_columns=frozenset(kemmeren_meta_cols),
+            join_columns=frozenset(),
             metadata_source="embedded",
             external_metadata_config=None,
             is_partitioned=False,
@@ -439,21 +451,35 @@ def _make_mock_datacard(repo_id):
     return card
 
 
+def _stub_cached_datacard(monkeypatch, card=None, factory=_make_mock_datacard):
+    """
+    Replace ``_cached_datacard`` so VirtualDB gets its DataCards without network access.
+
+    The stub accepts and ignores every keyword argument of ``_cached_datacard``
+    (``token``, ``revision``, ...), so tests need not follow its signature.
+
+    :param card: Card returned for every repository, if given
+    :param factory: Otherwise, called with the repo_id to create the card
+
+    """
+    import labretriever.virtual_db as vdb_module
+
+    def stub(repo_id, **kwargs):
+        return card if card is not None else factory(repo_id)
+
+    monkeypatch.setattr(vdb_module, "_cached_datacard", stub)
+
+
 @pytest.fixture()
 def vdb(config_path, parquet_dir, monkeypatch):
     """Return a VirtualDB with _resolve_parquet_files and _cached_datacard monkeypatched
     for local testing."""
-    import labretriever.virtual_db as vdb_module
 
     def _fake_resolve(self, repo_id, config_name):
         return parquet_dir.get((repo_id, config_name), [])
 
     monkeypatch.setattr(VirtualDB, "_resolve_parquet_files", _fake_resolve)
-    monkeypatch.setattr(
-        vdb_module,
-        "_cached_datacard",
-        lambda repo_id, token=None: _make_mock_datacard(repo_id),
-    )
+    _stub_cached_datacard(monkeypatch)
     return VirtualDB(config_path)
 
 
@@ -1096,8 +1122,6 @@ class TestEdgeCases:
 
     def test_no_parquet_files(self, tmp_path, monkeypatch):
         """Test graceful handling when no parquet files are found."""
-        import labretriever.virtual_db as vdb_module
-
         config = {
             "repositories": {
                 "BrentLab/empty": {
@@ -1117,11 +1141,7 @@ class TestEdgeCases:
             return []
 
         monkeypatch.setattr(VirtualDB, "_resolve_parquet_files", _fake_resolve)
-        monkeypatch.setattr(
-            vdb_module,
-            "_cached_datacard",
-            lambda repo_id, token=None: _make_mock_datacard(repo_id),
-        )
+        _stub_cached_datacard(monkeypatch)
 
         # Should not raise; just have no views
         v = VirtualDB(p)
@@ -1133,8 +1153,6 @@ class TestEdgeCases:
     ):
         """Dataset with 'links' but datacard dataset_type != comparative raises
         ValueError."""
-        import labretriever.virtual_db as vdb_module
-
         config = {
             "repositories": {
                 "BrentLab/harbison": {
@@ -1159,11 +1177,7 @@ class TestEdgeCases:
         non_comparative_card.get_config.return_value = cfg_mock
 
         monkeypatch.setattr(VirtualDB, "_resolve_parquet_files", lambda *a: [])
-        monkeypatch.setattr(
-            vdb_module,
-            "_cached_datacard",
-            lambda repo_id, token=None: non_comparative_card,
-        )
+        _stub_cached_datacard(monkeypatch, card=non_comparative_card)
 
         with pytest.raises(ValueError, match="comparative"):
             VirtualDB(p)
@@ -1179,8 +1193,6 @@ class TestDynamicSampleId:
 
     def test_non_default_sample_id(self, tmp_path, monkeypatch):
         """Views work when sample_id maps to a non-default column."""
-        import labretriever.virtual_db as vdb_module
-
         # Config uses experiment_id as the sample identifier
         config = {
             "repositories": {
@@ -1225,9 +1237,9 @@ class TestDynamicSampleId:
         mock_card.get_field_definitions.return_value = {}
         mock_card.get_experimental_conditions.return_value = {}
         mock_card.get_dataset_schema.return_value = DatasetSchema(
-            data_columns={"experiment_id", "target", "score"},
-            metadata_columns={"regulator"},
-            join_columns=set(),
+            data_columns=frozenset({"experiment_id", "target", "score"}),
+            metadata_columns=frozenset({"regulator"}),
+            join_columns=frozenset(),
             metadata_source="embedded",
             external_metadata_config=None,
             is_partitioned=False,
@@ -1238,11 +1250,7 @@ class TestDynamicSampleId:
             "_resolve_parquet_files",
             lambda self, repo_id, cn: files.get((repo_id, cn), []),
         )
-        monkeypatch.setattr(
-            vdb_module,
-            "_cached_datacard",
-            lambda repo_id, token=None: mock_card,
-        )
+        _stub_cached_datacard(monkeypatch, card=mock_card)
 
         v = VirtualDB(config_path)
 
@@ -1264,8 +1272,6 @@ class TestDynamicSampleId:
     def test_non_default_sample_id_with_collision(self, tmp_path, monkeypatch):
         """When parquet has both gm_id (sample) and sample_id (other col), gm_id is
         renamed to sample_id and sample_id is preserved as sample_id_orig."""
-        import labretriever.virtual_db as vdb_module
-
         config = {
             "repositories": {
                 "TestOrg/collision": {
@@ -1303,9 +1309,9 @@ class TestDynamicSampleId:
         mock_card.get_field_definitions.return_value = {}
         mock_card.get_experimental_conditions.return_value = {}
         mock_card.get_dataset_schema.return_value = DatasetSchema(
-            data_columns={"gm_id", "sample_id", "target", "score"},
-            metadata_columns={"regulator"},
-            join_columns=set(),
+            data_columns=frozenset({"gm_id", "sample_id", "target", "score"}),
+            metadata_columns=frozenset({"regulator"}),
+            join_columns=frozenset(),
             metadata_source="embedded",
             external_metadata_config=None,
             is_partitioned=False,
@@ -1316,11 +1322,7 @@ class TestDynamicSampleId:
             "_resolve_parquet_files",
             lambda self, repo_id, cn: files.get((repo_id, cn), []),
         )
-        monkeypatch.setattr(
-            vdb_module,
-            "_cached_datacard",
-            lambda repo_id, token=None: mock_card,
-        )
+        _stub_cached_datacard(monkeypatch, card=mock_card)
 
         v = VirtualDB(config_path)
 
@@ -1406,8 +1408,6 @@ class TestExternalMetadata:
     def test_external_metadata_join(self, tmp_path, monkeypatch):
         """Meta view JOINs data and metadata parquet when metadata is in a separate
         config."""
-        import labretriever.virtual_db as vdb_module
-
         # Data parquet: measurements with sample_id but no
         # metadata columns like db_id or batch
         data_df = pd.DataFrame(
@@ -1482,14 +1482,16 @@ class TestExternalMetadata:
         # External metadata schema: data cols in data parquet,
         # metadata cols in metadata parquet, joined on sample_id
         card.get_dataset_schema.return_value = DatasetSchema(
-            data_columns={"sample_id", "target_locus_tag", "effect"},
-            metadata_columns={
-                "sample_id",
-                "db_id",
-                "regulator_locus_tag",
-                "background_hops",
-            },
-            join_columns={"sample_id"},
+            data_columns=frozenset({"sample_id", "target_locus_tag", "effect"}),
+            metadata_columns=frozenset(
+                {
+                    "sample_id",
+                    "db_id",
+                    "regulator_locus_tag",
+                    "background_hops",
+                }
+            ),
+            join_columns=frozenset({"sample_id"}),
             metadata_source="external",
             external_metadata_config="sample_metadata",
             is_partitioned=False,
@@ -1500,11 +1502,7 @@ class TestExternalMetadata:
             "_resolve_parquet_files",
             lambda self, repo_id, cfg: parquet_files.get((repo_id, cfg), []),
         )
-        monkeypatch.setattr(
-            vdb_module,
-            "_cached_datacard",
-            lambda repo_id, token=None: card,
-        )
+        _stub_cached_datacard(monkeypatch, card=card)
 
         v = VirtualDB(config_file)
         tables = v.tables()
@@ -1532,8 +1530,6 @@ class TestExternalMetadata:
 
     def test_spaced_alias_in_join_context(self, tmp_path, monkeypatch):
         """Field alias with spaces must be qualified (m.col) in a JOIN, not bare."""
-        import labretriever.virtual_db as vdb_module
-
         data_df = pd.DataFrame(
             {"sample_id": [1, 1, 2, 2], "effect": [1.5, 0.8, 2.1, 0.3]}
         )
@@ -1578,9 +1574,9 @@ class TestExternalMetadata:
         card.get_field_definitions.return_value = {}
         card.get_experimental_conditions.return_value = {}
         card.get_dataset_schema.return_value = DatasetSchema(
-            data_columns={"sample_id", "effect"},
-            metadata_columns={"sample_id", "regulator_locus_tag"},
-            join_columns={"sample_id"},
+            data_columns=frozenset({"sample_id", "effect"}),
+            metadata_columns=frozenset({"sample_id", "regulator_locus_tag"}),
+            join_columns=frozenset({"sample_id"}),
             metadata_source="external",
             external_metadata_config="sample_metadata",
             is_partitioned=False,
@@ -1595,11 +1591,7 @@ class TestExternalMetadata:
             "_resolve_parquet_files",
             lambda self, repo_id, cfg: parquet_files.get((repo_id, cfg), []),
         )
-        monkeypatch.setattr(
-            vdb_module,
-            "_cached_datacard",
-            lambda repo_id, token=None: card,
-        )
+        _stub_cached_datacard(monkeypatch, card=card)
 
         v = VirtualDB(config_file)
         df = v.query("SELECT * FROM chip_meta ORDER BY sample_id")
@@ -1622,8 +1614,6 @@ class TestFactorDtype:
         passed as the FeatureInfo.dtype for the 'category' field in the
         mock DataCard.
         """
-        import labretriever.virtual_db as vdb_module
-
         df = pd.DataFrame(
             {
                 "sample_id": [1, 1, 2, 2],
@@ -1660,9 +1650,9 @@ class TestFactorDtype:
         card.get_experimental_conditions.return_value = {}
         card.get_metadata_config_name.return_value = None
         card.get_dataset_schema.return_value = DatasetSchema(
-            data_columns={"sample_id", "category", "value"},
-            metadata_columns={"sample_id", "category"},
-            join_columns=set(),
+            data_columns=frozenset({"sample_id", "category", "value"}),
+            metadata_columns=frozenset({"sample_id", "category"}),
+            join_columns=frozenset(),
             metadata_source="embedded",
             external_metadata_config=None,
             is_partitioned=False,
@@ -1680,17 +1670,16 @@ class TestFactorDtype:
             ),
         ]
         card.get_features.return_value = feature_list
+        card.get_feature.side_effect = lambda cfg, name: next(
+            (f for f in feature_list if f.name == name), None
+        )
 
         monkeypatch.setattr(
             VirtualDB,
             "_resolve_parquet_files",
             lambda self, repo_id, cn: files.get((repo_id, cn), []),
         )
-        monkeypatch.setattr(
-            vdb_module,
-            "_cached_datacard",
-            lambda repo_id, token=None: card,
-        )
+        _stub_cached_datacard(monkeypatch, card=card)
         return VirtualDB(config_file)
 
     def test_factor_dtype_creates_enum_column(self, tmp_path, monkeypatch):
@@ -1781,8 +1770,6 @@ class TestFactorDtype:
     def test_factor_dtype_orig_suffix_avoids_collision(self, tmp_path, monkeypatch):
         """When <col>_orig already exists in the parquet, the rename uses <col>_orig_1
         instead."""
-        import labretriever.virtual_db as vdb_module
-
         df = pd.DataFrame(
             {
                 "sample_id": [1, 2],
@@ -1824,14 +1811,14 @@ class TestFactorDtype:
         card.get_experimental_conditions.return_value = {}
         card.get_metadata_config_name.return_value = None
         card.get_dataset_schema.return_value = DatasetSchema(
-            data_columns={"sample_id", "category", "category_orig", "value"},
-            metadata_columns={"sample_id", "category", "category_orig"},
-            join_columns=set(),
+            data_columns=frozenset({"sample_id", "category", "category_orig", "value"}),
+            metadata_columns=frozenset({"sample_id", "category", "category_orig"}),
+            join_columns=frozenset(),
             metadata_source="embedded",
             external_metadata_config=None,
             is_partitioned=False,
         )
-        card.get_features.return_value = [
+        feature_list = [
             FeatureInfo(
                 name="category",
                 dtype={"class_label": {"names": ["A", "B"]}},
@@ -1843,17 +1830,17 @@ class TestFactorDtype:
                 description="id",
             ),
         ]
+        card.get_features.return_value = feature_list
+        card.get_feature.side_effect = lambda cfg, name: next(
+            (f for f in feature_list if f.name == name), None
+        )
 
         monkeypatch.setattr(
             VirtualDB,
             "_resolve_parquet_files",
             lambda self, repo_id, cn: files.get((repo_id, cn), []),
         )
-        monkeypatch.setattr(
-            vdb_module,
-            "_cached_datacard",
-            lambda repo_id, token=None: card,
-        )
+        _stub_cached_datacard(monkeypatch, card=card)
         v = VirtualDB(config_file)
 
         result = v.query("SELECT * FROM ds2_meta ORDER BY sample_id")
@@ -1867,8 +1854,6 @@ class TestSpacedAliases:
 
     def _make_vdb(self, tmp_path, monkeypatch, config_extra: dict):
         """Helper: VirtualDB with a single dataset and extra property mappings."""
-        import labretriever.virtual_db as vdb_module
-
         df = pd.DataFrame(
             {
                 "sample_id": [1, 2],
@@ -1902,9 +1887,9 @@ class TestSpacedAliases:
         card.get_experimental_conditions.return_value = {}
         card.get_metadata_config_name.return_value = None
         card.get_dataset_schema.return_value = DatasetSchema(
-            data_columns={"sample_id", "regulator", "condition"},
-            metadata_columns={"sample_id", "regulator", "condition"},
-            join_columns=set(),
+            data_columns=frozenset({"sample_id", "regulator", "condition"}),
+            metadata_columns=frozenset({"sample_id", "regulator", "condition"}),
+            join_columns=frozenset(),
             metadata_source="embedded",
             external_metadata_config=None,
             is_partitioned=False,
@@ -1920,11 +1905,7 @@ class TestSpacedAliases:
             "_resolve_parquet_files",
             lambda self, repo_id, cn: files.get((repo_id, cn), []),
         )
-        monkeypatch.setattr(
-            vdb_module,
-            "_cached_datacard",
-            lambda repo_id, token=None: card,
-        )
+        _stub_cached_datacard(monkeypatch, card=card)
         return VirtualDB(config_file)
 
     def test_field_alias_with_spaces(self, tmp_path, monkeypatch):
@@ -2045,8 +2026,6 @@ class TestGetConditionFieldInfo:
         """A dataset with no Type-A (field-only) alias mapping has no group."""
         import yaml as _yaml
 
-        import labretriever.virtual_db as vdb_module
-
         config = {
             "repositories": {
                 "BrentLab/test": {
@@ -2096,9 +2075,11 @@ class TestGetConditionFieldInfo:
             "pvalue",
         }
         card.get_dataset_schema.return_value = DatasetSchema(
-            data_columns={"sample_id", "target_locus_tag", "effect", "pvalue"},
-            metadata_columns={"sample_id", "condition"},
-            join_columns=set(),
+            data_columns=frozenset(
+                {"sample_id", "target_locus_tag", "effect", "pvalue"}
+            ),
+            metadata_columns=frozenset({"sample_id", "condition"}),
+            join_columns=frozenset(),
             metadata_source="embedded",
             external_metadata_config=None,
             is_partitioned=False,
@@ -2117,11 +2098,7 @@ class TestGetConditionFieldInfo:
             return [str(pq_path)] if repo_id == "BrentLab/test" else []
 
         monkeypatch.setattr(VirtualDB, "_resolve_parquet_files", _fake_resolve)
-        monkeypatch.setattr(
-            vdb_module,
-            "_cached_datacard",
-            lambda repo_id, token=None: card,
-        )
+        _stub_cached_datacard(monkeypatch, card=card)
 
         v = VirtualDB(config_path)
         import warnings
@@ -2141,8 +2118,6 @@ class TestGetConditionFieldInfo:
         """
         import yaml as _yaml
 
-        import labretriever.virtual_db as vdb_module
-
         config = {
             "repositories": {
                 "BrentLab/test2": {
@@ -2204,9 +2179,13 @@ class TestGetConditionFieldInfo:
             "pvalue",
         }
         card.get_dataset_schema.return_value = DatasetSchema(
-            data_columns={"sample_id", "target_locus_tag", "effect", "pvalue"},
-            metadata_columns={"sample_id", "condition", "regulator_locus_tag"},
-            join_columns=set(),
+            data_columns=frozenset(
+                {"sample_id", "target_locus_tag", "effect", "pvalue"}
+            ),
+            metadata_columns=frozenset(
+                {"sample_id", "condition", "regulator_locus_tag"}
+            ),
+            join_columns=frozenset(),
             metadata_source="embedded",
             external_metadata_config=None,
             is_partitioned=False,
@@ -2235,11 +2214,7 @@ class TestGetConditionFieldInfo:
             return [str(pq_path)] if repo_id == "BrentLab/test2" else []
 
         monkeypatch.setattr(VirtualDB, "_resolve_parquet_files", _fake_resolve)
-        monkeypatch.setattr(
-            vdb_module,
-            "_cached_datacard",
-            lambda repo_id, token=None: card,
-        )
+        _stub_cached_datacard(monkeypatch, card=card)
 
         v = VirtualDB(config_path)
         import warnings
@@ -2347,3 +2322,910 @@ class TestGetColumnMetadata:
         meta = vdb.get_column_metadata("harbison")
         assert meta is not None
         assert meta["condition"].level_definitions is None
+
+
+# ------------------------------------------------------------------
+# Tests: get_condition_cube
+# ------------------------------------------------------------------
+
+
+class TestConditionCube:
+    """Tests for VirtualDB.get_condition_cube() and ConditionCube."""
+
+    def test_unknown_db_name_returns_none(self, vdb):
+        """Returns None for an unrecognised dataset name."""
+        assert vdb.get_condition_cube("nonexistent") is None
+
+    def test_comparative_dataset_returns_none(self, vdb):
+        """Comparative datasets have no _meta view and no cube."""
+        assert vdb.get_condition_cube("dto") is None
+
+    def test_default_columns(self, vdb):
+        """Default columns are condition and property cols, not identifiers."""
+        cube = vdb.get_condition_cube("harbison")
+        assert cube is not None
+        assert "carbon_source" in cube.columns
+        assert "temperature_celsius" in cube.columns
+        assert "condition" in cube.columns
+        assert "sample_id" not in cube.columns
+        assert "regulator_locus_tag" not in cube.columns
+
+    def test_counts_sum_to_samples(self, vdb):
+        """Each harbison sample is counted once across the combinations."""
+        cube = vdb.get_condition_cube("harbison")
+        assert cube is not None
+        assert sum(cube.counts) == 4
+
+    def test_remaining_values_unfiltered(self, vdb):
+        """Without a selection every observed value is returned with counts."""
+        cube = vdb.get_condition_cube("harbison", columns=["carbon_source"])
+        assert cube is not None
+        assert cube.remaining_values("carbon_source") == {
+            "glucose": 2,
+            "galactose": 1,
+            "unspecified": 1,
+        }
+
+    def test_remaining_values_with_selection(self, vdb):
+        """Selecting a value constrains the other columns."""
+        cube = vdb.get_condition_cube(
+            "harbison", columns=["carbon_source", "condition"]
+        )
+        assert cube is not None
+        remaining = cube.remaining_values("condition", {"carbon_source": "glucose"})
+        assert remaining == {"YPD": 1, "Acid": 1}
+
+    def test_remaining_values_in_selection(self, vdb):
+        """List selections use IN semantics."""
+        cube = vdb.get_condition_cube(
+            "harbison", columns=["carbon_source", "condition"]
+        )
+        assert cube is not None
+        remaining = cube.remaining_values(
+            "carbon_source", {"condition": ["YPD", "Galactose"]}
+        )
+        assert remaining == {"glucose": 1, "galactose": 1}
+
+    def test_remaining_values_no_match(self, vdb):
+        """A selection that matches nothing returns an empty dict."""
+        cube = vdb.get_condition_cube(
+            "harbison", columns=["carbon_source", "condition"]
+        )
+        assert cube is not None
+        assert cube.remaining_values("condition", {"carbon_source": "maltose"}) == {}
+
+    def test_unknown_column_raises(self, vdb):
+        """Unknown columns raise KeyError at build and lookup time."""
+        with pytest.raises(KeyError):
+            vdb.get_condition_cube("harbison", columns=["nonexistent"])
+        cube = vdb.get_condition_cube("harbison", columns=["carbon_source"])
+        assert cube is not None
+        with pytest.raises(KeyError):
+            cube.remaining_values("carbon_source", {"nonexistent": 1})
+
+    def test_cached_until_revision_changes(self, vdb, monkeypatch):
+        """The cube is reused until the dataset revision changes."""
+        first = vdb.get_condition_cube("harbison")
+        assert vdb.get_condition_cube("harbison") is first
+
+        monkeypatch.setattr(
+            VirtualDB, "_get_dataset_revision", lambda self, db_name: "new-sha"
+        )
+        rebuilt = vdb.get_condition_cube("harbison")
+        assert rebuilt is not first
+        assert rebuilt is not None
+        assert rebuilt.revision == "new-sha"
+
+    def test_revision_from_snapshot_path(self, vdb):
+        """Files in the HF cache report the snapshot commit as revision."""
+        sha = "a" * 40
+        vdb._parquet_files["harbison"] = [
+            f"/cache/datasets--BrentLab--harbison/snapshots/{sha}/data.parquet"
+        ]
+        assert vdb._get_dataset_revision("harbison") == sha
+
+
+# ------------------------------------------------------------------
+# Tests: all_meta cross-dataset view
+# ------------------------------------------------------------------
+
+
+class TestAllMeta:
+    """Tests for the cross-dataset all_meta relation."""
+
+    def test_all_meta_view_created(self, vdb):
+        """all_meta is listed as a public view."""
+        assert "all_meta" in vdb.tables()
+
+    def test_all_meta_columns_are_common_fields(self, vdb):
+        """all_meta has db_name plus the common _meta fields."""
+        fields = vdb.get_fields("all_meta")
+        assert set(fields) == set(vdb.get_common_fields()) | {"db_name"}
+
+    def test_all_meta_rows_per_dataset(self, vdb):
+        """Each primary dataset contributes one row per sample."""
+        df = vdb.query(
+            "SELECT db_name, COUNT(*) AS n FROM all_meta "
+            "GROUP BY db_name ORDER BY db_name"
+        )
+        assert df["db_name"].tolist() == ["harbison", "kemmeren"]
+        assert df["n"].tolist() == [4, 2]
+
+    def test_all_meta_applies_aliases_and_missing_labels(self, vdb):
+        """Factor aliases and missing value labels carry over from _meta."""
+        df = vdb.query(
+            "SELECT DISTINCT carbon_source FROM all_meta WHERE db_name = 'harbison'"
+        )
+        assert set(df["carbon_source"]) == {"glucose", "galactose", "unspecified"}
+
+    def test_all_meta_excludes_comparative(self, vdb):
+        """Comparative datasets are not part of all_meta."""
+        df = vdb.query("SELECT DISTINCT db_name FROM all_meta")
+        assert "dto" not in df["db_name"].tolist()
+
+    def test_materialized_all_meta(self, config_path, parquet_dir, monkeypatch):
+        """materialize_all_meta stores the union in an internal table."""
+        monkeypatch.setattr(
+            VirtualDB,
+            "_resolve_parquet_files",
+            lambda self, repo_id, cfg: parquet_dir.get((repo_id, cfg), []),
+        )
+        _stub_cached_datacard(monkeypatch)
+        v = VirtualDB(config_path, materialize_all_meta=True)
+        tables = v.query(
+            "SELECT table_name FROM information_schema.tables "
+            "WHERE table_type = 'BASE TABLE'"
+        )
+        assert "__all_meta" in tables["table_name"].tolist()
+        assert len(v.query("SELECT * FROM all_meta")) == 6
+
+
+# ------------------------------------------------------------------
+# Tests: global sample index
+# ------------------------------------------------------------------
+
+
+class TestSampleIndex:
+    """Tests for build_sample_index() and find_samples()."""
+
+    def test_samples_view_created(self, vdb):
+        """The index is built on first use and exposed as the 'samples' view."""
+        assert "samples" not in vdb.tables()
+        vdb.find_samples("1")
+        assert "samples" in vdb.tables()
+        fields = vdb.get_fields("samples")
+        assert fields == ["db_name", "field", "sample_id", "value"]
+
+    def test_index_uses_enum_encoding(self, vdb):
+        """db_name and field are dictionary encoded as ENUMs."""
+        vdb.build_sample_index()
+        df = vdb.describe("samples").set_index("column_name")
+        assert df.loc["db_name", "column_type"].startswith("ENUM")
+        assert df.loc["field", "column_type"].startswith("ENUM")
+
+    def test_find_by_sample_id(self, vdb):
+        """A sample_id resolves to its dataset."""
+        df = vdb.find_samples("10", field="sample_id")
+        assert df["db_name"].tolist() == ["kemmeren"]
+        assert df["sample_id"].tolist() == ["10"]
+
+    def test_find_by_regulator_across_datasets(self, vdb):
+        """A regulator locus tag resolves to samples in every dataset."""
+        df = vdb.find_samples("YBR049C")
+        assert set(df["field"]) == {"regulator_locus_tag"}
+        pairs = set(zip(df["db_name"], df["sample_id"]))
+        assert pairs == {("harbison", "1"), ("harbison", "3"), ("kemmeren", "10")}
+
+    def test_find_multiple_values(self, vdb):
+        """A list of values is looked up in one probe."""
+        df = vdb.find_samples(["1", "11"], field="sample_id")
+        assert set(zip(df["db_name"], df["sample_id"])) == {
+            ("harbison", "1"),
+            ("kemmeren", "11"),
+        }
+
+    def test_find_unknown_value_returns_empty(self, vdb):
+        """Unknown identifiers return an empty DataFrame."""
+        df = vdb.find_samples("nope")
+        assert df.empty
+        assert list(df.columns) == ["db_name", "sample_id", "field", "value"]
+
+    def test_extra_fields(self, vdb):
+        """extra_fields adds non-role columns to the index."""
+        assert vdb.find_samples("REB1").empty
+        vdb.build_sample_index(extra_fields=["regulator_symbol"])
+        df = vdb.find_samples("REB1", field="regulator_symbol")
+        assert set(df["db_name"]) == {"harbison", "kemmeren"}
+
+
+# ------------------------------------------------------------------
+# Tests: identifier index and find_rows
+# ------------------------------------------------------------------
+
+
+class TestIdentifierIndex:
+    """Tests for get_identifier_index() and find_rows()."""
+
+    def test_index_covers_identifier_and_sample_columns(self, vdb):
+        """Role-tagged and sample id columns present in the parquet are indexed."""
+        index = vdb.get_identifier_index("harbison")
+        assert index is not None
+        assert "regulator_locus_tag" in index.columns
+        assert "sample_id" in index.columns
+
+    def test_index_none_without_files(self, vdb):
+        """Datasets without parquet files have no index."""
+        assert vdb.get_identifier_index("nonexistent") is None
+
+    def test_find_rows_by_regulator(self, vdb):
+        """Regulator lookups return matching rows from every dataset."""
+        hits = vdb.find_rows(regulator="YBR049C")
+        assert set(hits) == {"harbison", "kemmeren"}
+        assert len(hits["harbison"]) == 4
+        assert set(hits["harbison"]["regulator_locus_tag"]) == {"YBR049C"}
+        assert len(hits["kemmeren"]) == 2
+
+    def test_find_rows_restricted_db_names(self, vdb):
+        """db_names limits the datasets searched."""
+        hits = vdb.find_rows(regulator="YBR049C", db_names=["kemmeren"])
+        assert set(hits) == {"kemmeren"}
+
+    def test_find_rows_requires_identifier(self, vdb):
+        """Calling without regulator or target raises ValueError."""
+        with pytest.raises(ValueError):
+            vdb.find_rows()
+
+    def test_find_rows_skips_datasets_without_role(self, vdb):
+        """Datasets without target_identifier columns are omitted."""
+        assert vdb.find_rows(target="YAL001C") == {}
+
+    def test_find_rows_scans_only_candidate_files(self, vdb, tmp_path, monkeypatch):
+        """Files whose row groups cannot contain the value are not scanned."""
+        df = vdb.query("SELECT * FROM __harbison_parquet")
+        paths = []
+        for reg in ("YBR049C", "YDR463W"):
+            path = tmp_path / f"harbison_{reg}.parquet"
+            _write_parquet(path, df[df["regulator_locus_tag"] == reg])
+            paths.append(str(path))
+        vdb._parquet_files["harbison"] = paths
+        vdb._identifier_indexes.clear()
+
+        scanned: list[str] = []
+        original_execute = vdb._conn.execute
+
+        class _Recorder:
+            def execute(self, sql, *args):
+                if "read_parquet" in sql:
+                    scanned.append(sql)
+                return original_execute(sql, *args)
+
+            def __getattr__(self, name):
+                return getattr(vdb._conn, name)
+
+        conn = vdb._conn
+        monkeypatch.setattr(vdb, "_conn", _Recorder())
+        try:
+            hits = vdb.find_rows(regulator="YDR463W", db_names=["harbison"])
+        finally:
+            vdb._conn = conn
+        assert set(hits["harbison"]["regulator_locus_tag"]) == {"YDR463W"}
+        assert len(scanned) == 1
+        assert paths[1] in scanned[0]
+        assert paths[0] not in scanned[0]
+
+
+# ------------------------------------------------------------------
+# Tests: to_matrix
+# ------------------------------------------------------------------
+
+
+class TestToMatrix:
+    """Tests for VirtualDB.to_matrix()."""
+
+    def test_dense_mean_of_duplicates(self, vdb):
+        """Duplicate regulator/target pairs are averaged."""
+        m = vdb.to_matrix("harbison", "effect", col_col="target_locus_tag")
+        assert isinstance(m, DenseMatrix)
+        assert m.row_axis == "regulator_locus_tag"
+        assert list(m.row_labels) == ["YBR049C", "YDR463W"]
+        assert list(m.col_labels) == ["YAL001C", "YAL002W", "YAL003W"]
+        np.testing.assert_allclose(m.values, [[1.5, 1.0, 0.9], [1.35, 1.0, 0.3]])
+
+    def test_sparse_matches_dense(self, vdb):
+        """The CSR result expands to the dense result."""
+        dense = vdb.to_matrix("kemmeren", "effect", col_col="target_locus_tag")
+        csr = vdb.to_matrix(
+            "kemmeren", "effect", col_col="target_locus_tag", sparse=True
+        )
+        assert isinstance(csr, CSRMatrix)
+        assert csr.nnz == 4
+        np.testing.assert_array_equal(csr.to_dense().values, dense.values)
+        assert np.isnan(dense.values).sum() == 2
+
+    def test_where_and_agg(self, vdb):
+        """Filters with parameters and alternative aggregates are applied."""
+        m = vdb.to_matrix(
+            "harbison",
+            "effect",
+            col_col="target_locus_tag",
+            agg="count",
+            where="carbon_source = $cs",
+            params={"cs": "glucose"},
+        )
+        assert list(m.row_labels) == ["YBR049C"]
+        np.testing.assert_array_equal(m.values, [[1.0, 2.0, 1.0]])
+
+    def test_missing_target_role_requires_col(self, vdb):
+        """Without a target_identifier role the column axis must be given."""
+        with pytest.raises(ValueError, match="col_col"):
+            vdb.to_matrix("harbison", "effect")
+
+    def test_invalid_arguments(self, vdb):
+        """Unknown datasets, aggregates and columns are rejected."""
+        with pytest.raises(ValueError):
+            vdb.to_matrix("nonexistent", "effect", "a", "b")
+        with pytest.raises(ValueError, match="agg"):
+            vdb.to_matrix("harbison", "effect", col_col="target_locus_tag", agg="x")
+        with pytest.raises(KeyError):
+            vdb.to_matrix("harbison", "nope", col_col="target_locus_tag")
+
+    def test_cache_is_mmap_and_keyed_by_revision(self, vdb, tmp_path, monkeypatch):
+        """Cached matrices are reused memory-mapped until the revision changes."""
+        kwargs = dict(col_col="target_locus_tag", cache=True, cache_dir=tmp_path)
+        first = vdb.to_matrix("harbison", "effect", **kwargs)
+        assert isinstance(first.values, np.memmap)
+
+        def fail(*args, **kw):
+            raise AssertionError("matrix was rebuilt")
+
+        monkeypatch.setattr("labretriever.virtual_db.build_matrix", fail)
+        second = vdb.to_matrix("harbison", "effect", **kwargs)
+        np.testing.assert_array_equal(first.values, second.values)
+
+        monkeypatch.setattr(vdb, "_get_dataset_revision", lambda db: "newrev")
+        with pytest.raises(AssertionError, match="rebuilt"):
+            vdb.to_matrix("harbison", "effect", **kwargs)
+
+
+# ------------------------------------------------------------------
+# Tests: genomic region queries
+# ------------------------------------------------------------------
+
+
+def _make_pileup_datacard(repo_id):
+    """Mock DataCard for a hive-partitioned genome_map pileup dataset."""
+    card = MagicMock()
+    config_mock = MagicMock()
+    config_mock.metadata_fields = ["accession"]
+    config_mock.dataset_type = DatasetType.GENOME_MAP
+    card.get_config.return_value = config_mock
+    card.get_field_definitions.return_value = {}
+    card.get_experimental_conditions.return_value = {}
+    card.get_metadata_fields.return_value = ["accession"]
+    card.get_metadata_config_name.return_value = None
+    card.get_features.return_value = [
+        FeatureInfo(name="seqnames", dtype="string", description="Chromosome"),
+        FeatureInfo(name="start", dtype="int32", description="Start position"),
+        FeatureInfo(name="end", dtype="int32", description="End position"),
+        FeatureInfo(name="pileup", dtype="int32", description="Read depth"),
+        FeatureInfo(name="accession", dtype="string", description="Accession"),
+    ]
+    card.get_dataset_schema.return_value = DatasetSchema(
+        data_columns=frozenset({"sample_id", "seqnames", "start", "end", "pileup"}),
+        metadata_columns=frozenset({"accession"}),
+        join_columns=frozenset(),
+        metadata_source="embedded",
+        external_metadata_config=None,
+        is_partitioned=True,
+    )
+    return card
+
+
+@pytest.fixture()
+def pileup_vdb(tmp_path, monkeypatch):
+    """
+    VirtualDB over a genome_map dataset partitioned by sample_id.
+
+    Each of the two samples has 10,000 positions on chrI and chrII, sorted by
+    chromosome and position, written in row groups of 2048 rows. The files live
+    under a directory with a single quote in its name.
+
+    """
+    conn = duckdb.connect(":memory:")
+    files = []
+    for sample in (1, 2):
+        path = tmp_path / "o'brien" / f"sample_id={sample}" / "part-0.parquet"
+        path.parent.mkdir(parents=True)
+        conn.execute(
+            f"""
+            COPY (
+                SELECT
+                    'chr' || c AS seqnames,
+                    CAST(i AS INTEGER) AS start,
+                    CAST(i + 1 AS INTEGER) AS "end",
+                    CAST((i * {sample}) % 7 AS INTEGER) AS pileup,
+                    'SRR{sample}' AS accession
+                FROM (VALUES ('I'), ('II')) chroms(c), range(10000) t(i)
+                ORDER BY seqnames, start
+            ) TO '{str(path).replace("'", "''")}' (FORMAT PARQUET, ROW_GROUP_SIZE 2048)
+            """
+        )
+        files.append(str(path))
+    conn.close()
+
+    config = {
+        "repositories": {
+            "BrentLab/pileup": {
+                "dataset": {
+                    "genome_map": {
+                        "db_name": "pileup",
+                        "sample_id": {"field": "sample_id"},
+                    }
+                }
+            }
+        }
+    }
+    config_path = tmp_path / "pileup_config.yaml"
+    config_path.write_text(yaml.dump(config))
+
+    monkeypatch.setattr(
+        VirtualDB, "_resolve_parquet_files", lambda self, repo_id, cfg: files
+    )
+    _stub_cached_datacard(monkeypatch, factory=_make_pileup_datacard)
+    return VirtualDB(config_path)
+
+
+class TestRegionQuery:
+    """Tests for coordinate detection, region_row_groups() and region_query()."""
+
+    def test_coordinate_columns_from_features(self, pileup_vdb, vdb):
+        """Coordinate columns are detected by DataCard feature name."""
+        assert pileup_vdb.get_coordinate_columns("pileup") == (
+            "seqnames",
+            "start",
+            "end",
+        )
+        assert vdb.get_coordinate_columns("harbison") is None
+
+    def test_region_query_overlap(self, pileup_vdb):
+        """Records overlapping the half-open region are returned."""
+        df = pileup_vdb.region_query("pileup", "chrII", 1000, 1500)
+        assert len(df) == 1000  # 500 positions x 2 samples
+        assert set(df["seqnames"]) == {"chrII"}
+        assert df["start"].min() == 1000
+        assert df["start"].max() == 1499
+
+    def test_region_query_samples(self, pileup_vdb):
+        """samples restricts the result to the given samples."""
+        df = pileup_vdb.region_query(
+            "pileup", "chrII", 1000, 1500, samples=[2], columns=["start", "pileup"]
+        )
+        assert list(df.columns) == ["start", "pileup"]
+        assert len(df) == 500
+        assert pileup_vdb.region_query("pileup", "chrII", 1, 2, samples=[]).empty
+
+    def test_row_groups_pruned(self, pileup_vdb):
+        """Only overlapping row groups of the requested partition are kept."""
+        index = pileup_vdb.get_coordinate_index("pileup")
+        refs = pileup_vdb.region_row_groups("pileup", "chrII", 1000, 1500, samples=[1])
+        assert 0 < len(refs) <= 2
+        assert len(index.row_groups) == 20
+        assert {Path(r.file).parent.name for r in refs} == {"sample_id=1"}
+
+    def test_absent_region(self, pileup_vdb):
+        """Regions outside the data return an empty frame with the columns."""
+        df = pileup_vdb.region_query("pileup", "chrXVI", 0, 100)
+        assert df.empty
+        assert "pileup" in df.columns
+
+    def test_errors(self, pileup_vdb, vdb):
+        """Datasets without coordinates and inverted regions raise."""
+        with pytest.raises(ValueError, match="coordinate"):
+            vdb.region_query("harbison", "chrI", 0, 10)
+        with pytest.raises(ValueError, match="before start"):
+            pileup_vdb.region_query("pileup", "chrI", 10, 0)
+
+
+class TestOffline:
+    """Tests for VirtualDB offline mode."""
+
+    def test_resolve_uses_local_snapshot(self, vdb, tmp_path):
+        """Offline, only the local snapshot is used and misses raise clearly."""
+        from huggingface_hub.errors import LocalEntryNotFoundError
+
+        vdb.offline = True
+        card = MagicMock()
+        card.get_config.return_value.data_files = [MagicMock(path="data.parquet")]
+        (tmp_path / "data.parquet").write_bytes(b"")
+        with (
+            patch("labretriever.virtual_db.DataCard", return_value=card),
+            patch(
+                "huggingface_hub.snapshot_download", return_value=str(tmp_path)
+            ) as mock_download,
+        ):
+            files = _RESOLVE_PARQUET_FILES(vdb, "BrentLab/harbison", "harbison_2004")
+            assert files == [str(tmp_path / "data.parquet")]
+            assert mock_download.call_args.kwargs["local_files_only"] is True
+
+            mock_download.side_effect = LocalEntryNotFoundError("not cached")
+            with pytest.raises(HfOfflineError, match="offline mode"):
+                _RESOLVE_PARQUET_FILES(vdb, "BrentLab/harbison", "harbison_2004")
+
+
+class TestPinnedRevisions:
+    """Tests for revisions pinned in the VirtualDB config."""
+
+    PINNED = "d" * 40
+
+    def test_resolve_uses_dataset_revision(self, vdb, tmp_path):
+        """The card and files of a dataset are read at its pinned revision."""
+        repo_cfg = vdb.config.repositories["BrentLab/harbison"]
+        repo_cfg.revision = "main"
+        repo_cfg.dataset["harbison_2004"].revision = self.PINNED
+        card = MagicMock()
+        card.get_config.return_value.data_files = [MagicMock(path="data.parquet")]
+        with (
+            patch("labretriever.virtual_db.DataCard", return_value=card) as mock_card,
+            patch(
+                "huggingface_hub.snapshot_download", return_value=str(tmp_path)
+            ) as mock_download,
+        ):
+            _RESOLVE_PARQUET_FILES(vdb, "BrentLab/harbison", "harbison_2004")
+
+        assert mock_card.call_args.kwargs["revision"] == self.PINNED
+        assert mock_download.call_args.kwargs["revision"] == self.PINNED
+
+    def test_datacards_loaded_at_repo_revision(self, vdb, monkeypatch):
+        """DataCards are created with their repository's revision."""
+        import labretriever.virtual_db as vdb_module
+
+        vdb.config.repositories["BrentLab/harbison"].revision = self.PINNED
+        revisions = {}
+
+        def factory(repo_id, **kwargs):
+            revisions[repo_id] = kwargs["revision"]
+            return _make_mock_datacard(repo_id)
+
+        monkeypatch.setattr(vdb_module, "_cached_datacard", factory)
+        vdb._load_datacards()
+
+        assert revisions["BrentLab/harbison"] == self.PINNED
+        assert all(
+            revision is None
+            for repo_id, revision in revisions.items()
+            if repo_id != "BrentLab/harbison"
+        )
+
+    def test_dataset_revision_card(self, vdb, monkeypatch):
+        """A dataset pinned apart from its repository uses the card at its revision."""
+        import labretriever.virtual_db as vdb_module
+
+        repo_cfg = vdb.config.repositories["BrentLab/harbison"]
+        repo_cfg.dataset["harbison_2004"].revision = self.PINNED
+        cards = {}
+
+        def factory(repo_id, **kwargs):
+            card = _make_mock_datacard(repo_id)
+            cards[(repo_id, kwargs["revision"])] = card
+            return card
+
+        monkeypatch.setattr(vdb_module, "_cached_datacard", factory)
+        vdb._load_datacards()
+
+        pinned = cards[("BrentLab/harbison", self.PINNED)]
+        assert vdb._datacard("BrentLab/harbison", "harbison_2004") is pinned
+        # No dataset is read at the repository revision
+        assert ("BrentLab/harbison", None) not in cards
+        assert "BrentLab/harbison" not in vdb.datacards
+
+
+class TestRefresh:
+    """Tests for VirtualDB.refresh()."""
+
+    OLD = "a" * 40
+    NEW = "b" * 40
+
+    @pytest.fixture()
+    def setup(self, config_path, parquet_dir, monkeypatch):
+        """
+        A VirtualDB whose resolved files and upstream commits can be changed.
+
+        DataCards are created once per repository so that an unchanged
+        repository keeps equal configs.
+
+        """
+        files = dict(parquet_dir)
+        commits: dict[str, str] = {}
+        cards = {}
+
+        def card_for(repo_id):
+            if repo_id not in cards:
+                cards[repo_id] = _make_mock_datacard(repo_id)
+            return cards[repo_id]
+
+        def resolve(vdb, repo_id, config_name):
+            commit = commits.get(repo_id, self.OLD)
+            vdb._resolved_commits[(repo_id, config_name)] = commit
+            return files.get((repo_id, config_name), [])
+
+        monkeypatch.setattr(VirtualDB, "_resolve_parquet_files", resolve)
+        monkeypatch.setattr(
+            VirtualDB,
+            "_current_commit",
+            lambda vdb, repo_id, revision: commits.get(repo_id, self.OLD),
+        )
+        _stub_cached_datacard(monkeypatch, factory=card_for)
+        vdb = VirtualDB(config_path)
+        return vdb, files, commits
+
+    def _rewrite_harbison(self, files, tmp_path):
+        """Point harbison at new files holding only samples 1 and 2."""
+        key = ("BrentLab/harbison", "harbison_2004")
+        df = duckdb.sql(
+            f"SELECT * FROM read_parquet('{files[key][0]}') WHERE sample_id <= 2"
+        ).df()
+        files[key] = [_write_parquet(tmp_path / "harbison_new.parquet", df)]
+
+    def test_unchanged_contents_keep_views(self, setup):
+        """A moved repository with identical files and config is not rebuilt."""
+        vdb, files, commits = setup
+        views = vdb._parquet_files.copy()
+        commits["BrentLab/harbison"] = self.NEW
+
+        assert vdb.refresh() == []
+        assert vdb._parquet_files == views
+        assert vdb._checked_revisions["harbison"] == self.NEW
+
+    def test_nothing_moved(self, setup):
+        """Datasets at their recorded commit are not resolved again."""
+        vdb, files, commits = setup
+        with patch.object(VirtualDB, "_stage_refresh") as mock_stage:
+            assert vdb.refresh() == []
+        mock_stage.assert_not_called()
+
+    def test_changed_dataset_replaced(self, setup, tmp_path):
+        """Only the changed dataset and its dependent views are re-registered."""
+        vdb, files, commits = setup
+        kemmeren_files = vdb._parquet_files["kemmeren"]
+        self._rewrite_harbison(files, tmp_path)
+        commits["BrentLab/harbison"] = self.NEW
+
+        with patch.object(
+            VirtualDB,
+            "_register_views",
+            autospec=True,
+            side_effect=VirtualDB._register_views,
+        ) as mock_register:
+            assert vdb.refresh() == ["harbison"]
+
+        mock_register.assert_called_once()
+        assert set(mock_register.call_args.args[1]) == {"harbison", "dto"}
+        assert vdb._parquet_files["kemmeren"] == kemmeren_files
+        assert vdb.query("SELECT COUNT(*) AS n FROM harbison").iloc[0]["n"] == 4
+        assert len(vdb.query("SELECT * FROM harbison_meta")) == 2
+        assert set(vdb.query("SELECT db_name FROM all_meta")["db_name"]) == {
+            "harbison",
+            "kemmeren",
+        }
+        found = vdb.find_samples("3")
+        assert "harbison" not in set(found["db_name"].astype(str))
+
+    def test_reads_wait_for_swap(self, setup, tmp_path):
+        """Reads from other threads during the swap wait for it to commit."""
+        vdb, files, commits = setup
+        self._rewrite_harbison(files, tmp_path)
+        commits["BrentLab/harbison"] = self.NEW
+        readers = {
+            "query": lambda: len(vdb.query("SELECT * FROM harbison")),
+            "find_samples": lambda: "harbison"
+            in set(vdb.find_samples("3")["db_name"].astype(str)),
+            "describe": lambda: len(vdb.describe("harbison")),
+            "get_fields": lambda: "sample_id" in vdb.get_fields("harbison_meta"),
+        }
+        results: dict[str, Any] = {}
+        threads: list[threading.Thread] = []
+
+        def read(name):
+            try:
+                results[name] = readers[name]()
+            except Exception as exc:
+                results[name] = exc
+
+        original = VirtualDB._register_replaced_views
+
+        def swap(self, db_names, files):
+            original(self, db_names, files)
+            for name in readers:
+                threads.append(threading.Thread(target=read, args=(name,)))
+                threads[-1].start()
+            for thread in threads:
+                thread.join(timeout=0.05)
+            # Still inside the transaction: no reader got through
+            assert results == {}
+
+        with patch.object(VirtualDB, "_register_replaced_views", swap):
+            assert vdb.refresh() == ["harbison"]
+        for thread in threads:
+            thread.join()
+
+        assert results == {
+            "query": 4,
+            "find_samples": False,
+            "describe": len(vdb.describe("harbison")),
+            "get_fields": True,
+        }
+
+    def test_refresh_selected_datasets(self, setup, tmp_path):
+        """Only the named datasets are checked."""
+        vdb, files, commits = setup
+        self._rewrite_harbison(files, tmp_path)
+        commits["BrentLab/harbison"] = self.NEW
+
+        assert vdb.refresh(["kemmeren"]) == []
+        assert vdb.refresh(["harbison"]) == ["harbison"]
+
+    def test_unknown_dataset(self, setup):
+        """Unknown dataset names are rejected."""
+        vdb, _, _ = setup
+        with pytest.raises(ValueError, match="nonexistent"):
+            vdb.refresh(["nonexistent"])
+
+    def test_failed_swap_rolled_back(self, setup, tmp_path):
+        """If re-registering fails, the previous views and state are kept."""
+        vdb, files, commits = setup
+        old_files = vdb._parquet_files["harbison"]
+        self._rewrite_harbison(files, tmp_path)
+        commits["BrentLab/harbison"] = self.NEW
+
+        with patch.object(
+            VirtualDB, "_register_meta_view", side_effect=RuntimeError("boom")
+        ):
+            with pytest.raises(RuntimeError, match="boom"):
+                vdb.refresh()
+
+        assert vdb._parquet_files["harbison"] == old_files
+        assert len(vdb.query("SELECT * FROM harbison_meta")) == 4
+        assert vdb._checked_revisions["harbison"] == self.OLD
+        # The next refresh tries again
+        assert vdb.refresh() == ["harbison"]
+
+    def test_same_files_follows_symlinks(self, tmp_path):
+        """Snapshots linking to the same blob hold the same file."""
+        from labretriever.virtual_db import _same_files
+
+        blob = tmp_path / "blob"
+        blob.write_bytes(b"data")
+        links = []
+        for sha in (self.OLD, self.NEW):
+            snapshot = tmp_path / "snapshots" / sha
+            snapshot.mkdir(parents=True)
+            (snapshot / "data.parquet").symlink_to(blob)
+            links.append(str(snapshot / "data.parquet"))
+
+        assert _same_files([links[0]], [links[1]])
+        assert not _same_files([links[0]], [str(tmp_path / "other")])
+
+    def test_current_commit(self, vdb):
+        """Branches are resolved on the Hub; commit shas are used as is."""
+        with patch.object(
+            HfRepoStructureFetcher, "fetch", return_value={"sha": self.NEW}
+        ) as mock_fetch:
+            assert vdb._current_commit("BrentLab/harbison", self.OLD) == self.OLD
+            mock_fetch.assert_not_called()
+            assert vdb._current_commit("BrentLab/harbison", None) == self.NEW
+
+        mock_fetch.assert_called_once_with(
+            "BrentLab/harbison", force_refresh=True, revision=None
+        )
+
+    def test_current_commit_unknown(self, vdb):
+        """A failed check leaves the dataset alone."""
+        with patch.object(
+            HfRepoStructureFetcher, "fetch", side_effect=HfOfflineError("offline")
+        ):
+            assert vdb._current_commit("BrentLab/harbison", None) is None
+
+
+class TestPlanPartitions:
+    """Tests for VirtualDB.plan_partitions()."""
+
+    def test_plan(self, vdb, monkeypatch):
+        """The listing is restricted to the dataset's data_files."""
+        card = MagicMock()
+        card.get_config.return_value.data_files = [
+            MagicMock(path="binding/*/*.parquet")
+        ]
+        _stub_cached_datacard(monkeypatch, card=card)
+        listing = RepoListing.from_entries(
+            "BrentLab/harbison",
+            [
+                ("binding/regulator=GAL4/part-0.parquet", 10, True),
+                ("binding/regulator=CBF1/part-0.parquet", 20, True),
+                ("binding/regulator=GAL4/notes.txt", 1, False),
+            ],
+            path_prefix="binding/",
+        )
+        with patch.object(
+            HfRepoStructureFetcher, "list_files", return_value=listing
+        ) as mock_list:
+            plan = vdb.plan_partitions("harbison", {"regulator": "GAL4"})
+
+        mock_list.assert_called_once_with(
+            "BrentLab/harbison",
+            path_prefix="binding/",
+            force_refresh=False,
+            revision=None,
+        )
+        assert plan.files == ("binding/regulator=GAL4/part-0.parquet",)
+        assert plan.total_bytes == 10
+
+    def test_unknown_dataset(self, vdb):
+        """Unknown db_names raise."""
+        with pytest.raises(ValueError, match="Unknown dataset"):
+            vdb.plan_partitions("nope")
+
+
+# ------------------------------------------------------------------
+# Tests: optimized parquet copies
+# ------------------------------------------------------------------
+
+
+class TestOptimizeParquet:
+    """Tests for VirtualDB(optimize_parquet=True)."""
+
+    @pytest.fixture()
+    def optimized(self, vdb, config_path, tmp_path):
+        """An optimized VirtualDB next to the plain one from ``vdb``."""
+        opt = VirtualDB(
+            config_path,
+            optimize_parquet=True,
+            optimized_cache_dir=tmp_path / "optimized",
+        )
+        return vdb, opt
+
+    def test_views_read_optimized_copy(self, optimized, tmp_path):
+        """Views point at the optimized copy and return the same rows."""
+        plain, opt = optimized
+        for files in (opt._parquet_files[n] for n in ("harbison", "kemmeren")):
+            assert files
+            assert all(f.startswith(str(tmp_path / "optimized")) for f in files)
+        sql = "SELECT * FROM harbison ORDER BY sample_id, target_locus_tag"
+        pd.testing.assert_frame_equal(
+            plain.query(sql), opt.query(sql), check_dtype=False
+        )
+
+    def test_revision_is_source_revision(self, optimized):
+        """Revision-keyed caches see the revision of the source files."""
+        plain, opt = optimized
+        assert opt._get_dataset_revision("harbison") == (
+            plain._get_dataset_revision("harbison")
+        )
+
+    def test_copy_reused(self, optimized, config_path, tmp_path):
+        """A second VirtualDB reuses the existing optimized copy."""
+        _, opt = optimized
+        first = opt._parquet_files["harbison"][0]
+        mtime = Path(first).stat().st_mtime_ns
+        again = VirtualDB(
+            config_path,
+            optimize_parquet=True,
+            optimized_cache_dir=tmp_path / "optimized",
+        )
+        assert again._parquet_files["harbison"][0] == first
+        assert Path(first).stat().st_mtime_ns == mtime
+
+    def test_genome_map_sorted_by_position(self, pileup_vdb, tmp_path):
+        """genome_map copies are sorted by chromosome and start."""
+        opt = VirtualDB(
+            tmp_path / "pileup_config.yaml",
+            optimize_parquet=True,
+            optimized_cache_dir=tmp_path / "optimized",
+        )
+        files = opt._parquet_files["pileup"]
+        assert files != pileup_vdb._parquet_files["pileup"]
+        df = opt.query("SELECT seqnames, start FROM __pileup_parquet")
+        assert list(df.itertuples(index=False)) == sorted(df.itertuples(index=False))
+        # both samples' chrII:1000-1500 rows now share one or two row groups
+        refs = opt.region_row_groups("pileup", "chrII", 1000, 1500)
+        assert 0 < len(refs) <= 2
+        assert len(opt.region_query("pileup", "chrII", 1000, 1500)) == 1000
@@ -42,10 +42,15 @@ Example Usage::
 
 from __future__ import annotations
 
+import hashlib
 import logging
+import os
 import re
+import threading
 import warnings
-from dataclasses import dataclass
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from functools import lru_cache
 from pathlib import Path
 from typing import Any
@@ -54,8 +59,29 @@ import duckdb
 import pandas as pd
 from duckdb import BinderException
 
+from labretriever.constants import LABRETRIEVER_CACHE_DIR, resolve_offline
 from labretriever.datacard import DataCard, DatasetSchema
+from labretriever.errors import HfDataFetchError, HfOfflineError
+from labretriever.fetch_cache import get_fetch_cache
+from labretriever.fetchers import HfRepoStructureFetcher, is_commit_sha
+from labretriever.matrix import (
+    CSRMatrix,
+    DenseMatrix,
+    build_matrix,
+    load_matrix,
+    save_matrix,
+)
 from labretriever.models import DatasetType, MetadataConfig
+from labretriever.nested_path import compile_path
+from labretriever.parquet_compaction import (
+    DEFAULT_FILE_SIZE_BYTES,
+    DEFAULT_ROW_GROUP_SIZE,
+    compact_parquet,
+    sql_file_list,
+)
+from labretriever.partition_plan import PartitionPlan
+from labretriever.rate_limit import Priority, get_request_scheduler
+from labretriever.row_group_index import RowGroupIndex, RowGroupRef
 
 logger = logging.getLogger(__name__)
 
@@ -79,6 +105,106 @@ class ColumnMeta:
     level_definitions: dict[str, str] | None = None
 
 
+@dataclass
+class ConditionCube:
+    """
+    Precomputed co-occurrence counts for the filterable columns of a dataset.
+
+    One entry per distinct combination of values in ``columns`` found in the
+    ``<db_name>_meta`` view, with the number of samples carrying that combination. An
+    inverted index (column -> value -> combination positions) is built on construction
+    so cascading filter questions such as "which temperatures remain given
+    carbon_source=glucose" are answered in memory without querying DuckDB.
+
+    :param columns: Names of the columns covered by the cube.
+    :param combinations: Distinct value tuples, aligned with ``columns``.
+    :param counts: Number of samples for each entry in ``combinations``.
+    :param revision: Revision of the dataset the cube was built from. Used by
+        :meth:`VirtualDB.get_condition_cube` to decide when to rebuild.
+
+    """
+
+    columns: tuple[str, ...]
+    combinations: list[tuple[Any, ...]]
+    counts: list[int]
+    revision: str | None = None
+    _postings: list[dict[Any, set[int]]] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self._postings = [{} for _ in self.columns]
+        for row, combo in enumerate(self.combinations):
+            for i, value in enumerate(combo):
+                self._postings[i].setdefault(value, set()).add(row)
+
+    def _column_index(self, column: str) -> int:
+        try:
+            return self.columns.index(column)
+        except ValueError:
+            raise KeyError(
+                f"Column '{column}' is not part of this cube. "
+                f"Available columns: {list(self.columns)}"
+            ) from None
+
+    def values(self, column: str) -> list[Any]:
+        """
+        Return all values observed for a column.
+
+        :param column: Column name
+        :return: Values in the order they first appear in the cube
+        :raises KeyError: If ``column`` is not part of the cube
+
+        """
+        return list(self._postings[self._column_index(column)])
+
+    def remaining_values(
+        self, column: str, selected: dict[str, Any] | None = None
+    ) -> dict[Any, int]:
+        """
+        Return the values of ``column`` compatible with the current selection.
+
+        :param column: Column whose remaining values are requested
+        :param selected: Mapping of column name to the selected value. A list,
+            tuple or set selects any of its members (``IN`` semantics).
+            Selections on ``column`` itself are ignored so a UI can show all
+            alternatives to the current choice.
+        :return: Dict mapping each remaining value to its sample count
+        :raises KeyError: If ``column`` or any selected column is not part of
+            the cube
+
+        Example::
+
+            cube = vdb.get_condition_cube("harbison")
+            cube.remaining_values(
+                "temperature_celsius", {"carbon_source": "glucose"}
+            )
+            # {30.0: 2}
+
+        """
+        target = self._column_index(column)
+        rows: set[int] | None = None
+        for sel_col, sel_val in (selected or {}).items():
+            idx = self._column_index(sel_col)
+            if idx == target:
+                continue
+            postings = self._postings[idx]
+            if isinstance(sel_val, (list, tuple, set, frozenset)):
+                matched: set[int] = set()
+                for v in sel_val:
+                    matched |= postings.get(v, set())
+            else:
+                matched = postings.get(sel_val, set())
+            rows = matched if rows is None else rows & matched
+            if not rows:
+                return {}
+
+        result: dict[Any, int] = {}
+        candidates = range(len(self.combinations)) if rows is None else sorted(rows)
+        for row in candidates:
+            value = self.combinations[row][target]
+            result[value] = result.get(value, 0) + self.counts[row]
+        return result
+
+
 class QueryError(Exception):
     """Raised when a VirtualDB query fails at execution time."""
 
@@ -89,7 +215,8 @@ def get_nested_value(data: dict | list, path: str) -> Any:
     """
     Navigate nested dict/list using dot notation.
 
-    Handles missing intermediate keys gracefully by returning None.
+    Handles missing intermediate keys gracefully by returning None. The path
+    is parsed once and cached (see :func:`labretriever.nested_path.compile_path`).
     When an intermediate value is a list of dicts, extracts the
     remaining path from each item and returns a list of results.
 
@@ -118,53 +245,27 @@ def get_nested_value(data: dict | list, path: str) -> Any:
         ['glucose']
 
     """
-    if not isinstance(data, (dict, list)):
-        return None
+    return compile_path(path).get(data)
 
-    # If top-level data is a list, extract path from each item
-    if isinstance(data, list):
-        results = []
-        for item in data:
-            if isinstance(item, dict):
-                val = get_nested_value(item, path)
-                if val is not None:
-                    results.append(val)
-        return results if results else None
-
-    keys = path.split(".")
-    current = data
-
-    for i, key in enumerate(keys):
-        if isinstance(current, dict):
-            if key not in current:
-                logger.warning(
-                    "Key '%s' not found at path '%s' (current keys: %s)",
-                    key,
-                    ".".join(keys[: i + 1]),
-                    list(current.keys()),
-                )
-                return None
-            current = current[key]
-        elif isinstance(current, list):
-            # Extract the remaining path from each list item
-            remaining_path = ".".join(keys[i:])
-            results = []
-            for item in current:
-                if isinstance(item, dict):
-                    val = get_nested_value(item, remaining_path)
-                    if val is not None:
-                        results.append(val)
-            return results if results else None
-        else:
-            error_msg = (
-                f"Unexpected type '{type(current).__name__}' at "
-                f"path '{'.'.join(keys[:i])}'; expected dict or "
-                f"list of dicts"
-            )
-            logger.error(error_msg)
-            raise TypeError(error_msg)
 
-    return current
+_SNAPSHOT_REVISION_RE = re.compile(r"[/\\]snapshots[/\\]([0-9a-f]{40})[/\\]")
+
+# Coordinate column names recognised by get_coordinate_columns(), in order of
+# preference (see "Genomic Coordinates" in docs/huggingface_datacard.md)
+_CHROM_COLUMNS = ("chr", "chrom", "chromosome", "seqnames", "seqname")
+_START_COLUMNS = ("start", "pos", "position")
+_END_COLUMNS = ("end", "stop")
+
+# to_matrix() agg name -> DuckDB aggregate function
+_MATRIX_AGGREGATES = {
+    "mean": "AVG",
+    "median": "MEDIAN",
+    "sum": "SUM",
+    "min": "MIN",
+    "max": "MAX",
+    "first": "FIRST",
+    "count": "COUNT",
+}
 
 
 def _quote_ident(name: str) -> str:
@@ -172,17 +273,112 @@ def _quote_ident(name: str) -> str:
     return '"' + name.replace('"', '""') + '"'
 
 
+def _files_revision(files: list[str]) -> str | None:
+    """
+    Return a revision identifier for a set of parquet files.
+
+    The HuggingFace snapshot commit sha if the files live under
+    ``.../snapshots/<sha>/``, otherwise a fingerprint of the paths, sizes and
+    modification times.
+
+    :param files: Parquet file paths
+    :return: Revision string, or None if ``files`` is empty
+
+    """
+    if not files:
+        return None
+    for f in files:
+        m = _SNAPSHOT_REVISION_RE.search(f)
+        if m:
+            return m.group(1)
+    digest = hashlib.sha1()
+    for f in sorted(files):
+        try:
+            st = os.stat(f)
+            digest.update(f"{f}:{st.st_size}:{st.st_mtime_ns};".encode())
+        except OSError:
+            digest.update(f"{f};".encode())
+    return digest.hexdigest()
+
+
+def _detect_coordinate_columns(
+    names: list[str],
+) -> tuple[str, str, str | None] | None:
+    """
+    Match genomic coordinate columns by name.
+
+    :param names: Candidate column names
+    :return: A ``(chrom_col, start_col, end_col)`` tuple with ``end_col`` None for
+        single-position data, or None if no chromosome or start column matches
+
+    """
+    by_lower = {name.lower(): name for name in names}
+
+    def first(candidates: tuple[str, ...]) -> str | None:
+        return next((by_lower[c] for c in candidates if c in by_lower), None)
+
+    chrom_col = first(_CHROM_COLUMNS)
+    start_col = first(_START_COLUMNS)
+    if chrom_col is None or start_col is None:
+        return None
+    return chrom_col, start_col, first(_END_COLUMNS)
+
+
+def _hive_partition_value(path: str, column: str) -> str | None:
+    """Return the ``<column>=<value>`` hive partition value in a path, if any."""
+    m = re.search(rf"(?:^|[/\\]){re.escape(column)}=([^/\\]+)[/\\]", path)
+    return m.group(1) if m else None
+
+
+def _same_files(a: list[str], b: list[str]) -> bool:
+    """
+    Return True if two file lists name the same files on disk.
+
+    Files of a HuggingFace snapshot are symlinks into the blob store, so a file that did
+    not change between two commits resolves to the same blob from both snapshots.
+
+    """
+    return sorted(map(os.path.realpath, a)) == sorted(map(os.path.realpath, b))
+
+
+def _literal_dir_prefix(patterns: list[str]) -> str | None:
+    """Return the directory shared by file patterns before any glob character."""
+    dirs = []
+    for pattern in patterns:
+        literal = re.split(r"[*?\[]", pattern, maxsplit=1)[0]
+        dirs.append(literal.rpartition("/")[0])
+    common = os.path.commonpath(dirs) if dirs and all(dirs) else ""
+    return f"{common}/" if common else None
+
+
 @lru_cache(maxsize=32)
-def _cached_datacard(repo_id: str, token: str | None = None) -> Any:
+def _cached_datacard(
+    repo_id: str,
+    token: str | None = None,
+    offline: bool | None = None,
+    revision: str | None = None,
+    commit: str | None = None,
+) -> Any:
     """
     Return a cached DataCard instance.
 
     :param repo_id: HuggingFace repository ID
     :param token: Optional HuggingFace token
+    :param offline: Offline setting passed to the DataCard
+    :param revision: Pinned revision passed to the DataCard
+    :param commit: Commit sha the card is expected at. Only part of the cache key, so
+        that :meth:`VirtualDB.refresh` gets a new card when a repository has moved.
     :return: DataCard instance
 
     """
-    return DataCard(repo_id, token=token)
+    return DataCard(
+        repo_id,
+        token=token,
+        lazy=True,
+        intern_definitions=True,
+        offline=offline,
+        revision=revision,
+    )
 
 
 class VirtualDB:
@@ -202,6 +398,10 @@ class VirtualDB:
         config_path: Path | str,
         token: str | None = None,
         duckdb_connection: duckdb.DuckDBPyConnection | None = None,
+        materialize_all_meta: bool = False,
+        optimize_parquet: bool = False,
+        optimized_cache_dir: Path | str | None = None,
+        offline: bool | None = None,
     ):
         """
         Initialize VirtualDB with configuration.
@@ -214,12 +414,36 @@ class VirtualDB:
             registered on this connection instead of creating a new in-memory database.
             This provides a method of using a persistent database file. If not provided,
             an in-memory DuckDB connection is created.
+        :param materialize_all_meta: If True, the cross-dataset ``all_meta``
+            relation is materialized into a DuckDB table once at startup
+            instead of being a view that rescans every ``_meta`` view.
+        :param optimize_parquet: If True, each dataset's cached parquet files
+            are rewritten once per dataset revision into a compacted copy
+            (few large zstd files sorted by sample id, or by chromosome and
+            position for ``genome_map`` datasets) and all views read the copy.
+            See :func:`~labretriever.parquet_compaction.compact_parquet`.
+        :param optimized_cache_dir: Root directory for the optimized copies.
+            Defaults to ``LABRETRIEVER_CACHE_DIR/optimized``.
+        :param offline: If True, make no network calls: dataset cards come
+            from the card cache and parquet files from the local HuggingFace
+            snapshot. A dataset whose files are not cached raises
+            :class:`~labretriever.errors.HfOfflineError`. None follows
+            ``HF_HUB_OFFLINE``.
         :raises FileNotFoundError: If config file does not exist
         :raises ValueError: If configuration is invalid
+        :raises HfOfflineError: If offline and a dataset is not cached
 
         """
         self.config = MetadataConfig.from_yaml(config_path)
         self.token = token
+        self.offline = offline
+        self.materialize_all_meta = materialize_all_meta
+        self.optimize_parquet = optimize_parquet
+        self.optimized_cache_dir = (
+            Path(optimized_cache_dir)
+            if optimized_cache_dir is not None
+            else LABRETRIEVER_CACHE_DIR / "optimized"
+        )
 
         self._conn: duckdb.DuckDBPyConnection = (
             duckdb_connection
@@ -230,15 +454,55 @@ class VirtualDB:
         # db_name -> (repo_id, config_name)
         self.db_name_map = self._build_db_name_map()
 
+        # repo_id -> DataCard at the repository revision, filled by _load_datacards
+        self.datacards: dict[str, DataCard] = {}
+        # (repo_id, revision) -> DataCard, for datasets pinned to a revision
+        # other than their repository's
+        self._revision_datacards: dict[tuple[str, str | None], DataCard] = {}
+
         # Prepared queries: name -> sql
         self._prepared_queries: dict[str, str] = {}
 
+        # db_name -> ConditionCube, rebuilt when the dataset revision changes
+        self._condition_cubes: dict[str, ConditionCube] = {}
+        # db_name -> (revision, RowGroupIndex) over identifier columns
+        self._identifier_indexes: dict[str, tuple[str | None, RowGroupIndex]] = {}
+        # db_name -> (revision, RowGroupIndex) over genomic coordinate columns
+        self._coordinate_indexes: dict[str, tuple[str | None, RowGroupIndex]] = {}
+        # Held for every use of self._conn (see _connection)
+        self._lock = threading.RLock()
+        # Serializes refresh() calls
+        self._refresh_lock = threading.Lock()
+        # db_name -> column name -> ColumnMeta, filled by _build_column_metadata
+        self._column_metadata: dict[str, dict[str, ColumnMeta]] = {}
+        # db_name -> revision of the source files, for optimized datasets
+        self._source_revisions: dict[str, str | None] = {}
+        # (repo_id, config_name) -> commit sha of the snapshot its files were
+        # last resolved from, filled by _resolve_parquet_files
+        self._resolved_commits: dict[tuple[str, str], str | None] = {}
+        # The sample index is built on first use (see find_samples)
+        self._sample_index_built = False
+        self._sample_index_extra_fields: list[str] = []
+
         self._load_datacards()
         self._validate_datacards()
         self._update_cache()
         self._register_all_views()
         self._build_column_metadata()
 
+    @contextmanager
+    def _connection(self) -> Iterator[duckdb.DuckDBPyConnection]:
+        """
+        Yield the DuckDB connection while holding its lock.
+
+        Every use of ``self._conn`` goes through here: a DuckDB connection must not be
+        used by several threads at once, and :meth:`refresh` replaces views in a
+        transaction on it.
+
+        """
+        with self._lock:
+            yield self._conn
+
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
@@ -277,9 +541,10 @@ class VirtualDB:
         # use the sql as passed to query().
         resolved = self._prepared_queries.get(sql, sql)
         try:
-            if params:
-                return self._conn.execute(resolved, params).fetchdf()
-            return self._conn.execute(resolved).fetchdf()
+            with self._connection() as conn:
+                if params:
+                    return conn.execute(resolved, params).fetchdf()
+                return conn.execute(resolved).fetchdf()
         except Exception as exc:
             import pprint
 
@@ -330,7 +595,6 @@ class VirtualDB:
         :return: Sorted list of view names
 
         """
-
         return sorted(self._list_views())
 
     def describe(self, table: str | None = None) -> pd.DataFrame:
@@ -338,21 +602,20 @@ class VirtualDB:
         Describe column names and types for one or all views.
 
         :param table: View name, or None for all views
-        :return: DataFrame with columns ``table``, ``column_name``,
-                 ``column_type``
+        :return: DataFrame with columns ``table``, ``column_name``, ``column_type``
 
         """
+        with self._connection() as conn:
+            if table is not None:
+                df = conn.execute(f"DESCRIBE {table}").fetchdf()
+                df.insert(0, "table", table)
+                return df
 
-        if table is not None:
-            df = self._conn.execute(f"DESCRIBE {table}").fetchdf()
-            df.insert(0, "table", table)
-            return df
-
-        frames = []
-        for view in sorted(self._list_views()):
-            df = self._conn.execute(f"DESCRIBE {view}").fetchdf()
-            df.insert(0, "table", view)
-            frames.append(df)
+            frames = []
+            for view in sorted(self._list_views()):
+                df = conn.execute(f"DESCRIBE {view}").fetchdf()
+                df.insert(0, "table", view)
+                frames.append(df)
         if not frames:
             return pd.DataFrame(columns=["table", "column_name", "column_type"])
         return pd.concat(frames, ignore_index=True)
@@ -365,45 +628,45 @@ class VirtualDB:
         :return: Sorted list of column names
 
         """
-
-        if table is not None:
-            cols = self._conn.execute(
-                f"SELECT column_name FROM information_schema.columns "
-                f"WHERE table_name = '{table}'"
-            ).fetchdf()
-            return sorted(cols["column_name"].tolist())
-
-        all_cols: set[str] = set()
-        for view in self._list_views():
-            cols = self._conn.execute(
-                f"SELECT column_name FROM information_schema.columns "
-                f"WHERE table_name = '{view}'"
-            ).fetchdf()
-            all_cols.update(cols["column_name"].tolist())
+        with self._connection() as conn:
+            if table is not None:
+                cols = conn.execute(
+                    f"SELECT column_name FROM information_schema.columns "
+                    f"WHERE table_name = '{table}'"
+                ).fetchdf()
+                return sorted(cols["column_name"].tolist())
+
+            all_cols: set[str] = set()
+            for view in self._list_views():
+                cols = conn.execute(
+                    f"SELECT column_name FROM information_schema.columns "
+                    f"WHERE table_name = '{view}'"
+                ).fetchdf()
+                all_cols.update(cols["column_name"].tolist())
         return sorted(all_cols)
 
     def get_common_fields(self) -> list[str]:
         """
         Return columns present in ALL primary ``_meta`` views.
 
-        Primary dataset views are those without ``links`` in their
-        config (i.e. not comparative datasets).
+        Primary dataset views are those without ``links`` in their config (i.e. not
+        comparative datasets).
 
         :return: Sorted list of common column names
 
         """
-
         meta_views = self._get_primary_meta_view_names()
         if not meta_views:
             return []
 
         sets = []
-        for view in meta_views:
-            cols = self._conn.execute(
-                f"SELECT column_name FROM information_schema.columns "
-                f"WHERE table_name = '{view}'"
-            ).fetchdf()
-            sets.append(set(cols["column_name"].tolist()))
+        with self._connection() as conn:
+            for view in meta_views:
+                cols = conn.execute(
+                    f"SELECT column_name FROM information_schema.columns "
+                    f"WHERE table_name = '{view}'"
+                ).fetchdf()
+                sets.append(set(cols["column_name"].tolist()))
 
         common = set.intersection(*sets)
         return sorted(common)
@@ -412,14 +675,12 @@ class VirtualDB:
         """
         Return the sorted list of dataset names known to this VirtualDB.
 
-        Dataset names are the resolved ``db_name`` values from the
-        configuration (falling back to the config_name when ``db_name``
-        is not explicitly set). These are the names accepted by
-        :meth:`get_tags` and queryable via :meth:`query`.
+        Dataset names are the resolved ``db_name`` values from the configuration
+        (falling back to the config_name when ``db_name`` is not explicitly set). These
+        are the names accepted by :meth:`get_tags` and queryable via :meth:`query`.
 
-        Unlike :meth:`tables`, this method reads directly from the
-        configuration and does not require views to be registered, so
-        no data is downloaded.
+        Unlike :meth:`tables`, this method reads directly from the configuration and
+        does not require views to be registered, so no data is downloaded.
 
         :return: Sorted list of dataset names
 
@@ -430,16 +691,15 @@ class VirtualDB:
         """
         Return the merged tags for a dataset.
 
-        Tags are defined in the configuration at the repository and/or
-        dataset level. Dataset-level tags override repository-level tags
-        with the same key. See the ``tags`` section of the configuration
-        guide for details.
+        Tags are defined in the configuration at the repository and/or dataset level.
+        Dataset-level tags override repository-level tags with the same key. See the
+        ``tags`` section of the configuration guide for details.
 
-        :param db_name: Dataset name as it appears in :meth:`tables` (the
-            resolved ``db_name`` from the configuration, or the
-            ``config_name`` if ``db_name`` was not explicitly set).
-        :return: Dict of merged tags, or empty dict if the dataset has no
-            tags or the name is not found.
+        :param db_name: Dataset name as it appears in :meth:`tables` (the resolved
+            ``db_name`` from the configuration, or the ``config_name`` if ``db_name``
+            was not explicitly set).
+        :return: Dict of merged tags, or empty dict if the dataset has no tags or the
+            name is not found.
 
         """
         if db_name not in self.db_name_map:
@@ -547,7 +807,7 @@ class VirtualDB:
                     "type_b_cols": type_b_for_field,
                 }
 
-        card = self.datacards.get(repo_id)
+        card = self._datacard(repo_id, config_name)
 
         # Fallback: when no Type-A aliases exist but there are Type-C downstream
         # cols, use the DataCard's condition_fields (role=experimental_condition)
@@ -614,24 +874,774 @@ class VirtualDB:
         """
         Return per-column metadata for a primary dataset.
 
-        Metadata is collected from the DataCard during VirtualDB construction
-        and includes the feature description, semantic role, and per-level
-        definitions for ``experimental_condition`` columns.
+        Metadata is collected from the DataCard during VirtualDB construction and
+        includes the feature description, semantic role, and per-level definitions for
+        ``experimental_condition`` columns.
 
         :param db_name: Dataset name as registered in the VirtualDB config.
-        :returns: Dict mapping column name to :class:`ColumnMeta`, or ``None``
-            if ``db_name`` is not found or has no recorded metadata.
+        :returns: Dict mapping column name to :class:`ColumnMeta`, or ``None`` if
+            ``db_name`` is not found or has no recorded metadata.
         :rtype: dict[str, ColumnMeta] | None
 
         """
         return self._column_metadata.get(db_name)
 
+    def get_condition_cube(
+        self,
+        db_name: str,
+        columns: list[str] | None = None,
+        refresh: bool = False,
+    ) -> ConditionCube | None:
+        """
+        Return the co-occurrence cube of filterable columns for a dataset.
+
+        The cube holds every distinct combination of condition and property
+        column values in ``<db_name>_meta`` together with its sample count, so
+        cascading filter UIs can answer "which values of B remain given A=a"
+        from memory (see :meth:`ConditionCube.remaining_values`).
+
+        The cube is built on first request with a single ``GROUP BY`` over the
+        ``_meta`` view and cached. It is rebuilt only when the dataset revision
+        (the HuggingFace snapshot commit of its parquet files) changes, when
+        ``columns`` differs from the cached cube, or when ``refresh`` is True.
+
+        :param db_name: Dataset name as returned by :meth:`get_datasets`.
+        :param columns: Columns to include. Defaults to the
+            ``experimental_condition`` columns and the property-mapping output
+            columns of the ``_meta`` view, excluding ``sample_id`` and
+            regulator/target identifier columns.
+        :param refresh: If True, rebuild the cube even if it is current.
+        :returns: :class:`ConditionCube`, or ``None`` if ``db_name`` is not a
+            primary dataset with a ``_meta`` view or has no filterable columns.
+        :raises KeyError: If a requested column is not in the ``_meta`` view.
+
+        Example::
+
+            cube = vdb.get_condition_cube("harbison")
+            cube.remaining_values("temperature_celsius", {"carbon_source": "glucose"})
+
+        """
+        meta_view = f"{db_name}_meta"
+        if db_name not in self.db_name_map or not self._view_exists(meta_view):
+            return None
+
+        meta_cols = self._get_view_columns(meta_view)
+        if columns is None:
+            columns = self._default_cube_columns(db_name, meta_cols)
+        else:
+            missing = [c for c in columns if c not in meta_cols]
+            if missing:
+                raise KeyError(f"Columns {missing} not found in view '{meta_view}'")
+        if not columns:
+            return None
+
+        revision = self._get_dataset_revision(db_name)
+        cached = self._condition_cubes.get(db_name)
+        if (
+            not refresh
+            and cached is not None
+            and cached.revision == revision
+            and list(cached.columns) == list(columns)
+        ):
+            return cached
+
+        cols_sql = ", ".join(_quote_ident(c) for c in columns)
+        with self._connection() as conn:
+            rows = conn.execute(
+                f"SELECT {cols_sql}, COUNT(DISTINCT sample_id) "
+                f"FROM {meta_view} GROUP BY ALL"
+            ).fetchall()
+        cube = ConditionCube(
+            columns=tuple(columns),
+            combinations=[tuple(r[:-1]) for r in rows],
+            counts=[int(r[-1]) for r in rows],
+            revision=revision,
+        )
+        self._condition_cubes[db_name] = cube
+        return cube
+
+    def build_sample_index(self, extra_fields: list[str] | None = None) -> None:
+        """
+        Build the global sample index over all primary datasets.
+
+        The index is the internal table ``__sample_index`` with one row per ``(db_name,
+        sample_id, field, value)``, exposed read-only as the ``samples`` view. ``field``
+        is ``sample_id`` itself, every ``_meta`` column whose DataCard role is
+        ``regulator_identifier`` or ``identifier``, and any ``extra_fields`` (e.g. an
+        SRA accession column) present in a dataset's ``_meta`` view. ``db_name`` and
+        ``field`` are stored as DuckDB ENUMs (dictionary encoded), rows are sorted by
+        ``value`` and an ART index on ``value`` makes :meth:`find_samples` a single
+        index probe.
+
+        Called by the first :meth:`find_samples`, so constructing a VirtualDB does not
+        scan every ``_meta`` view. Call it directly to build the index ahead of time, or
+        with ``extra_fields`` to index additional columns; :meth:`refresh` keeps
+        indexing them.
+
+        :param extra_fields: Additional ``_meta`` column names to index
+
+        """
+        self._sample_index_built = True
+        self._sample_index_extra_fields = list(extra_fields or [])
+        column_metadata = self._column_metadata
+        index_roles = {"regulator_identifier", "identifier"}
+        selects: list[str] = []
+        db_names: list[str] = []
+        fields: set[str] = set()
+
+        for db_name in self._get_primary_view_names():
+            meta_view = f"{db_name}_meta"
+            if not self._view_exists(meta_view):
+                continue
+            meta_cols = self._get_view_columns(meta_view)
+            if "sample_id" not in meta_cols:
+                continue
+            col_meta = column_metadata.get(db_name, {})
+            to_index = ["sample_id"] + [
+                c
+                for c in meta_cols
+                if c != "sample_id"
+                and (
+                    (c in col_meta and col_meta[c].role in index_roles)
+                    or c in (extra_fields or [])
+                )
+            ]
+            db_names.append(db_name)
+            for col in to_index:
+                fields.add(col)
+                escaped_col = col.replace("'", "''")
+                selects.append(
+                    f"SELECT '{db_name}' AS db_name, "
+                    f"CAST(sample_id AS VARCHAR) AS sample_id, "
+                    f"'{escaped_col}' AS field, "
+                    f"CAST({_quote_ident(col)} AS VARCHAR) AS value "
+                    f"FROM {meta_view} WHERE {_quote_ident(col)} IS NOT NULL"
+                )
+
+        if not selects:
+            logger.info("No primary _meta views -- sample index not built")
+            return
+
+        union_sql = " UNION ALL ".join(selects)
+        with self._connection() as conn:
+            conn.execute("DROP VIEW IF EXISTS samples")
+            conn.execute("DROP TABLE IF EXISTS __sample_index")
+            self._ensure_enum_type("_sample_index_db_name", sorted(db_names))
+            self._ensure_enum_type("_sample_index_field", sorted(fields))
+            conn.execute(
+                "CREATE TABLE __sample_index AS "
+                "SELECT DISTINCT "
+                "CAST(db_name AS _sample_index_db_name) AS db_name, "
+                "sample_id, "
+                "CAST(field AS _sample_index_field) AS field, "
+                "value "
+                f"FROM ({union_sql}) ORDER BY value, db_name, sample_id"
+            )
+            conn.execute("CREATE INDEX __sample_index_value ON __sample_index (value)")
+            conn.execute("CREATE VIEW samples AS SELECT * FROM __sample_index")
+
+    def find_samples(
+        self, value: str | list[str], field: str | None = None
+    ) -> pd.DataFrame:
+        """
+        Look up which datasets contain a sample or regulator identifier.
+
+        Probes the global sample index built by :meth:`build_sample_index`
+        instead of querying every ``_meta`` view. The index is built on the first
+        call.
+
+        :param value: Identifier to look up (a sample_id, regulator locus
+            tag, accession, ...), or a list of identifiers
+        :param field: Restrict matches to this indexed field
+            (e.g. ``"regulator_locus_tag"``)
+        :return: DataFrame with columns ``db_name``, ``sample_id``,
+            ``field`` and ``value``; empty if nothing matches
+
+        Example::
+
+            vdb.find_samples("YBR049C", field="regulator_locus_tag")
+            #     db_name  sample_id                field    value
+            # 0  harbison          1  regulator_locus_tag  YBR049C
+            # ...
+
+        """
+        columns = ["db_name", "sample_id", "field", "value"]
+        if not self._sample_index_built:
+            self.build_sample_index(self._sample_index_extra_fields)
+        if not self._table_exists("__sample_index"):
+            return pd.DataFrame(columns=columns)
+
+        values = [value] if isinstance(value, str) else list(value)
+        if not values:
+            return pd.DataFrame(columns=columns)
+        placeholders = ", ".join("?" for _ in values)
+        sql = (
+            "SELECT CAST(db_name AS VARCHAR) AS db_name, sample_id, "
+            "CAST(field AS VARCHAR) AS field, value "
+            f"FROM __sample_index WHERE value IN ({placeholders})"
+        )
+        params: list[Any] = [str(v) for v in values]
+        if field is not None:
+            sql += " AND CAST(field AS VARCHAR) = ?"
+            params.append(field)
+        sql += " ORDER BY db_name, sample_id, field"
+        with self._connection() as conn:
+            return conn.execute(sql, params).fetchdf()
+
+    def get_identifier_index(self, db_name: str) -> RowGroupIndex | None:
+        """
+        Return the row-group index over a dataset's identifier columns.
+
+        Indexed columns are those whose DataCard role is
+        ``regulator_identifier`` or ``target_identifier``, plus the configured
+        sample identifier column, restricted to columns physically present in
+        the dataset's parquet files. The index is built from the parquet
+        footers on first use and cached until the dataset revision changes.
+
+        :param db_name: Dataset name as returned by :meth:`get_datasets`.
+        :returns: :class:`~labretriever.row_group_index.RowGroupIndex`, or
+            ``None`` if the dataset has no parquet files.
+
+        """
+        files = self._parquet_files.get(db_name, [])
+        if not files:
+            return None
+        revision = self._get_dataset_revision(db_name)
+        cached = self._identifier_indexes.get(db_name)
+        if cached is not None and cached[0] == revision:
+            return cached[1]
+
+        identifier_cols = self._get_identifier_columns(db_name)
+        columns = sorted(
+            set(identifier_cols["regulator"])
+            | set(identifier_cols["target"])
+            | {self._get_sample_id_col(db_name)}
+        )
+        with self._connection() as conn:
+            index = RowGroupIndex.from_parquet(conn, files, columns)
+        self._identifier_indexes[db_name] = (revision, index)
+        return index
+
+    def find_rows(
+        self,
+        regulator: str | None = None,
+        target: str | None = None,
+        db_names: list[str] | None = None,
+    ) -> dict[str, pd.DataFrame]:
+        """
+        Return the raw rows for a regulator and/or target across datasets.
+
+        For each primary dataset, the identifier index (see
+        :meth:`get_identifier_index`) selects the parquet files with row groups
+        that can contain the requested identifiers, and only those files are
+        scanned. DuckDB then skips non-matching row groups within them using
+        the same statistics. Identifiers are matched against every column with
+        the corresponding DataCard role. When a dataset's regulator columns live
+        only in its external metadata parquet, matching sample ids are resolved
+        through ``<db_name>_meta`` first and the data files are pruned on the
+        sample identifier column.
+
+        :param regulator: Value to match in ``regulator_identifier`` columns
+        :param target: Value to match in ``target_identifier`` columns
+        :param db_names: Datasets to search. Defaults to all primary datasets.
+        :returns: Dict mapping db_name to a DataFrame of matching raw parquet
+            rows. Datasets without matches, or without columns for a requested
+            role, are omitted.
+        :raises ValueError: If neither ``regulator`` nor ``target`` is given.
+
+        Example::
+
+            hits = vdb.find_rows(regulator="YBR049C", target="YAL001C")
+            for db_name, df in hits.items():
+                print(db_name, len(df))
+
+        """
+        if regulator is None and target is None:
+            raise ValueError("At least one of 'regulator' or 'target' is required")
+
+        names = db_names if db_names is not None else self._get_primary_view_names()
+        results: dict[str, pd.DataFrame] = {}
+        for db_name in names:
+            index = self.get_identifier_index(db_name)
+            if index is None:
+                continue
+            identifier_cols = self._get_identifier_columns(db_name)
+
+            conditions: list[str] = []
+            params: list[Any] = []
+            file_set = set(index.files)
+            answerable = True
+            for role, value in (("regulator", regulator), ("target", target)):
+                if value is None:
+                    continue
+                role_cols = identifier_cols[role]
+                physical = [c for c in role_cols if c in index.columns]
+                if physical:
+                    role_files: set[str] = set()
+                    with self._connection() as conn:
+                        for col in physical:
+                            role_files |= {
+                                ref.file for ref in index.probe(conn, col, value)
+                            }
+                    conditions.append(
+                        "("
+                        + " OR ".join(f"{_quote_ident(c)} = ?" for c in physical)
+                        + ")"
+                    )
+                    params.extend([value] * len(physical))
+                    file_set &= role_files
+                    continue
+
+                sample_ids = self._sample_ids_for_identifier(db_name, role_cols, value)
+                if not sample_ids:
+                    answerable = False
+                    break
+                sample_col = self._get_sample_id_col(db_name)
+                if sample_col in index.columns:
+                    role_files = set()
+                    for sid in sample_ids:
+                        role_files |= set(index.candidate_files(sample_col, sid))
+                    file_set &= role_files
+                placeholders = ", ".join("?" for _ in sample_ids)
+                conditions.append(f"{_quote_ident(sample_col)} IN ({placeholders})")
+                params.extend(sample_ids)
+
+            # No matches, or the dataset has no columns for a requested role
+            if not answerable or not file_set:
+                continue
+
+            files_sql = sql_file_list(sorted(file_set))
+            with self._connection() as conn:
+                df = conn.execute(
+                    f"SELECT * FROM read_parquet({files_sql}) "
+                    f"WHERE {' AND '.join(conditions)}",
+                    params,
+                ).fetchdf()
+            if not df.empty:
+                results[db_name] = df
+        return results
+
+    def get_coordinate_index(self, db_name: str) -> RowGroupIndex | None:
+        """
+        Return the row-group index over a dataset's genomic coordinate columns.
+
+        The chromosome, start and end (or single position) columns are
+        detected from the DataCard features (see
+        :meth:`get_coordinate_columns`). Together with the sample identifier
+        column they are indexed from the parquet footers on first use, and the
+        index is cached until the dataset revision changes.
+
+        :param db_name: Dataset name as returned by :meth:`get_datasets`.
+        :returns: :class:`~labretriever.row_group_index.RowGroupIndex`, or
+            ``None`` if the dataset has no parquet files or no coordinate
+            columns.
+
+        """
+        files = self._parquet_files.get(db_name, [])
+        coords = self.get_coordinate_columns(db_name)
+        if not files or coords is None:
+            return None
+        revision = self._get_dataset_revision(db_name)
+        cached = self._coordinate_indexes.get(db_name)
+        if cached is not None and cached[0] == revision:
+            return cached[1]
+
+        columns = [c for c in coords if c is not None]
+        columns.append(self._get_sample_id_col(db_name))
+        with self._connection() as conn:
+            index = RowGroupIndex.from_parquet(conn, files, sorted(set(columns)))
+        self._coordinate_indexes[db_name] = (revision, index)
+        return index
+
+    def get_coordinate_columns(
+        self, db_name: str
+    ) -> tuple[str, str, str | None] | None:
+        """
+        Return the genomic coordinate columns of a dataset.
+
+        Columns are matched by name against the DataCard features, following
+        the coordinate naming conventions of the dataset card format:
+        chromosome ``chr``/``chrom``/``chromosome``/``seqnames``, start
+        ``start``/``pos``/``position`` and end ``end``/``stop``.
+
+        :param db_name: Dataset name as returned by :meth:`get_datasets`.
+        :returns: ``(chrom_col, start_col, end_col)``, where ``end_col`` is
+            ``None`` for single-position data, or ``None`` if the dataset has
+            no chromosome or position column.
+
+        """
+        return _detect_coordinate_columns(list(self._column_metadata.get(db_name, {})))
+
+    def region_row_groups(
+        self,
+        db_name: str,
+        chrom: str,
+        start: int | float,
+        end: int | float,
+        samples: list[Any] | None = None,
+    ) -> list[RowGroupRef]:
+        """
+        Return the row groups that can hold records overlapping a region.
+
+        A row group is a candidate when its chromosome range includes
+        ``chrom``, its smallest start is at or before ``end`` and its largest
+        end (or position) is at or after ``start``. With ``samples``, row
+        groups are also pruned on the sample identifier column.
+
+        The chromosome and sample columns may instead be hive partition keys
+        (``.../<column>=<value>/...``); files in other partitions are then
+        skipped by path. Start/end columns that are not stored in the files
+        are not pruned on.
+
+        :param db_name: Dataset name as returned by :meth:`get_datasets`.
+        :param chrom: Chromosome name, as stored in the data
+        :param start: Region start (0-based, inclusive)
+        :param end: Region end (exclusive)
+        :param samples: Optional sample identifiers to restrict to
+        :returns: Candidate row groups, ordered by file and row group id
+        :raises ValueError: If the dataset has no coordinate columns
+
+        """
+        index = self.get_coordinate_index(db_name)
+        coords = self.get_coordinate_columns(db_name)
+        if index is None or coords is None:
+            raise ValueError(f"Dataset '{db_name}' has no genomic coordinate columns")
+        chrom_col, start_col, end_col = coords
+
+        refs = set(index.row_groups)
+
+        def restrict(column: str, values: list[Any]) -> None:
+            nonlocal refs
+            if column in index.columns:
+                matched: set[RowGroupRef] = set()
+                for value in values:
+                    matched.update(index.candidates(column, value))
+                refs &= matched
+            else:
+                wanted = {str(v) for v in values}
+                refs = {
+                    ref
+                    for ref in refs
+                    if _hive_partition_value(ref.file, column) in (None, *wanted)
+                }
+
+        restrict(chrom_col, [chrom])
+        if start_col in index.columns:
+            refs &= set(index.candidates_in_range(start_col, None, end))
+        last_col = end_col or start_col
+        if last_col in index.columns:
+            refs &= set(index.candidates_in_range(last_col, start, None))
+        if samples is not None:
+            restrict(self._get_sample_id_col(db_name), list(samples))
+        return sorted(refs, key=lambda ref: (ref.file, ref.row_group))
+
+    def region_query(
+        self,
+        db_name: str,
+        chrom: str,
+        start: int | float,
+        end: int | float,
+        samples: list[Any] | None = None,
+        columns: list[str] | None = None,
+    ) -> pd.DataFrame:
+        """
+        Return the raw records of a dataset overlapping a genomic region.
+
+        Only files holding candidate row groups (see
+        :meth:`region_row_groups`) are scanned; within those files DuckDB
+        skips the row groups whose statistics exclude the region.
+
+        Records overlap ``[start, end)`` when ``record_start < end`` and
+        ``record_end > start``. For single-position data the position must
+        lie in ``[start, end)``.
+
+        :param db_name: Dataset name as returned by :meth:`get_datasets`.
+        :param chrom: Chromosome name, as stored in the data
+        :param start: Region start (0-based, inclusive)
+        :param end: Region end (exclusive)
+        :param samples: Optional sample identifiers to restrict to
+        :param columns: Columns to return. Defaults to all parquet columns.
+        :returns: Matching raw parquet rows ordered by position
+        :raises ValueError: If the dataset has no coordinate columns or
+            ``end`` is before ``start``
+
+        Example::
+
+            df = vdb.region_query(
+                "barkai_compendium", "chrII", 100_000, 120_000, samples=[1, 2]
+            )
+
+        """
+        if end < start:
+            raise ValueError(f"Region end ({end}) is before start ({start})")
+        coords = self.get_coordinate_columns(db_name)
+        if coords is None:
+            raise ValueError(f"Dataset '{db_name}' has no genomic coordinate columns")
+        chrom_col, start_col, end_col = coords
+        refs = self.region_row_groups(db_name, chrom, start, end, samples=samples)
+
+        files = sorted({ref.file for ref in refs})
+        if not files or (samples is not None and not samples):
+            return pd.DataFrame(
+                columns=(
+                    columns
+                    if columns is not None
+                    else self._get_view_columns(f"__{db_name}_parquet")
+                )
+            )
+        select_sql = (
+            ", ".join(_quote_ident(c) for c in columns) if columns is not None else "*"
+        )
+
+        if end_col is None:
+            conditions = [
+                f"{_quote_ident(chrom_col)} = ?",
+                f"{_quote_ident(start_col)} >= ?",
+                f"{_quote_ident(start_col)} < ?",
+            ]
+        else:
+            conditions = [
+                f"{_quote_ident(chrom_col)} = ?",
+                f"{_quote_ident(start_col)} < ?",
+                f"{_quote_ident(end_col)} > ?",
+            ]
+        params: list[Any] = (
+            [chrom, start, end] if end_col is None else [chrom, end, start]
+        )
+        if samples is not None:
+            sample_col = self._get_sample_id_col(db_name)
+            placeholders = ", ".join("?" for _ in samples)
+            conditions.append(
+                f"CAST({_quote_ident(sample_col)} AS VARCHAR) IN ({placeholders})"
+            )
+            params.extend(str(s) for s in samples)
+
+        files_sql = sql_file_list(files)
+        with self._connection() as conn:
+            return conn.execute(
+                f"SELECT {select_sql} FROM read_parquet({files_sql}) "
+                f"WHERE {' AND '.join(conditions)} "
+                f"ORDER BY {_quote_ident(start_col)}",
+                params,
+            ).fetchdf()
+
+    def plan_partitions(
+        self, db_name: str, filters: dict[str, Any] | None = None
+    ) -> PartitionPlan:
+        """
+        Return the files of a hive-partitioned dataset a query needs.
+
+        Lists the dataset's repository on the Hub (under the common directory
+        of its ``data_files`` patterns) and selects the files matching both
+        the patterns and the partition predicates. Nothing is downloaded; the
+        plan's ``files`` can be passed to ``snapshot_download`` as
+        ``allow_patterns``.
+
+        :param db_name: Dataset name as returned by :meth:`get_datasets`.
+        :param filters: Partition column -> value, collection of values or
+            :class:`~labretriever.partition_plan.PartitionRange`
+        :returns: The matching files and their total size
+        :raises ValueError: If ``db_name`` is unknown or a filtered column is
+            not a partition column
+        :raises HfDataFetchError: If the repository cannot be listed
+
+        Example::
+
+            plan = vdb.plan_partitions("callingcards", {"regulator": "GAL4"})
+            plan.files, plan.total_bytes
+
+        """
+        if db_name not in self.db_name_map:
+            raise ValueError(f"Unknown dataset '{db_name}'")
+        repo_id, config_name = self.db_name_map[db_name]
+        revision = self.config.get_revision(repo_id, config_name)
+        card = _cached_datacard(
+            repo_id, token=self.token, offline=self.offline, revision=revision
+        )
+        config = card.get_config(config_name)
+        patterns = [df.path for df in config.data_files] if config else []
+        fetcher = HfRepoStructureFetcher(token=self.token, offline=self.offline)
+        return fetcher.plan_partitions(
+            repo_id,
+            filters,
+            path_prefix=_literal_dir_prefix(patterns),
+            patterns=patterns or None,
+            revision=revision,
+        )
+
+    def to_matrix(
+        self,
+        db_name: str,
+        value_col: str,
+        row_col: str | None = None,
+        col_col: str | None = None,
+        *,
+        agg: str = "mean",
+        sparse: bool = False,
+        where: str | None = None,
+        params: dict[str, Any] | None = None,
+        cache: bool = False,
+        cache_dir: Path | str | None = None,
+    ) -> DenseMatrix | CSRMatrix:
+        """
+        Pivot a measurement column into a row x column matrix.
+
+        Rows and columns are the distinct values of ``row_col`` and
+        ``col_col`` in the ``<db_name>`` view, sorted and integer coded by
+        DuckDB. Duplicate ``(row, col)`` pairs are combined with ``agg``. Only
+        the integer codes, the aggregated values and the two label lists are
+        transferred to Python, as NumPy arrays, so no long-format DataFrame is
+        materialized.
+
+        With ``cache=True`` the matrix is saved as ``.npy`` files under
+        ``<cache_dir>/<db_name>/<revision>/<key>/`` where ``revision`` is the
+        dataset revision (the HuggingFace snapshot commit of its parquet
+        files) and ``key`` hashes the arguments and the dataset's VirtualDB
+        configuration. Later calls with the same arguments load the arrays
+        memory-mapped instead of querying. A new dataset revision gets a new
+        cache directory.
+
+        :param db_name: Dataset name as returned by :meth:`get_datasets`.
+        :param value_col: Column holding the matrix values
+        :param row_col: Column for the row axis. Defaults to the dataset's
+            ``regulator_identifier`` column.
+        :param col_col: Column for the column axis. Defaults to the dataset's
+            ``target_identifier`` column.
+        :param agg: How duplicate cells are combined: one of ``"mean"``,
+            ``"median"``, ``"sum"``, ``"min"``, ``"max"``, ``"first"`` or
+            ``"count"``.
+        :param sparse: If True return a :class:`~labretriever.matrix.CSRMatrix`
+            holding only observed cells, else a
+            :class:`~labretriever.matrix.DenseMatrix` with ``NaN`` for missing
+            cells.
+        :param where: Optional SQL filter applied to the ``<db_name>`` view
+            before pivoting, e.g. ``"carbon_source = $cs"``
+        :param params: Named parameters for ``where``
+        :param cache: If True, read from and write to the matrix cache
+        :param cache_dir: Cache root. Defaults to
+            ``LABRETRIEVER_CACHE_DIR/matrices``.
+        :returns: The matrix
+        :raises ValueError: If ``db_name`` has no view, ``agg`` is unknown, or
+            a default axis cannot be determined from the column roles
+        :raises KeyError: If a named column is not in the ``<db_name>`` view
+
+        Example::
+
+            m = vdb.to_matrix(
+                "harbison", "effect", col_col="target_locus_tag", sparse=True
+            )
+            m.to_scipy()  # requires scipy
+
+        """
+        agg_sql = _MATRIX_AGGREGATES.get(agg)
+        if agg_sql is None:
+            raise ValueError(
+                f"Unknown agg '{agg}'. Choose one of {sorted(_MATRIX_AGGREGATES)}"
+            )
+        if db_name not in self.db_name_map or not self._view_exists(db_name):
+            raise ValueError(f"No view registered for dataset '{db_name}'")
+
+        identifier_cols = self._get_identifier_columns(db_name)
+        view_cols = self._get_view_columns(db_name)
+        axes: list[str] = []
+        for name, col, role in (
+            ("row_col", row_col, "regulator"),
+            ("col_col", col_col, "target"),
+        ):
+            if col is None:
+                candidates = [c for c in identifier_cols[role] if c in view_cols]
+                if not candidates:
+                    raise ValueError(
+                        f"Dataset '{db_name}' has no {role}_identifier column; "
+                        f"pass {name} explicitly"
+                    )
+                col = candidates[0]
+            axes.append(col)
+        row_col, col_col = axes
+        missing = [c for c in (value_col, row_col, col_col) if c not in view_cols]
+        if missing:
+            raise KeyError(f"Columns {missing} not found in view '{db_name}'")
+
+        cache_path: Path | None = None
+        revision = self._get_dataset_revision(db_name)
+        if cache and revision is not None:
+            repo_id, config_name = self.db_name_map[db_name]
+            key = hashlib.sha1(
+                repr(
+                    (
+                        value_col,
+                        row_col,
+                        col_col,
+                        agg,
+                        sparse,
+                        where,
+                        sorted((params or {}).items()),
+                        self.config.repositories[repo_id].model_dump_json(),
+                    )
+                ).encode()
+            ).hexdigest()
+            root = (
+                Path(cache_dir)
+                if cache_dir is not None
+                else LABRETRIEVER_CACHE_DIR / "matrices"
+            )
+            cache_path = root / db_name / revision / key
+            try:
+                return load_matrix(cache_path)
+            except FileNotFoundError:
+                pass
+
+        r, c, v = (_quote_ident(x) for x in (row_col, col_col, value_col))
+        where_sql = f" AND ({where})" if where else ""
+        tmp = f"__to_matrix_{os.getpid()}_{id(self)}"
+        with self._connection() as conn:
+            conn.execute(
+                f"CREATE OR REPLACE TEMP TABLE {tmp} AS "
+                f"SELECT {r} AS r, {c} AS c, CAST({agg_sql}({v}) AS DOUBLE) AS v "
+                f"FROM {db_name} "
+                f"WHERE {r} IS NOT NULL AND {c} IS NOT NULL AND {v} IS NOT NULL"
+                f"{where_sql} GROUP BY ALL",
+                params or {},
+            )
+            try:
+                row_labels = conn.execute(
+                    f"SELECT DISTINCT r FROM {tmp} ORDER BY r"
+                ).fetchnumpy()["r"]
+                col_labels = conn.execute(
+                    f"SELECT DISTINCT c FROM {tmp} ORDER BY c"
+                ).fetchnumpy()["c"]
+                coded = conn.execute(
+                    f"SELECT DENSE_RANK() OVER (ORDER BY r) - 1 AS ri, "
+                    f"DENSE_RANK() OVER (ORDER BY c) - 1 AS ci, v FROM {tmp}"
+                ).fetchnumpy()
+            finally:
+                conn.execute(f"DROP TABLE IF EXISTS {tmp}")
+
+        matrix = build_matrix(
+            coded["ri"],
+            coded["ci"],
+            coded["v"],
+            row_labels,
+            col_labels,
+            sparse=sparse,
+            row_axis=row_col,
+            col_axis=col_col,
+            value_col=value_col,
+        )
+        if cache_path is not None:
+            try:
+                save_matrix(matrix, cache_path)
+                return load_matrix(cache_path)
+            except OSError as exc:
+                logger.warning("Could not cache matrix at %s: %s", cache_path, exc)
+        return matrix
+
     def get_dataset_description(self, db_name: str) -> str | None:
         """
         Return the description for a dataset.
 
-        The VirtualDB config ``description`` field takes precedence over the
-        DataCard config description. Returns ``None`` if neither is defined.
+        The VirtualDB config ``description`` field takes precedence over the DataCard
+        config description. Returns ``None`` if neither is defined.
 
         :param db_name: Dataset name as registered in the VirtualDB config.
         :returns: Description string, or ``None`` if not found.
@@ -648,7 +1658,7 @@ class VirtualDB:
             if vdb_dataset_cfg and vdb_dataset_cfg.description is not None:
                 return vdb_dataset_cfg.description
         # Fall back to DataCard description
-        card = self.datacards.get(repo_id)
+        card = self._datacard(repo_id, config_name)
         if card is None:
             return None
         cfg = card.get_config(config_name)
@@ -658,8 +1668,8 @@ class VirtualDB:
         """
         Return the citation for a dataset.
 
-        The dataset-level citation takes precedence over the repository-level
-        citation. If neither is defined, returns ``None``.
+        The dataset-level citation takes precedence over the repository-level citation.
+        If neither is defined, returns ``None``.
 
         :param db_name: Dataset name as registered in the VirtualDB config.
         :returns: Citation string, or ``None`` if no citation is defined.
@@ -669,51 +1679,237 @@ class VirtualDB:
         if db_name not in self.db_name_map:
             return None
         repo_id, config_name = self.db_name_map[db_name]
-        card = self.datacards.get(repo_id)
+        card = self._datacard(repo_id, config_name)
         if card is None:
             return None
         return card.get_citation(config_name)
 
+    def refresh(self, db_names: list[str] | None = None) -> list[str]:
+        """
+        Pick up new upstream commits without rebuilding the whole database.
+
+        For each dataset, the commit its revision (the pinned ``revision``,
+        or the default branch) points at now is compared with the commit
+        its files were resolved at. Only datasets whose repository moved are
+        looked at again: the DataCard at the dataset's revision is reloaded
+        and the dataset's files are resolved anew, which downloads only files
+        not already in the local HuggingFace cache. The other datasets read
+        with a reloaded DataCard are checked as well. A dataset
+        whose DataCard config, schema and file contents are unchanged keeps
+        its views.
+
+        The views of the changed datasets (``__<db_name>_parquet``,
+        ``<db_name>``, ``<db_name>_meta``, ``<db_name>_expanded``), the
+        ``_expanded`` views of comparative datasets linking to them,
+        ``all_meta`` and the sample index are then replaced in one DuckDB
+        transaction. Downloads and ``optimize_parquet`` compaction happen
+        before it, so queries keep running on the previous views meanwhile
+        and reads from other threads only wait for the swap itself. If the
+        swap fails, it is rolled back and the previous views stay in place.
+
+        Example::
+
+            vdb.refresh()              # check every dataset
+            vdb.refresh(["harbison"])  # check one dataset
+
+        :param db_names: Datasets to check, or None for all
+        :return: Names of the datasets whose views were replaced, sorted
+        :raises ValueError: If a name is not a dataset of this database
+        :raises HfOfflineError: If offline and new files are not cached
+
+        """
+        targets = list(self.db_name_map) if db_names is None else list(db_names)
+        unknown = [n for n in targets if n not in self.db_name_map]
+        if unknown:
+            raise ValueError(f"Unknown dataset(s): {unknown}")
+
+        with self._refresh_lock:
+            commits: dict[tuple[str, str | None], str | None] = {}
+
+            def commit_of(repo_id: str, revision: str | None) -> str | None:
+                if (repo_id, revision) not in commits:
+                    commits[(repo_id, revision)] = self._current_commit(
+                        repo_id, revision
+                    )
+                return commits[(repo_id, revision)]
+
+            # db_name -> commit sha, for datasets whose repository moved
+            moved: dict[str, str] = {}
+
+            def check(names: list[str]) -> None:
+                for db_name in names:
+                    repo_id, config_name = self.db_name_map[db_name]
+                    revision = self.config.get_revision(repo_id, config_name)
+                    sha = commit_of(repo_id, revision)
+                    if sha is not None and sha != self._checked_revisions.get(db_name):
+                        moved[db_name] = sha
+
+            check(targets)
+            if not moved:
+                return []
+
+            card_keys = list(
+                dict.fromkeys(self._card_key(*self.db_name_map[n]) for n in moved)
+            )
+            # A reloaded DataCard replaces the card of every dataset read at
+            # the same repository revision, so those are checked too
+            check(
+                [
+                    n
+                    for n, (repo_id, config_name) in self.db_name_map.items()
+                    if self._card_key(repo_id, config_name) in card_keys
+                    and n not in moved
+                ]
+            )
+            card_commits = {key: commit_of(*key) for key in card_keys}
+            fetch_cache = get_fetch_cache()
+            for repo_id in dict.fromkeys(repo_id for repo_id, _ in card_keys):
+                for endpoint in ("card", "listing", "size"):
+                    fetch_cache.invalidate(endpoint, repo_id)
+            cards, errors = self._load_cards(
+                (key for key in card_keys if card_commits[key] is not None),
+                commits=card_commits,
+            )
+            for (repo_id, revision), exc in errors.items():
+                logger.warning(
+                    "Could not reload datacard for repo '%s' at revision %s: %s "
+                    "-- keeping its current views",
+                    repo_id,
+                    revision or "main",
+                    exc,
+                )
+
+            changed: set[str] = set()
+            staged: dict[str, list[str]] = {}
+            for db_name in list(moved):
+                card = cards.get(self._card_key(*self.db_name_map[db_name]))
+                if card is None:
+                    del moved[db_name]
+                    continue
+                dataset_changed, files = self._stage_refresh(db_name, card)
+                if dataset_changed:
+                    changed.add(db_name)
+                    staged.update(files)
+
+            if changed:
+                self._replace_datasets(changed, staged, cards)
+                logger.info("Refreshed datasets: %s", ", ".join(sorted(changed)))
+            elif cards:
+                self._store_cards(cards)
+            self._checked_revisions.update(moved)
+            return sorted(changed)
+
     # ------------------------------------------------------------------
     # Initialisation phases
     # ------------------------------------------------------------------
 
     def _load_datacards(self) -> None:
         """
-        Fetch (or load from cache) the DataCard for every distinct repo.
+        Fetch (or load from cache) the DataCard of every distinct repo and revision.
 
-        Populates ``self.datacards`` keyed by ``repo_id``. Failures are
-        logged as warnings and the repo is omitted from the dict so that
-        subsequent phases can skip it gracefully.
+        Cards are fetched concurrently (see :meth:`DataCard.load_many`), at each
+        repository's pinned ``revision`` if it has one. Populates ``self.datacards``
+        keyed by ``repo_id`` with the cards at repository revisions; a dataset pinned to
+        another revision than its repository gets its own card, looked up with
+        :meth:`_datacard`. Failures are logged as warnings and the card is omitted so
+        that subsequent phases can skip the dataset gracefully.
 
         """
-        self.datacards: dict[str, DataCard] = {}
-        seen_repos: set[str] = set()
-        for repo_id, _ in self.db_name_map.values():
-            if repo_id in seen_repos:
-                continue
-            seen_repos.add(repo_id)
-            try:
-                self.datacards[repo_id] = _cached_datacard(repo_id, token=self.token)
-            except Exception as exc:
-                logger.warning(
-                    "Could not load datacard for repo '%s': %s",
+        self.datacards = {}
+        self._revision_datacards = {}
+        cards, errors = self._load_cards(
+            self._card_key(repo_id, config_name)
+            for repo_id, config_name in self.db_name_map.values()
+        )
+        self._store_cards(cards)
+        for (repo_id, revision), exc in errors.items():
+            logger.warning(
+                "Could not load datacard for repo '%s' at revision %s: %s",
+                repo_id,
+                revision or "main",
+                exc,
+            )
+
+    def _card_key(self, repo_id: str, config_name: str) -> tuple[str, str | None]:
+        """Return the (repo_id, revision) a dataset's DataCard is read at."""
+        return repo_id, self.config.get_revision(repo_id, config_name)
+
+    def _datacard(self, repo_id: str, config_name: str) -> DataCard | None:
+        """
+        Return the loaded DataCard of a dataset.
+
+        :param repo_id: Repository ID
+        :param config_name: Configuration name
+        :return: The card at the dataset's revision, or None if it did not load
+
+        """
+        key = self._card_key(repo_id, config_name)
+        if key[1] == self.config.get_revision(repo_id):
+            return self.datacards.get(repo_id)
+        return self._revision_datacards.get(key)
+
+    def _load_cards(
+        self,
+        keys: Iterable[tuple[str, str | None]],
+        commits: dict[tuple[str, str | None], str | None] | None = None,
+    ) -> tuple[
+        dict[tuple[str, str | None], DataCard],
+        dict[tuple[str, str | None], Exception],
+    ]:
+        """
+        Load DataCards at the given revisions.
+
+        :param keys: (repo_id, revision) pairs. Duplicates are loaded once.
+        :param commits: Commit sha each pair is expected at, see
+            :func:`_cached_datacard`
+        :return: Loaded cards and load errors, keyed by (repo_id, revision)
+
+        """
+        by_revision: dict[str | None, list[str]] = {}
+        for repo_id, revision in dict.fromkeys(keys):
+            by_revision.setdefault(revision, []).append(repo_id)
+        commits = commits or {}
+        cards: dict[tuple[str, str | None], DataCard] = {}
+        errors: dict[tuple[str, str | None], Exception] = {}
+        for revision, repo_ids in by_revision.items():
+
+            def factory(repo_id: str, revision: str | None = revision) -> DataCard:
+                return _cached_datacard(
                     repo_id,
-                    exc,
+                    token=self.token,
+                    offline=self.offline,
+                    revision=revision,
+                    commit=commits.get((repo_id, revision)),
                 )
 
+            loaded, failed = DataCard.load_many(repo_ids, factory=factory)
+            cards.update(((r, revision), card) for r, card in loaded.items())
+            errors.update(((r, revision), exc) for r, exc in failed.items())
+        return cards, errors
+
+    def _store_cards(self, cards: dict[tuple[str, str | None], DataCard]) -> None:
+        """Install loaded cards, replacing the dicts rather than mutating them."""
+        datacards = dict(self.datacards)
+        revision_datacards = dict(self._revision_datacards)
+        for (repo_id, revision), card in cards.items():
+            if revision == self.config.get_revision(repo_id):
+                datacards[repo_id] = card
+            else:
+                revision_datacards[(repo_id, revision)] = card
+        self.datacards = datacards
+        self._revision_datacards = revision_datacards
+
     def _validate_datacards(self) -> None:
         """
         Cross-check the VirtualDB config against the loaded datacards.
 
-        Checks that every dataset with a ``links`` field in the VirtualDB
-        config has ``dataset_type: comparative`` in its HuggingFace datacard.
-        Also resolves ``self._dataset_schemas`` and
-        ``self._external_meta_configs`` (keyed by ``db_name``) for use by
-        ``_update_cache`` and ``_register_all_views``.
+        Checks that every dataset with a ``links`` field in the VirtualDB config has
+        ``dataset_type: comparative`` in its HuggingFace datacard. Also resolves
+        ``self._dataset_schemas`` and ``self._external_meta_configs`` (keyed by
+        ``db_name``) for use by ``_update_cache`` and ``_register_all_views``.
 
-        :raises ValueError: If a dataset with ``links`` does not have
-            ``dataset_type: comparative`` in its datacard.
+        :raises ValueError: If a dataset with ``links`` does not have ``dataset_type:
+            comparative`` in its datacard.
 
         """
         self._dataset_schemas: dict[str, DatasetSchema] = {}
@@ -727,7 +1923,7 @@ class VirtualDB:
                 if repo_cfg and repo_cfg.dataset
                 else None
             )
-            card = self.datacards.get(repo_id)
+            card = self._datacard(repo_id, config_name)
 
             # Validate comparative dataset_type agreement.
             if ds_cfg and ds_cfg.links:
@@ -779,10 +1975,29 @@ class VirtualDB:
         ``"__<db_name>_meta"`` so ``_register_all_views`` can read them
         without further network calls.
 
+        With ``optimize_parquet``, each dataset's files are replaced by their
+        compacted copy (see :meth:`_optimize_parquet_files`).
+
+        Also records each dataset's source files and their revision, which
+        :meth:`refresh` compares against the upstream repository.
+
         """
         self._parquet_files: dict[str, list[str]] = {}
+        self._source_revisions = {}
+        # db_name -> files resolved from the repository, before optimization
+        self._source_files: dict[str, list[str]] = {}
+        # db_name -> commit sha the dataset was last resolved or checked at
+        self._checked_revisions: dict[str, str | None] = {}
         for db_name, (repo_id, config_name) in self.db_name_map.items():
             files = self._resolve_parquet_files(repo_id, config_name)
+            self._source_files[db_name] = files
+            self._checked_revisions[db_name] = self._resolved_commits.get(
+                (repo_id, config_name)
+            )
+            if self.optimize_parquet and files:
+                files = self._optimize_parquet_files(
+                    db_name, repo_id, config_name, files
+                )
             self._parquet_files[db_name] = files
 
         for db_name, ext_config_name in self._external_meta_configs.items():
@@ -795,13 +2010,31 @@ class VirtualDB:
         Register all DuckDB views in dependency order.
 
         Expects ``self._parquet_files``, ``self._dataset_schemas``, and
-        ``self._external_meta_configs`` to have been populated by the earlier
-        init phases. No network or disk access occurs here.
+        ``self._external_meta_configs`` to have been populated by the earlier init
+        phases. No network or disk access occurs here.
+
+        """
+        self._external_meta_views: dict[str, str] = {}
+        self._register_views(list(self.db_name_map))
 
+        # 6. Cross-dataset union of the common _meta columns
+        self._register_all_meta_view(materialize=self.materialize_all_meta)
+
+    def _register_views(self, db_names: list[str]) -> None:
         """
+        Register the per-dataset views of some datasets in dependency order.
+
+        Used by :meth:`_register_all_views` for every dataset and by :meth:`refresh` for
+        the datasets it replaces.
+
+        :param db_names: Datasets whose views to (re-)register
+
+        """
+        datasets = {n: self.db_name_map[n] for n in db_names}
+
         # 1. Raw per-dataset views (internal __<db_name>_parquet
         # plus public <db_name> for primary datasets only)
-        for db_name, (repo_id, config_name) in self.db_name_map.items():
+        for db_name, (repo_id, config_name) in datasets.items():
             comparative = self._is_comparative(repo_id, config_name)
             self._register_raw_view(
                 db_name,
@@ -811,8 +2044,9 @@ class VirtualDB:
         # 2. External metadata parquet views.
         # When a data config's metadata lives in a separate HF config
         # (applies_to), register its parquet as __<db_name>_metadata_parquet.
-        self._external_meta_views: dict[str, str] = {}
         for db_name, ext_config_name in self._external_meta_configs.items():
+            if db_name not in datasets:
+                continue
             meta_view = f"__{db_name}_metadata_parquet"
             files = self._parquet_files.get(f"__{db_name}_meta", [])
             if not files:
@@ -823,12 +2057,13 @@ class VirtualDB:
                     db_name,
                 )
                 continue
-            files_sql = ", ".join(f"'{f}'" for f in files)
+            files_sql = sql_file_list(files)
             try:
-                self._conn.execute(
-                    f"CREATE OR REPLACE VIEW {meta_view} AS "
-                    f"SELECT * FROM read_parquet([{files_sql}])"
-                )
+                with self._connection() as conn:
+                    conn.execute(
+                        f"CREATE OR REPLACE VIEW {meta_view} AS "
+                        f"SELECT * FROM read_parquet({files_sql})"
+                    )
             except Exception as exc:
                 logger.warning(
                     "Failed to create external metadata view '%s': %s",
@@ -839,22 +2074,19 @@ class VirtualDB:
             self._external_meta_views[db_name] = meta_view
 
         # 3. Metadata views for primary datasets (<db_name>_meta)
-        for db_name, (repo_id, config_name) in self.db_name_map.items():
+        for db_name, (repo_id, config_name) in datasets.items():
             if not self._is_comparative(repo_id, config_name):
                 self._register_meta_view(db_name, repo_id, config_name)
 
         # 4. Replace primary raw views with join to _meta so
         # derived columns (e.g. carbon_source) are available
-        for db_name, (repo_id, config_name) in self.db_name_map.items():
+        for db_name, (repo_id, config_name) in datasets.items():
             if not self._is_comparative(repo_id, config_name):
                 self._enrich_raw_view(db_name)
 
         # 5. Comparative expanded views (pre-parsed composite IDs)
-        for db_name, (repo_id, config_name) in self.db_name_map.items():
-            repo_cfg = self.config.repositories.get(repo_id)
-            if not repo_cfg or not repo_cfg.dataset:
-                continue
-            ds_cfg = repo_cfg.dataset.get(config_name)
+        for db_name, (repo_id, config_name) in datasets.items():
+            ds_cfg = self._get_dataset_config(repo_id, config_name)
             if ds_cfg and ds_cfg.links:
                 self._register_comparative_expanded_view(db_name, ds_cfg)
 
@@ -862,21 +2094,21 @@ class VirtualDB:
         """
         Collect per-column metadata from DataCards for all primary datasets.
 
-        Populates ``self._column_metadata`` keyed by ``db_name``.  For each
-        primary (non-comparative) dataset, features are gathered from the
-        primary DataCard config and, when present, from the external metadata
-        config (``_external_meta_configs``).  Property mappings are then
-        walked to propagate metadata to output column names that differ from
-        the underlying DataCard feature names (e.g. Type-A renames).
+        Populates ``self._column_metadata`` keyed by ``db_name``.  For each primary
+        (non-comparative) dataset, features are gathered from the primary DataCard
+        config and, when present, from the external metadata config
+        (``_external_meta_configs``).  Property mappings are then walked to propagate
+        metadata to output column names that differ from the underlying DataCard feature
+        names (e.g. Type-A renames).
 
         """
-        self._column_metadata: dict[str, dict[str, ColumnMeta]] = {}
+        self._column_metadata = {}
 
         for db_name, (repo_id, config_name) in self.db_name_map.items():
             if self._is_comparative(repo_id, config_name):
                 continue
 
-            card = self.datacards.get(repo_id)
+            card = self._datacard(repo_id, config_name)
             if card is None:
                 continue
 
@@ -951,14 +2183,7 @@ class VirtualDB:
         :return: Dict mapping db_name -> (repo_id, config_name)
 
         """
-        mapping: dict[str, tuple[str, str]] = {}
-        for repo_id, repo_cfg in self.config.repositories.items():
-            if not repo_cfg.dataset:
-                continue
-            for config_name, ds_cfg in repo_cfg.dataset.items():
-                resolved = ds_cfg.db_name or config_name
-                mapping[resolved] = (repo_id, config_name)
-        return mapping
+        return self.config.get_db_name_map()
 
     # ------------------------------------------------------------------
     # Parquet file resolution
@@ -969,14 +2194,28 @@ class VirtualDB:
         Download (or locate cached) Parquet files for a dataset config.
 
         Uses ``huggingface_hub.snapshot_download`` with the file patterns
-        from the DataCard.
+        from the DataCard, as a bulk request of the shared
+        :class:`~labretriever.rate_limit.RequestScheduler`. The card and files
+        are read at the dataset's pinned ``revision``, if any. In offline mode
+        only the local snapshot is used.
 
         :param repo_id: HuggingFace repository ID
         :param config_name: Dataset configuration name
-        :return: List of absolute paths to Parquet files
+        :return: List of absolute paths to Parquet files. The commit sha of the
+            snapshot they were read from is recorded in ``self._resolved_commits``.
+        :raises HfOfflineError: If offline and the repository has no local
+            snapshot
 
         """
-        card = DataCard(repo_id, token=self.token)
+        revision = self.config.get_revision(repo_id, config_name)
+        card = DataCard(
+            repo_id,
+            token=self.token,
+            lazy=True,
+            intern_definitions=True,
+            offline=self.offline,
+            revision=revision,
+        )
         config = card.get_config(config_name)
         if not config:
             logger.warning(
@@ -990,11 +2229,32 @@ class VirtualDB:
 
         from huggingface_hub import snapshot_download
 
-        downloaded_path = snapshot_download(
-            repo_id=repo_id,
-            repo_type="dataset",
-            allow_patterns=file_patterns,
-            token=self.token,
+        offline = resolve_offline(self.offline)
+        try:
+            downloaded_path = get_request_scheduler().call(
+                lambda: snapshot_download(
+                    repo_id=repo_id,
+                    repo_type="dataset",
+                    revision=revision,
+                    allow_patterns=file_patterns,
+                    token=self.token,
+                    local_files_only=offline,
+                ),
+                priority=Priority.BULK,
+            )
+        except Exception as e:
+            if not offline:
+                raise
+            raise HfOfflineError(
+                f"Files of '{config_name}' in repo '{repo_id}' are not in the "
+                f"local HuggingFace cache and offline mode is enabled: {e}",
+                repo_id=repo_id,
+            ) from e
+
+        # snapshot_download returns the .../snapshots/<commit sha> directory
+        snapshot = Path(downloaded_path).name
+        self._resolved_commits[(repo_id, config_name)] = (
+            snapshot if is_commit_sha(snapshot) else None
         )
 
         parquet_files: list[str] = []
@@ -1014,6 +2274,187 @@ class VirtualDB:
 
         return parquet_files
 
+    # ------------------------------------------------------------------
+    # Refresh helpers
+    # ------------------------------------------------------------------
+
+    def _current_commit(self, repo_id: str, revision: str | None) -> str | None:
+        """
+        Return the commit sha a revision of a repository points at now.
+
+        :param repo_id: Repository ID
+        :param revision: Branch, tag or commit sha, or None for the default
+            branch
+        :return: The commit sha, or None if it could not be determined
+
+        """
+        if is_commit_sha(revision):
+            return revision
+        fetcher = HfRepoStructureFetcher(token=self.token, offline=self.offline)
+        try:
+            structure = fetcher.fetch(repo_id, force_refresh=True, revision=revision)
+        except HfDataFetchError as exc:
+            logger.warning(
+                "Could not check the current commit of repo '%s': %s", repo_id, exc
+            )
+            return None
+        return structure.get("sha")
+
+    def _stage_refresh(
+        self, db_name: str, card: DataCard
+    ) -> tuple[bool, dict[str, list[str]]]:
+        """
+        Resolve a dataset's files again and diff it against the current state.
+
+        :param db_name: Dataset name
+        :param card: Reloaded DataCard at the dataset's revision
+        :return: Whether the dataset's DataCard config, schema or file contents changed,
+            and its files keyed like ``self._parquet_files``
+
+        """
+        repo_id, config_name = self.db_name_map[db_name]
+        old_card = self._datacard(repo_id, config_name)
+        changed = old_card is None or (
+            card.get_config(config_name) != old_card.get_config(config_name)
+        )
+        files = {db_name: self._resolve_parquet_files(repo_id, config_name)}
+        changed = changed or not _same_files(
+            files[db_name], self._source_files.get(db_name, [])
+        )
+        if self._is_comparative(repo_id, config_name):
+            return changed, files
+
+        try:
+            schema = card.get_dataset_schema(config_name)
+        except Exception as exc:
+            logger.warning(
+                "Could not get dataset schema for %s/%s: %s",
+                repo_id,
+                config_name,
+                exc,
+            )
+            schema = None
+        changed = changed or schema != self._dataset_schemas.get(db_name)
+        if (
+            schema is not None
+            and schema.metadata_source == "external"
+            and schema.external_metadata_config
+        ):
+            meta_key = f"__{db_name}_meta"
+            files[meta_key] = self._resolve_parquet_files(
+                repo_id, schema.external_metadata_config
+            )
+            changed = changed or not _same_files(
+                files[meta_key], self._parquet_files.get(meta_key, [])
+            )
+        return changed, files
+
+    def _replace_datasets(
+        self,
+        db_names: set[str],
+        files: dict[str, list[str]],
+        cards: dict[tuple[str, str | None], DataCard],
+    ) -> None:
+        """
+        Swap in new DataCards and files and re-register the affected views.
+
+        The views are replaced in one transaction while holding the connection lock (see
+        :meth:`_connection`). On failure the transaction is rolled back and the previous
+        state is restored.
+
+        :param db_names: Datasets to replace
+        :param files: Their new files, keyed like ``self._parquet_files``
+        :param cards: Reloaded DataCards by (repo_id, revision)
+
+        """
+        saved = {
+            "datacards": self.datacards,
+            "_revision_datacards": self._revision_datacards,
+            "_parquet_files": dict(self._parquet_files),
+            "_source_revisions": dict(self._source_revisions),
+            "_dataset_schemas": self._dataset_schemas,
+            "_external_meta_configs": self._external_meta_configs,
+            "_external_meta_views": dict(self._external_meta_views),
+            "_column_metadata": self._column_metadata,
+        }
+        sources = {n: files[n] for n in db_names}
+        try:
+            self._store_cards(cards)
+            for db_name in db_names:
+                self._source_revisions.pop(db_name, None)
+                repo_id, config_name = self.db_name_map[db_name]
+                if self.optimize_parquet and files[db_name]:
+                    files[db_name] = self._optimize_parquet_files(
+                        db_name, repo_id, config_name, files[db_name]
+                    )
+
+            with self._connection() as conn:
+                conn.execute("BEGIN TRANSACTION")
+                try:
+                    self._register_replaced_views(db_names, files)
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+        except BaseException:
+            with self._lock:
+                for name, value in saved.items():
+                    setattr(self, name, value)
+            raise
+
+        self._source_files.update(sources)
+        for db_name in db_names:
+            self._condition_cubes.pop(db_name, None)
+            self._identifier_indexes.pop(db_name, None)
+            self._coordinate_indexes.pop(db_name, None)
+
+    def _register_replaced_views(
+        self, db_names: set[str], files: dict[str, list[str]]
+    ) -> None:
+        """
+        Drop and re-register the views of replaced datasets and their dependents.
+
+        :param db_names: Replaced datasets
+        :param files: Their new files, keyed like ``self._parquet_files``
+
+        """
+        for db_name in db_names:
+            for view in (
+                f"__{db_name}_parquet",
+                db_name,
+                f"__{db_name}_metadata_parquet",
+                f"{db_name}_meta",
+                f"{db_name}_expanded",
+            ):
+                with self._connection() as conn:
+                    conn.execute(f"DROP VIEW IF EXISTS {view}")
+            self._external_meta_views.pop(db_name, None)
+            self._parquet_files.pop(f"__{db_name}_meta", None)
+        self._parquet_files.update(files)
+        self._validate_datacards()
+
+        # Comparative datasets linking to a replaced dataset
+        dependents = set()
+        for db_name, (repo_id, config_name) in self.db_name_map.items():
+            ds_cfg = self._get_dataset_config(repo_id, config_name)
+            if ds_cfg and ds_cfg.links:
+                linked = {
+                    self._get_db_name_for(pair[0], pair[1])
+                    for pairs in ds_cfg.links.values()
+                    for pair in pairs
+                }
+                if linked & db_names:
+                    dependents.add(db_name)
+        self._register_views(
+            [n for n in self.db_name_map if n in db_names or n in dependents]
+        )
+
+        if any(not self._is_comparative(*self.db_name_map[n]) for n in db_names):
+            self._register_all_meta_view(materialize=self.materialize_all_meta)
+            self._build_column_metadata()
+            if self._sample_index_built:
+                self.build_sample_index(self._sample_index_extra_fields)
+
     # ------------------------------------------------------------------
     # View registration helpers
     # ------------------------------------------------------------------
@@ -1027,20 +2468,19 @@ class VirtualDB:
         """
         Register a raw DuckDB view over pre-resolved Parquet files.
 
-        Creates an internal ``__<db_name>_parquet`` view that reads
-        directly from the Parquet files. For primary datasets, also
-        creates a public ``<db_name>`` view (initially identical)
-        that may later be replaced by ``_enrich_raw_view``.
+        Creates an internal ``__<db_name>_parquet`` view that reads directly from the
+        Parquet files. For primary datasets, also creates a public ``<db_name>`` view
+        (initially identical) that may later be replaced by ``_enrich_raw_view``.
 
-        For comparative datasets, only the internal parquet view is
-        created; the public view is the ``_expanded`` view instead.
+        For comparative datasets, only the internal parquet view is created; the public
+        view is the ``_expanded`` view instead.
 
-        Parquet files must have been resolved by ``_update_cache``
-        before this method is called.
+        Parquet files must have been resolved by ``_update_cache`` before this method is
+        called.
 
         :param db_name: View name
-        :param parquet_only: If True, only create the internal
-            ``__<db_name>_parquet`` view (no public ``<db_name>``).
+        :param parquet_only: If True, only create the internal ``__<db_name>_parquet``
+            view (no public ``<db_name>``).
 
         """
         files = self._parquet_files.get(db_name, [])
@@ -1051,11 +2491,11 @@ class VirtualDB:
             )
             return
 
-        files_sql = ", ".join(f"'{f}'" for f in files)
-        parquet_sql = f"SELECT * FROM read_parquet([{files_sql}])"
-        self._conn.execute(
-            f"CREATE OR REPLACE VIEW __{db_name}_parquet AS " f"{parquet_sql}"
-        )
+        parquet_sql = f"SELECT * FROM read_parquet({sql_file_list(files)})"
+        with self._connection() as conn:
+            conn.execute(
+                f"CREATE OR REPLACE VIEW __{db_name}_parquet AS " f"{parquet_sql}"
+            )
         if not parquet_only:
             sample_col = self._get_sample_id_col(db_name)
             if sample_col == "sample_id":
@@ -1072,7 +2512,8 @@ class VirtualDB:
                         parts.append(col)
                 cols_sql = ", ".join(parts)
                 public_select = f"SELECT {cols_sql} FROM __{db_name}_parquet"
-            self._conn.execute(f"CREATE OR REPLACE VIEW {db_name} AS {public_select}")
+            with self._connection() as conn:
+                conn.execute(f"CREATE OR REPLACE VIEW {db_name} AS {public_select}")
 
     def _register_meta_view(self, db_name: str, repo_id: str, config_name: str) -> None:
         """
@@ -1120,14 +2561,14 @@ class VirtualDB:
             # may not be physically present in the parquet file. Use DuckDB
             # introspection to get the actual columns in the metadata parquet.
             assert ext_meta_view is not None
-            actual_meta_cols: set[str] = set(self._get_view_columns(ext_meta_view))
+            actual_meta_cols = frozenset(self._get_view_columns(ext_meta_view))
             meta_cols: list[str] = sorted(actual_meta_cols)
         elif schema is not None:
             actual_meta_cols = schema.metadata_columns
             meta_cols = sorted(actual_meta_cols)
         else:
             meta_cols = self._resolve_metadata_fields(repo_id, config_name) or []
-            actual_meta_cols = set(meta_cols)
+            actual_meta_cols = frozenset(meta_cols)
 
         if not meta_cols:
             raise ValueError(
@@ -1307,7 +2748,8 @@ class VirtualDB:
             f"SELECT DISTINCT {cols_sql} FROM {from_clause}"
         )
         try:
-            self._conn.execute(sql)
+            with self._connection() as conn:
+                conn.execute(sql)
         except BinderException as exc:
             raise BinderException(
                 f"Failed to create meta view '{db_name}_meta'.\n"
@@ -1321,10 +2763,9 @@ class VirtualDB:
         """
         Replace a primary raw view with a join to its ``_meta`` view.
 
-        If ``<db_name>_meta`` has derived columns not present in the
-        raw parquet view, recreates ``<db_name>`` as a join so derived
-        columns (e.g. ``carbon_source``) appear alongside measurement
-        data.
+        If ``<db_name>_meta`` has derived columns not present in the raw parquet view,
+        recreates ``<db_name>`` as a join so derived columns (e.g. ``carbon_source``)
+        appear alongside measurement data.
 
         :param db_name: Base view name for the primary dataset
 
@@ -1385,23 +2826,70 @@ class VirtualDB:
         else:
             join_clause = f"JOIN {meta_name} m USING ({sample_col})"
 
-        self._conn.execute(
-            f"CREATE OR REPLACE VIEW {db_name} AS "
-            f"SELECT {full_select} "
-            f"FROM {parquet_name} r "
-            f"{join_clause}"
-        )
+        with self._connection() as conn:
+            conn.execute(
+                f"CREATE OR REPLACE VIEW {db_name} AS "
+                f"SELECT {full_select} "
+                f"FROM {parquet_name} r "
+                f"{join_clause}"
+            )
+
+    def _register_all_meta_view(self, materialize: bool = False) -> None:
+        """
+        Register the cross-dataset ``all_meta`` relation.
+
+        ``all_meta`` is a ``UNION ALL BY NAME`` of the columns returned by
+        :meth:`get_common_fields` over every primary ``<db_name>_meta`` view, plus a
+        leading ``db_name`` column identifying the source dataset. Because it reads the
+        ``_meta`` views, factor aliases and missing value labels are already applied.
+        Columns whose types differ between datasets are widened to a common type by
+        DuckDB.
+
+        When ``materialize`` is True the union is computed once into the internal table
+        ``__all_meta`` and ``all_meta`` is a view over that table, so cross-study
+        searches scan one compact table instead of every dataset's parquet files.
+
+        :param materialize: Whether to materialize the union into a table
+
+        """
+        if "all" in self.db_name_map or "all_meta" in self.db_name_map:
+            logger.warning(
+                "A dataset is named 'all' or 'all_meta' -- skipping the "
+                "cross-dataset 'all_meta' view"
+            )
+            return
+
+        meta_views = self._get_primary_meta_view_names()
+        common = [c for c in self.get_common_fields() if c != "db_name"]
+        if not meta_views or not common:
+            return
+
+        cols_sql = ", ".join(_quote_ident(c) for c in common)
+        selects = [
+            f"SELECT '{view[: -len('_meta')]}' AS db_name, {cols_sql} FROM {view}"
+            for view in meta_views
+        ]
+        union_sql = " UNION ALL BY NAME ".join(selects)
+
+        with self._connection() as conn:
+            if materialize:
+                conn.execute(f"CREATE OR REPLACE TABLE __all_meta AS {union_sql}")
+                conn.execute(
+                    "CREATE OR REPLACE VIEW all_meta AS SELECT * FROM __all_meta"
+                )
+            else:
+                conn.execute(f"CREATE OR REPLACE VIEW all_meta AS {union_sql}")
 
     def _get_view_columns(self, view: str) -> list[str]:
         """
         Return column names for a view.
 
-        Uses ``DESCRIBE`` rather than ``information_schema`` to force
-        eager schema resolution for ``read_parquet``-backed views,
-        which DuckDB may evaluate lazily.
+        Uses ``DESCRIBE`` rather than ``information_schema`` to force eager schema
+        resolution for ``read_parquet``-backed views, which DuckDB may evaluate lazily.
 
         """
-        df = self._conn.execute(f"DESCRIBE {view}").fetchdf()
+        with self._connection() as conn:
+            df = conn.execute(f"DESCRIBE {view}").fetchdf()
         return df["column_name"].tolist()
 
     def _get_sample_id_col(self, db_name: str) -> str:
@@ -1421,9 +2909,8 @@ class VirtualDB:
         """
         Get metadata field names from the DataCard.
 
-        Delegates to ``DataCard.get_metadata_fields()`` which handles
-        both embedded metadata_fields and external metadata configs
-        (via applies_to).
+        Delegates to ``DataCard.get_metadata_fields()`` which handles both embedded
+        metadata_fields and external metadata configs (via applies_to).
 
         :param repo_id: Repository ID
         :param config_name: Configuration name
@@ -1431,8 +2918,11 @@ class VirtualDB:
 
         """
         try:
-            card = self.datacards.get(repo_id) or _cached_datacard(
-                repo_id, token=self.token
+            card = self._datacard(repo_id, config_name) or _cached_datacard(
+                repo_id,
+                token=self.token,
+                offline=self.offline,
+                revision=self.config.get_revision(repo_id, config_name),
             )
             return card.get_metadata_fields(config_name)
         except Exception:
@@ -1449,25 +2939,24 @@ class VirtualDB:
         """
         Return the ENUM levels for a field with class_label dtype.
 
-        Looks up the FeatureInfo for ``field`` in the DataCard config and
-        extracts the ``names`` list from its ``class_label`` dtype dict.
+        Looks up the FeatureInfo for ``field`` in the DataCard config and extracts the
+        ``names`` list from its ``class_label`` dtype dict.
 
         :param card: DataCard instance
         :param config_name: Configuration name
         :param field: Field name to look up
         :return: List of level strings
-        :raises ValueError: If the field is not found, has no class_label dtype,
-            or the class_label dict has no ``names`` key
+        :raises ValueError: If the field is not found, has no class_label dtype, or the
+            class_label dict has no ``names`` key
 
         """
         try:
-            features = card.get_features(config_name)
+            feature = card.get_feature(config_name, field)
         except Exception as exc:
             raise ValueError(
                 f"Could not retrieve features for config '{config_name}': {exc}"
             ) from exc
 
-        feature = next((f for f in features if f.name == field), None)
         if feature is None:
             raise ValueError(
                 f"Field '{field}' not found in DataCard config '{config_name}'. "
@@ -1506,12 +2995,13 @@ class VirtualDB:
         :param levels: Ordered list of allowed string values
 
         """
-        try:
-            self._conn.execute(f"DROP TYPE IF EXISTS {type_name}")
-        except Exception:
-            pass  # type may not exist yet
         escaped = ", ".join(f"'{v.replace(chr(39), chr(39)*2)}'" for v in levels)
-        self._conn.execute(f"CREATE TYPE {type_name} AS ENUM ({escaped})")
+        with self._connection() as conn:
+            try:
+                conn.execute(f"DROP TYPE IF EXISTS {type_name}")
+            except Exception:
+                pass  # type may not exist yet
+            conn.execute(f"CREATE TYPE {type_name} AS ENUM ({escaped})")
 
     def _resolve_alias(self, col: str, value: str) -> str:
         """
@@ -1564,8 +3054,11 @@ class VirtualDB:
         card = None
         if mappings:
             try:
-                card = self.datacards.get(repo_id) or _cached_datacard(
-                    repo_id, token=self.token
+                card = self._datacard(repo_id, config_name) or _cached_datacard(
+                    repo_id,
+                    token=self.token,
+                    offline=self.offline,
+                    revision=self.config.get_revision(repo_id, config_name),
                 )
             except Exception as exc:
                 logger.warning(
@@ -1676,9 +3169,9 @@ class VirtualDB:
         """
         Build a SQL expression for a field+path property mapping.
 
-        Resolves each definition value via ``get_nested_value``,
-        applies factor aliases, and returns either a constant or
-        a CASE WHEN expression.
+        Resolves ``path`` in every definition in one pass with a compiled accessor
+        (:func:`~labretriever.nested_path.compile_path`), applies factor aliases, and
+        returns either a constant or a CASE WHEN expression.
 
         :param key: Output column name
         :param field: Source field in parquet (e.g., "condition")
@@ -1705,9 +3198,9 @@ class VirtualDB:
 
         # Resolve each definition value
         value_map: dict[str, str] = {}
-        for def_key, definition in defs.items():
-            raw = get_nested_value(definition, path)
+        for def_key, raw in compile_path(path).get_many(defs).items():
             if raw is None:
+                definition = defs[def_key]
                 logger.debug(
                     "Path '%s' resolved to None for " "definition key '%s' (keys: %s)",
                     path,
@@ -1763,13 +3256,11 @@ class VirtualDB:
         """
         Build a constant column expression for a path-only mapping.
 
-        Resolves a single value from the DataCard's raw model_extra,
-        which preserves the full dict structure (including any
-        ``experimental_conditions`` wrapper).
+        Resolves a single value from the DataCard's raw model_extra, which preserves the
+        full dict structure (including any ``experimental_conditions`` wrapper).
 
         :param key: Output column name
-        :param path: Dot-notation path (may include
-            ``experimental_conditions.`` prefix)
+        :param path: Dot-notation path (may include ``experimental_conditions.`` prefix)
         :param dtype: Optional data type
         :param config_name: Configuration name
         :param card: DataCard instance
@@ -1798,7 +3289,7 @@ class VirtualDB:
         if not merged:
             return None
 
-        raw = get_nested_value(merged, path)
+        raw = compile_path(path).get(merged)
         if raw is None:
             logger.debug(
                 "Path '%s' resolved to None in model_extra for "
@@ -1885,38 +3376,223 @@ class VirtualDB:
             return
 
         cols_sql = ", ".join(extra_cols)
-        self._conn.execute(
-            f"CREATE OR REPLACE VIEW {db_name}_expanded AS "
-            f"SELECT *, {cols_sql} FROM {parquet_view}"
-        )
+        with self._connection() as conn:
+            conn.execute(
+                f"CREATE OR REPLACE VIEW {db_name}_expanded AS "
+                f"SELECT *, {cols_sql} FROM {parquet_view}"
+            )
 
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
 
-    def _is_comparative(self, repo_id: str, config_name: str) -> bool:
-        """Return True if the dataset has links (i.e. is comparative)."""
+    def _get_dataset_revision(self, db_name: str) -> str | None:
+        """
+        Return a revision identifier for a dataset's parquet files.
+
+        Files resolved through ``snapshot_download`` live under
+        ``.../snapshots/<commit_sha>/``; the commit sha is returned in that case. For
+        files outside the HuggingFace cache, a fingerprint of the file paths, sizes and
+        modification times is returned instead. For datasets replaced by an optimized
+        copy, the revision of the source files is returned.
+
+        :param db_name: Dataset name
+        :return: Revision string, or None if the dataset has no files
+
+        """
+        if db_name in self._source_revisions:
+            return self._source_revisions[db_name]
+        return _files_revision(self._parquet_files.get(db_name, []))
+
+    def _optimize_parquet_files(
+        self, db_name: str, repo_id: str, config_name: str, files: list[str]
+    ) -> list[str]:
+        """
+        Return the files of a compacted, sorted copy of a dataset.
+
+        The copy lives in
+        ``<optimized_cache_dir>/<repo>/<config_name>/<revision>-<params>/`` and
+        is written on first use. Rows are sorted by chromosome and start
+        position for ``genome_map`` datasets with detectable coordinate
+        columns, and by the sample identifier column otherwise. If the copy
+        cannot be written, the source files are returned.
+
+        :param db_name: Dataset name
+        :param repo_id: Repository ID
+        :param config_name: Configuration name
+        :param files: Source parquet files
+        :return: Parquet files to register views over
+
+        """
+        revision = _files_revision(files)
+        sort_by = [self._get_sample_id_col(db_name)]
+        card = self._datacard(repo_id, config_name)
+        if card is not None:
+            try:
+                dc_config = card.get_config(config_name)
+                if (
+                    dc_config is not None
+                    and dc_config.dataset_type == DatasetType.GENOME_MAP
+                ):
+                    coords = _detect_coordinate_columns(
+                        [f.name for f in card.get_features(config_name)]
+                    )
+                    if coords is not None:
+                        sort_by = [coords[0], coords[1]]
+            except Exception as exc:
+                logger.debug("Could not inspect %s/%s: %s", repo_id, config_name, exc)
+
+        params_key = hashlib.sha1(
+            repr((sort_by, DEFAULT_ROW_GROUP_SIZE, DEFAULT_FILE_SIZE_BYTES)).encode()
+        ).hexdigest()[:8]
+        out_dir = (
+            self.optimized_cache_dir
+            / repo_id.replace("/", "--")
+            / config_name
+            / f"{revision}-{params_key}"
+        )
+        # Compaction can take long, so it runs on its own cursor instead of
+        # holding the lock that queries wait on
+        with self._connection() as conn:
+            cursor = conn.cursor()
+        try:
+            optimized = compact_parquet(cursor, files, out_dir, sort_by=sort_by)
+        except (duckdb.Error, OSError) as exc:
+            logger.warning(
+                "Could not optimize parquet files for '%s' -- using the "
+                "original files: %s",
+                db_name,
+                exc,
+            )
+            return files
+        finally:
+            cursor.close()
+        self._source_revisions[db_name] = revision
+        return optimized
+
+    def _get_identifier_columns(self, db_name: str) -> dict[str, list[str]]:
+        """
+        Return the regulator and target identifier columns of a dataset.
+
+        Uses the DataCard feature roles recorded in the column metadata
+        (``regulator_identifier`` and ``target_identifier``), covering both the data
+        config and any external metadata config.
+
+        :param db_name: Dataset name
+        :return: Dict with keys ``"regulator"`` and ``"target"``
+
+        """
+        col_meta = self._column_metadata.get(db_name, {})
+        return {
+            "regulator": [
+                c for c, m in col_meta.items() if m.role == "regulator_identifier"
+            ],
+            "target": [c for c, m in col_meta.items() if m.role == "target_identifier"],
+        }
+
+    def _sample_ids_for_identifier(
+        self, db_name: str, columns: list[str], value: Any
+    ) -> list[Any] | None:
+        """
+        Resolve the sample ids whose ``_meta`` row matches an identifier.
+
+        :param db_name: Dataset name
+        :param columns: Candidate identifier columns
+        :param value: Identifier value
+        :return: Matching sample ids, or None if none of ``columns`` is in the ``_meta``
+            view
+
+        """
+        meta_view = f"{db_name}_meta"
+        if not self._view_exists(meta_view):
+            return None
+        meta_cols = set(self._get_view_columns(meta_view))
+        present = [c for c in columns if c in meta_cols]
+        if not present:
+            return None
+        where = " OR ".join(f"{_quote_ident(c)} = ?" for c in present)
+        with self._connection() as conn:
+            rows = conn.execute(
+                f"SELECT DISTINCT sample_id FROM {meta_view} WHERE {where}",
+                [value] * len(present),
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def _default_cube_columns(self, db_name: str, meta_cols: list[str]) -> list[str]:
+        """
+        Select the columns of a ``_meta`` view that drive cascading filters.
+
+        Includes ``experimental_condition`` columns and property-mapping output columns,
+        in ``_meta`` view order. Excludes ``sample_id`` and columns whose DataCard role
+        is ``regulator_identifier`` or ``target_identifier``, which have one level per
+        sample and would make the cube as large as the view.
+
+        :param db_name: Dataset name
+        :param meta_cols: Columns of ``<db_name>_meta``
+        :return: Column names
+
+        """
+        repo_id, config_name = self.db_name_map[db_name]
+        mappings = self.config.get_property_mappings(repo_id, config_name)
+        col_meta = self._column_metadata.get(db_name, {})
+        identifier_roles = {"regulator_identifier", "target_identifier"}
+
+        selected: list[str] = []
+        for col in meta_cols:
+            if col == "sample_id":
+                continue
+            meta = col_meta.get(col)
+            role = meta.role if meta is not None else None
+            if role in identifier_roles:
+                continue
+            if (
+                role == "experimental_condition"
+                or col in mappings
+                or col in self.config.missing_value_labels
+            ):
+                selected.append(col)
+        return selected
+
+    def _get_dataset_config(self, repo_id: str, config_name: str) -> Any:
+        """Return the VirtualDB config of a dataset, or None."""
         repo_cfg = self.config.repositories.get(repo_id)
         if not repo_cfg or not repo_cfg.dataset:
-            return False
-        ds_cfg = repo_cfg.dataset.get(config_name)
+            return None
+        return repo_cfg.dataset.get(config_name)
+
+    def _is_comparative(self, repo_id: str, config_name: str) -> bool:
+        """Return True if the dataset has links (i.e. is comparative)."""
+        ds_cfg = self._get_dataset_config(repo_id, config_name)
         return bool(ds_cfg and ds_cfg.links)
 
     def _list_views(self) -> list[str]:
         """Return list of public views (excludes internal __ prefixed)."""
-        df = self._conn.execute(
-            "SELECT table_name FROM information_schema.tables "
-            "WHERE table_schema = 'main' AND table_type = 'VIEW'"
-        ).fetchdf()
+        with self._connection() as conn:
+            df = conn.execute(
+                "SELECT table_name FROM information_schema.tables "
+                "WHERE table_schema = 'main' AND table_type = 'VIEW'"
+            ).fetchdf()
         return [n for n in df["table_name"].tolist() if not n.startswith("__")]
 
     def _view_exists(self, name: str) -> bool:
         """Check whether a view is registered (including internal)."""
-        df = self._conn.execute(
-            "SELECT table_name FROM information_schema.tables "
-            "WHERE table_schema = 'main' AND table_type = 'VIEW' "
-            f"AND table_name = '{name}'"
-        ).fetchdf()
+        with self._connection() as conn:
+            df = conn.execute(
+                "SELECT table_name FROM information_schema.tables "
+                "WHERE table_schema = 'main' AND table_type = 'VIEW' "
+                f"AND table_name = '{name}'"
+            ).fetchdf()
+        return len(df) > 0
+
+    def _table_exists(self, name: str) -> bool:
+        """Check whether a base table is registered (including internal)."""
+        with self._connection() as conn:
+            df = conn.execute(
+                "SELECT table_name FROM information_schema.tables "
+                "WHERE table_schema = 'main' AND table_type = 'BASE TABLE' "
+                "AND table_name = ?",
+                [name],
+            ).fetchdf()
         return len(df) > 0
 
     def _get_primary_view_names(self) -> list[str]: